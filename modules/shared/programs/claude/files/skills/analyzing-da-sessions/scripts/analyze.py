@@ -6,41 +6,132 @@ PR #670 정정 코멘트의 알고리즘 (분모 정정 + 4-tier fallback + sour
 
 Internal boundary:
   - constants/enums          — VERDICT_CATEGORIES, INTENSITY_VERDICTS, BUNDLE_MAP, regex 등
-  - jsonl payload walker     — extract_text_payloads
+  - jsonl payload walker     — extract_text_payloads, record_schema
   - finding_id normalizer    — get_bundle
-  - verdict parser pipeline  — extract_strict_verdicts, extract_unmarked_json_verdicts,
-                                extract_kv_verdicts, extract_nl_summary, extract_intensity_verdicts
-  - severity transition      — find_severity_for_finding, severity_rank, compute_severity_transitions
+  - verdict parser pipeline  — scan_anchors, extract_tiered_verdicts, extract_strict_verdicts,
+                                extract_unmarked_json_verdicts, extract_kv_verdicts,
+                                extract_nl_summary, extract_intensity_verdicts
+  - severity transition      — build_severity_index, index_finding_occurrences, lookup_severity,
+                                find_severity_for_finding, severity_rank,
+                                compute_severity_transitions
   - stability source         — resolve_stability_status_from_round_summary (round summary 전용)
-  - aggregate builder        — analyze_session, build_aggregate
+  - aggregate builder        — SessionParser, analyze_session, iter_text_lines,
+                                triage_session_file, triaged_session,
+                                AggregateAccumulator, FoldBuffer, build_aggregate
   - markdown renderer        — render_markdown
   - json renderer            — render_json
-  - host handling            — collect_local_files, collect_remote_files, fetch_remote_file,
-                                analyze_remote_session, _validate_host, _validate_remote_path
+  - session result cache     — SessionCache, algorithm_version, split_local_cache,
+                                iter_local_analyses
+  - run profile (--profile)  — RunProfile, enable_profile, profile_stage, profile_fetch,
+                                take_session_profile
+  - verdict index (--index)  — VerdictIndex, open_verdict_index, normalize_timestamp, query_index,
+                                query_index_sessions, query_index_verdicts, render_verdict_rows
+  - sampling (--sample)      — SampleEstimator, sample_host_runs, allocate_sample, session_source,
+                                collect_host_runs
+  - time buckets (--bucket)  — TrendBuckets, bucket_of, _render_trend
+  - regression gate (gate)   — gate_main, gate_file_digests, gate_values, compare_gate, gate_paths,
+                                load_gate_store, save_gate_store, select_duplicates, classify_corpus_files
+  - snapshot blob store      — snapshot_main, BlobStore, open_blob_store, attach_snapshot_blobs,
+                                analyze_blob_session, iter_blob_analyses, snapshot_local_files,
+                                snapshot_remote_files
+  - host handling            — collect_local_files, collect_remote_files, FetchLimiter,
+                                fetch_limiter, fetch_with_retries, transport_stats, fetch_remote_file,
+                                analyze_remote_sessions, analyze_remote_session_async,
+                                iter_remote_sessions_async,
+                                fetch_remote_tar_batch, iter_remote_tar_members,
+                                find_duplicate_sessions, dedupe_host_runs, stat_remote_files,
+                                remote_session_digests, local_session_digest,
+                                iter_remote_sessions, RemoteMirror, analyze_mirrored_sessions,
+                                HostRun, run_hosts,
+                                analyze_remote_exec, emit_remote_sessions,
+                                _validate_host, _validate_remote_path
+  - watch daemon (watch)     — WatchState, open_watch_socket, query_watch, watch_loop, watch_main
 
 CLI:
   --hosts <comma list>     default: mac,minipc. whitelist {mac, minipc} reject-fast.
-  --corpus <path>          pinned manifest.json (files + snapshot_id 소비).
+  --corpus <path>          pinned manifest.json (files + snapshot_id 소비). `blobs`가 있으면 (snapshot) host 대신
+                           blob store를 읽는다 (ssh 없음).
+  --blob-store <dir>       snapshot blob store (default: manifest blob_store, 없으면 ~/.cache/analyzing-da-sessions/blobs).
   --json out=<path>        JSON sidecar 경로 override (default: /tmp/analyze-da-sessions-<ISO>.json).
+  --cache <path>           세션 결과 cache SQLite 경로 (default: ~/.cache/analyzing-da-sessions/cache.sqlite3).
+  --no-cache               cache 조회/기록 없이 전체 재파싱.
+  --jobs <N>               로컬 파일 분석 process 수 (default: 1 = 직렬, 0 = CPU 수).
+  --transport tar|cat      원격 jsonl fetch 방식 (default: tar = batch당 ssh 1회, cat = 파일당 ssh 1회).
+  --remote-exec            원격 host에서 분석기를 직접 실행 (`ssh host python3 -`)하고 세션 결과만 수신.
+  --mirror <dir>           원격 jsonl 로컬 mirror 경로 (default: ~/.cache/analyzing-da-sessions/mirror).
+  --no-mirror              mirror 없이 cache miss 원격 파일을 매 실행 전체 fetch.
+  --no-triage              marker byte triage 없이 모든 세션 전체 파싱.
+  --no-dedup               content가 같은 세션 사본 (host 간 동기화/복사, manifest 반복)도 각각 분석/집계.
+  --profile                단계/host별 wall·CPU, ssh fetch 지연·전송량, 느린/큰 세션 top N을
+                           JSON sidecar `profile` section에 기록.
+  --index <path>           세션/verdict 행을 SQLite에 기록 (query subcommand 입력).
+  --sample <N> | --sample-frac <p>
+                           dedup 후 세션을 (host, source) 층화 표본 N개 (또는 비율 p)로 줄여 분석하고
+                           M-1..M-3 추정치 + 95% 층화 세션 bootstrap 구간을 함께 출력.
+  --seed <S>               표본 추출/bootstrap seed (default: 0). 같은 파일 목록 + seed면 같은 결과.
+  --bucket day|week|month  같은 scan에서 세션 시작 시각 (첫 record timestamp, 없으면 mtime) UTC 구간별
+                           M-1..M-5도 계산해 JSON `trend` 시계열 + markdown 추이 표로 출력.
+
+  query --index <path> [--hosts L] [--path S] [--verdict L] [--bundle L] [--severity L] [--source L]
+        [--since T] [--until T] [--list] [--json out=<path>]
+                           index 행만으로 filter에 맞는 M-1..M-5 재계산 (jsonl 미접근). --list는 verdict 행 표.
+
+  gate --corpus <manifest> [위 host/cache/분석 option] [--baseline <json>] [--store <path>]
+       [--tolerance N | --tolerance <group>=N ...] [--update] [--json out=<path>]
+                           pinned 파일 content sha256이 store와 같으면 저장된 결과를 재사용하고 바뀐 파일만
+                           재분석한 aggregate를 baseline과 비교. exit 0 통과 / 1 허용치 초과 / 2 오류.
+                           --update는 현재 aggregate를 baseline으로 기록.
+
+  snapshot --corpus <manifest> [--hosts L] [--blob-store <dir>] [--output <path>] [--refresh]
+                           pinned 파일 content를 sha256 주소의 gzip blob으로 고정 (같은 content는 1개)하고
+                           manifest에 `blob_store` + `blobs` (path → sha256, size, mtime_ns)를 기록.
+
+  watch [위 host/cache/분석 option] [--socket <path>] [--interval S] [--remote-interval S]
+                           daemon — 로컬은 S초, 원격은 ssh find로 S초마다 (size, mtime)을 polling해
+                           바뀐 세션만 재분석하고 markdown/JSON/status를 Unix socket으로 응답.
+  watch --ask markdown|json|status
+                           실행 중인 daemon에 query 1건을 보내 응답을 stdout으로 출력.
 
 Output:
   stdout                  markdown 표 + 요약
   JSON sidecar            같은 aggregate 객체에서 렌더링 (불일치 위험 차단)
 """
 
+from __future__ import annotations  # --remote-exec 원격 python3 < 3.10에서도 `X | None` annotation 허용
+
 import argparse
+import asyncio
+import bisect
 import concurrent.futures
+import contextlib
 import datetime
+import functools
 import glob
+import gzip
+import hashlib
 import json
+import mmap
 import os
 import platform
 import posixpath
+import queue
+import random
 import re
+import resource
+import signal
+import socket
+import socketserver
+import sqlite3
+import stat
 import subprocess
 import sys
+import tarfile
+import tempfile
+import threading
+import time
+import zlib
 from collections import Counter, defaultdict
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 1. constants/enums
@@ -48,6 +139,12 @@ from typing import Any, Iterable
 
 VALID_HOSTS = {"mac", "minipc"}
 
+# aggregate JSON schema. 값 변경 시 session result cache도 자동 무효화된다 (algorithm_version 입력).
+SCHEMA_VERSION = "1.0"
+# analyze_session 반환 dict의 shape/의미를 바꿀 때 증가 — regex/tunable 변경은 자동 감지되므로
+# 본 값은 코드 로직 변경 (tier 순서, 필드 추가 등)만 반영한다.
+PARSER_REVISION = 4
+
 VERDICT_CATEGORIES = ("CONFIRMED_ISSUE", "NOT_AN_ISSUE", "NEEDS_MORE_INFO")
 INTENSITY_VERDICTS = ("FULL", "LITE", "SKIP")
 
@@ -67,6 +164,33 @@ VERDICT_KV = re.compile(
 )
 NL_SUMMARY = re.compile(r"(CONFIRMED(?:_ISSUE)?|NOT_AN_ISSUE|NEEDS_MORE_INFO)\s*(\d+)\s*건")
 ARBITER_RESULT_HEADER_COUNT = re.compile(r"Arbiter\s+검증\s+결과\s*[:：]?\s*(\d+)\s*건")
+ARBITER_RESULT_HEADER = re.compile(r"##\s+Arbiter\s+검증\s+결과")  # Tier 4 KV window 시작
+NEXT_SECTION_HEADER = re.compile(r"\n##\s")  # Tier 4 KV window 종료
+
+# Single-pass anchor scan — 각 token은 아래 extractor 매치의 필요조건 literal이다. payload마다
+# 1회 alternation scan으로 등장 token 집합을 구한 뒤, token이 없는 extractor는 호출하지 않는다.
+#   /tmp/da-             ARBITER_DIR_MARKER, INTENSITY_DIR_MARKER
+#   verdict-json:start   VERDICT_JSON_BLOCK (Tier 1)
+#   ###                  HUMAN_VERDICT_HEADER (Tier 2)
+#   ```json              FENCED_JSON_BLOCK (Tier 3)
+#   Arbiter + 판정       ARBITER_RESULT_HEADER window 안 VERDICT_KV (Tier 4)
+#   건                   NL_SUMMARY, ARBITER_RESULT_HEADER_COUNT (Tier 5)
+#   intensity/검토/판정  INTENSITY_VERDICT_LINE
+#   selective            SELECTIVE_LINE (SessionParser streaming scan)
+# INTENSITY_VERDICT_LINE의 `Review\s+Intensity` 분기와 SELECTIVE_LINE은 re.I라 대소문자 무관
+# anchor가 필요하다.
+# alternation에 re.I (또는 scoped `(?i:...)`)를 섞으면 sre literal prefix 최적화가 꺼져 scan이
+# 기존 regex pass 합계보다 느려지므로, 이 token들만 str.lower() 부분 문자열 검사로 분리한다.
+ANCHOR_SCAN = re.compile(r"/tmp/da-|verdict-json:start|```json|###|판정|Arbiter|건|검토")
+ANCHOR_TOKEN_COUNT = 8
+# re.I가 ASCII i/s와 동일시하는 비ASCII 문자 — 등장 시 casefold anchor 존재로 간주 (superset)
+CASEFOLD_ALIASES = ("\u0130", "\u0131", "\u017f")
+CASEFOLD_ANCHORS = ("intensity", "selective")
+# 파일 단위 triage — 세 byte 문자열이 모두 없으면 marker 없음 + parse_failures 없음이 확정된다.
+# jsonl writer가 "/"를 escape하는 경우 (`\/`)도 포함한다.
+TRIAGE_MARKERS = (b"/tmp/da-", b"\\/tmp\\/da-", b"verdict-json:start")
+STRICT_TIER_ANCHORS = frozenset({"verdict-json:start", "###"})
+INTENSITY_LINE_ANCHORS = frozenset({"intensity", "검토", "판정"})
 
 # Intensity verdict (인라인 체크리스트 출력의 첫 토큰 — Step 0 결과 라벨)
 INTENSITY_VERDICT_LINE = re.compile(
@@ -78,6 +202,15 @@ INTENSITY_VERDICT_LINE = re.compile(
 SEV_LINE = re.compile(
     r"\*\*심각도\*\*\s*[:：]\s*\*?\*?(CRITICAL|HIGH|MEDIUM|LOW)\*?\*?", re.I
 )
+# severity index용 core — SEV_LINE에서 후행 `\*?\*?`만 뺀 형태. window 안 SEV_LINE 매치 존재는
+# "window 안에 완전히 들어가는 core 매치 존재"와 동치이고, core 매치끼리는 겹치지 않는다.
+SEV_CORE = re.compile(
+    r"\*\*심각도\*\*\s*[:：]\s*\*?\*?(CRITICAL|HIGH|MEDIUM|LOW)", re.I
+)
+# streaming parser가 payload 경계 (가상 blob의 "\n")에서 미완성 core를 이어 붙일지 판정한다.
+# label 글자 사이에는 "\n"이 올 수 없으므로 label 직전 공백/콜론까지만 미완성으로 본다.
+SEV_PENDING_TAIL = re.compile(r"\*\*심각도\*\*\s*(?:[:：]\s*)?\Z")
+SEV_TOKEN = "**심각도**"
 SEVERITY_RANK = {"CRITICAL": 4, "HIGH": 3, "MEDIUM": 2, "LOW": 1}
 
 # Finding ID normalize
@@ -108,6 +241,37 @@ SELECTIVE_LINE = re.compile(
     r"selective\s*:\s*trigger\s+(\d+)건.*?stable\s+(\d+)건.*?split\s+(\d+)건.*?fragmented\s+(\d+)건",
     re.I,
 )
+# payload 경계를 넘는 selective 라인 carry — SELECTIVE_LINE은 `\s` 자리에서만 줄을 넘을 수 있으므로
+# carry 끝이 `\s` 자리에서 끝나는 (다음 "\n"으로 이어질 수 있는) 미완성 매치만 보존한다.
+SELECTIVE_START = re.compile(r"selective", re.I)
+SELECTIVE_PENDING_TAIL = re.compile(
+    r"selective\s*(?::\s*(?:trigger\s*(?:\s\d+건.*?stable\s*(?:\s\d+건.*?split\s*"
+    r"(?:\s\d+건.*?fragmented\s*)?)?)?)?)?\Z",
+    re.I,
+)
+
+# Payload walk 범위 (extract_text_payloads) — field path는 dict key를 `.`로 이은 것이고 list는 투명하다
+# (`message.content.text` = message.content[*].text). record 최상위에 `payload` key가 있거나 type이
+# Codex rollout 값이면 codex, 아니면 claude schema로 본다.
+#   include: schema별로 string을 수집할 subtree. 그 밖의 field (uuid, cwd, usage, file-history
+#            snapshot 등)는 수집하지 않는다 (SessionParser는 길이만 센다).
+#   exclude: include 안에서도 건너뛰는 field — path 끝부분 (suffix) 매치라 tool_result 안 중첩
+#            block에도 적용된다. id/서명/암호화 reasoning/Edit 전 파일 전문.
+#   binary:  known-binary field — string이 PAYLOAD_BINARY_MAX_CHARS를 넘으면 건너뛴다 (base64 image 등).
+PAYLOAD_CODEX_RECORD_TYPES = ("session_meta", "response_item", "event_msg", "turn_context", "compacted")
+PAYLOAD_INCLUDE_PATHS = {
+    "claude": ("message.content", "toolUseResult", "summary", "content"),
+    "codex": ("payload", "content"),
+}
+PAYLOAD_EXCLUDE_PATHS = (
+    "id",
+    "tool_use_id",
+    "call_id",
+    "signature",
+    "encrypted_content",
+    "toolUseResult.originalFile",
+)
+PAYLOAD_BINARY_PATHS = ("source.data", "file.base64", "image_url")
 
 # Host path mapping —
 #   command path:    SSH 명령 인자는 `~/.claude/projects` 등 relative tilde 표현을 사용한다
@@ -130,11 +294,60 @@ HOST_PATH_MAP = {
 ARBITER_WINDOW_CHARS = 30000  # KV verdict 회수 시 Arbiter 결과 헤더 뒤 고정 window 크기
 SEVERITY_LOOKBEHIND_CHARS = 200  # finding_id 등장 위치 기준 앞쪽 탐색 범위 (severity 라벨 회수)
 SEVERITY_LOOKAHEAD_CHARS = 1000  # finding_id 등장 위치 기준 뒤쪽 탐색 범위
+FINDING_ID_MAX_CHARS = 256  # streaming parser가 severity core 주변에 보존하는 finding_id 최대 길이
+SELECTIVE_CARRY_CHARS = 8192  # payload 경계를 넘는 selective 라인 carry 상한 (초과분은 앞에서 절단)
+PAYLOAD_BINARY_MAX_CHARS = 4096  # PAYLOAD_BINARY_PATHS string 상한 (짧은 URL 등은 그대로 수집)
 SSH_FIND_TIMEOUT_SECONDS = 60  # 원격 호스트의 find 명령 timeout
-SSH_CAT_TIMEOUT_SECONDS = 120  # 원격 호스트의 cat 명령 timeout
+SSH_READ_IDLE_TIMEOUT_SECONDS = 30  # cat/tail stream이 이 시간 동안 byte 없이 멈추면 stall로 보고 종료 (transient → 재시도)
+SSH_REMOTE_EXEC_TIMEOUT_SECONDS = 900  # --remote-exec 원격 분석 process 전체 timeout (host당 1 process)
 FLEISS_KAPPA_TIMEOUT_SECONDS = 60  # fleiss-kappa.py helper 호출 timeout (현재 v1에서는 미사용)
-SSH_FETCH_WORKERS = 8  # 원격 호스트당 동시 SSH cat worker 수 (host 순차 처리, host당 K=8 병렬)
+SSH_FETCH_WORKERS = 8  # 원격 호스트당 동시 SSH fetch 시작 상한 (FetchLimiter가 지연/오류로 조정)
+SSH_FETCH_WORKERS_MIN = 1  # FetchLimiter 상한 하한
+SSH_FETCH_WORKERS_MAX = 32  # FetchLimiter 상한 상한 = host당 fetch thread pool 크기
+SSH_FETCH_LATENCY_RATIO = 2.0  # 첫 byte 지연 EWMA가 관측 최저치의 N배를 넘으면 상한 1 감소
+SSH_FETCH_LATENCY_ALPHA = 0.3  # 첫 byte 지연 EWMA 가중치
+SSH_FETCH_RETRIES = 2  # transient 실패 (ssh rc 255 = 연결/mux 오류, timeout) 파일당 재시도 횟수
+SSH_RETRY_BACKOFF_SECONDS = 0.5  # 재시도 대기 기준 — 시도마다 2배, 0.5~1.5배 jitter
+TAR_FETCH_BATCH_FILES = 500  # `ssh host tar` 1회로 받는 파일 수 (--transport tar)
+SSH_TAR_TIMEOUT_SECONDS = 600  # tar batch 1개의 stream 전체 timeout
 SSH_CONTROLMASTER_CHECK_TIMEOUT_SECONDS = 10  # ssh -O check / ssh true preflight timeout
+SSH_DIGEST_TIMEOUT_SECONDS = 300  # dedup 후보 batch 1개의 원격 sha256sum timeout (원격에서 content 전체를 읽음)
+MIRROR_TAIL_OVERLAP_BYTES = 4096  # tail fetch 시 로컬 사본 끝과 대조하는 겹침 구간 (불일치 → 전체 재fetch)
+MIRROR_COPY_CHUNK_BYTES = 1 << 20  # mirror 사본 기록 chunk 크기
+HOST_RESULT_QUEUE_SIZE = 256  # host worker → main thread 결과 queue 상한 (main이 밀리면 worker 대기)
+RESUME_HASH_BYTES = 64 * 1024  # 이어 파싱 전 대조하는 파일 앞/offset 직전 구간 크기
+BLOB_COMPRESS_LEVEL = 6  # snapshot blob gzip level (jsonl은 6 이상에서 크기 이득이 작고 압축만 느려진다)
+WATCH_POLL_SECONDS = 5.0  # watch daemon 로컬 세션 디렉터리 mtime polling 주기
+WATCH_REMOTE_POLL_SECONDS = 60.0  # watch daemon 원격 host polling 주기 (poll 1회 = ssh find 1회)
+WATCH_QUERY_TIMEOUT_SECONDS = 10  # watch socket query 1건 송수신 timeout
+
+# Session result cache — (host, path, size, mtime, algorithm version) 일치 시 analyze_session 재실행 생략
+CACHE_DEFAULT_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "analyzing-da-sessions",
+    "cache.sqlite3",
+)
+
+# Remote mirror — 원격 jsonl 로컬 사본 + manifest. 반복 실행은 새 파일/늘어난 tail만 전송한다
+MIRROR_DEFAULT_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "analyzing-da-sessions",
+    "mirror",
+)
+
+# Snapshot blob store — content sha256 주소의 gzip 사본. snapshot 사이에서 같은 content는 1개만 저장한다
+BLOB_STORE_DEFAULT_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "analyzing-da-sessions",
+    "blobs",
+)
+
+# Watch daemon — markdown/JSON/status query를 받는 Unix socket (`analyze.py watch`)
+WATCH_SOCKET_DEFAULT_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "analyzing-da-sessions",
+    "watch.sock",
+)
 
 
 def current_host() -> str:
@@ -148,16 +361,117 @@ def current_host() -> str:
 # 2. jsonl payload walker
 # ─────────────────────────────────────────────────────────────────────────────
 
-def extract_text_payloads(obj: Any, accumulator: list) -> None:
-    """JSONL record에서 string payload만 추출 (raw blob regex 금지)."""
+def _path_suffix_table(paths: Iterable[str]) -> dict[str, tuple[tuple[str, ...], ...]]:
+    """suffix path 목록 → 마지막 key별 (앞쪽 key tuple, ...) — walk 중 key 1번 조회로 후보만 비교."""
+    table: dict[str, list[tuple[str, ...]]] = defaultdict(list)
+    for path in paths:
+        *head, last = path.split(".")
+        table[last].append(tuple(head))
+    return {k: tuple(v) for k, v in table.items()}
+
+
+def _path_prefix_table(paths: Iterable[str]) -> tuple[frozenset, frozenset]:
+    """include path 목록 → (include path tuple 집합, 그 진부분 prefix 집합)."""
+    full = {tuple(p.split(".")) for p in paths}
+    partial = {path[:i] for path in full for i in range(1, len(path))}
+    return frozenset(full), frozenset(partial - full)
+
+
+_PAYLOAD_INCLUDE = {schema: _path_prefix_table(paths) for schema, paths in PAYLOAD_INCLUDE_PATHS.items()}
+_PAYLOAD_EXCLUDE = _path_suffix_table(PAYLOAD_EXCLUDE_PATHS)
+_PAYLOAD_BINARY = _path_suffix_table(PAYLOAD_BINARY_PATHS)
+
+
+def _suffix_match(table: dict, key: str, parents: tuple[str, ...]) -> bool:
+    heads = table.get(key)
+    if heads is None:
+        return False
+    return any(not head or parents[-len(head):] == head for head in heads)
+
+
+def record_schema(obj: dict) -> str:
+    """jsonl record → PAYLOAD_INCLUDE_PATHS schema 이름 (claude | codex)."""
+    if "payload" in obj or obj.get("type") in PAYLOAD_CODEX_RECORD_TYPES:
+        return "codex"
+    return "claude"
+
+
+# walk frame mode — include path를 찾는 중 / include subtree 수집 / 제외 subtree 길이만 (gaps)
+_WALK_SEARCH, _WALK_COLLECT, _WALK_SKIP = 0, 1, 2
+
+
+def extract_text_payloads(obj: Any, accumulator: list, gaps: bool = False) -> None:
+    """JSONL record에서 string payload만 추출 (raw blob regex 금지).
+
+    record (dict)는 record_schema의 PAYLOAD_INCLUDE_PATHS subtree만, PAYLOAD_EXCLUDE_PATHS를 빼고
+    key 순서대로 깊이 우선 walk한다. 명시 stack으로 순회하므로 nesting 깊이에 recursion 한도가 없다.
+    dict가 아닌 값은 전체를 walk한다.
+
+    gaps=True면 수집하지 않은 string (include 밖, exclude, binary)도 같은 순서로 내려가 그 가상 blob
+    길이 (string마다 len + 1 — 앞 "\n" 포함, 연속분은 합산)를 int로 accumulator에 넣는다.
+    SessionParser가 그만큼 위치를 전진시켜 severity window 거리가 전체 walk와 같게 유지된다.
+    """
     if isinstance(obj, str):
         accumulator.append(obj)
-    elif isinstance(obj, dict):
-        for v in obj.values():
-            extract_text_payloads(v, accumulator)
-    elif isinstance(obj, list):
-        for v in obj:
-            extract_text_payloads(v, accumulator)
+        return
+    if isinstance(obj, dict):
+        full, partial = _PAYLOAD_INCLUDE[record_schema(obj)]
+        mode = _WALK_SEARCH
+    else:
+        full = partial = frozenset()
+        mode = _WALK_COLLECT
+    exclude = _PAYLOAD_EXCLUDE
+    binary = _PAYLOAD_BINARY
+    limit = PAYLOAD_BINARY_MAX_CHARS
+    append = accumulator.append
+    # frame: (자식 iterator, 부모 key path, walk mode, dict 여부)
+    stack = [(iter(obj.items() if isinstance(obj, dict) else obj), (), mode, isinstance(obj, dict))]
+    while stack:
+        items, path, mode, is_dict = stack[-1]
+        for item in items:
+            if is_dict:
+                key, value = item
+                if mode == _WALK_SEARCH:
+                    child_path = path + (key,)
+                    if child_path in full:
+                        child_mode = _WALK_COLLECT
+                    elif child_path in partial:
+                        child_mode = _WALK_SEARCH
+                    elif gaps:
+                        child_mode = _WALK_SKIP
+                    else:
+                        continue
+                elif mode == _WALK_COLLECT:
+                    if _suffix_match(exclude, key, path) or (
+                        isinstance(value, str) and len(value) > limit and _suffix_match(binary, key, path)
+                    ):
+                        if not gaps:
+                            continue
+                        child_mode = _WALK_SKIP
+                    else:
+                        child_mode = _WALK_COLLECT
+                    child_path = path + (key,) if isinstance(value, (dict, list)) else path
+                else:
+                    child_path, child_mode = path, _WALK_SKIP
+            else:
+                value = item
+                child_path, child_mode = path, mode
+            if isinstance(value, str):
+                if child_mode == _WALK_COLLECT:
+                    append(value)
+                elif gaps:
+                    if accumulator and type(accumulator[-1]) is int:
+                        accumulator[-1] += len(value) + 1
+                    else:
+                        append(len(value) + 1)
+            elif isinstance(value, dict):
+                stack.append((iter(value.items()), child_path, child_mode, True))
+                break
+            elif isinstance(value, list):
+                stack.append((iter(value), child_path, child_mode, False))
+                break
+        else:
+            stack.pop()
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -181,6 +495,74 @@ def get_bundle(finding_id: str | None) -> str | None:
 # 4. verdict parser pipeline (4-tier fallback)
 # ─────────────────────────────────────────────────────────────────────────────
 
+def scan_anchors(text: str) -> set[str]:
+    """payload에 등장한 anchor token 집합. ANCHOR_SCAN 1회 pass + CASEFOLD_ANCHORS casefold 검사.
+
+    token끼리는 접두/접미가 겹치지 않으므로 finditer의 non-overlapping 소비가 다른 token 등장을
+    가리지 않는다. 모든 token이 발견되면 즉시 중단한다.
+    """
+    found: set[str] = set()
+    for m in ANCHOR_SCAN.finditer(text):
+        found.add(m.group(0))
+        if len(found) == ANCHOR_TOKEN_COUNT:
+            break
+    lowered = text.lower()
+    has_alias = any(c in text for c in CASEFOLD_ALIASES)
+    for token in CASEFOLD_ANCHORS:
+        if has_alias or token in lowered:
+            found.add(token)
+    return found
+
+
+def extract_tiered_verdicts(
+    text: str,
+    anchors: set[str] | None = None,
+    parse_failures: list | None = None,
+    timings: Counter | None = None,
+) -> tuple[list[dict], bool, int]:
+    """payload 단위 4-tier fallback. verdict를 처음 회수한 tier 결과만 채택하고, Tier 1~4가 모두
+    비면 Tier 5 NL summary signal을 반환한다 → (verdicts, nl_signal, nl_estimated_count).
+
+    anchors (scan_anchors 결과)에 필수 token이 없는 tier는 호출을 생략한다. token 부재 시 해당
+    tier는 항상 빈 결과이므로 전체 tier를 순서대로 실행한 결과와 같다.
+    timings가 주어지면 (--profile) 실행한 tier별 소요 시간을 누적한다.
+    """
+    if anchors is None:
+        anchors = scan_anchors(text)
+    t = time.perf_counter() if timings is not None else 0.0
+    if not anchors.isdisjoint(STRICT_TIER_ANCHORS):
+        sv = extract_strict_verdicts(text, parse_failures)
+        if timings is not None:
+            t = _lap(timings, "tier_strict", t)
+        if sv:
+            return sv, False, 0
+    if "```json" in anchors:
+        uj = extract_unmarked_json_verdicts(text)
+        if timings is not None:
+            t = _lap(timings, "tier_unmarked_json", t)
+        if uj:
+            return uj, False, 0
+    if "Arbiter" in anchors and "판정" in anchors:
+        kv = extract_kv_verdicts(text, arbiter_window_only=True)
+        if timings is not None:
+            t = _lap(timings, "tier_kv", t)
+        if kv:
+            return kv, False, 0
+    if "건" in anchors:
+        has_signal, est = extract_nl_summary(text)
+        if timings is not None:
+            _lap(timings, "tier_nl_summary", t)
+        return [], has_signal, est
+    return [], False, 0
+
+
+def _lap(timings: Counter, key: str, started: float) -> float:
+    """--profile 구간 누적 — started부터 지금까지를 timings[key]에 더하고 지금 시각을 반환."""
+    now = time.perf_counter()
+    timings[key] += now - started
+    return now
+
+
 def extract_strict_verdicts(text: str, parse_failures: list | None = None) -> list[dict]:
     """Tier 1 (VERDICT_JSON marker)을 우선 적용, finding_id 단위로 Tier 2 (### header)
     fallback. 같은 finding_id가 두 source에 모두 있으면 Tier 1만 채택해 중복 카운트를 차단한다.
@@ -257,11 +639,11 @@ def extract_kv_verdicts(text: str, arbiter_window_only: bool = True) -> list[dic
     """Tier 4: KV `**판정**: VERDICT`. Arbiter 결과 헤더 window 안만."""
     verdicts = []
     if arbiter_window_only:
-        for m in re.finditer(r"##\s+Arbiter\s+검증\s+결과", text):
+        for m in ARBITER_RESULT_HEADER.finditer(text):
             start = m.end()
             end = min(len(text), start + ARBITER_WINDOW_CHARS)
             window = text[start:end]
-            nxt = re.search(r"\n##\s", window)
+            nxt = NEXT_SECTION_HEADER.search(window)
             if nxt:
                 window = window[: nxt.start()]
             for vm in VERDICT_KV.finditer(window):
@@ -309,21 +691,116 @@ def severity_label(rank: int) -> str:
     return "NONE"
 
 
-def find_severity_for_finding(text_blob: str, finding_id: str) -> str | None:
-    """analyze-da-sessions.py 패턴: finding header 인접 영역에서 severity 라벨 추출."""
-    if not finding_id:
+def _finding_id_overlaps(finding_ids: list[str]) -> dict[str, list[tuple[int, str, bool]]]:
+    """id A의 매치 span 안에서 시작할 수 있는 다른 id 목록 — A → [(offset, B, straddles)].
+
+    straddles=False면 B가 A 안에 완전히 포함되어 A 등장 시 B 등장이 확정이고, True면 B가 A 끝을
+    넘어가므로 blob 재확인이 필요하다. offset 0에서 A보다 긴 B는 longest-first alternation이
+    이미 B를 선택했을 것이므로 제외한다.
+    """
+    overlaps: dict[str, list[tuple[int, str, bool]]] = {}
+    for a in finding_ids:
+        rel: list[tuple[int, str, bool]] = []
+        for b in finding_ids:
+            for k in range(len(a)):
+                if k == 0 and b == a:
+                    continue
+                if a[k] != b[0]:
+                    continue
+                tail = a[k:]
+                if len(b) <= len(tail):
+                    if tail.startswith(b):
+                        rel.append((k, b, False))
+                elif k > 0 and b.startswith(tail):
+                    rel.append((k, b, True))
+        overlaps[a] = rel
+    return overlaps
+
+
+def build_severity_index(text_blob: str, finding_ids: Iterable[str]) -> dict:
+    """text_blob 1회 scan으로 severity core 위치와 finding_id 등장 위치를 색인한다.
+
+    - SEV_CORE finditer → 시작/끝/라벨 정렬 list (core끼리는 겹치지 않아 끝 위치도 단조 증가).
+    - finding_id 전체를 longest-first alternation 하나로 scan한 뒤, 매치 span 안에서 시작하는
+      다른 id (접두/내포/경계 걸침)를 _finding_id_overlaps로 복원하고, id별로 non-overlapping
+      greedy filter를 적용한다 — id마다 `re.finditer(re.escape(id), text_blob)`한 결과와 같다.
+    """
+    sev_starts: list[int] = []
+    sev_ends: list[int] = []
+    sev_labels: list[str] = []
+    for m in SEV_CORE.finditer(text_blob):
+        sev_starts.append(m.start())
+        sev_ends.append(m.end())
+        sev_labels.append(m.group(1).upper())
+    return {
+        "length": len(text_blob),
+        "sev_starts": sev_starts,
+        "sev_ends": sev_ends,
+        "sev_labels": sev_labels,
+        "occurrences": index_finding_occurrences(text_blob, finding_ids),
+    }
+
+
+def index_finding_occurrences(
+    text: str, finding_ids: Iterable[str], base: int = 0
+) -> dict[str, list[tuple[int, int]]]:
+    """finding_id별 non-overlapping 등장 span 목록. base는 text가 가상 blob에서 시작하는 위치."""
+    ids = sorted({fid for fid in finding_ids if fid}, key=lambda x: (-len(x), x))
+    starts: dict[str, set[int]] = {fid: set() for fid in ids}
+    if ids:
+        overlaps = _finding_id_overlaps(ids)
+        alternation = re.compile("|".join(re.escape(fid) for fid in ids))
+        for m in alternation.finditer(text):
+            fid, pos = m.group(0), m.start()
+            starts[fid].add(pos)
+            for k, other, straddles in overlaps[fid]:
+                if not straddles or text.startswith(other, pos + k):
+                    starts[other].add(pos + k)
+
+    occurrences: dict[str, list[tuple[int, int]]] = {}
+    for fid, positions in starts.items():
+        spans: list[tuple[int, int]] = []
+        last_end = -1
+        for pos in sorted(positions):
+            if pos >= last_end:
+                spans.append((base + pos, base + pos + len(fid)))
+                last_end = pos + len(fid)
+        occurrences[fid] = spans
+    return occurrences
+
+
+def lookup_severity(index: dict, finding_id: str) -> str | None:
+    """finding_id 등장 위치마다 [start - LOOKBEHIND, end + LOOKAHEAD) window에 완전히 들어가는
+    첫 severity core를 bisect로 찾는다. 첫 등장부터 순서대로 보고 처음 찾은 라벨을 반환한다.
+    """
+    sev_starts = index["sev_starts"]
+    if not finding_id or not sev_starts:
         return None
-    # finding_id 등장 위치의 앞뒤 window에서 severity 라벨 검색
-    for m in re.finditer(re.escape(finding_id), text_blob):
-        start = max(0, m.start() - SEVERITY_LOOKBEHIND_CHARS)
-        end = min(len(text_blob), m.end() + SEVERITY_LOOKAHEAD_CHARS)
-        window = text_blob[start:end]
-        sm = SEV_LINE.search(window)
-        if sm:
-            return sm.group(1).upper()
+    sev_ends = index["sev_ends"]
+    for occ_start, occ_end in index["occurrences"].get(finding_id, ()):
+        start = max(0, occ_start - SEVERITY_LOOKBEHIND_CHARS)
+        end = min(index["length"], occ_end + SEVERITY_LOOKAHEAD_CHARS)
+        i = bisect.bisect_left(sev_starts, start)
+        if i < len(sev_starts) and sev_ends[i] <= end:
+            return index["sev_labels"][i]
     return None
 
 
+def find_severity_for_finding(
+    text_blob: str, finding_id: str, index: dict | None = None
+) -> str | None:
+    """analyze-da-sessions.py 패턴: finding header 인접 영역에서 severity 라벨 추출.
+
+    finding_id 등장 위치의 앞뒤 window에서 첫 `**심각도**` 라벨을 찾는다. 여러 finding을 조회할
+    때는 build_severity_index 결과를 index로 넘겨 finding마다 blob 전체를 재scan하지 않는다.
+    """
+    if not finding_id:
+        return None
+    if index is None:
+        index = build_severity_index(text_blob, [finding_id])
+    return lookup_severity(index, finding_id)
+
+
 def compute_severity_transitions(
     rounds_data: list[list[dict]],
 ) -> Counter:
@@ -371,229 +848,851 @@ def resolve_stability_status_from_round_summary(text: str) -> Counter:
 # 7. aggregate builder
 # ─────────────────────────────────────────────────────────────────────────────
 
-def analyze_session(path: str) -> dict | None:
-    """단일 jsonl 세션 분석. 모든 metric 입력을 추출하여 dict로 반환."""
-    has_arbiter_marker = False
-    has_intensity_marker = False
-    intensity_verdicts: list[str] = []
-    all_verdicts: list[dict] = []
-    nl_signal_only = False
-    nl_estimated = 0
-    full_text = []
-    parse_failures: list[str] = []
+# skip_payload가 가상 blob의 수집하지 않은 자리를 채우는 문자 — SEV_CORE / finding_id / selective 어디에도 없다
+_PAYLOAD_GAP_FILL = "\x00"
+
+
+class SessionParser:
+    """jsonl 세션 1개의 streaming 분석 상태.
+
+    payload를 "\n"으로 이어 붙인 가상 text_blob 위의 global offset만 추적하고 blob 자체는 만들지
+    않는다. 보존하는 text는 (1) 최근 LOOKAHEAD + FINDING_ID_MAX_CHARS 자의 rolling window,
+    (2) severity core마다 그 core를 window에 담을 수 있는 finding_id 등장 범위
+    [core 끝 - LOOKAHEAD - FINDING_ID_MAX_CHARS, core 시작 + LOOKBEHIND + FINDING_ID_MAX_CHARS)의
+    snippet, (3) payload 경계를 넘는 selective 라인 carry (SELECTIVE_CARRY_CHARS 상한)뿐이다.
+    메모리는 파일 크기가 아니라 severity 라벨/verdict 수에 비례한다.
+
+    profile=True (--profile)면 단계별 (JSON decode, payload walk, anchor scan, tier, severity) 소요
+    시간을 timings에 누적하고 finish() 결과에 "profile" key로 붙인다. caller (run_hosts)가 cache
+    기록 전에 떼어 RunProfile로 옮긴다.
+    """
+
+    def __init__(self, path: str, profile: bool = False):
+        self.path = path
+        self.has_arbiter_marker = False
+        self.has_intensity_marker = False
+        self.intensity_verdicts: list[str] = []
+        self.verdicts: list[dict] = []
+        self.nl_signal_only = False
+        self.nl_estimated = 0
+        self.parse_failures: list[str] = []
+        self.stability: Counter = Counter()
+        # jsonl record의 top-level `timestamp` — verdict마다 출처 record 시각을 붙인다 (--index)
+        self.record_timestamp: str | None = None
+        self.first_timestamp: str | None = None
+        self.last_timestamp: str | None = None
+        # 가상 blob 상태 — offset은 지금까지 feed된 blob 길이
+        self.payload_count = 0
+        self.offset = 0
+        self.window = ""
+        self.sev_scan_pos = 0
+        self.sev_starts: list[int] = []
+        self.sev_ends: list[int] = []
+        self.sev_labels: list[str] = []
+        self.snippets: list[list] = []  # [global start, text] — 정렬, 서로 떨어져 있음
+        self.capture_until = 0
+        self.selective_carry = ""
+        # --profile 계측 — None이면 계측 없음
+        self.timings: Counter | None = None
+        if profile:
+            self.timings = Counter()
+            self.line_count = 0
+            self.char_count = 0
+            self.started = (time.perf_counter(), time.thread_time())
+
+    def feed_line(self, line: str) -> None:
+        """jsonl 1줄. JSON parse 실패 줄은 기존과 같이 건너뛴다."""
+        timings = self.timings
+        if timings is not None:
+            self.line_count += 1
+            self.char_count += len(line)
+            t = time.perf_counter()
+        try:
+            obj = json.loads(line)
+        except Exception:
+            return
+        payloads: list[str | int] = []
+        if timings is not None:
+            t = _lap(timings, "json_decode", t)
+        stamp = obj.get("timestamp") if isinstance(obj, dict) else None
+        if isinstance(stamp, str):
+            self.record_timestamp = stamp
+            if self.first_timestamp is None:
+                self.first_timestamp = stamp
+            self.last_timestamp = stamp
+        else:
+            self.record_timestamp = None
+        extract_text_payloads(obj, payloads, gaps=True)
+        if timings is not None:
+            _lap(timings, "payload_walk", t)
+        for text in payloads:
+            if type(text) is int:
+                self.skip_payload(text)
+            else:
+                self.feed_payload(text)
+
+    def skip_payload(self, span: int) -> None:
+        """walk가 수집하지 않은 string 구간 (extract_text_payloads gaps) — scan 없이 가상 blob 위치만
+        span만큼 전진한다. 빈자리는 어떤 pattern에도 걸리지 않는 _PAYLOAD_GAP_FILL로 보므로 severity
+        window는 전체 walk와 같은 거리에서 끊기고, 미완성 core / selective 라인은 이어지지 않는다."""
+        if self.payload_count == 0:
+            span -= 1  # 가상 blob 첫 string 앞에는 "\n"이 없다
+            head = ""
+        else:
+            head = "\n"
+        self.payload_count += 1
+        self.selective_carry = ""
+        keep = SEVERITY_LOOKAHEAD_CHARS + FINDING_ID_MAX_CHARS
+        if span <= keep:
+            self._track_severity((head + _PAYLOAD_GAP_FILL * span)[:span])
+            return
+        # 긴 구간 (base64 image 등)은 만들지 않고, snippet capture 잔여분과 마지막 window만 채운다 —
+        # _track_severity에 같은 길이를 넣은 결과와 같다
+        if self.capture_until > self.offset:
+            n = self.capture_until - self.offset
+            self.snippets[-1][1] += (head + _PAYLOAD_GAP_FILL * n)[:n]
+        self.offset += span
+        self.sev_scan_pos = self.offset
+        self.window = _PAYLOAD_GAP_FILL * keep
+
+    def feed_payload(self, text: str) -> None:
+        piece = text if self.payload_count == 0 else "\n" + text
+        self.payload_count += 1
+        timings = self.timings
+        t = time.perf_counter() if timings is not None else 0.0
+        anchors = scan_anchors(text)
+        if timings is not None:
+            t = _lap(timings, "anchor_scan", t)
+        self._track_severity(piece)
+        if self.selective_carry or "selective" in anchors:
+            self._track_selective(piece)
+        if timings is not None:
+            t = _lap(timings, "severity_selective_scan", t)
+
+        if "/tmp/da-" in anchors:
+            if not self.has_arbiter_marker and ARBITER_DIR_MARKER.search(text):
+                self.has_arbiter_marker = True
+            if not self.has_intensity_marker and INTENSITY_DIR_MARKER.search(text):
+                self.has_intensity_marker = True
+
+        if not anchors.isdisjoint(INTENSITY_LINE_ANCHORS):
+            self.intensity_verdicts.extend(extract_intensity_verdicts(text))
+        if timings is not None:
+            _lap(timings, "marker_intensity", t)
+
+        verdicts, has_signal, est = extract_tiered_verdicts(text, anchors, self.parse_failures, timings)
+        if verdicts:
+            for v in verdicts:
+                v["timestamp"] = self.record_timestamp
+            self.verdicts.extend(verdicts)
+        elif has_signal:
+            self.nl_signal_only = True
+            self.nl_estimated = max(self.nl_estimated, est)
+
+    def _track_severity(self, piece: str) -> None:
+        base = self.offset - len(self.window)
+        end = self.offset + len(piece)
+        if self.capture_until > self.offset:
+            self.snippets[-1][1] += piece[: self.capture_until - self.offset]
+        buf = self.window + piece
+
+        lookbehind, lookahead = SEVERITY_LOOKBEHIND_CHARS, SEVERITY_LOOKAHEAD_CHARS
+        for m in SEV_CORE.finditer(buf, self.sev_scan_pos - base):
+            s, e = base + m.start(), base + m.end()
+            self.sev_starts.append(s)
+            self.sev_ends.append(e)
+            self.sev_labels.append(m.group(1).upper())
+            self._keep(buf, base, e - lookahead - FINDING_ID_MAX_CHARS,
+                       s + lookbehind + FINDING_ID_MAX_CHARS)
+            self.sev_scan_pos = e
+
+        # label 직전에서 끊긴 core는 다음 payload와 이어서 다시 scan
+        keep_from = end - lookahead - FINDING_ID_MAX_CHARS
+        pending = buf.rfind(SEV_TOKEN, self.sev_scan_pos - base)
+        if pending >= 0 and SEV_PENDING_TAIL.match(buf, pending):
+            self.sev_scan_pos = base + pending
+            keep_from = min(keep_from, self.sev_scan_pos)
+        else:
+            self.sev_scan_pos = end
+        self.window = buf[max(keep_from - base, 0):]
+        self.offset = end
+
+    def _keep(self, buf: str, base: int, start: int, stop: int) -> None:
+        start = max(start, base, 0)
+        avail = min(stop, base + len(buf))
+        if self.snippets and start <= self.snippets[-1][0] + len(self.snippets[-1][1]):
+            last = self.snippets[-1]
+            last_end = last[0] + len(last[1])
+            if avail > last_end:
+                last[1] += buf[last_end - base: avail - base]
+        else:
+            self.snippets.append([start, buf[start - base: avail - base]])
+        self.capture_until = max(self.capture_until, stop)
+
+    def _track_selective(self, piece: str) -> None:
+        buf = self.selective_carry + piece
+        last_end = 0
+        for m in SELECTIVE_LINE.finditer(buf):
+            self.stability["stable"] += int(m.group(2))
+            self.stability["split"] += int(m.group(3))
+            self.stability["fragmented"] += int(m.group(4))
+            last_end = m.end()
+        self.selective_carry = ""
+        for m in SELECTIVE_START.finditer(buf, max(last_end, len(buf) - SELECTIVE_CARRY_CHARS)):
+            if SELECTIVE_PENDING_TAIL.match(buf, m.start()):
+                self.selective_carry = buf[m.start():]
+                break
+
+    def snapshot(self) -> str:
+        """이어서 feed할 수 있는 parser 상태 JSON (PARSER_STATE_FIELDS). finish()는 verdict dict를
+        수정하므로 반드시 finish 전에 만든다."""
+        state = {name: getattr(self, name) for name in PARSER_STATE_FIELDS}
+        return json.dumps(state, separators=(",", ":"))
+
+    @classmethod
+    def restore(cls, path: str, raw: str, profile: bool = False) -> "SessionParser | None":
+        """snapshot 역변환. field 구성이 다르면 (parser 구조 변경) None — caller는 처음부터 파싱한다."""
+        try:
+            state = json.loads(raw)
+        except ValueError:
+            return None
+        if not isinstance(state, dict) or set(state) != set(PARSER_STATE_FIELDS):
+            return None
+        parser = cls(path, profile)
+        for name, value in state.items():
+            setattr(parser, name, value)
+        parser.stability = Counter(parser.stability)
+        return parser
+
+    def severity_index(self, finding_ids: Iterable[str]) -> dict:
+        """build_severity_index와 같은 shape — 위치는 가상 blob 기준 global offset."""
+        ids = [fid for fid in finding_ids if fid]
+        occurrences: dict[str, list[tuple[int, int]]] = {fid: [] for fid in ids}
+        for start, text in self.snippets:
+            for fid, spans in index_finding_occurrences(text, ids, start).items():
+                occurrences[fid].extend(spans)
+        return {
+            "length": self.offset,
+            "sev_starts": self.sev_starts,
+            "sev_ends": self.sev_ends,
+            "sev_labels": self.sev_labels,
+            "occurrences": occurrences,
+        }
+
+    def finish(self) -> dict:
+        t = time.perf_counter() if self.timings is not None else 0.0
+        # severity 라벨링 — finding_id 인접 window에서 수집. confirmed finding 전체를 1회 색인한다.
+        confirmed = [
+            v for v in self.verdicts if v.get("verdict") == "CONFIRMED_ISSUE" and v.get("finding_id")
+        ]
+        if confirmed:
+            index = self.severity_index(v["finding_id"] for v in confirmed)
+            for v in confirmed:
+                sev = lookup_severity(index, v["finding_id"])
+                if sev:
+                    v["severity"] = sev
+
+        result = {
+            "path": self.path,
+            "has_arbiter_marker": self.has_arbiter_marker,
+            "has_intensity_marker": self.has_intensity_marker,
+            "intensity_verdicts": self.intensity_verdicts,
+            "verdicts": self.verdicts,
+            "nl_signal_only": self.nl_signal_only,
+            "nl_estimated_count": self.nl_estimated,
+            "round_summary_stability": self.stability,
+            "parse_failures": self.parse_failures,
+            "first_timestamp": self.first_timestamp,
+            "last_timestamp": self.last_timestamp,
+        }
+        if self.timings is not None:
+            _lap(self.timings, "severity_lookup", t)
+            wall, cpu = self.started
+            result["profile"] = {
+                "lines": self.line_count,
+                "chars": self.char_count,
+                "payloads": self.payload_count,
+                "wall_seconds": time.perf_counter() - wall,
+                "cpu_seconds": time.thread_time() - cpu,
+                "phases": dict(self.timings),
+            }
+        return result
+
 
+# SessionParser.snapshot에 담는 field — feed_line/feed_payload가 갱신하는 상태 전체
+PARSER_STATE_FIELDS = (
+    "has_arbiter_marker",
+    "has_intensity_marker",
+    "intensity_verdicts",
+    "verdicts",
+    "nl_signal_only",
+    "nl_estimated",
+    "parse_failures",
+    "stability",
+    "record_timestamp",
+    "first_timestamp",
+    "last_timestamp",
+    "payload_count",
+    "offset",
+    "window",
+    "sev_scan_pos",
+    "sev_starts",
+    "sev_ends",
+    "sev_labels",
+    "snippets",
+    "capture_until",
+    "selective_carry",
+)
+
+
+def triage_session_file(path: str) -> bool:
+    """전체 파싱이 필요한 후보 파일인지 — mmap 위 TRIAGE_MARKERS substring 검색 (JSON decode 없음).
+
+    False면 analyze_session 결과의 aggregate 기여는 session_counts.total 1건뿐이므로 caller는
+    빈 SessionParser 결과 (triaged_session)로 대신한다. 읽기 실패는 True — 전체 파싱 경로가
+    기존처럼 None으로 처리한다.
+    """
     try:
-        with open(path, "r", errors="replace") as fp:
-            for line in fp:
-                try:
-                    obj = json.loads(line)
-                except Exception:
-                    continue
-                payloads: list[str] = []
-                extract_text_payloads(obj, payloads)
-                for text in payloads:
-                    full_text.append(text)
-                    if ARBITER_DIR_MARKER.search(text):
-                        has_arbiter_marker = True
-                    if INTENSITY_DIR_MARKER.search(text):
-                        has_intensity_marker = True
-
-                    intensity_verdicts.extend(extract_intensity_verdicts(text))
-
-                    sv = extract_strict_verdicts(text, parse_failures)
-                    if sv:
-                        all_verdicts.extend(sv)
-                        continue
-                    uj = extract_unmarked_json_verdicts(text)
-                    if uj:
-                        all_verdicts.extend(uj)
-                        continue
-                    kv = extract_kv_verdicts(text, arbiter_window_only=True)
-                    if kv:
-                        all_verdicts.extend(kv)
-                        continue
-                    has_signal, est = extract_nl_summary(text)
-                    if has_signal:
-                        nl_signal_only = True
-                        nl_estimated = max(nl_estimated, est)
-    except Exception:
+        with open(path, "rb") as fp:
+            if not os.fstat(fp.fileno()).st_size:
+                return False
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return any(mm.find(marker) >= 0 for marker in TRIAGE_MARKERS)
+    except (OSError, ValueError):
+        return True
+
+
+def _record_timestamp(raw: bytes) -> str | None:
+    """jsonl 1줄의 top-level `timestamp` — SessionParser.feed_line과 같은 기준 (str만)."""
+    if b'"timestamp"' not in raw:
         return None
+    try:
+        obj = json.loads(raw.decode("utf-8", "replace"))
+    except ValueError:
+        return None
+    stamp = obj.get("timestamp") if isinstance(obj, dict) else None
+    return stamp if isinstance(stamp, str) else None
 
-    text_blob = "\n".join(full_text)
-    # severity 라벨링 — finding_id 인접 window에서 수집
-    for v in all_verdicts:
-        if v.get("verdict") == "CONFIRMED_ISSUE" and v.get("finding_id"):
-            sev = find_severity_for_finding(text_blob, v["finding_id"])
-            if sev:
-                v["severity"] = sev
 
-    return {
-        "path": path,
-        "has_arbiter_marker": has_arbiter_marker,
-        "has_intensity_marker": has_intensity_marker,
-        "intensity_verdicts": intensity_verdicts,
-        "verdicts": all_verdicts,
-        "nl_signal_only": nl_signal_only,
-        "nl_estimated_count": nl_estimated,
-        "round_summary_stability": resolve_stability_status_from_round_summary(text_blob),
-        "parse_failures": parse_failures,
+def _first_record_timestamp(buf, start: int, end: int) -> str | None:
+    """buf[start:end] (bytes 또는 mmap)의 줄을 앞에서부터 보며 첫 record timestamp."""
+    while start < end:
+        newline = buf.find(b"\n", start, end)
+        stop = end if newline < 0 else newline
+        stamp = _record_timestamp(buf[start:stop])
+        if stamp is not None:
+            return stamp
+        start = stop + 1
+    return None
+
+
+def _last_record_timestamp(buf, start: int, end: int) -> str | None:
+    """buf[start:end]의 줄을 뒤에서부터 보며 마지막 record timestamp."""
+    while end > start:
+        newline = buf.rfind(b"\n", start, end)
+        begin = start if newline < 0 else newline + 1
+        stamp = _record_timestamp(buf[begin:end])
+        if stamp is not None:
+            return stamp
+        end = max(newline, start)
+    return None
+
+
+class RecordTimeBounds:
+    """chunk stream의 첫/마지막 record timestamp — 줄 전체를 decode하지 않고 양 끝 몇 줄만 본다.
+
+    chunk 경계에 걸친 줄은 다음 chunk와 이어 붙인다. chunk마다 완성된 줄 중 마지막 timestamp만
+    뒤에서 찾으므로 대부분 chunk당 1줄 decode로 끝난다.
+    """
+
+    def __init__(self):
+        self.first: str | None = None
+        self.last: str | None = None
+        self._pending: list[bytes] = []  # 아직 줄바꿈이 오지 않은 줄 조각
+
+    def feed(self, chunk: bytes) -> None:
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            self._pending.append(chunk)
+            return
+        data = chunk
+        if self._pending:
+            end += sum(len(piece) for piece in self._pending)
+            data = b"".join(self._pending + [chunk])
+        self._pending = [data[end + 1:]] if end + 1 < len(data) else []
+        self._scan(data, end)
+
+    def finish(self) -> tuple[str | None, str | None]:
+        if self._pending:
+            data = b"".join(self._pending)
+            self._pending = []
+            self._scan(data, len(data))
+        return self.first, self.last
+
+    def _scan(self, data: bytes, end: int) -> None:
+        if self.first is None:
+            self.first = _first_record_timestamp(data, 0, end)
+            if self.first is None:
+                return
+        self.last = _last_record_timestamp(data, 0, end) or self.last
+
+
+def file_time_bounds(path: str) -> tuple[str | None, str | None]:
+    """로컬 jsonl의 (first_timestamp, last_timestamp) — mmap 양 끝에서 timestamp가 있는 줄까지만 decode.
+
+    triage 제외 세션도 --bucket 구간 배정과 --index 활동 구간에 전체 파싱과 같은 시각을 쓰도록
+    한다. 읽기 실패는 (None, None).
+    """
+    try:
+        with open(path, "rb") as fp:
+            size = os.fstat(fp.fileno()).st_size
+            if not size:
+                return None, None
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                first = _first_record_timestamp(mm, 0, size)
+                return first, first and _last_record_timestamp(mm, 0, size)
+    except (OSError, ValueError):
+        return None, None
+
+
+def triaged_session(path: str, time_bounds: tuple[str | None, str | None]) -> dict:
+    """triage에서 제외된 세션의 결과 — marker/verdict 없는 analyze_session 결과와 같은 shape.
+
+    time_bounds는 file_time_bounds / RecordTimeBounds가 찾은 (first, last) record timestamp다.
+    """
+    parser = SessionParser(path)
+    parser.first_timestamp, parser.last_timestamp = time_bounds
+    return parser.finish()
+
+
+def analyze_session(
+    source: str | Iterable, path: str | None = None, profile: bool | None = None
+) -> dict | None:
+    """단일 jsonl 세션 분석. 모든 metric 입력을 추출하여 dict로 반환.
+
+    source는 파일 path (str), 줄 단위 iterable (str 또는 bytes), binary stream (tar member,
+    subprocess pipe 등) 중 하나. path는 stream 입력일 때 결과 dict의 "path" 값이다.
+    줄 단위 SessionParser streaming — 세션 전체 text를 메모리에 올리지 않는다. 읽기 실패 시 None.
+    profile이 None이면 --profile 활성 여부 (enable_profile)를 따른다.
+    """
+    if profile is None:
+        profile = _run_profile is not None
+    if isinstance(source, str):
+        try:
+            fp = open(source, "r", errors="replace")
+        except Exception:
+            return None
+        with fp:
+            return _analyze_lines(source, fp, profile)
+    return _analyze_lines(path, _iter_source_lines(source), profile)
+
+
+def analyze_session_file(
+    path: str, resume: dict | None = None, profile: bool | None = None
+) -> dict | None:
+    """로컬 jsonl 분석 + 이어 파싱 상태. 결과 dict에 "resume" key ({"offset", "prefix_hash",
+    "state", "resumed_from"})를 붙여 반환한다 — caller (run_hosts)가 cache 기록 전에 떼어
+    SessionCache.put_resume으로 저장한다.
+
+    resume (이전 실행의 "resume")의 offset이 현재 파일 크기 이하이고 그 앞부분의
+    resume_prefix_hash가 같으면 저장된 parser 상태에서 offset 이후 줄만 feed한다. 파일이 줄었거나
+    앞부분이 바뀌었거나 상태를 복원할 수 없으면 처음부터 파싱한다. 상태는 마지막 완결 줄 ("\n")
+    경계에서 만든다 — 쓰는 중인 마지막 줄은 이번 결과에는 반영하되 다음 실행에서 다시 읽는다.
+    binary 줄을 iter_text_lines로 decode하므로 analyze_session(path)의 text mode 결과와 같다.
+    읽기 실패 시 None.
+    """
+    if profile is None:
+        profile = _run_profile is not None
+    try:
+        with open(path, "rb") as fp:
+            size = os.fstat(fp.fileno()).st_size
+            parser = None
+            offset = 0
+            if resume and 0 < resume["offset"] <= size and (
+                resume_prefix_hash(fp, resume["offset"]) == resume["prefix_hash"]
+            ):
+                parser = SessionParser.restore(path, resume["state"], profile)
+                if parser is not None:
+                    offset = resume["offset"]
+            if parser is None:
+                parser = SessionParser(path, profile)
+            resumed_from = offset
+            fp.seek(offset)
+            state = None
+            for raw in fp:
+                if not raw.endswith(b"\n"):
+                    state = parser.snapshot()  # 미완결 마지막 줄 직전 상태
+                for line in iter_text_lines((raw,)):
+                    parser.feed_line(line)
+                if state is None:
+                    offset += len(raw)
+            if state is None:
+                state = parser.snapshot()
+            prefix_hash = resume_prefix_hash(fp, offset)
+    except Exception:
+        return None
+    result = parser.finish()
+    result["resume"] = {
+        "offset": offset,
+        "prefix_hash": prefix_hash,
+        "state": state,
+        "resumed_from": resumed_from,
     }
+    return result
 
 
-def build_aggregate(
-    sessions: list[dict],
-    hosts: list[str],
-    corpus_label: str,
-    warnings: list[str],
-) -> dict:
-    """모든 세션 분석 결과를 통합 aggregate 객체로 빌드."""
-    arbiter_marker_sessions = [s for s in sessions if s and s["has_arbiter_marker"]]
-    intensity_marker_sessions = [s for s in sessions if s and s["has_intensity_marker"]]
+def resume_prefix_hash(fp, offset: int) -> str:
+    """파일 [0, offset) 구간의 앞/뒤 RESUME_HASH_BYTES digest — 이어 파싱 전 앞부분 변경 감지.
 
-    # parse_failures (verdict_json JSON parse error 등)를 warnings에 누적해 silent swallow 차단
-    parse_failure_total = 0
-    for s in sessions:
-        if s and s.get("parse_failures"):
-            parse_failure_total += len(s["parse_failures"])
-    if parse_failure_total > 0:
-        warnings.append(
-            f"verdict_json parse failures: {parse_failure_total}건 — diagnostics는 session-level parse_failures 참조"
-        )
+    jsonl은 append-only라 rewrite는 보통 파일 앞 (rotate/truncate 후 재작성)이나 offset 직전
+    (마지막 줄 수정)에서 드러난다. 중간만 같은 길이로 바뀐 경우는 잡지 못한다.
+    """
+    h = hashlib.sha256(str(offset).encode())
+    fp.seek(0)
+    h.update(fp.read(min(offset, RESUME_HASH_BYTES)))
+    tail_start = max(RESUME_HASH_BYTES, offset - RESUME_HASH_BYTES)
+    if tail_start < offset:
+        fp.seek(tail_start)
+        h.update(fp.read(offset - tail_start))
+    return h.hexdigest()[:32]
+
+
+def _analyze_lines(path: str | None, lines: Iterable[str], profile: bool = False) -> dict | None:
+    parser = SessionParser(path, profile)
+    try:
+        for line in lines:
+            parser.feed_line(line)
+    except Exception:
+        return None
+    return parser.finish()
+
+
+def _iter_source_lines(source: Iterable) -> Iterable[str]:
+    for line in source:
+        if isinstance(line, (bytes, bytearray)):
+            yield from iter_text_lines((line,))
+        else:
+            yield line
+
+
+def iter_text_lines(binary_lines: Iterable[bytes]) -> Iterable[str]:
+    """binary line stream → text line. `open(path, "r", errors="replace")`와 같이 UTF-8 replace
+    decode + universal newline (`\r\n`, `\r`도 줄 경계) 의미를 유지한다. `\n` 경계는 multibyte
+    UTF-8 문자를 가르지 않으므로 줄 단위 decode가 안전하다.
+    """
+    for raw in binary_lines:
+        text = raw.decode("utf-8", "replace")
+        if "\r" not in text:
+            yield text
+            continue
+        # str.splitlines는 \x0b, \u2028 등도 경계로 보므로 "\n" split으로 text mode 경계만 재현
+        for part in text.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+            if part:
+                yield part + "\n"
+
+
+class AggregateAccumulator:
+    """세션 결과를 1건씩 접어 넣는 aggregate 누적기 — build_aggregate의 streaming 형태.
 
-    # M-1: 검토 강도 verdict 분포
-    m1_counter: Counter = Counter()
-    for s in intensity_marker_sessions:
-        for v in s["intensity_verdicts"]:
-            if v in INTENSITY_VERDICTS:
-                m1_counter[v] += 1
-    m1_n = sum(m1_counter.values())
-
-    # M-2: 판정자 verdict 분포 (high+medium confidence subset)
-    m2_counter: Counter = Counter()
-    source_counter: dict = defaultdict(lambda: {"count": 0, "confidence": ""})
-    for s in arbiter_marker_sessions:
+    세션 dict (verdict list, path, parse_failures)를 보관하지 않고 metric별 Counter/합계만 유지하므로
+    메모리는 corpus 크기가 아니라 등장한 label 종류 수에 비례한다. merge(other)는 other의 세션들을
+    이어서 add한 것과 같아 host/worker별 부분 누적을 결합할 수 있다 (결합법칙 성립, 교환법칙은
+    dict key 순서 때문에 성립하지 않음). 출력 dict key 순서는 label이 처음 등장한 세션 순서를
+    따르므로, 같은 순서로 접으면 build 결과가 세션 list 전체를 순회하던 예전 build_aggregate와 같다.
+    marker가 없는 세션은 순서와 무관한 합계 (total, parse failure 수)에만 기여한다 (order_sensitive).
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.arbiter_sessions = 0
+        self.intensity_sessions = 0
+        self.parse_failure_total = 0
+        self.m1: Counter = Counter()
+        self.m2: Counter = Counter()
+        self.sources: dict[str, dict] = {}
+        self.bundle_total: Counter = Counter()
+        self.bundle_confirmed: Counter = Counter()
+        self.transitions: Counter = Counter()
+        self.m5: Counter = Counter()
+        self.full_sessions = 0
+        self.full_zero_sessions = 0
+
+    @staticmethod
+    def order_sensitive(session: dict | None) -> bool:
+        """add 순서가 build 결과 (dict key 순서)에 영향을 주는 세션인지."""
+        return bool(session) and (session["has_arbiter_marker"] or session["has_intensity_marker"])
+
+    def add(self, s: dict | None) -> None:
+        if not s:
+            return
+        self.total += 1
+        # parse_failures (verdict_json JSON parse error 등)는 build에서 warnings로 보고 (silent swallow 차단)
+        if s.get("parse_failures"):
+            self.parse_failure_total += len(s["parse_failures"])
+
+        if s["has_intensity_marker"]:
+            self.intensity_sessions += 1
+            # M-1: 검토 강도 verdict 분포
+            for v in s["intensity_verdicts"]:
+                if v in INTENSITY_VERDICTS:
+                    self.m1[v] += 1
+            # derived: intensity_full_finding_zero_rate
+            if "FULL" in s["intensity_verdicts"]:
+                self.full_sessions += 1
+                if not any(v["verdict"] == "CONFIRMED_ISSUE" for v in s["verdicts"]):
+                    self.full_zero_sessions += 1
+
+        if not s["has_arbiter_marker"]:
+            return
+        self.arbiter_sessions += 1
         for v in s["verdicts"]:
+            # M-2: 판정자 verdict 분포 (high+medium confidence subset)
             if v["source"] in ("verdict_json", "md_header", "json_unmarked", "kv"):
-                m2_counter[v["verdict"]] += 1
-                src = v["source"]
-                source_counter[src]["count"] += 1
-                source_counter[src]["confidence"] = v["source_confidence"]
-    m2_n = sum(m2_counter.values())
-
-    # M-3: reviewer 묶음별 confirmed-rate
-    bundle_total: Counter = Counter()
-    bundle_confirmed: Counter = Counter()
-    for s in arbiter_marker_sessions:
-        for v in s["verdicts"]:
+                self.m2[v["verdict"]] += 1
+                src = self.sources.setdefault(v["source"], {"count": 0, "confidence": ""})
+                src["count"] += 1
+                src["confidence"] = v["source_confidence"]
+            # M-3: reviewer 묶음별 confirmed-rate
             b = v.get("bundle")
-            if not b:
-                continue
-            bundle_total[b] += 1
-            if v["verdict"] == "CONFIRMED_ISSUE":
-                bundle_confirmed[b] += 1
-    m3 = {}
-    for b in ("Correctness", "Design", "Regression", "Maintainability"):
-        total = bundle_total[b]
-        confirmed = bundle_confirmed[b]
-        m3[b] = {
-            "total": total,
-            "confirmed": confirmed,
-            "confirmed_rate": (confirmed / total) if total else 0.0,
-        }
+            if b:
+                self.bundle_total[b] += 1
+                if v["verdict"] == "CONFIRMED_ISSUE":
+                    self.bundle_confirmed[b] += 1
+        # M-4: severity transition (per-session round 그룹핑)
+        self.transitions += _session_severity_transitions(s["verdicts"])
+        # M-5: stability_status 분포
+        self.m5 += s["round_summary_stability"]
 
-    # M-4: severity transition (per-session round 그룹핑)
-    transitions: Counter = Counter()
-    for s in arbiter_marker_sessions:
-        # 라운드 분리: arbiter marker 등장 횟수로 라운드 추정 (단순 휴리스틱).
-        # session 안의 verdict 목록을 인접 그룹으로 나누어 round로 간주.
-        verdicts = [v for v in s["verdicts"] if v["source"] in ("verdict_json", "md_header")]
-        if len(verdicts) < 2:
-            continue
-        # 단순화: finding_id 중복 등장 시 새 round로 간주
-        rounds: list[list[dict]] = []
-        seen_ids: set = set()
-        cur: list[dict] = []
-        for v in verdicts:
-            fid = v.get("finding_id", "")
-            if fid in seen_ids and cur:
-                rounds.append(cur)
-                cur = []
-                seen_ids = set()
-            cur.append(v)
-            if fid:
-                seen_ids.add(fid)
-        if cur:
-            rounds.append(cur)
-        if len(rounds) >= 2:
-            transitions += compute_severity_transitions(rounds)
-
-    # M-5: stability_status 분포
-    m5_source = "round_summary_fallback"
-    m5_counter: Counter = Counter()
-    for s in arbiter_marker_sessions:
-        m5_counter += s["round_summary_stability"]
-    if not m5_counter:
-        m5_source = "unavailable"
-    m5_n = sum(m5_counter.values())
-
-    # derived: intensity_full_finding_zero_rate
-    full_sessions = [s for s in intensity_marker_sessions if "FULL" in s["intensity_verdicts"]]
-    full_zero = [s for s in full_sessions if not any(
-        v["verdict"] == "CONFIRMED_ISSUE" for v in s["verdicts"]
-    )]
-    intensity_full_zero_rate = (
-        len(full_zero) / len(full_sessions) if full_sessions else 0.0
-    )
+    def merge(self, other: "AggregateAccumulator") -> None:
+        """other에 접힌 세션들을 이 누적기 뒤에 이어 add한 것과 같은 상태로 결합."""
+        self.total += other.total
+        self.arbiter_sessions += other.arbiter_sessions
+        self.intensity_sessions += other.intensity_sessions
+        self.parse_failure_total += other.parse_failure_total
+        self.m1.update(other.m1)
+        self.m2.update(other.m2)
+        for name, src in other.sources.items():
+            mine = self.sources.setdefault(name, {"count": 0, "confidence": ""})
+            mine["count"] += src["count"]
+            mine["confidence"] = src["confidence"]
+        self.bundle_total.update(other.bundle_total)
+        self.bundle_confirmed.update(other.bundle_confirmed)
+        self.transitions += other.transitions
+        self.m5 += other.m5
+        self.full_sessions += other.full_sessions
+        self.full_zero_sessions += other.full_zero_sessions
 
-    return {
-        "schema_version": "1.0",
-        "captured_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-        "hosts": hosts,
-        "corpus": corpus_label,
-        "session_counts": {
-            "total": len([s for s in sessions if s]),
-            "arbiter_marker_sessions": len(arbiter_marker_sessions),
-            "intensity_marker_sessions": len(intensity_marker_sessions),
-        },
-        "metrics": {
-            "M-1": {
-                "denominator": "intensity_marker_sessions",
-                "n": m1_n,
-                "distribution": dict(m1_counter),
-                "percentages": {
-                    k: round(100 * v / m1_n, 1) if m1_n else 0.0
-                    for k, v in m1_counter.items()
-                },
+    def build(self, hosts: list[str], corpus_label: str, warnings: list[str]) -> dict:
+        """aggregate 객체 (markdown/JSON renderer 입력)."""
+        if self.parse_failure_total > 0:
+            warnings.append(
+                f"verdict_json parse failures: {self.parse_failure_total}건 — diagnostics는 session-level parse_failures 참조"
+            )
+        m1_n = sum(self.m1.values())
+        m2_n = sum(self.m2.values())
+        m3 = {}
+        for b in ("Correctness", "Design", "Regression", "Maintainability"):
+            total = self.bundle_total[b]
+            confirmed = self.bundle_confirmed[b]
+            m3[b] = {
+                "total": total,
+                "confirmed": confirmed,
+                "confirmed_rate": (confirmed / total) if total else 0.0,
+            }
+        m5_n = sum(self.m5.values())
+        intensity_full_zero_rate = (
+            self.full_zero_sessions / self.full_sessions if self.full_sessions else 0.0
+        )
+
+        return {
+            "schema_version": SCHEMA_VERSION,
+            "captured_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "hosts": hosts,
+            "corpus": corpus_label,
+            "session_counts": {
+                "total": self.total,
+                "arbiter_marker_sessions": self.arbiter_sessions,
+                "intensity_marker_sessions": self.intensity_sessions,
             },
-            "M-2": {
-                "denominator": "arbiter_marker_sessions_findings_high_medium",
-                "n": m2_n,
-                "distribution": dict(m2_counter),
-                "percentages": {
-                    k: round(100 * v / m2_n, 1) if m2_n else 0.0
-                    for k, v in m2_counter.items()
+            "metrics": {
+                "M-1": {
+                    "denominator": "intensity_marker_sessions",
+                    "n": m1_n,
+                    "distribution": dict(self.m1),
+                    "percentages": {
+                        k: round(100 * v / m1_n, 1) if m1_n else 0.0
+                        for k, v in self.m1.items()
+                    },
+                },
+                "M-2": {
+                    "denominator": "arbiter_marker_sessions_findings_high_medium",
+                    "n": m2_n,
+                    "distribution": dict(self.m2),
+                    "percentages": {
+                        k: round(100 * v / m2_n, 1) if m2_n else 0.0
+                        for k, v in self.m2.items()
+                    },
+                    "source_distribution": {name: dict(src) for name, src in self.sources.items()},
+                },
+                "M-3": {"by_bundle": m3},
+                "M-4": {"transition_matrix": {f"{a}->{b}": c for (a, b), c in self.transitions.items()}},
+                "M-5": {
+                    "source": "round_summary_fallback" if self.m5 else "unavailable",
+                    "n": m5_n,
+                    "distribution": dict(self.m5),
                 },
-                "source_distribution": dict(source_counter),
             },
-            "M-3": {"by_bundle": m3},
-            "M-4": {"transition_matrix": {f"{a}->{b}": c for (a, b), c in transitions.items()}},
-            "M-5": {
-                "source": m5_source,
-                "n": m5_n,
-                "distribution": dict(m5_counter),
+            "derived": {
+                "intensity_full_finding_zero_rate": round(intensity_full_zero_rate, 3),
             },
-        },
-        "derived": {
-            "intensity_full_finding_zero_rate": round(intensity_full_zero_rate, 3),
-        },
-        "warnings": warnings,
-    }
+            "warnings": warnings,
+        }
+
+
+class FoldBuffer:
+    """세션 결과를 정렬 key 순서대로 AggregateAccumulator에 접는 reorder buffer.
+
+    order_sensitive가 아닌 세션은 도착 즉시 accumulator에 접고, marker 세션만 1건짜리
+    AggregateAccumulator로 줄여 key별 pending에 둔다. sort_at_finish=False면 key가 0부터의 연속
+    index (local files index)라 앞에서부터 연속으로 도착한 구간을 바로 접고, True면 (remote path
+    key, TrendBuckets 구간처럼 index가 띄엄띄엄인 경우) finish에서 key를 정렬해 접는다.
+    """
+
+    def __init__(self, sort_at_finish: bool):
+        self.sort_at_finish = sort_at_finish
+        self.accumulator = AggregateAccumulator()
+        self.pending: dict[Any, AggregateAccumulator | None] = {}
+        self.next_key = 0
+
+    def add(self, key: Any, result: dict | None) -> None:
+        partial = None
+        if AggregateAccumulator.order_sensitive(result):
+            partial = AggregateAccumulator()
+            partial.add(result)
+        else:
+            self.accumulator.add(result)
+        if self.sort_at_finish:
+            if partial is not None:
+                self.pending[key] = partial
+            return
+        self.pending[key] = partial
+        while self.next_key in self.pending:
+            ready = self.pending.pop(self.next_key)
+            if ready is not None:
+                self.accumulator.merge(ready)
+            self.next_key += 1
+
+    def finish(self) -> AggregateAccumulator:
+        """남은 pending을 key 순으로 접고 누적기를 반환한다."""
+        for key in sorted(self.pending):
+            ready = self.pending[key]
+            if ready is not None:
+                self.accumulator.merge(ready)
+        self.pending.clear()
+        return self.accumulator
+
+
+def _session_severity_transitions(verdicts: list[dict]) -> Counter:
+    """M-4 세션 1개의 round 그룹핑 + max severity 전이."""
+    # 라운드 분리: arbiter marker 등장 횟수로 라운드 추정 (단순 휴리스틱).
+    # session 안의 verdict 목록을 인접 그룹으로 나누어 round로 간주.
+    verdicts = [v for v in verdicts if v["source"] in ("verdict_json", "md_header")]
+    if len(verdicts) < 2:
+        return Counter()
+    # 단순화: finding_id 중복 등장 시 새 round로 간주
+    rounds: list[list[dict]] = []
+    seen_ids: set = set()
+    cur: list[dict] = []
+    for v in verdicts:
+        fid = v.get("finding_id", "")
+        if fid in seen_ids and cur:
+            rounds.append(cur)
+            cur = []
+            seen_ids = set()
+        cur.append(v)
+        if fid:
+            seen_ids.add(fid)
+    if cur:
+        rounds.append(cur)
+    if len(rounds) < 2:
+        return Counter()
+    return compute_severity_transitions(rounds)
+
+
+def build_aggregate(
+    sessions: Iterable[dict | None],
+    hosts: list[str],
+    corpus_label: str,
+    warnings: list[str],
+) -> dict:
+    """모든 세션 분석 결과를 통합 aggregate 객체로 빌드 (AggregateAccumulator에 순서대로 add)."""
+    acc = AggregateAccumulator()
+    for s in sessions:
+        acc.add(s)
+    return acc.build(hosts, corpus_label, warnings)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 8. markdown renderer
 # ─────────────────────────────────────────────────────────────────────────────
 
+def _render_sample_estimates(sample: dict) -> list[str]:
+    """--sample 추정 section — 층 배분 표 + M-1/M-2/M-3 비율 추정과 bootstrap 구간."""
+    level = f"{sample['confidence'] * 100:g}%"
+    out = [f"## 표본 추정 (층화 세션 bootstrap B={sample['replicates']}, {level} 구간)", ""]
+    out.append("| 층 (host / source) | 모집단 | 표본 | 분석 |")
+    out.append("|--------------------|--------|------|------|")
+    for st in sample["strata"]:
+        out.append(f"| {st['host']} / {st['source']} | {st['population']} | {st['sampled']} | {st['analyzed']} |")
+    out.append("")
+    out.append(f"| metric | 항목 | 추정 | {level} 구간 |")
+    out.append("|--------|------|------|------------|")
+    for metric, scale in (("M-1", 1), ("M-2", 1), ("M-3", 100)):
+        for label, est in sample["estimates"][metric].items():
+            value = "n/a" if est["estimate"] is None else f"{est['estimate'] * scale:.1f}%"
+            ci = "n/a" if est["ci"] is None else f"{est['ci'][0] * scale:.1f}% – {est['ci'][1] * scale:.1f}%"
+            out.append(f"| {metric} | {label} | {value} | {ci} |")
+    out.append("")
+    out.append("아래 M-1 ~ M-5 표는 표본 세션만의 집계다.")
+    out.append("")
+    return out
+
+
+def _render_trend(trend: dict) -> list[str]:
+    """--bucket 추이 section — 구간당 1행으로 M-1..M-5 대표값만 압축 (전체 분포는 JSON `trend`)."""
+    out = [f"## 추이 ({trend['unit']} 단위, {trend['timezone']})", ""]
+    out.append("| 구간 | 세션 | Arbiter 세션 | M-1 FULL | M-2 n | M-2 CONFIRMED | M-3 confirmed-rate | M-4 상향 전이 | M-5 stable |")
+    out.append("|------|------|--------------|----------|-------|---------------|--------------------|---------------|------------|")
+    for row in trend["series"]:
+        m = row["metrics"]
+        m1 = f"{m['M-1']['percentages'].get('FULL', 0.0):.1f}%" if m["M-1"]["n"] else "-"
+        m2 = f"{m['M-2']['percentages'].get('CONFIRMED_ISSUE', 0.0):.1f}%" if m["M-2"]["n"] else "-"
+        bundles = m["M-3"]["by_bundle"].values()
+        m3_total = sum(b["total"] for b in bundles)
+        m3 = f"{100 * sum(b['confirmed'] for b in bundles) / m3_total:.1f}%" if m3_total else "-"
+        transitions = m["M-4"]["transition_matrix"]
+        up = sum(
+            c for pair, c in transitions.items()
+            if SEVERITY_RANK.get(pair.split("->")[1], 0) > SEVERITY_RANK.get(pair.split("->")[0], 0)
+        )
+        m4 = f"{up} / {sum(transitions.values())}" if transitions else "-"
+        m5_n = m["M-5"]["n"]
+        m5 = f"{100 * m['M-5']['distribution'].get('stable', 0) / m5_n:.1f}%" if m5_n else "-"
+        counts = row["session_counts"]
+        out.append(
+            f"| {row['bucket']} | {counts['total']} | {counts['arbiter_marker_sessions']} | {m1} | {m['M-2']['n']}"
+            f" | {m2} | {m3} | {m4} | {m5} |"
+        )
+    sources = trend["time_source"]
+    out.append("")
+    out.append(
+        f"세션 시각: record timestamp {sources['timestamp']}, mtime {sources['mtime']}, 미상 {sources[BUCKET_UNKNOWN]}."
+        " M-4 상향 전이 = severity가 올라간 전이 / 전체 전이."
+    )
+    out.append("")
+    return out
+
+
 def render_markdown(agg: dict) -> str:
     out = []
     out.append(f"# DA 세션 정량 분석 — {agg['captured_at']}")
@@ -603,10 +1702,27 @@ def render_markdown(agg: dict) -> str:
     out.append(f"| 호스트 | {', '.join(agg['hosts'])} |")
     out.append(f"| corpus | {agg['corpus']} |")
     out.append(f"| 분석 파일 수 | {agg['session_counts']['total']} |")
+    if "dedup" in agg:
+        out.append(f"| 중복 제외 세션 (content hash) | {agg['dedup']['sessions']} |")
     out.append(f"| Arbiter marker 세션 | {agg['session_counts']['arbiter_marker_sessions']} |")
     out.append(f"| Intensity marker 세션 | {agg['session_counts']['intensity_marker_sessions']} |")
+    if "sample" in agg:
+        out.append(
+            f"| 표본 | {agg['sample']['sampled']} / {agg['sample']['population']} 세션 (seed {agg['sample']['seed']}) |"
+        )
+    if "query" in agg:
+        # analyze.py query — index 재계산 결과임을 표시
+        filters = agg["query"]["filters"]
+        label = ", ".join(
+            f"{k}={','.join(v) if isinstance(v, list) else v}" for k, v in filters.items()
+        ) or "없음"
+        out.append(f"| verdict index | {agg['query']['index']} ({agg['query']['indexed_at']}) |")
+        out.append(f"| filter | {label} |")
     out.append("")
 
+    if "sample" in agg:
+        out.extend(_render_sample_estimates(agg["sample"]))
+
     # M-1
     m1 = agg["metrics"]["M-1"]
     out.append(f"## M-1: 검토 강도 verdict 분포 (n={m1['n']})")
@@ -689,6 +1805,9 @@ def render_markdown(agg: dict) -> str:
     out.append(f"- intensity_full_finding_zero_rate: {d['intensity_full_finding_zero_rate'] * 100:.1f}%")
     out.append("")
 
+    if "trend" in agg:
+        out.extend(_render_trend(agg["trend"]))
+
     # Warnings
     if agg["warnings"]:
         out.append("---")
@@ -708,258 +1827,4423 @@ def render_json(agg: dict) -> str:
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Host handling
+# 10. session result cache
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _validate_host(alias: str) -> None:
-    if alias not in VALID_HOSTS:
-        raise ValueError(f"invalid host: {alias!r}. valid: {sorted(VALID_HOSTS)}")
+# algorithm_version에 섞는 non-regex 입력. module-level 정규식은 globals()에서 자동 수집한다.
+_ALGORITHM_CONSTANTS = (
+    "SCHEMA_VERSION",
+    "PARSER_REVISION",
+    "VERDICT_CATEGORIES",
+    "INTENSITY_VERDICTS",
+    "SEVERITY_RANK",
+    "BUNDLE_MAP",
+    "ARBITER_WINDOW_CHARS",
+    "SEVERITY_LOOKBEHIND_CHARS",
+    "SEVERITY_LOOKAHEAD_CHARS",
+    "FINDING_ID_MAX_CHARS",
+    "SELECTIVE_CARRY_CHARS",
+    "PAYLOAD_CODEX_RECORD_TYPES",
+    "PAYLOAD_INCLUDE_PATHS",
+    "PAYLOAD_EXCLUDE_PATHS",
+    "PAYLOAD_BINARY_PATHS",
+    "PAYLOAD_BINARY_MAX_CHARS",
+)
+CACHE_COMMIT_EVERY = 200  # put N건마다 commit — 중도 중단 시에도 완료분 cache 보존
+LOCAL_JOBS_CHUNKS_PER_WORKER = 4  # --jobs 모드 chunksize = miss 파일 수 / (worker 수 × 본 값)
 
 
-def collect_local_files(host: str) -> list[str]:
-    """현재 머신의 jsonl 파일 glob."""
-    _validate_host(host)
-    paths = HOST_PATH_MAP[host]
-    files = []
-    for base, pattern in [
-        (paths["claude"], "**/*.jsonl"),
-        (paths["codex"], "**/rollout-*.jsonl"),
-    ]:
-        glob_path = os.path.join(base, pattern)
-        for f in glob.glob(glob_path, recursive=True):
-            if "/subagents/" not in f:
-                files.append(f)
-    return files
+def _constant_repr(value: Any) -> str:
+    """algorithm_version용 repr — set/frozenset은 원소 repr 정렬 (iteration 순서가 hash seed마다
+    달라지므로), 나머지는 중첩까지 repr과 같은 문자열이다."""
+    if isinstance(value, (set, frozenset)):
+        items = ", ".join(sorted(_constant_repr(v) for v in value))
+        return f"{type(value).__name__}({{{items}}})" if items else f"{type(value).__name__}()"
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{_constant_repr(k)}: {_constant_repr(v)}" for k, v in value.items()) + "}"
+    if isinstance(value, list):
+        return "[" + ", ".join(_constant_repr(v) for v in value) + "]"
+    if isinstance(value, tuple):
+        items = [_constant_repr(v) for v in value]
+        return "(" + ", ".join(items) + ("," if len(items) == 1 else "") + ")"
+    return repr(value)
 
 
-def _allowed_remote_path(host: str, path: str) -> bool:
-    """원격 path가 정확한 base prefix 아래의 안전한 .jsonl 경로인지 확인.
+def algorithm_version() -> str:
+    """analyze_session 결과를 좌우하는 입력 전체의 digest.
 
-    SSH remote command는 원격 shell이 해석하므로 shell metacharacter (`;`, `$()`,
-    newline, backtick, space 등)가 포함된 경로는 명령 인젝션/word-splitting 위험이
-    있다. 따라서 다음 검사를 통과시킨다:
+    module-level `re.Pattern` 상수는 이름순으로 pattern + flags를 모두 섞으므로 regex 추가/수정 시
+    별도 bump 없이 cache가 무효화된다. tunable/매핑 상수와 SCHEMA_VERSION, PARSER_REVISION도 포함
+    (_constant_repr — set 값도 process와 무관하게 같은 digest).
+    """
+    h = hashlib.sha256()
+    module_globals = globals()
+    for name in sorted(module_globals):
+        value = module_globals[name]
+        if isinstance(value, re.Pattern):
+            h.update(f"{name}\0{value.pattern}\0{value.flags}\n".encode())
+    for name in _ALGORITHM_CONSTANTS:
+        h.update(f"{name}\0{_constant_repr(module_globals[name])}\n".encode())
+    return h.hexdigest()[:16]
+
+
+def encode_session(result: dict) -> str:
+    """analyze_session 결과 dict → JSON 문자열 (cache/전송용).
+
+    ensure_ascii 기본값을 유지한다 — verdict JSON의 lone surrogate escape가 SQLite UTF-8
+    인코딩에서 깨지지 않도록 ASCII escape로 저장한다.
+    """
+    return json.dumps(result, separators=(",", ":"))
+
+
+def decode_session(raw: str) -> dict:
+    """encode_session 역변환. JSON이 잃어버리는 Counter 타입을 복원한다."""
+    return _restore_session_types(json.loads(raw))
+
+
+def _restore_session_types(result: dict) -> dict:
+    result["round_summary_stability"] = Counter(result.get("round_summary_stability") or {})
+    return result
+
+
+class SessionCache:
+    """analyze_session 결과 dict의 SQLite 영속 cache.
+
+    row key는 (host, path)이고 (size, mtime_ns, algorithm_version)이 모두 일치할 때만 hit로 본다.
+    파일이 바뀌거나 regex/schema가 바뀌면 같은 row를 덮어쓰므로 cache가 무한히 자라지 않는다.
+    analyze_session이 None을 반환한 세션 (read 실패)은 저장하지 않아 다음 실행에서 재시도된다.
+    host worker thread들이 동시에 조회하므로 connection 접근은 lock으로 직렬화한다.
+
+    parser_states table은 (host, path)별 이어 파싱 상태 (analyze_session_file의 "resume")를 둔다.
+    결과 row가 miss (파일이 자람)여도 상태가 있으면 늘어난 줄만 파싱한다. algorithm_version이
+    다르면 상태도 무효다. content_digests table은 dedup 단계의 파일 content sha256이다.
+    """
+
+    def __init__(self, db_path: str):
+        parent = os.path.dirname(db_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self.db_path = db_path
+        self.version = algorithm_version()
+        self.hits = 0
+        self.misses = 0
+        self.resumed = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS session_results ("
+            " host TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " algorithm_version TEXT NOT NULL,"
+            " result TEXT NOT NULL,"
+            " PRIMARY KEY (host, path))"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS parser_states ("
+            " host TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " algorithm_version TEXT NOT NULL,"
+            " byte_offset INTEGER NOT NULL,"
+            " prefix_hash TEXT NOT NULL,"
+            " state TEXT NOT NULL,"
+            " PRIMARY KEY (host, path))"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS content_digests ("
+            " host TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " digest TEXT NOT NULL,"
+            " PRIMARY KEY (host, path))"
+        )
+        self.conn.commit()
+
+    def get(self, host: str, path: str, size: int, mtime_ns: int) -> dict | None:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT result FROM session_results"
+                " WHERE host = ? AND path = ? AND size = ? AND mtime_ns = ? AND algorithm_version = ?",
+                (host, path, size, mtime_ns, self.version),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return decode_session(row[0])
+
+    def put(
+        self,
+        host: str,
+        path: str,
+        size: int,
+        mtime_ns: int,
+        result: dict,
+        encoded: str | None = None,
+    ) -> None:
+        """encoded가 주어지면 (worker가 이미 encode한 경우) 재인코딩 없이 그대로 저장한다."""
+        encoded = encoded or encode_session(result)
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO session_results"
+                " (host, path, size, mtime_ns, algorithm_version, result) VALUES (?, ?, ?, ?, ?, ?)",
+                (host, path, size, mtime_ns, self.version, encoded),
+            )
+            self._pending += 1
+            if self._pending >= CACHE_COMMIT_EVERY:
+                self.conn.commit()
+                self._pending = 0
+
+    def get_resume(self, host: str, path: str) -> dict | None:
+        """analyze_session_file에 넘길 이어 파싱 상태 (없거나 algorithm_version이 다르면 None)."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT byte_offset, prefix_hash, state FROM parser_states"
+                " WHERE host = ? AND path = ? AND algorithm_version = ?",
+                (host, path, self.version),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"offset": row[0], "prefix_hash": row[1], "state": row[2]}
+
+    def put_resume(self, host: str, path: str, resume: dict) -> None:
+        if resume.get("resumed_from"):
+            self.resumed += 1
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO parser_states"
+                " (host, path, algorithm_version, byte_offset, prefix_hash, state) VALUES (?, ?, ?, ?, ?, ?)",
+                (host, path, self.version, resume["offset"], resume["prefix_hash"], resume["state"]),
+            )
+            self._pending += 1
+            if self._pending >= CACHE_COMMIT_EVERY:
+                self.conn.commit()
+                self._pending = 0
+
+    def get_digest(self, host: str, path: str, size: int, mtime_ns: int) -> str | None:
+        """dedup content sha256. algorithm_version과 무관하게 (size, mtime)만 일치하면 재사용한다."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT digest FROM content_digests WHERE host = ? AND path = ? AND size = ? AND mtime_ns = ?",
+                (host, path, size, mtime_ns),
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def put_digest(self, host: str, path: str, size: int, mtime_ns: int, digest: str) -> None:
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO content_digests (host, path, size, mtime_ns, digest) VALUES (?, ?, ?, ?, ?)",
+                (host, path, size, mtime_ns, digest),
+            )
+            self._pending += 1
+            if self._pending >= CACHE_COMMIT_EVERY:
+                self.conn.commit()
+                self._pending = 0
+
+    def flush(self) -> None:
+        """대기 중인 put을 commit — 장시간 실행 (watch daemon)에서 poll마다 호출한다."""
+        with self._lock:
+            self.conn.commit()
+            self._pending = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.commit()
+            self.conn.close()
+
+
+def take_session_resume(cache: SessionCache | None, host: str, path: str, result: dict | None) -> bool:
+    """결과 dict의 "resume" key를 떼어 cache.put_resume으로 저장 — 결과 cache row에는 남기지 않는다."""
+    resume = result.pop("resume", None) if result is not None else None
+    if resume is None:
+        return False
+    if cache is not None:
+        cache.put_resume(host, path, resume)
+    return True
+
+
+def open_session_cache(db_path: str | None) -> SessionCache | None:
+    """cache open. 실패는 측정 결과와 무관하므로 stderr 경고 후 cache 없이 진행한다."""
+    if not db_path:
+        return None
+    try:
+        return SessionCache(db_path)
+    except (OSError, sqlite3.Error) as e:
+        print(f"WARNING: session cache disabled ({db_path}): {e}", file=sys.stderr)
+        return None
+
+
+def _stat_or_none(path: str) -> os.stat_result | None:
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def _analyze_session_encoded(
+    path: str, resume: dict | None = None, profile: bool = False, resumable: bool = False
+) -> str | None:
+    """process pool worker — 결과를 encode_session 문자열로 반환해 pickle 전송량을 줄인다.
+
+    --profile 상태는 worker process에 전달되지 않으므로 (spawn) profile을 명시로 받는다.
+    """
+    if resumable:
+        result = analyze_session_file(path, resume, profile=profile)
+    else:
+        result = analyze_session(path, profile=profile)
+    if result is None:
+        return None
+    return encode_session(result)
+
+
+def split_local_cache(
+    host: str,
+    files: list[str],
+    cache: SessionCache | None,
+    triage: bool = False,
+    triage_stats: dict | None = None,
+) -> tuple[list[dict | None], list[tuple[int, str, os.stat_result | None]]]:
+    """files 순서의 결과 list (cache hit / triage 제외분만 채움) + miss 파일 (index, path, stat) list.
+
+    triage=True면 cache 조회 전에 triage_session_file로 후보를 거른다 — 비후보는 cache에 넣지 않아
+    cache에는 항상 전체 파싱 결과만 남는다. triage_stats가 주어지면 "skipped" 수를 누적한다.
+    """
+    results: list[dict | None] = [None] * len(files)
+    pending: list[tuple[int, str, os.stat_result | None]] = []
+    for i, path in enumerate(files):
+        if triage and not triage_session_file(path):
+            results[i] = triaged_session(path, file_time_bounds(path))
+            if triage_stats is not None:
+                triage_stats["skipped"] = triage_stats.get("skipped", 0) + 1
+            continue
+        st = _stat_or_none(path) if cache is not None else None
+        if st is not None:
+            cached = cache.get(host, path, st.st_size, st.st_mtime_ns)
+            if cached is not None:
+                results[i] = cached
+                continue
+        pending.append((i, path, st))
+    return results, pending
+
+
+def iter_local_analyses(
+    pending: list[tuple[int, str, os.stat_result | None]],
+    jobs: int = 1,
+    resumes: dict[str, dict | None] | None = None,
+) -> Iterable[tuple[int, str, os.stat_result | None, dict | None, str | None]]:
+    """split_local_cache의 miss 파일을 분석해 입력 순서대로 (index, path, stat, 결과, encoded) yield.
+
+    jobs > 1이면 process pool 경로이며 encoded는 worker가 만든 encode_session 문자열 (cache put
+    재인코딩 생략용), 직렬이면 None. resumes (path → 이어 파싱 상태 | None)가 주어지면
+    analyze_session_file로 분석해 결과에 "resume"을 붙인다 (caller가 take_session_resume으로 저장).
+    """
+    resumable = resumes is not None
+    resumes = resumes or {}
+    if jobs <= 1 or len(pending) < 2:
+        for i, path, st in pending:
+            if resumable:
+                result = analyze_session_file(path, resumes.get(path))
+            else:
+                result = analyze_session(path)
+            yield i, path, st, result, None
+        return
+    workers = min(jobs, len(pending))
+    chunksize = max(1, len(pending) // (workers * LOCAL_JOBS_CHUNKS_PER_WORKER))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        encoded_results = executor.map(
+            functools.partial(
+                _analyze_session_encoded, profile=_run_profile is not None, resumable=resumable
+            ),
+            [path for _, path, _ in pending],
+            [resumes.get(path) for _, path, _ in pending],
+            chunksize=chunksize,
+        )
+        for (i, path, st), encoded in zip(pending, encoded_results):
+            yield i, path, st, (None if encoded is None else decode_session(encoded)), encoded
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 11. run profile (--profile)
+# ─────────────────────────────────────────────────────────────────────────────
+
+PROFILE_TOP_SESSIONS = 20  # profile.sessions.slowest / largest 목록 길이
+PROFILE_PERCENTILES = (50, 90, 99)
+
+
+class RunProfile:
+    """--profile 계측 누적기 — 단계 (host별 wall/CPU), SSH fetch 지연/전송량, 세션별 단계 시간.
+
+    host worker thread와 fetch worker thread가 동시에 기록하므로 lock으로 보호한다. 단계 CPU는
+    해당 단계를 실행한 thread의 thread_time이다 — fetch pool thread와 --jobs worker process의 CPU는
+    세션 profile (cpu_seconds)과 process 전체 합계 (build의 process_cpu_seconds,
+    children_cpu_seconds)로만 잡힌다.
+    """
+
+    def __init__(self):
+        self.started = (time.perf_counter(), time.process_time())
+        self._lock = threading.Lock()
+        self.stages: dict[tuple[str, str], list[float]] = {}  # (host, stage) → [wall, cpu, count]
+        self.fetches: dict[tuple[str, str], list[tuple[float, int]]] = defaultdict(list)
+        self.sessions: list[tuple[str, str, dict]] = []
+
+    def add_stage(self, host: str, stage: str, wall: float, cpu: float) -> None:
+        with self._lock:
+            entry = self.stages.setdefault((host, stage), [0.0, 0.0, 0])
+            entry[0] += wall
+            entry[1] += cpu
+            entry[2] += 1
+
+    def add_fetch(self, host: str, command: str, seconds: float, nbytes: int) -> None:
+        with self._lock:
+            self.fetches[(host, command)].append((seconds, nbytes))
+
+    def add_session(self, host: str, path: str, profile: dict) -> None:
+        with self._lock:
+            self.sessions.append((host, path, profile))
+
+    def build(self, top: int = PROFILE_TOP_SESSIONS) -> dict:
+        """JSON sidecar `profile` section. 시간은 초 단위 (소수 6자리)."""
+        wall, cpu = self.started
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        stages = [
+            {"host": host, "stage": stage, "wall_seconds": _round6(w), "cpu_seconds": _round6(c), "count": n}
+            for (host, stage), (w, c, n) in self.stages.items()
+        ]
+        fetch: dict[str, dict] = defaultdict(dict)
+        for (host, command), samples in sorted(self.fetches.items()):
+            latencies = sorted(seconds for seconds, _ in samples)
+            fetch[host][command] = {
+                "count": len(samples),
+                "bytes": sum(nbytes for _, nbytes in samples),
+                "latency_seconds": {
+                    **{f"p{q}": _round6(_percentile(latencies, q)) for q in PROFILE_PERCENTILES},
+                    "max": _round6(latencies[-1]),
+                },
+            }
+        phases: Counter = Counter()
+        for _, _, prof in self.sessions:
+            phases.update(prof["phases"])
+        entries = [_session_profile_entry(host, path, prof) for host, path, prof in self.sessions]
+        return {
+            "wall_seconds": _round6(time.perf_counter() - wall),
+            "process_cpu_seconds": _round6(time.process_time() - cpu),
+            "children_cpu_seconds": _round6(children.ru_utime + children.ru_stime),
+            "stages": stages,
+            "fetch": dict(fetch),
+            "sessions": {
+                "count": len(entries),
+                "wall_seconds": _round6(sum(e["wall_seconds"] for e in entries)),
+                "phases": {k: _round6(v) for k, v in sorted(phases.items())},
+                "slowest": sorted(entries, key=lambda e: -e["wall_seconds"])[:top],
+                "largest": sorted(entries, key=lambda e: -e["chars"])[:top],
+            },
+        }
+
+
+def _round6(value: float) -> float:
+    return round(value, 6)
+
+
+def _percentile(sorted_values: list[float], q: int) -> float:
+    """nearest-rank percentile (sorted_values는 비어 있지 않음)."""
+    rank = max(1, -(-q * len(sorted_values) // 100))
+    return sorted_values[rank - 1]
+
+
+def _session_profile_entry(host: str, path: str, prof: dict) -> dict:
+    return {
+        "host": host,
+        "path": path,
+        "lines": prof["lines"],
+        "chars": prof["chars"],
+        "payloads": prof["payloads"],
+        "wall_seconds": _round6(prof["wall_seconds"]),
+        "cpu_seconds": _round6(prof["cpu_seconds"]),
+        "phases": {k: _round6(v) for k, v in sorted(prof["phases"].items())},
+    }
+
+
+_run_profile: RunProfile | None = None
+
+
+def enable_profile() -> RunProfile:
+    """--profile 활성화 — 이후 analyze_session / 단계 / fetch 계측이 반환된 RunProfile에 쌓인다."""
+    global _run_profile
+    _run_profile = RunProfile()
+    return _run_profile
+
+
+def disable_profile() -> None:
+    global _run_profile
+    _run_profile = None
+
+
+@contextlib.contextmanager
+def profile_stage(host: str, stage: str):
+    """with block 구간을 (host, stage) 단계로 계측. --profile 비활성이면 no-op."""
+    prof = _run_profile
+    if prof is None:
+        yield
+        return
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        prof.add_stage(host, stage, time.perf_counter() - wall, time.thread_time() - cpu)
+
+
+def profile_fetch(host: str, command: str, started: float, nbytes: int) -> None:
+    """ssh 전송 1건 (started = perf_counter 시작 시각) 기록. --profile 비활성이면 no-op."""
+    prof = _run_profile
+    if prof is not None:
+        prof.add_fetch(host, command, time.perf_counter() - started, nbytes)
+
+
+def take_session_profile(host: str, path: str, result: dict | None) -> bool:
+    """결과 dict의 "profile" key를 떼어 RunProfile로 옮긴다 — cache/aggregate에는 남기지 않는다."""
+    prof = result.pop("profile", None) if result is not None else None
+    if prof is None:
+        return False
+    if _run_profile is not None:
+        _run_profile.add_session(host, path, prof)
+    return True
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 12. verdict index (--index, query)
+# ─────────────────────────────────────────────────────────────────────────────
+
+INDEX_SCHEMA_VERSION = 1  # verdict index table 구성 — 바뀌면 query가 재생성을 요구한다
+INDEX_LIST_COLUMNS = ("host", "path", "finding_id", "bundle", "verdict", "severity", "source", "timestamp")
+INDEX_VERDICT_FILTERS = ("verdict", "bundle", "severity", "source")  # 세션을 매칭 verdict 보유로 제한하는 filter
+RELATIVE_TIME = re.compile(r"(\d+)([hdw])")
+RELATIVE_TIME_UNITS = {"h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def normalize_timestamp(value: str | None) -> str | None:
+    """jsonl `timestamp` (ISO 8601, `Z` 포함) → UTC ISO 문자열. 문자열 비교 = 시각 비교가 되도록
+    index에는 본 형태로만 기록한다. 해석 불가 값은 None."""
+    if not value:
+        return None
+    text = value.strip()
+    if text.endswith(("Z", "z")):
+        text = text[:-1] + "+00:00"
+    try:
+        parsed = datetime.datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.astimezone(datetime.timezone.utc).isoformat(timespec="milliseconds")
+
+
+class VerdictIndex:
+    """--index 출력 — 세션 1행 + verdict 1행씩 기록하는 SQLite 파일.
+
+    run_hosts main thread가 세션 결과를 접기 전에 add로 넘긴다. `<path>.tmp`에 쓰고 commit에서
+    filter용 index를 만든 뒤 rename하므로, 기록 중에도 이전 index로 query할 수 있고 중단된 실행은
+    이전 index를 건드리지 않는다. sessions 행은 aggregate에 필요한 세션 단위 값 (marker, intensity
+    verdict, selective 합계, parse failure)을 모두 담아 query가 jsonl 없이 M-1..M-5를 다시 계산한다.
+    """
+
+    def __init__(self, db_path: str, hosts: list[str]):
+        parent = os.path.dirname(db_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self.db_path = db_path
+        self.tmp_path = db_path + ".tmp"
+        self.host_rank = {host: rank for rank, host in enumerate(hosts)}
+        self.sessions = 0
+        self.verdicts = 0
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.tmp_path)
+        self.conn = sqlite3.connect(self.tmp_path)
+        self.conn.executescript(
+            "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+            "CREATE TABLE sessions ("
+            " id INTEGER PRIMARY KEY,"
+            " host TEXT NOT NULL,"
+            " host_rank INTEGER NOT NULL,"
+            " sort_key TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " has_arbiter_marker INTEGER NOT NULL,"
+            " has_intensity_marker INTEGER NOT NULL,"
+            " intensity_verdicts TEXT NOT NULL,"
+            " nl_signal_only INTEGER NOT NULL,"
+            " nl_estimated_count INTEGER NOT NULL,"
+            " round_summary_stability TEXT NOT NULL,"
+            " parse_failures TEXT NOT NULL,"
+            " first_timestamp TEXT,"
+            " last_timestamp TEXT);"
+            "CREATE TABLE verdicts ("
+            " session_id INTEGER NOT NULL REFERENCES sessions (id),"
+            " seq INTEGER NOT NULL,"
+            " finding_id TEXT,"
+            " bundle TEXT,"
+            " verdict TEXT NOT NULL,"
+            " severity TEXT,"
+            " source TEXT NOT NULL,"
+            " source_confidence TEXT NOT NULL,"
+            " timestamp TEXT,"
+            " PRIMARY KEY (session_id, seq));"
+        )
+
+    def add(self, host: str, key: Any, result: dict) -> None:
+        """세션 결과 1건. key는 HostRun 정렬 key (local files index / remote path) — query가 같은
+        순서로 접어 일회성 실행과 같은 aggregate key 순서를 재현한다."""
+        sort_key = f"{key:012d}" if isinstance(key, int) else key
+        cur = self.conn.execute(
+            "INSERT INTO sessions (host, host_rank, sort_key, path, has_arbiter_marker, has_intensity_marker,"
+            " intensity_verdicts, nl_signal_only, nl_estimated_count, round_summary_stability, parse_failures,"
+            " first_timestamp, last_timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                host,
+                self.host_rank.get(host, len(self.host_rank)),
+                sort_key,
+                result["path"],
+                int(result["has_arbiter_marker"]),
+                int(result["has_intensity_marker"]),
+                json.dumps(result["intensity_verdicts"]),
+                int(result["nl_signal_only"]),
+                result["nl_estimated_count"],
+                json.dumps(dict(result["round_summary_stability"])),
+                json.dumps(result["parse_failures"], ensure_ascii=False),
+                normalize_timestamp(result.get("first_timestamp")),
+                normalize_timestamp(result.get("last_timestamp")),
+            ),
+        )
+        session_id = cur.lastrowid
+        self.conn.executemany(
+            "INSERT INTO verdicts (session_id, seq, finding_id, bundle, verdict, severity, source,"
+            " source_confidence, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    session_id,
+                    seq,
+                    v.get("finding_id"),
+                    v.get("bundle"),
+                    v["verdict"],
+                    v.get("severity"),
+                    v["source"],
+                    v["source_confidence"],
+                    normalize_timestamp(v.get("timestamp")),
+                )
+                for seq, v in enumerate(result["verdicts"])
+            ],
+        )
+        self.sessions += 1
+        self.verdicts += len(result["verdicts"])
+
+    def commit(self, hosts: list[str], corpus_label: str) -> None:
+        """filter index 생성 + meta 기록 후 `<path>.tmp` → path rename."""
+        self.conn.executescript(
+            "CREATE INDEX verdicts_filter ON verdicts (verdict, bundle, severity);"
+            "CREATE INDEX verdicts_timestamp ON verdicts (timestamp);"
+            "CREATE INDEX verdicts_finding ON verdicts (finding_id);"
+            "CREATE INDEX sessions_order ON sessions (host_rank, sort_key);"
+            "CREATE INDEX sessions_path ON sessions (path);"
+            "CREATE INDEX sessions_time ON sessions (last_timestamp, first_timestamp);"
+        )
+        meta = {
+            "index_schema_version": str(INDEX_SCHEMA_VERSION),
+            "algorithm_version": algorithm_version(),
+            "captured_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "hosts": json.dumps(hosts),
+            "corpus": corpus_label,
+        }
+        self.conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", meta.items())
+        self.conn.commit()
+        self.conn.close()
+        os.replace(self.tmp_path, self.db_path)
+
+    def abort(self) -> None:
+        self.conn.close()
+        with contextlib.suppress(OSError):
+            os.unlink(self.tmp_path)
+
+
+def open_verdict_index(db_path: str | None, hosts: list[str]) -> VerdictIndex | None:
+    """--index open. 실패는 stderr 경고 후 index 없이 진행한다 (측정 결과와 무관)."""
+    if not db_path:
+        return None
+    try:
+        return VerdictIndex(db_path, hosts)
+    except (OSError, sqlite3.Error) as e:
+        print(f"WARNING: verdict index open failed ({db_path}): {e} — index 없이 진행", file=sys.stderr)
+        return None
+
+
+def parse_time_bound(s: str) -> str:
+    """query --since/--until 파싱. ISO 날짜/시각 (timezone 없으면 UTC) 또는 `<N>h|d|w` (지금부터 N 전)."""
+    m = RELATIVE_TIME.fullmatch(s.strip())
+    if m:
+        delta = datetime.timedelta(seconds=int(m.group(1)) * RELATIVE_TIME_UNITS[m.group(2)])
+        bound = datetime.datetime.now(datetime.timezone.utc) - delta
+        return bound.isoformat(timespec="milliseconds")
+    bound = normalize_timestamp(s)
+    if bound is None:
+        raise argparse.ArgumentTypeError(f"invalid time: {s!r} (ISO 8601 or <N>h|d|w)")
+    return bound
+
+
+def _index_filters(filters: dict) -> tuple[str, list, str, list]:
+    """filter → (sessions WHERE, params, verdicts WHERE, params).
+
+    session 조건: host, path 부분 문자열, 활동 구간 (first..last timestamp)이 [since, until)과 겹침.
+    verdict 조건: verdict/bundle/severity/source 값 목록, timestamp가 [since, until) 안.
+    """
+    session_sql, session_params = ["1"], []
+    if filters.get("hosts"):
+        session_sql.append(f"s.host IN ({','.join('?' * len(filters['hosts']))})")
+        session_params.extend(filters["hosts"])
+    if filters.get("path"):
+        session_sql.append("instr(s.path, ?) > 0")
+        session_params.append(filters["path"])
+    if filters.get("since"):
+        session_sql.append("s.last_timestamp >= ?")
+        session_params.append(filters["since"])
+    if filters.get("until"):
+        session_sql.append("s.first_timestamp < ?")
+        session_params.append(filters["until"])
+
+    verdict_sql, verdict_params = [], []
+    for column in INDEX_VERDICT_FILTERS:
+        values = filters.get(column)
+        if values:
+            verdict_sql.append(f"v.{column} IN ({','.join('?' * len(values))})")
+            verdict_params.extend(values)
+    if filters.get("since"):
+        verdict_sql.append("v.timestamp >= ?")
+        verdict_params.append(filters["since"])
+    if filters.get("until"):
+        verdict_sql.append("v.timestamp < ?")
+        verdict_params.append(filters["until"])
+    return " AND ".join(session_sql), session_params, " AND ".join(verdict_sql), verdict_params
+
+
+def open_index_readonly(db_path: str) -> sqlite3.Connection:
+    """query용 read-only connection. 없는 파일/다른 schema는 ValueError."""
+    if not os.path.isfile(db_path):
+        raise ValueError(f"verdict index not found: {db_path} (`analyze.py --index {db_path}`로 생성)")
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'index_schema_version'").fetchone()
+    except sqlite3.Error:
+        row = None
+    if row is None or row[0] != str(INDEX_SCHEMA_VERSION):
+        conn.close()
+        raise ValueError(f"verdict index schema mismatch: {db_path} — `analyze.py --index`로 재생성")
+    return conn
+
+
+def query_index_sessions(conn: sqlite3.Connection, filters: dict) -> Iterable[dict]:
+    """filter에 맞는 세션을 analyze_session 결과 shape로 재구성해 (host, 정렬 key) 순으로 yield.
+
+    verdict/bundle/severity/source filter가 있으면 매칭 verdict가 1건 이상인 세션만 남기고 verdict
+    list도 매칭 행으로 줄인다 — M-1/M-5는 그 세션들 전체 값, M-2..M-4는 매칭 verdict만으로 계산된다.
+    --since/--until만 있으면 활동 구간이 겹치는 세션은 verdict가 없어도 남고 verdict list만 구간 안으로
+    줄어든다 (intensity-only 세션이 M-1에서 빠지지 않도록).
+    """
+    session_where, session_params, verdict_where, verdict_params = _index_filters(filters)
+    restrict = any(filters.get(column) for column in INDEX_VERDICT_FILTERS)
+    verdict_where = verdict_where or "1"
+    rows: dict[int, list[dict]] = defaultdict(list)
+    for session_id, finding_id, bundle, verdict, severity, source, confidence, stamp in conn.execute(
+        "SELECT v.session_id, v.finding_id, v.bundle, v.verdict, v.severity, v.source,"
+        " v.source_confidence, v.timestamp FROM verdicts v JOIN sessions s ON s.id = v.session_id"
+        f" WHERE {session_where} AND {verdict_where} ORDER BY v.session_id, v.seq",
+        session_params + verdict_params,
+    ):
+        v = {
+            "finding_id": finding_id,
+            "verdict": verdict,
+            "source": source,
+            "source_confidence": confidence,
+            "bundle": bundle,
+            "timestamp": stamp,
+        }
+        if severity is not None:
+            v["severity"] = severity
+        rows[session_id].append(v)
+    for row in conn.execute(
+        "SELECT s.id, s.path, s.has_arbiter_marker, s.has_intensity_marker, s.intensity_verdicts,"
+        " s.nl_signal_only, s.nl_estimated_count, s.round_summary_stability, s.parse_failures,"
+        " s.first_timestamp, s.last_timestamp FROM sessions s"
+        f" WHERE {session_where} ORDER BY s.host_rank, s.sort_key",
+        session_params,
+    ):
+        if restrict and row[0] not in rows:
+            continue
+        yield {
+            "path": row[1],
+            "has_arbiter_marker": bool(row[2]),
+            "has_intensity_marker": bool(row[3]),
+            "intensity_verdicts": json.loads(row[4]),
+            "verdicts": rows.get(row[0], []),
+            "nl_signal_only": bool(row[5]),
+            "nl_estimated_count": row[6],
+            "round_summary_stability": Counter(json.loads(row[7])),
+            "parse_failures": json.loads(row[8]),
+            "first_timestamp": row[9],
+            "last_timestamp": row[10],
+        }
+
+
+def query_index_verdicts(conn: sqlite3.Connection, filters: dict) -> list[dict]:
+    """query --list — filter에 맞는 verdict 행 (INDEX_LIST_COLUMNS)."""
+    session_where, session_params, verdict_where, verdict_params = _index_filters(filters)
+    cur = conn.execute(
+        "SELECT s.host, s.path, v.finding_id, v.bundle, v.verdict, v.severity, v.source, v.timestamp"
+        " FROM verdicts v JOIN sessions s ON s.id = v.session_id"
+        f" WHERE {session_where} AND {verdict_where or '1'}"
+        " ORDER BY s.host_rank, s.sort_key, v.seq",
+        session_params + verdict_params,
+    )
+    return [dict(zip(INDEX_LIST_COLUMNS, row)) for row in cur]
+
+
+def query_index(db_path: str, filters: dict) -> dict:
+    """index에서 filter에 맞는 세션/verdict로 aggregate를 다시 계산 (jsonl 재파싱 없음).
+
+    결과는 일회성 실행과 같은 aggregate shape이고 `query` section (index 경로, 생성 시각, filter)이
+    붙는다. filter가 없으면 index를 만든 실행의 aggregate와 같다 (captured_at 제외).
+    """
+    conn = open_index_readonly(db_path)
+    try:
+        meta = dict(conn.execute("SELECT key, value FROM meta"))
+        hosts = [h for h in json.loads(meta["hosts"]) if not filters.get("hosts") or h in filters["hosts"]]
+        accumulator = AggregateAccumulator()
+        for session in query_index_sessions(conn, filters):
+            accumulator.add(session)
+    finally:
+        conn.close()
+    warnings: list[str] = []
+    if meta["algorithm_version"] != algorithm_version():
+        warnings.append("verdict index는 다른 algorithm_version으로 생성됨 — `--index`로 재생성 권장")
+    agg = accumulator.build(hosts, meta["corpus"], warnings)
+    agg["query"] = {
+        "index": db_path,
+        "indexed_at": meta["captured_at"],
+        "filters": {k: v for k, v in filters.items() if v},
+    }
+    return agg
+
+
+def render_verdict_rows(rows: list[dict]) -> str:
+    """query --list markdown 표."""
+    lines = [
+        f"## Verdict index query — {len(rows)} verdicts",
+        "",
+        "| " + " | ".join(INDEX_LIST_COLUMNS) + " |",
+        "|" + "---|" * len(INDEX_LIST_COLUMNS),
+    ]
+    for row in rows:
+        cells = ["" if row[c] is None else str(row[c]).replace("|", "\\|") for c in INDEX_LIST_COLUMNS]
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines) + "\n"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 13. sampling (--sample, --sample-frac)
+# ─────────────────────────────────────────────────────────────────────────────
+
+SAMPLE_BOOTSTRAP_REPLICATES = 1000  # 층화 세션 bootstrap 반복 수
+SAMPLE_CONFIDENCE = 0.95  # 추정 구간 신뢰수준 (percentile bootstrap)
+SAMPLE_SOURCES = ("claude", "codex")
+
+
+def session_source(host: str, path: str) -> str:
+    """세션 path의 log source — HOST_PATH_MAP[host]["codex"] 아래면 codex, 아니면 claude."""
+    codex = HOST_PATH_MAP.get(host, {}).get("codex", "")
+    return "codex" if codex and path.startswith(codex.rstrip("/") + "/") else "claude"
+
+
+def allocate_sample(populations: list[int], target: int) -> list[int]:
+    """층별 표본 크기 — 모집단 비례 배분 (최대 나머지 방식, 합 = target).
+
+    target이 비어 있지 않은 층 수 이상이면 각 층에 최소 1개를 보장해 추정 구간이 빈 층을 빼지 않는다.
+    """
+    total = sum(populations)
+    target = min(target, total)
+    if not total or target <= 0:
+        return [0] * len(populations)
+    nonempty = sum(1 for n in populations if n)
+    floor = 1 if target >= nonempty else 0
+    sizes = [min(n, floor) for n in populations]
+    remaining = target - sum(sizes)
+    spare = [n - s for n, s in zip(populations, sizes)]
+    spare_total = sum(spare)
+    if remaining and spare_total:
+        quotas = [remaining * n / spare_total for n in spare]
+        extra = [int(q) for q in quotas]
+        order = sorted(range(len(quotas)), key=lambda i: (extra[i] - quotas[i], i))
+        for i in order[: remaining - sum(extra)]:
+            extra[i] += 1
+        sizes = [s + e for s, e in zip(sizes, extra)]
+    return sizes
+
+
+class SampleEstimator:
+    """--sample 표본 세션의 M-1/M-2/M-3 비율 추정 + 층화 세션 bootstrap 구간.
+
+    표본 단위는 세션이고 verdict는 세션 안에 묶여 있으므로 (cluster), verdict 단위 이항 구간
+    (Wilson 등)은 구간을 과소평가한다. 대신 층 (host, source)마다 표본 세션을 복원추출해 가중
+    비율 추정량 Σ w·y / Σ w·x (w = 층 모집단 / 층 결과 수)를 다시 계산하는 percentile bootstrap을
+    쓴다. 세션별 기여 (y, x)는 1건짜리 AggregateAccumulator로 구해 metric 정의를 공유하고,
+    SAMPLE_KEYS 순서의 고정 길이 tuple로 두어 replicate 합계를 zip 열 합으로 구한다.
+    결과가 없는 세션 (fetch 실패, 원격 빈 파일)은 층 결과 수에서 빠진다.
+    """
+
+    BUNDLES = ("Correctness", "Design", "Regression", "Maintainability")
+    SAMPLE_KEYS = (
+        [("M-1", k) for k in INTENSITY_VERDICTS]
+        + [("M-2", k) for k in VERDICT_CATEGORIES]
+        + [("M-3", b) for b in BUNDLES]
+        + [("M-3", b, "confirmed") for b in BUNDLES]
+    )
+
+    def __init__(self, strata: list[dict], seed: int):
+        self.strata = strata
+        self.seed = seed
+        self._stratum = {}  # (host, path) → strata index
+        for i, stratum in enumerate(strata):
+            for path in stratum.pop("paths"):
+                self._stratum[(stratum["host"], path)] = i
+        self.contributions: list[list[tuple]] = [[] for _ in strata]
+
+    def add(self, host: str, key: Any, result: dict) -> None:
+        i = self._stratum.get((host, result["path"]))
+        if i is None:
+            return
+        acc = AggregateAccumulator()
+        acc.add(result)
+        self.contributions[i].append(
+            tuple(acc.m1[k] for k in INTENSITY_VERDICTS)
+            + tuple(acc.m2[k] for k in VERDICT_CATEGORIES)
+            + tuple(acc.bundle_total[b] for b in self.BUNDLES)
+            + tuple(acc.bundle_confirmed[b] for b in self.BUNDLES)
+        )
+
+    @classmethod
+    def _ratios(cls, totals: list[float]) -> dict:
+        """SAMPLE_KEYS 순서 가중 합계 → metric별 비율 (분모 0이면 None)."""
+        t = dict(zip(cls.SAMPLE_KEYS, totals))
+        ratios = {}
+        for metric, labels in (("M-1", INTENSITY_VERDICTS), ("M-2", VERDICT_CATEGORIES)):
+            n = sum(t[(metric, k)] for k in labels)
+            for k in labels:
+                ratios[(metric, k)] = t[(metric, k)] / n if n else None
+        for b in cls.BUNDLES:
+            total = t[("M-3", b)]
+            ratios[("M-3", b)] = t[("M-3", b, "confirmed")] / total if total else None
+        return ratios
+
+    def _weighted_totals(self, weights: list[float], samples: Iterable[list[tuple]]) -> list[float]:
+        totals = [0.0] * len(self.SAMPLE_KEYS)
+        for w, rows in zip(weights, samples):
+            if rows:
+                for j, column in enumerate(zip(*rows)):
+                    totals[j] += w * sum(column)
+        return totals
+
+    def build(self) -> dict:
+        """JSON sidecar `sample` section."""
+        weights = [
+            stratum["population"] / len(rows) if rows else 0.0
+            for stratum, rows in zip(self.strata, self.contributions)
+        ]
+        point = self._ratios(self._weighted_totals(weights, self.contributions))
+
+        rng = random.Random(f"{self.seed}:bootstrap")
+        replicates: dict[tuple, list[float]] = defaultdict(list)
+        for _ in range(SAMPLE_BOOTSTRAP_REPLICATES):
+            resampled = [rng.choices(rows, k=len(rows)) if rows else rows for rows in self.contributions]
+            for k, ratio in self._ratios(self._weighted_totals(weights, resampled)).items():
+                if ratio is not None:
+                    replicates[k].append(ratio)
+
+        alpha = (1 - SAMPLE_CONFIDENCE) / 2
+
+        def interval(key: tuple, scale: float, digits: int) -> dict:
+            values = sorted(replicates.get(key, ()))
+            estimate = point[key]
+            ci = None
+            if values:
+                lo = values[round(alpha * (len(values) - 1))]
+                hi = values[round((1 - alpha) * (len(values) - 1))]
+                ci = [round(lo * scale, digits), round(hi * scale, digits)]
+            return {"estimate": None if estimate is None else round(estimate * scale, digits), "ci": ci}
+
+        return {
+            "seed": self.seed,
+            "method": "stratified_session_bootstrap",
+            "replicates": SAMPLE_BOOTSTRAP_REPLICATES,
+            "confidence": SAMPLE_CONFIDENCE,
+            "population": sum(s["population"] for s in self.strata),
+            "sampled": sum(s["sampled"] for s in self.strata),
+            "strata": [
+                {**stratum, "analyzed": len(rows)} for stratum, rows in zip(self.strata, self.contributions)
+            ],
+            "estimates": {
+                "M-1": {k: interval(("M-1", k), 100, 1) for k in INTENSITY_VERDICTS},
+                "M-2": {k: interval(("M-2", k), 100, 1) for k in VERDICT_CATEGORIES},
+                "M-3": {b: interval(("M-3", b), 1, 3) for b in self.BUNDLES},
+            },
+        }
+
+
+def sample_host_runs(
+    runs: list[HostRun], size: int | None = None, frac: float | None = None, seed: int = 0
+) -> SampleEstimator:
+    """run.files를 층화 표본으로 줄이고 표본 추정기를 반환 (run_hosts sinks로 넘긴다).
+
+    층은 (host, source). size (전체 표본 수) 또는 frac (모집단 비율)을 allocate_sample로 층에
+    배분하고, 층마다 정렬된 path 목록에서 `random.Random("<seed>:<host>:<source>")`로 비복원추출해
+    같은 목록 + seed면 같은 표본이 나온다. run.files는 원래 순서를 유지한 채 표본만 남긴다.
+    """
+    collect_host_runs(runs)
+    strata = []
+    for run in runs:
+        by_source: dict[str, list[str]] = {source: [] for source in SAMPLE_SOURCES}
+        for path in run.files:
+            by_source[session_source(run.host, path)].append(path)
+        for source in SAMPLE_SOURCES:
+            strata.append({"host": run.host, "source": source, "paths": sorted(by_source[source])})
+    populations = [len(s["paths"]) for s in strata]
+    target = size if size is not None else round((frac or 0.0) * sum(populations))
+    chosen: dict[str, set[str]] = defaultdict(set)
+    for stratum, population, n in zip(strata, populations, allocate_sample(populations, target)):
+        rng = random.Random(f"{seed}:{stratum['host']}:{stratum['source']}")
+        stratum["paths"] = rng.sample(stratum["paths"], n)
+        stratum["population"] = population
+        stratum["sampled"] = n
+        chosen[stratum["host"]].update(stratum["paths"])
+    for run in runs:
+        run.files = [p for p in run.files if p in chosen[run.host]]
+    strata = [s for s in strata if s["population"]]
+    return SampleEstimator(strata, seed)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 14. time buckets (--bucket)
+# ─────────────────────────────────────────────────────────────────────────────
+
+BUCKET_UNITS = ("day", "week", "month")
+BUCKET_UNKNOWN = "unknown"  # record timestamp도 mtime도 얻지 못한 세션
+
+
+def bucket_of(moment: datetime.datetime, unit: str) -> tuple[str, str]:
+    """UTC 시각 → (구간 label, 구간 시작 날짜). week는 ISO 주 (월요일 시작, `2026-W19`)."""
+    day = moment.astimezone(datetime.timezone.utc).date()
+    if unit == "day":
+        return day.isoformat(), day.isoformat()
+    if unit == "week":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}", (day - datetime.timedelta(days=day.weekday())).isoformat()
+    return f"{day:%Y-%m}", day.replace(day=1).isoformat()
+
+
+class TrendBuckets:
+    """--bucket 시계열 — 세션을 시작 시각 구간별 AggregateAccumulator에 접는다 (run_hosts sink).
+
+    세션 시각은 첫 jsonl record의 `timestamp` (first_timestamp), 없으면 파일 mtime (원격은 find로
+    모은 metadata)이다. 세션 단위 metric (M-1, M-4, M-5)과 분모를 구간 사이에서 나누지 않도록
+    verdict별 시각이 아닌 세션 시작 시각 1개로 배정한다. 구간마다 host별 FoldBuffer를 두므로 구간
+    aggregate의 dict key 순서도 전체 aggregate와 같은 규칙을 따른다.
+    """
+
+    def __init__(self, runs: list[HostRun], unit: str):
+        self.unit = unit
+        self.hosts = [run.host for run in runs]
+        self._runs = {run.host: run for run in runs}
+        self.buckets: dict[str, dict[str, FoldBuffer]] = {}
+        self.starts: dict[str, str] = {}
+        self.time_sources: Counter = Counter()
+
+    def session_time(self, host: str, result: dict) -> tuple[datetime.datetime | None, str]:
+        """(세션 시각, 출처 timestamp | mtime | unknown)."""
+        stamp = normalize_timestamp(result.get("first_timestamp"))
+        if stamp is not None:
+            return datetime.datetime.fromisoformat(stamp), "timestamp"
+        run = self._runs[host]
+        path = result["path"]
+        mtime_ns = run.metadata[path][1] if path in run.metadata else None
+        if mtime_ns is None and not run.is_remote:
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                pass
+        if mtime_ns is None:
+            return None, BUCKET_UNKNOWN
+        return datetime.datetime.fromtimestamp(mtime_ns / 1e9, datetime.timezone.utc), "mtime"
+
+    def add(self, host: str, key: Any, result: dict) -> None:
+        moment, source = self.session_time(host, result)
+        self.time_sources[source] += 1
+        if moment is None:
+            label = start = BUCKET_UNKNOWN
+        else:
+            label, start = bucket_of(moment, self.unit)
+        self.starts[label] = start
+        folds = self.buckets.setdefault(label, {})
+        if host not in folds:
+            # 구간에는 local files index도 띄엄띄엄 들어오므로 key 정렬은 build에서
+            folds[host] = FoldBuffer(sort_at_finish=True)
+        folds[host].add(key, result)
+
+    def build(self, hosts: list[str], corpus_label: str) -> dict:
+        """JSON sidecar `trend` section — 구간 시작 순 (unknown은 마지막)."""
+        series = []
+        for label in sorted(self.buckets, key=lambda b: (b == BUCKET_UNKNOWN, self.starts[b])):
+            acc = AggregateAccumulator()
+            for host in self.hosts:
+                folded = self.buckets[label].get(host)
+                if folded is not None:
+                    acc.merge(folded.finish())
+            agg = acc.build(hosts, corpus_label, [])
+            series.append({
+                "bucket": label,
+                "start": None if label == BUCKET_UNKNOWN else self.starts[label],
+                "session_counts": agg["session_counts"],
+                "metrics": agg["metrics"],
+                "derived": agg["derived"],
+            })
+        return {
+            "unit": self.unit,
+            "timezone": "UTC",
+            "time_source": {k: self.time_sources[k] for k in ("timestamp", "mtime", BUCKET_UNKNOWN)},
+            "series": series,
+        }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 15. regression gate (gate)
+# ─────────────────────────────────────────────────────────────────────────────
+
+GATE_STORE_VERSION = 1
+GATE_DEFAULT_TOLERANCE = 5.0  # PR #670 ±5% 게이트 — 비율은 %p, 건수는 상대 %
+GATE_METRIC_GROUPS = ("counts", "M-1", "M-2", "M-3", "M-4", "M-5", "derived")
+# manifest `captured_metric_summary` key → gate 항목 (baseline JSON이 없을 때의 비교 대상)
+GATE_SUMMARY_KEYS = {
+    "intensity_full_pct": ("M-1", "FULL"),
+    "arbiter_confirmed_pct": ("M-2", "CONFIRMED_ISSUE"),
+}
+
+
+def gate_paths(manifest_path: str, snapshot_id: str) -> tuple[str, str]:
+    """manifest 옆 (baseline aggregate JSON, 파일별 digest/결과 store) 기본 경로."""
+    base = os.path.join(os.path.dirname(os.path.abspath(manifest_path)), snapshot_id)
+    return base + ".baseline.json", base + ".gate.json"
+
+
+def load_gate_store(path: str, snapshot_id: str) -> dict[tuple[str, str], dict]:
+    """(host, path) → {"sha256", "result_digest", "result"}. 다른 snapshot / algorithm version /
+    형식의 store는 재사용할 수 없으므로 빈 store로 본다."""
+    try:
+        with open(path, "r") as fp:
+            data = json.load(fp)
+    except (OSError, ValueError):
+        return {}
+    if (
+        not isinstance(data, dict)
+        or data.get("store_version") != GATE_STORE_VERSION
+        or data.get("snapshot_id") != snapshot_id
+        or data.get("algorithm_version") != algorithm_version()
+    ):
+        return {}
+    return {(e["host"], e["path"]): e for e in data.get("files", []) if isinstance(e, dict)}
+
+
+def save_gate_store(path: str, snapshot_id: str, entries: dict[tuple[str, str], dict]) -> None:
+    """store를 `<path>.tmp`에 쓴 뒤 rename — 중단돼도 이전 store가 남는다."""
+    data = {
+        "store_version": GATE_STORE_VERSION,
+        "snapshot_id": snapshot_id,
+        "algorithm_version": algorithm_version(),
+        "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "files": [{"host": host, "path": p, **entry} for (host, p), entry in entries.items()],
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "w") as fp:
+        json.dump(data, fp, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def gate_file_digests(run: HostRun, cache: SessionCache | None, warnings: list[str]) -> dict[str, tuple[int, str]]:
+    """pinned 파일의 path → (size, content sha256). (size, mtime)이 같은 digest는 SessionCache에서
+    재사용하고, 나머지만 로컬 직접 / 원격 `ssh sha256sum` batch로 계산한다 (content 전송 없음).
+
+    원격 stat 결과는 run.metadata에 남겨 재분석 때 session cache와 mirror가 쓰게 한다. snapshot
+    manifest (run.blobs)는 기록된 digest를 그대로 쓴다.
+    """
+    if run.blobs is not None:
+        for path in run.files:
+            if path not in run.blobs:
+                warnings.append(f"host {run.host}: gate digest 없음 (snapshot blob 항목 없음) — {path}")
+        return {p: (e["size"], e["sha256"]) for p, e in run.blobs.items()}
+    if run.is_remote:
+        stats = stat_remote_files(run.host, run.files, warnings)
+        run.metadata = stats
+    else:
+        stats = {}
+        for path in run.files:
+            st = _stat_or_none(path)
+            if st is not None:
+                stats[path] = (st.st_size, st.st_mtime_ns)
+    digests: dict[str, tuple[int, str]] = {}
+    todo = []
+    for path, (size, mtime_ns) in stats.items():
+        cached = None if cache is None else cache.get_digest(run.host, path, size, mtime_ns)
+        if cached is None:
+            todo.append(path)
+        else:
+            digests[path] = (size, cached)
+    if run.is_remote:
+        computed = remote_session_digests(run.host, todo, warnings) if todo else {}
+    else:
+        computed = {path: d for path in todo if (d := local_session_digest(path)) is not None}
+    for path, digest in computed.items():
+        size, mtime_ns = stats[path]
+        digests[path] = (size, digest)
+        if cache is not None:
+            cache.put_digest(run.host, path, size, mtime_ns, digest)
+    for path in run.files:
+        if path not in digests:
+            warnings.append(f"host {run.host}: gate digest 없음 — {path}")
+    return digests
+
+
+class _ResultCollector:
+    """run_hosts sink — (host, path) → 세션 결과 (gate 재분석분)."""
+
+    def __init__(self):
+        self.results: dict[tuple[str, str], dict] = {}
+
+    def add(self, host: str, key: Any, result: dict) -> None:
+        self.results[(host, result["path"])] = result
+
+
+def gate_values(agg: dict) -> dict[tuple[str, str], tuple[float, str]]:
+    """aggregate → gate 항목 (metric group, 항목) → (값, 단위). 단위 `pp`는 %p 차이, `%`는 상대 변화로
+    허용치와 비교한다. 분포는 비율로 바꿔 corpus 크기와 무관하게 비교한다."""
+    values: dict[tuple[str, str], tuple[float, str]] = {}
+    for k, v in agg["session_counts"].items():
+        values[("counts", k)] = (v, "%")
+    m = agg["metrics"]
+    for metric, labels in (("M-1", INTENSITY_VERDICTS), ("M-2", VERDICT_CATEGORIES)):
+        values[(metric, "n")] = (m[metric]["n"], "%")
+        for k in dict.fromkeys([*labels, *m[metric]["percentages"]]):
+            values[(metric, k)] = (m[metric]["percentages"].get(k, 0.0), "pp")
+    for bundle, row in m["M-3"]["by_bundle"].items():
+        values[("M-3", f"{bundle}.total")] = (row["total"], "%")
+        values[("M-3", f"{bundle}.confirmed_rate")] = (round(100 * row["confirmed_rate"], 1), "pp")
+    transitions = m["M-4"]["transition_matrix"]
+    m4_n = sum(transitions.values())
+    values[("M-4", "n")] = (m4_n, "%")
+    for pair, c in transitions.items():
+        values[("M-4", pair)] = (round(100 * c / m4_n, 1), "pp")
+    m5_n = m["M-5"]["n"]
+    values[("M-5", "n")] = (m5_n, "%")
+    for status, c in m["M-5"]["distribution"].items():
+        values[("M-5", status)] = (round(100 * c / m5_n, 1) if m5_n else 0.0, "pp")
+    for k, v in agg["derived"].items():
+        values[("derived", k)] = (round(100 * v, 1), "pp")
+    return values
+
+
+def compare_gate(
+    baseline: dict[tuple[str, str], tuple[float, str]],
+    current: dict[tuple[str, str], tuple[float, str]],
+    tolerances: dict[str, float],
+    keys: Iterable[tuple[str, str]] | None = None,
+) -> list[dict]:
+    """항목별 차이와 통과 여부. keys가 없으면 양쪽 항목 합집합 (한쪽에만 있는 항목은 0으로 본다)."""
+    if keys is None:
+        keys = dict.fromkeys([*baseline, *current])
+    checks = []
+    for key in keys:
+        group, item = key
+        base, unit = baseline.get(key, (0, current.get(key, (0, "pp"))[1]))
+        value = current.get(key, (0, unit))[0]
+        tolerance = tolerances.get(group, tolerances["default"])
+        if unit == "pp":
+            delta: float | None = round(value - base, 2)
+        elif base:
+            delta = round(100 * (value - base) / base, 2)
+        else:
+            delta = 0.0 if value == 0 else None  # 0 → 양수는 상대 변화 무한대
+        checks.append({
+            "metric": group,
+            "item": item,
+            "baseline": base,
+            "current": value,
+            "delta": delta,
+            "unit": unit,
+            "tolerance": tolerance,
+            "ok": delta is not None and abs(delta) <= tolerance,
+        })
+    return checks
+
+
+def _render_gate(gate: dict) -> str:
+    """gate 결과 markdown — 요약 표 + 항목 표 (허용치 초과 항목이 먼저)."""
+    out = [f"# DA 회귀 게이트 — {gate['snapshot_id']}", ""]
+    out.append("| 항목 | 값 |")
+    out.append("|------|-----|")
+    out.append(f"| baseline | {gate['baseline']} |")
+    out.append(f"| pinned 파일 | {gate['files']} |")
+    out.append(f"| 재사용 / 재분석 | {gate['reused']} / {gate['reanalyzed']} (결과 변경 {gate['results_changed']}) |")
+    if "dedup" in gate:
+        out.append(f"| 중복 제외 세션 (content hash) | {gate['dedup']} |")
+    failed = sum(1 for c in gate["checks"] if not c["ok"])
+    verdict = "PASS" if gate["status"] == "pass" else "FAIL"
+    out.append(f"| 판정 | {verdict} ({failed}/{len(gate['checks'])} 항목 허용치 초과) |")
+    out.append("")
+    out.append("| metric | 항목 | baseline | 현재 | 차이 | 허용 | 결과 |")
+    out.append("|--------|------|----------|------|------|------|------|")
+    for c in sorted(gate["checks"], key=lambda c: c["ok"]):
+        delta = "∞" if c["delta"] is None else f"{c['delta']:+g}"
+        unit = "%p" if c["unit"] == "pp" else "%"
+        mark = "ok" if c["ok"] else "FAIL"
+        out.append(
+            f"| {c['metric']} | {c['item']} | {c['baseline']:g} | {c['current']:g} | {delta}{unit}"
+            f" | ±{c['tolerance']:g}{unit} | {mark} |"
+        )
+    return "\n".join(out)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 16. snapshot blob store (snapshot)
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+class BlobStore:
+    """pinned 세션 content의 content-addressed gzip 사본 디렉터리 (`<root>/<sha[:2]>/<sha>.jsonl.gz`).
+
+    blob 이름이 원본 content sha256이라 snapshot·host·path가 달라도 같은 content는 1번만 저장된다.
+    기록은 같은 디렉터리의 임시 파일에 압축하며 sha256을 계산한 뒤 rename한다 — 중단돼도 완결되지
+    않은 blob이 이름을 갖지 않는다. gzip header mtime은 0으로 고정해 같은 content면 blob byte도 같다.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.stored = 0  # 이번 실행이 새로 기록한 blob
+        self.raw_bytes = 0
+        self.blob_bytes = 0
+        self._lock = threading.Lock()
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest + ".jsonl.gz")
+
+    def has(self, digest: str) -> bool:
+        return os.path.isfile(self.path(digest))
+
+    def put(self, fp, accept=None) -> tuple[str, int] | None:
+        """binary stream fp를 끝까지 읽어 blob으로 기록하고 (content sha256, 원본 크기)를 반환한다.
+
+        accept (끝난 stream 확인, 예: RemoteFileStream.finish)가 False거나 읽기가 실패하면 임시
+        파일을 지우고 None. 같은 digest의 blob이 이미 있으면 새로 쓰지 않는다.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(
+                filename="", mode="wb", fileobj=raw, compresslevel=BLOB_COMPRESS_LEVEL, mtime=0
+            ) as out:
+                for chunk in iter(functools.partial(fp.read, MIRROR_COPY_CHUNK_BYTES), b""):
+                    digest.update(chunk)
+                    size += len(chunk)
+                    out.write(chunk)
+            if accept is not None and not accept():
+                os.unlink(tmp)
+                return None
+            hexdigest = digest.hexdigest()
+            final = self.path(hexdigest)
+            with self._lock:
+                if os.path.isfile(final):
+                    os.unlink(tmp)
+                    return hexdigest, size
+                os.makedirs(os.path.dirname(final), exist_ok=True)
+                blob_size = os.path.getsize(tmp)
+                os.replace(tmp, final)
+                self.stored += 1
+                self.raw_bytes += size
+                self.blob_bytes += blob_size
+            return hexdigest, size
+        except (OSError, EOFError, tarfile.TarError):
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+            return None
+
+
+def open_blob_store(manifest: dict, manifest_path: str, root: str | None) -> BlobStore:
+    """--blob-store > manifest `blob_store` (상대 경로는 manifest 기준) > BLOB_STORE_DEFAULT_PATH."""
+    if root:
+        return BlobStore(root)
+    recorded = manifest.get("blob_store")
+    if recorded:
+        return BlobStore(os.path.join(os.path.dirname(os.path.abspath(manifest_path)), recorded))
+    return BlobStore(BLOB_STORE_DEFAULT_PATH)
+
+
+def attach_snapshot_blobs(runs: list[HostRun], manifest: dict, store: BlobStore) -> int:
+    """manifest `blobs`가 있으면 각 HostRun이 host 대신 blob store를 읽게 한다 (ssh 없음).
+
+    manifest에 기록된 (size, mtime_ns)는 run.metadata가 되어 session cache key와 --bucket mtime
+    fallback에 쓰인다 — snapshot 시점 그대로의 파일 상태라 live 실행과 cache 항목을 공유한다.
+    반환: blob 항목이 있는 pinned 파일 수.
+    """
+    blobs = manifest.get("blobs")
+    if not isinstance(blobs, dict):
+        return 0
+    pinned = 0
+    for run in runs:
+        run.blobs = {p: blobs[p] for p in run.files if isinstance(blobs.get(p), dict)}
+        run.blob_store = store
+        run.metadata = {
+            p: (e["size"], e["mtime_ns"]) for p, e in run.blobs.items() if e.get("mtime_ns") is not None
+        }
+        pinned += len(run.blobs)
+    return pinned
+
+
+def _blob_triage(fp, digest_check, time_bounds: RecordTimeBounds) -> bool:
+    """blob stream에 TRIAGE_MARKERS가 있는지 — chunk 경계에 걸친 marker는 겹침 구간으로 찾는다.
+    marker가 없으면 끝까지 읽으므로 digest_check와 time_bounds에 content 전체가 들어간다."""
+    overlap = max(len(marker) for marker in TRIAGE_MARKERS) - 1
+    tail = b""
+    for chunk in iter(functools.partial(fp.read, MIRROR_COPY_CHUNK_BYTES), b""):
+        digest_check.update(chunk)
+        time_bounds.feed(chunk)
+        window = tail + chunk
+        if any(window.find(marker) >= 0 for marker in TRIAGE_MARKERS):
+            return True
+        tail = window[-overlap:]
+    return False
+
+
+def analyze_blob_session(
+    root: str, path: str, digest: str, profile: bool | None = None, triage: bool = False
+) -> tuple[dict | None, list[str], bool]:
+    """blob을 풀며 analyze_session에 흘려보내고 content sha256을 대조한다 (결과, warnings, 전체 파싱 여부).
+
+    triage=True면 먼저 압축을 풀며 marker를 찾고, 없으면 파싱 없이 triaged_session을 반환한다
+    (triage_session_file의 blob 판 — 전체 파싱 여부 False, cache에 넣지 않는다). blob이 없거나,
+    깨졌거나, content가 manifest digest와 다르면 결과 없음 + warning이다.
+    """
+    store = BlobStore(root)
+    if triage:
+        digest_check = hashlib.sha256()
+        time_bounds = RecordTimeBounds()
+        try:
+            with gzip.open(store.path(digest), "rb") as fp:
+                candidate = _blob_triage(fp, digest_check, time_bounds)
+        except (OSError, EOFError, zlib.error):
+            candidate = True  # 오류 보고는 아래 전체 파싱 경로가 한다
+        if not candidate:
+            if digest_check.hexdigest() != digest:
+                return None, [f"snapshot blob content digest 불일치 ({digest[:12]}) — {path}"], False
+            return triaged_session(path, time_bounds.finish()), [], False
+    digest_check = hashlib.sha256()
+
+    def _lines(fp):
+        for raw in fp:
+            digest_check.update(raw)
+            yield raw
+
+    try:
+        with gzip.open(store.path(digest), "rb") as fp:
+            result = analyze_session(_lines(fp), path, profile)
+            # parser가 중간에 멈춘 경우에도 digest 대조는 content 전체로 한다
+            for chunk in iter(functools.partial(fp.read, MIRROR_COPY_CHUNK_BYTES), b""):
+                digest_check.update(chunk)
+    except FileNotFoundError:
+        return None, [f"snapshot blob 없음 ({digest[:12]}) — {path}: snapshot 재실행 필요"], True
+    except (OSError, EOFError, zlib.error) as e:
+        return None, [f"snapshot blob 읽기 실패 ({digest[:12]}) — {path}: {type(e).__name__}: {e}"], True
+    if digest_check.hexdigest() != digest:
+        return None, [f"snapshot blob content digest 불일치 ({digest[:12]}) — {path}"], True
+    return result, [], True
+
+
+def _analyze_blob_encoded(
+    root: str, path: str, digest: str, profile: bool = False, triage: bool = False
+) -> tuple[str | None, list[str], bool]:
+    """process pool worker — _analyze_session_encoded의 blob 판."""
+    result, file_warnings, parsed = analyze_blob_session(root, path, digest, profile, triage)
+    return (None if result is None else encode_session(result)), file_warnings, parsed
+
+
+def iter_blob_analyses(
+    root: str, pending: list[tuple[Any, str, str]], jobs: int = 1, triage: bool = False
+) -> Iterable[tuple[Any, str, dict | None, list[str], str | None, bool]]:
+    """(key, path, digest) list를 분석해 입력 순서대로 (key, path, 결과, warnings, encoded, 전체 파싱 여부)
+    yield.
+
+    jobs > 1이면 iter_local_analyses와 같이 process pool에 chunk 단위로 분배한다.
+    """
+    if jobs <= 1 or len(pending) < 2:
+        for key, path, digest in pending:
+            result, file_warnings, parsed = analyze_blob_session(root, path, digest, triage=triage)
+            yield key, path, result, file_warnings, None, parsed
+        return
+    workers = min(jobs, len(pending))
+    chunksize = max(1, len(pending) // (workers * LOCAL_JOBS_CHUNKS_PER_WORKER))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        encoded_results = executor.map(
+            functools.partial(_analyze_blob_encoded, root, profile=_run_profile is not None, triage=triage),
+            [path for _, path, _ in pending],
+            [digest for _, _, digest in pending],
+            chunksize=chunksize,
+        )
+        for (key, path, _), (encoded, file_warnings, parsed) in zip(pending, encoded_results):
+            result = None if encoded is None else decode_session(encoded)
+            yield key, path, result, file_warnings, encoded, parsed
+
+
+def snapshot_local_files(
+    host: str, files: list[str], store: BlobStore, warnings: list[str]
+) -> dict[str, dict]:
+    """로컬 pinned 파일 → blob. sha256을 먼저 구해 store에 있는 content는 다시 압축하지 않는다."""
+    entries: dict[str, dict] = {}
+    for path in files:
+        st = _stat_or_none(path)
+        digest = local_session_digest(path) if st is not None else None
+        if digest is None:
+            warnings.append(f"host {host}: snapshot 읽기 실패 — {path}")
+            continue
+        stored = (digest, st.st_size)
+        if not store.has(digest):
+            try:
+                with open(path, "rb") as fp:
+                    stored = store.put(fp)
+            except OSError:
+                stored = None
+            if stored is None:
+                warnings.append(f"host {host}: snapshot blob 기록 실패 — {path}")
+                continue
+        entries[path] = {"sha256": stored[0], "size": stored[1], "mtime_ns": st.st_mtime_ns}
+        if stored[0] != digest or stored[1] != st.st_size:
+            entries[path]["mtime_ns"] = None  # 읽는 사이 바뀜 — 기록한 content 기준, cache key 없음
+            warnings.append(f"host {host}: snapshot 중 content 변경 — {path} (기록한 content로 고정)")
+    return entries
+
+
+def snapshot_remote_files(
+    host: str, files: list[str], store: BlobStore, warnings: list[str]
+) -> dict[str, dict]:
+    """원격 pinned 파일 → blob. stat + `ssh sha256sum` batch로 store에 이미 있는 content를 거르고
+    나머지만 `ssh tar` batch (미수신분은 파일당 `ssh cat`, transient 실패 재시도)로 받아 기록한다."""
+    stats = stat_remote_files(host, files, warnings)
+    digests = remote_session_digests(host, files, warnings)
+    entries: dict[str, dict] = {}
+    todo = []
+    for path in files:
+        digest = digests.get(path)
+        if digest is not None and path in stats and store.has(digest):
+            entries[path] = {"sha256": digest, "size": stats[path][0], "mtime_ns": stats[path][1]}
+        else:
+            todo.append(path)
+
+    def record(path: str, stored: tuple[str, int]) -> None:
+        meta = stats.get(path)
+        entries[path] = {"sha256": stored[0], "size": stored[1], "mtime_ns": None if meta is None else meta[1]}
+        if meta is None or stored[1] != meta[0] or digests.get(path, stored[0]) != stored[0]:
+            entries[path]["mtime_ns"] = None
+            warnings.append(f"host {host}: snapshot 중 content 변경 — {path} (받은 content로 고정)")
+
+    if not todo:
+        return entries
+    if not check_controlmaster_active(host, warnings):
+        warnings.append(f"host {host}: ControlMaster 비활성으로 snapshot fetch skip ({len(todo)}개 파일)")
+        return entries
+    tar_files = [p for p in todo if _allowed_remote_path(host, p)]
+    missing = [p for p in todo if not _allowed_remote_path(host, p)]
+    for start in range(0, len(tar_files), TAR_FETCH_BATCH_FILES):
+        batch = tar_files[start:start + TAR_FETCH_BATCH_FILES]
+        for path, stream, size in iter_remote_tar_members(host, batch, warnings):
+            stored = store.put(stream)
+            if stored is not None and stored[1] == size:
+                record(path, stored)
+        missing.extend(p for p in batch if p not in entries)
+
+    def _fetch_one(path: str) -> tuple[str, tuple[str, int] | None, list[str]]:
+        file_warnings: list[str] = []
+
+        def attempt(attempt_warnings: list[str]):
+            try:
+                stream = fetch_remote_file(host, path, attempt_warnings)
+            except ValueError as e:
+                attempt_warnings.append(f"host {host}: {e}")
+                return None, None
+            if stream is None:
+                return None, None
+            return store.put(stream, accept=lambda: stream.finish(attempt_warnings)), stream
+
+        return path, fetch_with_retries(host, file_warnings, attempt), file_warnings
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=SSH_FETCH_WORKERS_MAX) as executor:
+        fetched = sorted(executor.map(_fetch_one, missing), key=lambda triple: triple[0])
+    for path, stored, file_warnings in fetched:
+        warnings.extend(file_warnings)
+        if stored is not None:
+            record(path, stored)
+    return entries
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Host handling
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _validate_host(alias: str) -> None:
+    if alias not in VALID_HOSTS:
+        raise ValueError(f"invalid host: {alias!r}. valid: {sorted(VALID_HOSTS)}")
+
+
+def classify_corpus_files(files: list[str], hosts: list[str], warnings: list[str]) -> dict[str, list[str]]:
+    """--corpus manifest `files` → host별 path 목록 (manifest 순서 유지).
+
+    host 분류는 HOST_PATH_MAP base prefix 순회 — 호스트 추가 시 한 곳만 수정.
+    미매칭 path는 silent host 배정 대신 warning만 누적한다 (예전 단순 /Users/-mac
+    /home/-minipc fallback은 HOST_PATH_MAP 경계를 우회하는 별도 규칙이라 제거 —
+    새 host 지원은 HOST_PATH_MAP에 명시 추가가 정답).
+    live mode와 동일하게 (a) /subagents/ 하위는 wrapper output이라 제외하고
+    (b) --hosts whitelist 밖 host로 분류된 path는 분석에서 제외한다.
+    """
+    files_by_host: dict[str, list[str]] = defaultdict(list)
+    for f in files:
+        if "/subagents/" in f:
+            continue
+        matched_host = None
+        for host_alias, host_paths in HOST_PATH_MAP.items():
+            for base in (host_paths.get("claude", ""), host_paths.get("codex", "")):
+                if base and f.startswith(base + os.sep):
+                    matched_host = host_alias
+                    break
+            if matched_host is not None:
+                break
+        if matched_host is None:
+            warnings.append(f"corpus host unclassified (HOST_PATH_MAP 미일치): {f}")
+        elif matched_host in hosts:
+            files_by_host[matched_host].append(f)
+    return files_by_host
+
+
+def collect_local_files(host: str) -> list[str]:
+    """현재 머신의 jsonl 파일 glob."""
+    _validate_host(host)
+    paths = HOST_PATH_MAP[host]
+    files = []
+    for base, pattern in [
+        (paths["claude"], "**/*.jsonl"),
+        (paths["codex"], "**/rollout-*.jsonl"),
+    ]:
+        glob_path = os.path.join(base, pattern)
+        for f in glob.glob(glob_path, recursive=True):
+            if "/subagents/" not in f:
+                files.append(f)
+    return files
+
+
+def _allowed_remote_path(host: str, path: str) -> bool:
+    """원격 path가 정확한 base prefix 아래의 안전한 .jsonl 경로인지 확인.
+
+    SSH remote command는 원격 shell이 해석하므로 shell metacharacter (`;`, `$()`,
+    newline, backtick, space 등)가 포함된 경로는 명령 인젝션/word-splitting 위험이
+    있다. 따라서 다음 검사를 통과시킨다:
+
+    1. 제어문자/shell metacharacter/공백 부재.
+    2. `.jsonl` 확장자.
+    3. `posixpath.normpath`로 traversal(`../`) 정규화.
+    4. `posixpath.isabs`로 relative path 폐기 (find stdout 비신뢰).
+    5. `posixpath.commonpath([base_norm, path_norm]) == base_norm` boundary 비교 —
+       sibling-prefix(`/Users/green/.claude/projects-evil/...`)는 commonpath가
+       base_norm와 다르므로 거부. absolute/relative mix는 ValueError → 폐기.
+    6. `path_norm != base_norm`로 base 자체 통과를 차단 (`.jsonl` 확장자 검사가
+       이미 거부하지만 방어적 명시).
+    """
+    if not isinstance(path, str) or not path:
+        return False
+    # 제어문자 / shell metacharacter / space 거부
+    if any(c in path for c in " \n\r\t;|&$`(){}[]<>*?\"'\\"):
+        return False
+    if not path.endswith(".jsonl"):
+        return False
+    try:
+        path_norm = posixpath.normpath(path)
+    except Exception:
+        return False
+    if not posixpath.isabs(path_norm):
+        return False
+    paths = HOST_PATH_MAP.get(host, {})
+    bases = (paths.get("claude", ""), paths.get("codex", ""))
+    for base in bases:
+        if not base:
+            continue
+        base_norm = posixpath.normpath(base)
+        try:
+            if posixpath.commonpath([base_norm, path_norm]) == base_norm and path_norm != base_norm:
+                return True
+        except ValueError:
+            # absolute/relative mix 등 — 폐기
+            continue
+    return False
+
+
+def _validate_remote_path(host: str, path: str) -> None:
+    if not _allowed_remote_path(host, path):
+        raise ValueError(f"disallowed remote path for host {host}: {path!r}")
+
+
+def collect_remote_files(
+    host: str, warnings: list[str], metadata: dict[str, tuple[int, int]] | None = None
+) -> list[str]:
+    """원격 호스트에서 jsonl 파일 path glob (subprocess.run 고정 argv).
+
+    SSH 명령 인자에는 host-neutral relative tilde 표현 (`~/.claude/projects`,
+    `~/.codex/sessions`)을 사용해 host별 absolute home prefix hardcoded를 피한다.
+    원격 shell이 `~`를 해당 user의 home directory로 expansion한다.
+
+    원격 find stdout의 path 라인은 비신뢰 입력으로 간주하여, `_allowed_remote_path`가
+    통과한 line만 수집한다 — 제어문자/shell metacharacter/relative path/sibling-prefix
+    포함 line은 silently 폐기한다. 검증은 absolute `HOST_PATH_MAP` prefix와의
+    boundary 비교로 수행한다.
+
+    metadata dict가 주어지면 같은 find 1회로 path → (size, mtime_ns)를 채운다 (GNU find
+    `-printf`, 미지원이면 BSD `stat -f`로 재시도). 원격 cache 조회와 mirror 동기화의 기준값이다.
+    """
+    _validate_host(host)
+    all_files: list[str] = []
+    for base in ("~/.claude/projects", "~/.codex/sessions"):
+        # SSH는 argv를 single string으로 합쳐 원격 shell에 전달하므로
+        # `*.jsonl`과 format 문자열을 single-quote로 감싸 원격 glob/word splitting을 차단한다.
+        find_argv = ["ssh", host, "find", base, "-type", "f", "-name", "'*.jsonl'"]
+        if metadata is None:
+            variants = [find_argv]
+        else:
+            variants = [
+                find_argv + ["-printf", "'%s %T@ %p\\n'"],
+                find_argv + ["-exec", "stat", "-f", "'%z %m %N'", "'{}'", "+"],
+            ]
+        try:
+            for argv in variants:
+                started = time.perf_counter()
+                proc = subprocess.run(
+                    argv,
+                    capture_output=True,
+                    text=True,
+                    timeout=SSH_FIND_TIMEOUT_SECONDS,
+                )
+                profile_fetch(host, "find", started, len(proc.stdout))
+                # `-printf` 미지원 (BSD find)은 출력 없이 실패 — 다음 variant로 재시도
+                if proc.returncode == 0 or proc.stdout:
+                    break
+            if proc.returncode != 0:
+                warnings.append(
+                    f"host {host}: ssh find failed (rc={proc.returncode}) for {base}"
+                )
+                continue
+            for line in proc.stdout.splitlines():
+                entry = None
+                if metadata is not None:
+                    entry = _parse_find_stat_line(line)
+                    if entry is None:
+                        continue
+                    line = entry[0]
+                if "/subagents/" in line:
+                    continue
+                if not _allowed_remote_path(host, line):
+                    continue
+                all_files.append(line)
+                if entry is not None:
+                    metadata[line] = entry[1:]
+        except subprocess.TimeoutExpired:
+            warnings.append(f"host {host}: ssh find timeout for {base} — partial result")
+        except FileNotFoundError:
+            warnings.append(f"host {host}: ssh binary not found — partial result")
+    return all_files
+
+
+def _parse_find_stat_line(line: str) -> tuple[str, int, int] | None:
+    """`<size> <epoch[.frac]> <path>` → (path, size, mtime_ns). 형식 불일치는 None (폐기).
+
+    mtime은 float을 거치지 않고 정수 ns로 변환해 로컬 os.stat().st_mtime_ns와 같은 값을 만든다.
+    """
+    parts = line.split(" ", 2)
+    if len(parts) != 3 or not parts[0].isdigit():
+        return None
+    sec, _, frac = parts[1].partition(".")
+    if not sec.isdigit() or (frac and not frac.isdigit()):
+        return None
+    mtime_ns = int(sec) * 1_000_000_000 + int((frac + "000000000")[:9])
+    return parts[2], int(parts[0]), mtime_ns
+
+
+SHA256_LINE = re.compile(r"([0-9a-f]{64}) [ *](.+)")
+
+
+def stat_remote_files(host: str, paths: list[str], warnings: list[str]) -> dict[str, tuple[int, int]]:
+    """원격 파일 목록의 path → (size, mtime_ns). find 없이 목록이 주어진 경우 (--corpus)의 dedup용.
+
+    collect_remote_files와 같은 `-printf` / BSD `stat -f` variant를 path 인자로 실행한다. path는
+    `_allowed_remote_path` 통과분만 보내고, 응답도 요청한 path만 수용한다.
+    """
+    _validate_host(host)
+    stats: dict[str, tuple[int, int]] = {}
+    paths = [p for p in paths if _allowed_remote_path(host, p)]
+    for start in range(0, len(paths), TAR_FETCH_BATCH_FILES):
+        batch = paths[start:start + TAR_FETCH_BATCH_FILES]
+        requested = set(batch)
+        variants = [
+            ["ssh", host, "find", *batch, "-maxdepth", "0", "-printf", "'%s %T@ %p\\n'"],
+            ["ssh", host, "stat", "-f", "'%z %m %N'", *batch],
+        ]
+        try:
+            for argv in variants:
+                started = time.perf_counter()
+                proc = subprocess.run(argv, capture_output=True, text=True, timeout=SSH_FIND_TIMEOUT_SECONDS)
+                profile_fetch(host, "find", started, len(proc.stdout))
+                if proc.returncode == 0 or proc.stdout:
+                    break
+        except subprocess.TimeoutExpired:
+            warnings.append(f"host {host}: ssh stat timeout — dedup 대상에서 {len(batch)}개 파일 제외")
+            continue
+        except FileNotFoundError:
+            warnings.append(f"host {host}: ssh binary not found — dedup 생략")
+            break
+        for line in proc.stdout.splitlines():
+            stat = _parse_find_stat_line(line)
+            if stat is not None and stat[0] in requested:
+                stats[stat[0]] = stat[1:]
+    return stats
+
+
+def local_session_digest(path: str) -> str | None:
+    """로컬 파일 content sha256 (hex). 읽기 실패는 None."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as fp:
+            for chunk in iter(functools.partial(fp.read, MIRROR_COPY_CHUNK_BYTES), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def remote_session_digests(host: str, paths: list[str], warnings: list[str]) -> dict[str, str]:
+    """원격 파일 content sha256 — batch당 `ssh host sha256sum` 1회 (없으면 `shasum -a 256`).
+
+    content는 전송하지 않는다. 응답 line은 비신뢰 입력으로 보고 요청한 path의 64자리 hex만 수용한다.
+    """
+    _validate_host(host)
+    digests: dict[str, str] = {}
+    paths = [p for p in paths if _allowed_remote_path(host, p)]
+    for start in range(0, len(paths), TAR_FETCH_BATCH_FILES):
+        batch = paths[start:start + TAR_FETCH_BATCH_FILES]
+        requested = set(batch)
+        try:
+            for argv in (["ssh", host, "sha256sum", "--", *batch], ["ssh", host, "shasum", "-a", "256", *batch]):
+                started = time.perf_counter()
+                proc = subprocess.run(argv, capture_output=True, text=True, timeout=SSH_DIGEST_TIMEOUT_SECONDS)
+                profile_fetch(host, "sha256sum", started, len(proc.stdout))
+                # sha256sum 부재 (macOS 일부 버전)는 출력 없이 실패 — shasum으로 재시도
+                if proc.returncode == 0 or proc.stdout:
+                    break
+        except subprocess.TimeoutExpired:
+            warnings.append(f"host {host}: ssh sha256sum timeout — dedup 대상에서 {len(batch)}개 파일 제외")
+            continue
+        except FileNotFoundError:
+            warnings.append(f"host {host}: ssh binary not found — dedup 생략")
+            break
+        for line in proc.stdout.splitlines():
+            m = SHA256_LINE.fullmatch(line)
+            if m and m.group(2) in requested:
+                digests[m.group(2)] = m.group(1)
+        missing = len(requested) - sum(1 for p in batch if p in digests)
+        if missing:
+            warnings.append(
+                f"host {host}: ssh sha256sum rc={proc.returncode}, {missing}개 파일 digest 없음 — 중복 판정 없이 분석"
+            )
+    return digests
+
+
+def select_duplicates(
+    digests: dict[tuple[str, str], str], rank: dict[str, int], remote_hosts: set[str]
+) -> dict[str, set[str]]:
+    """(host, path) → digest에서 content가 같은 group마다 1개만 남기고 뺄 host → path 집합.
+
+    남기는 사본은 로컬 → host 순서 (rank) → path 순서로 첫 번째다 (원격 사본 fetch를 건너뛰도록).
+    """
+    groups: dict[str, list[tuple[str, str]]] = defaultdict(list)
+    for entry, digest in digests.items():
+        groups[digest].append(entry)
+    drop: dict[str, set[str]] = defaultdict(set)
+    for group in groups.values():
+        group.sort(key=lambda entry: (entry[0] in remote_hosts, rank[entry[0]], entry[1]))
+        for host, path in group[1:]:
+            drop[host].add(path)
+    return drop
+
+
+def find_duplicate_sessions(
+    listings: list[tuple[str, bool, dict[str, tuple[int, int]]]],
+    cache: SessionCache | None,
+    warnings: dict[str, list[str]],
+    known: dict[tuple[str, str], str] | None = None,
+) -> tuple[dict[str, set[str]], dict]:
+    """host 간/host 내 content가 같은 세션 중 분석할 1개만 남기고 나머지 (host → path 집합)를 반환.
+
+    listings는 host 순서의 (host, is_remote, path → (size, mtime_ns)). 크기가 같은 파일이 2개 이상인
+    group만 sha256을 계산하므로 (빈 파일 제외) 중복이 없는 corpus는 stat 외 비용이 없다. digest는
+    SessionCache에 (host, path, size, mtime)으로 저장해 재실행 시 다시 읽지 않는다. 같은 content면
+    로컬 사본 → host 순서 → path 순서로 첫 번째를 남긴다 (원격 사본 fetch를 건너뛰도록).
+    digest를 얻지 못한 파일은 중복으로 보지 않는다. known ((host, path) → digest, snapshot manifest
+    기록값)에 있는 파일은 계산하지 않는다.
+    """
+    rank = {host: i for i, (host, _, _) in enumerate(listings)}
+    by_size: dict[int, list[tuple[str, str]]] = defaultdict(list)
+    remote_hosts = set()
+    for host, is_remote, stats in listings:
+        if is_remote:
+            remote_hosts.add(host)
+        for path, (size, _) in stats.items():
+            if size:
+                by_size[size].append((host, path))
+    candidates = [entry for group in by_size.values() if len(group) > 1 for entry in group]
+
+    digests: dict[tuple[str, str], str] = {}
+    todo: dict[str, list[str]] = defaultdict(list)
+    stats_by_host = {host: stats for host, _, stats in listings}
+    for host, path in candidates:
+        if known and (host, path) in known:
+            digests[(host, path)] = known[(host, path)]
+            continue
+        cached = None if cache is None else cache.get_digest(host, path, *stats_by_host[host][path])
+        if cached is None:
+            todo[host].append(path)
+        else:
+            digests[(host, path)] = cached
+    hashed = 0
+    for host, paths in todo.items():
+        if host in remote_hosts:
+            computed = remote_session_digests(host, paths, warnings[host])
+        else:
+            computed = {}
+            for path in paths:
+                digest = local_session_digest(path)
+                if digest is not None:
+                    computed[path] = digest
+        hashed += len(computed)
+        for path, digest in computed.items():
+            digests[(host, path)] = digest
+            if cache is not None:
+                cache.put_digest(host, path, *stats_by_host[host][path], digest)
+
+    drop = select_duplicates(digests, rank, remote_hosts)
+    stats = {
+        "sessions": sum(len(paths) for paths in drop.values()),
+        "by_host": {host: len(drop.get(host, ())) for host in rank},
+        "candidates": len(candidates),
+        "hashed": hashed,
+    }
+    return drop, stats
+
+
+class FetchLimiter:
+    """host별 동시 ssh fetch 상한 — 관측 지연과 ssh transport 오류로 조정하는 AIMD.
+
+    fetch 1건 (cat / tail / tar batch)은 acquire → ssh 실행 → release(첫 byte 지연, 성공 여부,
+    transient)이다. 첫 byte 지연은 파일 크기와 무관한 mux session 개설 + 원격 process 시작 비용이라
+    포화 신호로 쓴다.
+    - 성공이 현재 상한만큼 쌓이면 (≈ 1 round) 상한 +1. 그 사이 지연 EWMA가 관측 최저치의
+      SSH_FETCH_LATENCY_RATIO배를 넘었으면 원격/회선 포화로 보고 대신 -1.
+    - transient 실패 (ssh rc 255 — ControlMaster의 sshd MaxSessions 초과 등 연결/mux 오류, timeout)는
+      상한 절반. 같은 감소 이전에 시작된 fetch의 실패는 다시 줄이지 않는다 (epoch).
+    상한은 [SSH_FETCH_WORKERS_MIN, SSH_FETCH_WORKERS_MAX]이다. 동기 경로 (tar batch, mirror)는 acquire,
+    async cat transport는 acquire_async로 같은 상한을 나눠 쓴다. 한 실행 (watch daemon은 수명) 동안 host별 1개 (fetch_limiter).
+    """
+
+    def __init__(self, host: str, initial: int = SSH_FETCH_WORKERS):
+        self.host = host
+        self.initial = initial
+        self.limit = initial
+        self.limit_min = self.limit_max = initial
+        self.active = 0
+        self.requests = 0
+        self.retries = 0
+        self.transient_failures = 0
+        self.gave_up = 0
+        self._in_flight_total = 0
+        self._since_change = 0
+        self._epoch = 0
+        self._ewma: float | None = None
+        self._floor: float | None = None
+        self._cond = threading.Condition()
+        self._async_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def _take(self) -> int:
+        self.active += 1
+        self.requests += 1
+        self._in_flight_total += self.active
+        return self._epoch
+
+    def acquire(self) -> int:
+        """slot이 날 때까지 대기. 반환 epoch는 release에 그대로 넘긴다."""
+        with self._cond:
+            while self.active >= self.limit:
+                self._cond.wait()
+            return self._take()
+
+    async def acquire_async(self) -> int:
+        """acquire의 asyncio 판 — thread를 막지 않고 release 통지를 기다린다 (async cat transport)."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self.active < self.limit:
+                    return self._take()
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def release(self, epoch: int, latency: float, ok: bool = True, transient: bool = False) -> None:
+        with self._cond:
+            self.active -= 1
+            self._since_change += 1
+            if transient:
+                self.transient_failures += 1
+                if epoch == self._epoch:
+                    self._set_limit(self.limit // 2)
+            elif ok:
+                alpha = SSH_FETCH_LATENCY_ALPHA
+                self._ewma = latency if self._ewma is None else alpha * latency + (1 - alpha) * self._ewma
+                self._floor = self._ewma if self._floor is None else min(self._floor, self._ewma)
+                if self._since_change >= self.limit:
+                    saturated = self._ewma > SSH_FETCH_LATENCY_RATIO * self._floor
+                    self._set_limit(self.limit - 1 if saturated else self.limit + 1)
+            self._cond.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_wake_waiter, waiter)
+
+    def _set_limit(self, limit: int) -> None:
+        limit = max(SSH_FETCH_WORKERS_MIN, min(SSH_FETCH_WORKERS_MAX, limit))
+        if limit < self.limit:
+            self._epoch += 1
+        self.limit = limit
+        self.limit_min = min(self.limit_min, limit)
+        self.limit_max = max(self.limit_max, limit)
+        self._since_change = 0
+
+    def backoff(self, attempt: int) -> None:
+        """재시도 전 대기 — SSH_RETRY_BACKOFF_SECONDS × 2^attempt × jitter (동시 실패의 재시도 분산)."""
+        time.sleep(self.backoff_delay(attempt))
+
+    def backoff_delay(self, attempt: int) -> float:
+        """재시도 1회를 기록하고 backoff 대기 시간을 반환한다 (async transport는 asyncio.sleep으로 대기)."""
+        with self._cond:
+            self.retries += 1
+        return SSH_RETRY_BACKOFF_SECONDS * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def give_up(self) -> None:
+        with self._cond:
+            self.gave_up += 1
+
+    def build(self) -> dict:
+        """JSON sidecar `transport.<host>`."""
+        with self._cond:
+            return {
+                "concurrency": {
+                    "initial": self.initial,
+                    "final": self.limit,
+                    "min": self.limit_min,
+                    "max": self.limit_max,
+                    "mean_in_flight": round(self._in_flight_total / self.requests, 2) if self.requests else 0.0,
+                },
+                "requests": self.requests,
+                "retries": self.retries,
+                "transient_failures": self.transient_failures,
+                "gave_up": self.gave_up,
+            }
+
+
+def _wake_waiter(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+_fetch_limiters: dict[str, FetchLimiter] = {}
+_fetch_limiters_lock = threading.Lock()
+
+
+def fetch_limiter(host: str) -> FetchLimiter:
+    with _fetch_limiters_lock:
+        limiter = _fetch_limiters.get(host)
+        if limiter is None:
+            limiter = _fetch_limiters[host] = FetchLimiter(host)
+        return limiter
+
+
+def transport_stats() -> dict:
+    """fetch가 있었던 host별 FetchLimiter 통계 (JSON sidecar `transport`, fetch가 없었으면 빈 dict)."""
+    with _fetch_limiters_lock:
+        limiters = list(_fetch_limiters.values())
+    return {limiter.host: limiter.build() for limiter in limiters if limiter.requests}
+
+
+def fetch_with_retries(host: str, warnings: list[str], attempt) -> Any:
+    """attempt(attempt_warnings) → (값, 끝난 RemoteFileStream | None)을 transient 실패 시 재시도.
+
+    stream.transient (ssh rc 255 / timeout)이면 FetchLimiter.backoff 후 최대 SSH_FETCH_RETRIES회
+    다시 시도한다. 재시도로 넘어간 시도의 warning은 버리고 마지막 시도의 warning만 남긴다.
+    """
+    limiter = fetch_limiter(host)
+    for n in range(SSH_FETCH_RETRIES + 1):
+        attempt_warnings: list[str] = []
+        value, stream = attempt(attempt_warnings)
+        if stream is None or not stream.transient:
+            break
+        if n == SSH_FETCH_RETRIES:
+            limiter.give_up()
+            break
+        limiter.backoff(n)
+    warnings.extend(attempt_warnings)
+    return value
+
+
+class RemoteFileStream:
+    """`ssh host cat <path>` (또는 `tail -c +N`) stdout pipe를 binary line iterator로 노출한다.
+
+    analyze_session이 pipe에서 바로 줄을 읽으므로 원격 내용은 전체 문자열로도, 임시 파일로도
+    만들어지지 않는다. ssh 종료 상태는 stream을 다 읽은 뒤 finish()로 확인하며, 실패 (idle timeout,
+    nonzero rc) 시 이미 파싱한 결과는 caller가 버린다 — partial 내용은 측정에 섞지 않는다. timeout은
+    마지막 byte 이후 SSH_READ_IDLE_TIMEOUT_SECONDS 무응답이라 느리게라도 받는 큰 파일은 끊지 않는다.
+    mirror 사본 기록처럼 동기 file 객체가 필요한 경로용이며, 파일당 cat 분석은 async transport
+    (iter_remote_sessions_async)가 맡는다.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        path: str,
+        proc: subprocess.Popen,
+        command: str = "cat",
+        limiter: FetchLimiter | None = None,
+        epoch: int = 0,
+    ):
+        self.host = host
+        self.path = path
+        self.proc = proc
+        self.command = command
+        self.size = 0
+        self.timed_out = False
+        self.started = time.perf_counter()
+        self.first_byte: float | None = None
+        self._limiter = limiter
+        self._epoch = epoch
+        self._last_read = time.monotonic()
+        self._done = False
+        self._timer = threading.Timer(SSH_READ_IDLE_TIMEOUT_SECONDS, self._watchdog)
+        self._timer.start()
+
+    def _watchdog(self) -> None:
+        # 마지막 byte 이후 SSH_READ_IDLE_TIMEOUT_SECONDS가 지났으면 stall — 느리게라도 받는 중이면 다시 건다
+        if self._done:
+            return
+        idle = time.monotonic() - self._last_read
+        if idle >= SSH_READ_IDLE_TIMEOUT_SECONDS:
+            self.timed_out = True
+            self.proc.kill()
+            return
+        self._timer = threading.Timer(SSH_READ_IDLE_TIMEOUT_SECONDS - idle, self._watchdog)
+        self._timer.start()
+
+    def _stop_watchdog(self) -> None:
+        self._done = True
+        self._timer.cancel()
+
+    @property
+    def transient(self) -> bool:
+        """끝난 stream의 실패가 재시도할 만한 transport 실패 (timeout, ssh rc 255)인지."""
+        return self.timed_out or self.proc.returncode == 255
+
+    def __iter__(self):
+        for line in self.proc.stdout:
+            if self.first_byte is None:
+                self.first_byte = time.perf_counter()
+            self._last_read = time.monotonic()
+            self.size += len(line)
+            yield line
+
+    def read(self, n: int = -1) -> bytes:
+        data = self.proc.stdout.read(n)
+        if data and self.first_byte is None:
+            self.first_byte = time.perf_counter()
+        self._last_read = time.monotonic()
+        self.size += len(data)
+        return data
+
+    def _release(self, ok: bool) -> None:
+        profile_fetch(self.host, self.command, self.started, self.size)
+        if self._limiter is not None:
+            latency = (self.first_byte or time.perf_counter()) - self.started
+            self._limiter.release(self._epoch, latency, ok=ok, transient=self.transient)
+            self._limiter = None
+
+    def abort(self) -> None:
+        """나머지 내용이 필요 없을 때 — ssh를 종료시키고 warning 없이 정리한다."""
+        self._stop_watchdog()
+        self.proc.kill()
+        self.proc.stdout.close()
+        self.proc.wait()
+        self._release(True)
+
+    def finish(self, warnings: list[str]) -> bool:
+        """pipe를 닫고 ssh 종료를 기다린다. 실패면 warnings 누적 후 False."""
+        self.proc.stdout.close()
+        rc = self.proc.wait()
+        self._stop_watchdog()
+        self._release(rc == 0 and not self.timed_out)
+        if self.timed_out:
+            warnings.append(
+                f"host {self.host}: ssh {self.command} idle timeout ({SSH_READ_IDLE_TIMEOUT_SECONDS}s 무응답)"
+                f" for {self.path} — partial result"
+            )
+            return False
+        if rc != 0:
+            warnings.append(
+                f"host {self.host}: ssh {self.command} failed (rc={rc}) for {self.path} — partial result"
+            )
+            return False
+        return True
+
+
+def fetch_remote_file(
+    host: str, path: str, warnings: list[str], offset: int = 0
+) -> RemoteFileStream | None:
+    """원격 jsonl 내용 stream 열기. ssh 실행 실패는 warnings 누적 + None 반환 (partial result).
+
+    offset > 0이면 `tail -c +<offset+1>`로 해당 byte offset 이후만 받는다 (mirror tail fetch).
+    반환된 stream은 끝까지 읽은 뒤 finish(warnings)로 ssh 종료 상태를 확인해야 한다. ssh 실행 전
+    host FetchLimiter slot을 기다리고, slot은 finish/abort가 반환한다.
+    """
+    _validate_host(host)
+    _validate_remote_path(host, path)
+    if offset:
+        argv, command = ["ssh", host, "tail", "-c", f"+{int(offset) + 1}", path], "tail"
+    else:
+        argv, command = ["ssh", host, "cat", path], "cat"
+    limiter = fetch_limiter(host)
+    epoch = limiter.acquire()
+    try:
+        proc = subprocess.Popen(
+            argv,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except FileNotFoundError:
+        limiter.release(epoch, 0.0, ok=False)
+        warnings.append(f"host {host}: ssh binary not found — partial result")
+        return None
+    return RemoteFileStream(host, path, proc, command, limiter, epoch)
+
+
+def check_controlmaster_active(host: str, warnings: list[str]) -> bool:
+    """ControlMaster master socket이 활성인지 확인. 비활성이면 master 생성을 1회 시도 후 재확인.
+
+    `ssh -O check <host>`는 master 부재 시 실패한다. 따라서 실패 시 일반 `ssh <host> true`로
+    master 생성 시도 후 다시 `-O check`로 확인하는 2단계 sequence로 구성한다.
+
+    반환값이 False이면 caller가 해당 host fetch를 skip한다 (fail-fast).
+    """
+    _validate_host(host)
+    try:
+        proc = subprocess.run(
+            ["ssh", "-O", "check", host],
+            capture_output=True,
+            text=True,
+            timeout=SSH_CONTROLMASTER_CHECK_TIMEOUT_SECONDS,
+        )
+        if proc.returncode == 0:
+            return True
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        pass
+    # master 부재로 추정 — `ssh true`로 master 생성 시도
+    try:
+        gen = subprocess.run(
+            ["ssh", host, "true"],
+            capture_output=True,
+            text=True,
+            timeout=SSH_CONTROLMASTER_CHECK_TIMEOUT_SECONDS,
+        )
+        if gen.returncode != 0:
+            warnings.append(
+                f"host {host}: ssh true (ControlMaster 생성 시도) 실패 (rc={gen.returncode}) — fetch skip"
+            )
+            return False
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        warnings.append(
+            f"host {host}: ssh true 시간 초과 또는 binary 부재 — fetch skip"
+        )
+        return False
+    # 재확인
+    try:
+        re_check = subprocess.run(
+            ["ssh", "-O", "check", host],
+            capture_output=True,
+            text=True,
+            timeout=SSH_CONTROLMASTER_CHECK_TIMEOUT_SECONDS,
+        )
+        if re_check.returncode == 0:
+            return True
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        pass
+    warnings.append(
+        f"host {host}: ControlMaster 재확인 실패 — fetch skip"
+    )
+    return False
+
+
+async def _fetch_parse_async(
+    host: str, path: str, limiter: FetchLimiter, warnings: list[str]
+) -> tuple[dict | None, bool]:
+    """`ssh host cat <path>` 1회 — stdout chunk가 도착하는 대로 줄로 잘라 SessionParser에 넣는다.
+
+    RemoteFileStream + analyze_session의 asyncio 판이며 줄 경계 (b"\\n")와 decode가 같아 결과도 같다.
+    timeout은 파일 전체가 아니라 read 1회 (SSH_READ_IDLE_TIMEOUT_SECONDS 무응답)라 느리게라도
+    받는 큰 파일은 끊지 않고, 멈춘 stream만 끊는다. 반환: (결과 | None, transient 실패 여부).
+    """
+    epoch = await limiter.acquire_async()
+    started = time.perf_counter()
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "ssh", host, "cat", path,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except FileNotFoundError:
+        limiter.release(epoch, 0.0, ok=False)
+        warnings.append(f"host {host}: ssh binary not found — partial result")
+        return None, False
+    except asyncio.CancelledError:
+        limiter.release(epoch, 0.0, ok=False)
+        raise
+    parser = SessionParser(path, _run_profile is not None)
+    size = 0
+    first_byte: float | None = None
+    timed_out = parse_failed = False
+    pending = bytearray()
+    try:
+        while True:
+            try:
+                chunk = await asyncio.wait_for(proc.stdout.read(MIRROR_COPY_CHUNK_BYTES), SSH_READ_IDLE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                timed_out = True
+                proc.kill()
+                break
+            if not chunk:
+                break
+            if first_byte is None:
+                first_byte = time.perf_counter()
+            size += len(chunk)
+            if parse_failed:
+                continue  # 파싱은 포기했어도 ssh 종료 상태 확인을 위해 끝까지 읽는다
+            pending += chunk
+            start = 0
+            try:
+                while (end := pending.find(b"\n", start)) >= 0:
+                    for line in iter_text_lines((bytes(pending[start:end + 1]),)):
+                        parser.feed_line(line)
+                    start = end + 1
+            except Exception:
+                parse_failed = True
+            del pending[:start]
+        if pending and not parse_failed and not timed_out:
+            try:
+                for line in iter_text_lines((bytes(pending),)):
+                    parser.feed_line(line)
+            except Exception:
+                parse_failed = True
+    except asyncio.CancelledError:
+        # caller가 iter_remote_sessions_async를 닫음 — ssh를 끊고 slot을 돌려준다
+        if proc.returncode is None:
+            proc.kill()
+        raise
+    finally:
+        rc = await proc.wait()
+        profile_fetch(host, "cat", started, size)
+        transient = timed_out or rc == 255
+        limiter.release(epoch, (first_byte or time.perf_counter()) - started, ok=rc == 0 and not timed_out, transient=transient)
+    if timed_out:
+        warnings.append(
+            f"host {host}: ssh cat idle timeout ({SSH_READ_IDLE_TIMEOUT_SECONDS}s 무응답) for {path} — partial result"
+        )
+        return None, True
+    if rc != 0:
+        warnings.append(f"host {host}: ssh cat failed (rc={rc}) for {path} — partial result")
+        return None, transient
+    if parse_failed or not size:
+        return None, False
+    return parser.finish(), False
+
+
+async def analyze_remote_session_async(host: str, path: str, limiter: FetchLimiter) -> tuple[dict | None, list[str]]:
+    """원격 jsonl 1개를 ssh pipe에서 바로 분석한다 (임시 파일 없음, 빈 파일은 결과 없음). transient
+    실패는 asyncio.sleep backoff 후 재시도하고 마지막 시도의 warning만 남긴다 (fetch_with_retries와
+    같은 규칙)."""
+    _validate_host(host)
+    _validate_remote_path(host, path)
+    for n in range(SSH_FETCH_RETRIES + 1):
+        attempt_warnings: list[str] = []
+        result, transient = await _fetch_parse_async(host, path, limiter, attempt_warnings)
+        if not transient:
+            break
+        if n == SSH_FETCH_RETRIES:
+            limiter.give_up()
+            break
+        await asyncio.sleep(limiter.backoff_delay(n))
+    return result, attempt_warnings
+
+
+def iter_remote_sessions_async(host: str, files: list[str]) -> Iterable[tuple[str, dict | None, list[str]]]:
+    """파일당 `ssh cat`을 event loop 1개 (thread 1개)에서 동시에 진행하고 끝나는 순서대로
+    (path, 결과, warnings)를 yield한다. 동시 ssh 수는 host FetchLimiter (acquire_async)가 정한다.
+
+    in-flight fetch마다 OS thread를 쓰지 않으므로 멈춘 stream 1개가 worker를 붙잡지 않고, 나머지
+    파일은 같은 loop에서 계속 진행된다. SSH_FETCH_WORKERS_MAX개 worker coroutine이 files를 차례로
+    가져가고, 결과는 같은 크기의 bounded asyncio.Queue로 caller thread가 꺼낸다 — caller가 밀려 queue가
+    차면 worker가 put에서 멈춰 새 ssh를 시작하지 않는다. generator가 중간에 닫히면 (caller 예외,
+    close) loop의 task를 cancel해 진행 중 ssh를 kill하고 새 fetch를 시작하지 않는다.
+    """
+    done = object()
+    results: asyncio.Queue = asyncio.Queue(maxsize=SSH_FETCH_WORKERS_MAX)
+    ready = threading.Event()
+    loop: asyncio.AbstractEventLoop | None = None
+    main: asyncio.Task | None = None
+
+    async def _worker(paths: Iterator[str], limiter: FetchLimiter) -> None:
+        for path in paths:
+            try:
+                result, file_warnings = await analyze_remote_session_async(host, path, limiter)
+            except Exception as e:
+                result, file_warnings = None, [f"host {host}: worker exception for {path}: {type(e).__name__}: {e}"]
+            await results.put((path, result, file_warnings))
+
+    async def _all() -> None:
+        nonlocal loop, main
+        loop, main = asyncio.get_running_loop(), asyncio.current_task()
+        ready.set()
+        workers: list[asyncio.Task] = []
+        try:
+            try:
+                limiter = fetch_limiter(host)
+                paths = iter(files)
+                workers = [
+                    asyncio.create_task(_worker(paths, limiter))
+                    for _ in range(min(SSH_FETCH_WORKERS_MAX, len(files)))
+                ]
+                await asyncio.gather(*workers)
+                await results.put(done)
+            except Exception as e:
+                for worker in workers:
+                    worker.cancel()
+                if workers:
+                    await asyncio.wait(workers)
+                await results.put(e)
+            await results.join()  # 마지막 item을 caller가 꺼낼 때까지 loop를 닫지 않는다
+        except asyncio.CancelledError:
+            # caller가 generator를 닫음 (마지막 결과 뒤 done 전에 닫으면 join에서 온다) — gather가 worker를
+            # cancel했지만 첫 worker가 끝나는 순간 돌아오므로 나머지 worker의 ssh kill/wait (finally)까지
+            # 기다린다 (다시 cancel하면 그 wait가 끊긴다)
+            if workers:
+                await asyncio.wait(workers)
+
+    async def _take():
+        item = await results.get()
+        results.task_done()
+        return item
+
+    thread = threading.Thread(target=asyncio.run, args=(_all(),), daemon=True)
+    thread.start()
+    ready.wait()
+    finished = False
+    try:
+        while True:
+            item = asyncio.run_coroutine_threadsafe(_take(), loop).result()
+            if item is done:
+                finished = True
+                break
+            if isinstance(item, Exception):
+                finished = True
+                raise item
+            yield item
+    finally:
+        if not finished:
+            loop.call_soon_threadsafe(main.cancel)
+        thread.join()
+
+
+def _tar_member_key(path: str) -> str:
+    # tar는 절대경로 member 이름의 선행 "/"를 제거해 기록한다 (GNU tar / bsdtar 공통)
+    return posixpath.normpath(path).lstrip("/")
+
+
+def iter_remote_tar_members(host: str, paths: list[str], batch_warnings: list[str]):
+    """`ssh host tar -chf - -T -` 1회로 paths를 받아 (path, member binary stream, size)를 순서대로 낸다.
+
+    path 목록은 명령 인자가 아니라 stdin으로 보내므로 원격 shell이 해석하지 않는다 (`-T -`는
+    GNU tar / bsdtar 공통, 검증된 절대경로라 `-`로 시작하는 option 해석도 없다). `-h`로 symlink를
+    따라가 `cat`과 같은 내용을 받는다. tar stream도 비신뢰 입력으로 보고 요청한 path의 regular file
+    member만 낸다. member stream은 다음 member로 넘어가기 전에 소비해야 한다 (stream mode).
+    timeout / stream 중단 / 폐기 member 수는 batch_warnings에 누적한다.
+    """
+    _validate_host(host)
+    for path in paths:
+        _validate_remote_path(host, path)
+    wanted = {_tar_member_key(p): p for p in paths}
+    limiter = fetch_limiter(host)
+    epoch = limiter.acquire()
+    started = time.perf_counter()
+    try:
+        proc = subprocess.Popen(
+            ["ssh", host, "tar", "-chf", "-", "-T", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except FileNotFoundError:
+        limiter.release(epoch, 0.0, ok=False)
+        batch_warnings.append(f"host {host}: ssh binary not found — partial result")
+        return
+
+    # stdout을 읽지 않는 동안 stdin write가 막히지 않도록 path 목록은 별도 thread에서 쓴다
+    def _write_names() -> None:
+        try:
+            proc.stdin.write(("\n".join(paths) + "\n").encode("utf-8"))
+            proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+
+    timed_out: list[bool] = []
+
+    def _kill() -> None:
+        timed_out.append(True)
+        proc.kill()
+
+    writer = threading.Thread(target=_write_names, daemon=True)
+    writer.start()
+    timer = threading.Timer(SSH_TAR_TIMEOUT_SECONDS, _kill)
+    timer.start()
+    received: set[str] = set()
+    received_bytes = 0
+    rejected = 0
+    stream_error = ""
+    first_member: float | None = None
+    try:
+        with tarfile.open(fileobj=proc.stdout, mode="r|") as archive:
+            for member in archive:
+                if first_member is None:
+                    first_member = time.perf_counter()
+                path = wanted.get(_tar_member_key(member.name))
+                if path is None or path in received or not member.isfile():
+                    rejected += 1
+                    continue
+                received.add(path)
+                received_bytes += member.size
+                yield path, archive.extractfile(member), member.size
+    except tarfile.TarError as e:
+        stream_error = f"{type(e).__name__}: {e}"
+    finally:
+        timer.cancel()
+        proc.stdout.close()
+        rc = proc.wait()
+        writer.join()
+        profile_fetch(host, "tar", started, received_bytes)
+        # transient tar 실패는 여기서 재시도하지 않는다 — 미수신 파일은 caller가 cat 경로 (재시도 포함)로 보낸다
+        limiter.release(
+            epoch,
+            (first_member or time.perf_counter()) - started,
+            ok=not (timed_out or stream_error),
+            transient=bool(timed_out) or rc == 255,
+        )
+
+    if timed_out or stream_error:
+        cause = "timeout" if timed_out else stream_error
+        batch_warnings.append(f"host {host}: tar stream 중단 ({cause}) — 미수신 파일은 ssh cat fetch로 재시도")
+    if rejected:
+        batch_warnings.append(f"host {host}: tar stream member {rejected}개 폐기 (요청 밖 path/비정규 파일)")
+
+
+def fetch_remote_tar_batch(
+    host: str, paths: list[str]
+) -> tuple[list[tuple[str, dict | None, list[str]]], list[str], list[str]]:
+    """tar batch 1개를 받아 member마다 바로 analyze_session에 흘려보낸다 (iter_remote_tar_members).
+
+    반환: (path별 (path, 결과, warnings) list, stream에 없던 path list, batch warnings).
+    stream에 없던 path (원격 부재/권한, tar 부재, timeout 등)는 caller가 ssh cat 경로로 재시도해
+    파일별 실패 warning을 cat 경로와 같은 형식으로 남긴다.
+    """
+    batch_warnings: list[str] = []
+    host_results: list[tuple[str, dict | None, list[str]]] = []
+    for path, stream, size in iter_remote_tar_members(host, paths, batch_warnings):
+        # 빈 파일은 cat 경로 (빈 content → None)와 같이 결과 없음
+        host_results.append((path, analyze_session(stream, path) if size else None, []))
+    received = {path for path, _, _ in host_results}
+    return host_results, [p for p in paths if p not in received], batch_warnings
+
+
+def analyze_remote_sessions(
+    host: str, files: list[str], warnings: list[str], transport: str = "tar"
+) -> list[tuple[str, dict | None, list[str]]]:
+    """원격 jsonl fetch + 분석 — 파일별 (path, 결과, warnings) 수집 (iter_remote_sessions list화)."""
+    return list(iter_remote_sessions(host, files, warnings, transport))
+
+
+def iter_remote_sessions(
+    host: str, files: list[str], warnings: list[str], transport: str = "tar"
+) -> Iterable[tuple[str, dict | None, list[str]]]:
+    """원격 jsonl fetch + 분석 — 파일별 (path, 결과, warnings)를 batch/파일이 끝나는 대로 yield.
+
+    transport="tar"는 TAR_FETCH_BATCH_FILES개씩 `ssh tar` stream 1개로 받고, stream에 없던
+    파일만 파일당 `ssh cat` 경로로 재시도한다. tar batch는 batch당 thread 1개 (tarfile이 동기 stream을
+    읽음), cat은 asyncio event loop 1개 (iter_remote_sessions_async)이며 실제 동시 ssh 수는 두 경로
+    모두 host FetchLimiter가 제한한다.
+    파일별 warnings는 파일별로 분리 수집한다. 끝나는 순서가 비결정적이므로 caller가 path 순으로
+    merge해 deterministic ordering을 강제한다.
+    batch 단위 warnings는 batch 순서대로 warnings에 누적한다.
+    """
+    if transport == "tar" and files:
+        # 검증 실패 path는 batch 전체를 실패시키지 않도록 바로 cat 경로로 보내 ValueError warning을 남긴다
+        tar_files = [p for p in files if _allowed_remote_path(host, p)]
+        missing = [p for p in files if not _allowed_remote_path(host, p)]
+        batches = [
+            tar_files[i:i + TAR_FETCH_BATCH_FILES]
+            for i in range(0, len(tar_files), TAR_FETCH_BATCH_FILES)
+        ]
+
+        def _fetch_batch(batch: list[str]):
+            try:
+                return fetch_remote_tar_batch(host, batch)
+            except Exception as e:
+                return [], batch, [f"host {host}: tar batch exception: {type(e).__name__}: {e}"]
+
+        workers = max(1, min(SSH_FETCH_WORKERS_MAX, len(batches)))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            for triples, batch_missing, batch_warnings in executor.map(_fetch_batch, batches):
+                yield from triples
+                missing.extend(batch_missing)
+                warnings.extend(batch_warnings)
+        files = missing
+    if not files:
+        return
+    yield from iter_remote_sessions_async(host, files)
+
+
+class RemoteMirror:
+    """원격 jsonl의 로컬 사본 디렉터리 + SQLite manifest.
+
+    manifest row는 (host, path) → (size, mtime_ns)이며 size는 로컬 사본 byte 수, mtime_ns는 마지막
+    동기화 때 원격 find가 보고한 mtime이다. sync()는 원격 find metadata와 비교해
+    - (size, mtime) 일치 + 로컬 사본 크기 일치 → 전송 없음
+    - 원격 size >= 사본 size → append-only jsonl로 보고 `tail -c +N`으로 늘어난 부분만 전송.
+      사본 끝 MIRROR_TAIL_OVERLAP_BYTES를 겹쳐 받아 대조하고, 불일치 (rewrite/truncate)면 전체 재fetch
+    - 그 외 (신규, 축소, 사본 유실) → 전체 fetch (tar batch, 미수신분은 cat)
+    로 나눈다. 사본은 `.part`에 쓴 뒤 os.replace하므로 중단돼도 manifest와 어긋난 사본이 남지 않는다.
+    manifest 갱신은 main thread에서만 수행한다.
+    """
+
+    def __init__(self, root: str):
+        os.makedirs(root, mode=0o700, exist_ok=True)  # 세션 원문 사본 — 소유자 전용
+        self.root = root
+        self.conn = sqlite3.connect(os.path.join(root, "manifest.sqlite3"))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS mirror_files ("
+            " host TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " PRIMARY KEY (host, path))"
+        )
+        self.conn.commit()
+
+    def local_path(self, host: str, path: str) -> str:
+        # path는 _validate_remote_path를 통과한 base 하위 절대경로라 root/host 밖으로 나가지 않는다
+        return os.path.join(self.root, host, _tar_member_key(path))
+
+    def sync(
+        self,
+        host: str,
+        files: list[str],
+        metadata: dict[str, tuple[int, int]],
+        warnings: list[str],
+        transport: str = "tar",
+    ) -> tuple[list[str], dict]:
+        """files를 원격 metadata 기준으로 동기화. 반환: (사본이 최신인 path list (files 순서), 통계).
+
+        통계: unchanged/tail/full 파일 수, failed (전송 실패로 제외된 파일 수), bytes (수신 byte 수).
+        tail/full 전송 실패 파일은 cat 경로와 같은 형식의 warning을 남기고 결과에서 제외한다.
+        """
+        for path in files:
+            _validate_remote_path(host, path)
+        rows = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in self.conn.execute(
+                "SELECT path, size, mtime_ns FROM mirror_files WHERE host = ?", (host,)
+            )
+        }
+        stats = {"unchanged": 0, "tail": 0, "full": 0, "failed": 0, "bytes": 0}
+        ready: set[str] = set()
+        tails: list[tuple[str, int]] = []
+        full: list[str] = []
+        for path in files:
+            row = rows.get(path)
+            meta = metadata.get(path)
+            st = _stat_or_none(self.local_path(host, path))
+            if row is None or meta is None or st is None or st.st_size != row[0]:
+                full.append(path)
+            elif meta == row:
+                stats["unchanged"] += 1
+                ready.add(path)
+            elif meta[0] >= row[0]:
+                tails.append((path, row[0]))
+            else:
+                full.append(path)
+
+        def _record(path: str, size: int | None, kind: str, received: int) -> None:
+            stats["bytes"] += received
+            if size is None:
+                stats["failed"] += 1
+                return
+            stats[kind] += 1
+            ready.add(path)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO mirror_files (host, path, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                (host, path, size, metadata[path][1]),
+            )
+
+        if tails:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=SSH_FETCH_WORKERS_MAX) as executor:
+                for path, size, received, local_warnings in executor.map(
+                    lambda item: self._fetch_tail(host, *item), tails
+                ):
+                    if size is None and not local_warnings:
+                        stats["bytes"] += received
+                        full.append(path)  # overlap 불일치 — 전체 재fetch
+                    else:
+                        _record(path, size, "tail", received)
+                        warnings.extend(local_warnings)
+
+        if transport == "tar" and full:
+            batches = [
+                full[i:i + TAR_FETCH_BATCH_FILES] for i in range(0, len(full), TAR_FETCH_BATCH_FILES)
+            ]
+            missing: list[str] = []
+            workers = max(1, min(SSH_FETCH_WORKERS_MAX, len(batches)))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                for written, batch_missing, batch_warnings in executor.map(
+                    lambda batch: self._fetch_tar_batch(host, batch), batches
+                ):
+                    for path, size in written:
+                        _record(path, size, "full", size)
+                    missing.extend(batch_missing)
+                    warnings.extend(batch_warnings)
+            full = missing
+        if full:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=SSH_FETCH_WORKERS_MAX) as executor:
+                results = executor.map(lambda path: self._fetch_full(host, path), full)
+                for path, size, received, local_warnings in results:
+                    _record(path, size, "full", received)
+                    warnings.extend(local_warnings)
+        self.conn.commit()
+        return [p for p in files if p in ready], stats
+
+    def prune(self, host: str, keep: Iterable[str]) -> int:
+        """원격에서 사라진 파일의 사본/manifest row 삭제. caller는 find가 완전할 때만 호출한다."""
+        keep = set(keep)
+        stale = [
+            path
+            for (path,) in self.conn.execute("SELECT path FROM mirror_files WHERE host = ?", (host,))
+            if path not in keep
+        ]
+        for path in stale:
+            try:
+                os.remove(self.local_path(host, path))
+            except OSError:
+                pass
+            self.conn.execute("DELETE FROM mirror_files WHERE host = ? AND path = ?", (host, path))
+        self.conn.commit()
+        return len(stale)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _write(self, host: str, path: str, stream) -> int:
+        """stream 전체를 사본 `.part`에 쓰고 os.replace. 기록 byte 수 반환."""
+        local = self.local_path(host, path)
+        os.makedirs(os.path.dirname(local), exist_ok=True)
+        written = 0
+        with open(local + ".part", "wb") as fp:
+            for chunk in iter(lambda: stream.read(MIRROR_COPY_CHUNK_BYTES), b""):
+                fp.write(chunk)
+                written += len(chunk)
+        os.replace(local + ".part", local)
+        return written
+
+    def _fetch_tar_batch(
+        self, host: str, paths: list[str]
+    ) -> tuple[list[tuple[str, int]], list[str], list[str]]:
+        batch_warnings: list[str] = []
+        written: list[tuple[str, int]] = []
+        try:
+            for path, stream, _ in iter_remote_tar_members(host, paths, batch_warnings):
+                written.append((path, self._write(host, path, stream)))
+        except Exception as e:
+            batch_warnings.append(f"host {host}: tar batch exception: {type(e).__name__}: {e}")
+        received = {path for path, _ in written}
+        return written, [p for p in paths if p not in received], batch_warnings
+
+    def _fetch_full(self, host: str, path: str) -> tuple[str, int | None, int, list[str]]:
+        local_warnings: list[str] = []
+        size, received = fetch_with_retries(
+            host, local_warnings, lambda w: self._fetch_full_once(host, path, w)
+        )
+        return path, size, received, local_warnings
+
+    def _fetch_full_once(self, host: str, path: str, local_warnings: list[str]):
+        stream = fetch_remote_file(host, path, local_warnings)
+        if stream is None:
+            return (None, 0), None
+        try:
+            size = self._write(host, path, stream)
+        except OSError as e:
+            stream.abort()
+            local_warnings.append(f"host {host}: mirror write failed for {path}: {e}")
+            return (None, stream.size), None
+        if not stream.finish(local_warnings):
+            return (None, stream.size), stream
+        return (size, stream.size), stream
+
+    def _fetch_tail(
+        self, host: str, path: str, local_size: int
+    ) -> tuple[str, int | None, int, list[str]]:
+        """사본 끝 overlap부터 받아 대조 후 append. (path, 새 사본 크기 | None, 수신 byte, warnings).
+
+        반환 size가 None이고 warnings가 비어 있으면 overlap 불일치 — caller가 전체 재fetch한다.
+        전송 실패 시 사본은 local_size로 되돌려 manifest와 일치를 유지하고, transient 실패면 같은
+        offset부터 다시 받는다.
+        """
+        local_warnings: list[str] = []
+        size, received = fetch_with_retries(
+            host, local_warnings, lambda w: self._fetch_tail_once(host, path, local_size, w)
+        )
+        return path, size, received, local_warnings
+
+    def _fetch_tail_once(self, host: str, path: str, local_size: int, local_warnings: list[str]):
+        offset = max(0, local_size - MIRROR_TAIL_OVERLAP_BYTES)
+        stream = fetch_remote_file(host, path, local_warnings, offset=offset)
+        if stream is None:
+            return (None, 0), None
+        with open(self.local_path(host, path), "r+b") as fp:
+            fp.seek(offset)
+            expected = fp.read(local_size - offset)
+            if stream.read(len(expected)) != expected:
+                stream.abort()
+                return (None, stream.size), stream
+            fp.seek(local_size)
+            fp.truncate()
+            for chunk in iter(lambda: stream.read(MIRROR_COPY_CHUNK_BYTES), b""):
+                fp.write(chunk)
+            if not stream.finish(local_warnings):
+                fp.truncate(local_size)
+                return (None, stream.size), stream
+            return (fp.tell(), stream.size), stream
+
+
+def open_remote_mirror(root: str | None) -> RemoteMirror | None:
+    """mirror open. 실패는 측정 결과와 무관하므로 stderr 경고 후 mirror 없이 (직접 fetch) 진행한다."""
+    if not root:
+        return None
+    try:
+        return RemoteMirror(root)
+    except (OSError, sqlite3.Error) as e:
+        print(f"WARNING: remote mirror disabled ({root}): {e}", file=sys.stderr)
+        return None
+
+
+def analyze_mirrored_sessions(
+    host: str,
+    files: list[str],
+    metadata: dict[str, tuple[int, int]],
+    mirror: RemoteMirror,
+    warnings: list[str],
+    transport: str = "tar",
+    jobs: int = 1,
+    triage: bool = False,
+    cache: SessionCache | None = None,
+) -> list[tuple[str, dict | None, list[str]]]:
+    """mirror 동기화 후 로컬 사본을 분석 (split_local_cache + iter_local_analyses) — 파일별
+    (path, 결과, []) 수집.
+
+    결과 "path"는 사본 경로 대신 원격 path로 되돌린다. 빈 파일은 fetch 경로와 같이 결과 없음.
+    cache가 주어지면 (host, 원격 path)의 이어 파싱 상태로 tail이 늘어난 사본은 늘어난 줄만
+    파싱하고, 결과에 붙은 "resume"은 caller (run_hosts)가 같은 key로 저장한다.
+    """
+    synced, stats = mirror.sync(host, files, metadata, warnings, transport)
+    print(
+        f"remote mirror {host}: unchanged {stats['unchanged']}, tail {stats['tail']},"
+        f" full {stats['full']}, failed {stats['failed']}, {stats['bytes']} bytes received",
+        file=sys.stderr,
+    )
+    local_paths = [mirror.local_path(host, p) for p in synced]
+    host_results: list[tuple[str, dict | None, list[str]]] = []
+    triage_stats: dict = {}
+    started = time.perf_counter()
+    results, pending = split_local_cache(host, local_paths, None, triage, triage_stats)
+    resumes = None
+    if cache is not None:
+        resumes = {local: cache.get_resume(host, synced[i]) for i, local, _ in pending}
+    for i, _, _, result, _ in iter_local_analyses(pending, jobs, resumes):
+        results[i] = result
+    if triage:
+        report_triage(host, len(local_paths), triage_stats, time.perf_counter() - started)
+    for path, local, result in zip(synced, local_paths, results):
+        st = _stat_or_none(local)
+        if result is None or st is None or not st.st_size:
+            host_results.append((path, None, []))
+            continue
+        result["path"] = path
+        host_results.append((path, result, []))
+    return host_results
+
+
+# --remote-exec 원격 응답 session 결과의 필드 → 허용 타입. 원격 stdout도 비신뢰 입력으로 보고
+# aggregate가 가정하는 shape만 통과시킨다.
+REMOTE_RESULT_FIELDS = {
+    "path": str,
+    "has_arbiter_marker": bool,
+    "has_intensity_marker": bool,
+    "intensity_verdicts": list,
+    "verdicts": list,
+    "nl_signal_only": bool,
+    "nl_estimated_count": int,
+    "round_summary_stability": dict,
+    "parse_failures": list,
+    "first_timestamp": (str, type(None)),
+    "last_timestamp": (str, type(None)),
+}
+# verdict 1건에서 AggregateAccumulator / VerdictIndex가 읽는 key — 전부 필수, optional은 있으면 type 확인
+REMOTE_VERDICT_FIELDS = {
+    "finding_id": str,
+    "verdict": str,
+    "source": str,
+    "source_confidence": str,
+    "bundle": (str, type(None)),
+}
+REMOTE_VERDICT_OPTIONAL_FIELDS = {
+    "severity": (str, type(None)),
+    "timestamp": (str, type(None)),
+}
+REMOTE_WARNING_REASONS = {
+    "disallowed": "remote-exec disallowed path",
+    "unreadable": "remote-exec read failed",
+}
+
+
+def emit_remote_sessions(host: str, files: list[str], out, triage: bool = False) -> int:
+    """--remote-exec 원격 측 진입점. 로그를 가진 호스트에서 analyze_session을 실행하고 파일마다
+    JSON line 1개 (`session` 또는 `warning`)를 out에 흘려보낸 뒤 `done` line으로 끝낸다.
+
+    출력은 ensure_ascii JSON이라 원격 non-interactive shell의 locale과 무관하다. warning은 사유
+    코드만 보내고 메시지는 local이 구성한다 (원격 문자열을 warnings에 그대로 넣지 않는다).
+    triage=True면 marker 후보가 아닌 파일은 원격에서도 전체 파싱 없이 triaged_session을 보낸다.
+    """
+    count = 0
+    for path in files:
+        if not _allowed_remote_path(host, path):
+            record = {"type": "warning", "path": path, "reason": "disallowed"}
+        elif not os.access(path, os.R_OK) or not os.path.isfile(path):
+            record = {"type": "warning", "path": path, "reason": "unreadable"}
+        else:
+            # 빈 파일은 ssh cat 경로 (빈 content → None)와 같이 결과 없음으로 보고
+            if not os.path.getsize(path):
+                result = None
+            elif triage and not triage_session_file(path):
+                result = triaged_session(path, file_time_bounds(path))
+            else:
+                result = analyze_session(path)
+            record = {"type": "session", "path": path, "result": result}
+            count += 1
+        out.write(json.dumps(record, separators=(",", ":")) + "\n")
+        out.flush()
+    out.write(json.dumps({"type": "done", "count": count}) + "\n")
+    out.flush()
+    return 0
+
+
+def _remote_exec_program(host: str, files: list[str], triage: bool = False) -> str:
+    """`python3 -` stdin으로 보낼 bootstrap. 본 module source를 별도 namespace에서 exec한 뒤
+    emit_remote_sessions를 호출한다. 검증 boundary가 local과 같도록 HOST_PATH_MAP[host]도 함께 보낸다.
+    """
+    with open(os.path.abspath(__file__), "r", encoding="utf-8") as fp:
+        source = fp.read()
+    payload = json.dumps({
+        "host": host,
+        "paths": HOST_PATH_MAP[host],
+        "files": files,
+        "triage": triage,
+        "source": source,
+    })
+    return "\n".join([
+        "import json, sys",
+        f"args = json.loads({payload!r})",
+        'namespace = {"__name__": "analyze_da_remote"}',
+        'exec(compile(args["source"], "analyze.py", "exec"), namespace)',
+        'namespace["HOST_PATH_MAP"][args["host"]] = args["paths"]',
+        'sys.exit(namespace["emit_remote_sessions"](args["host"], args["files"], sys.stdout, args["triage"]))',
+        "",
+    ])
+
+
+def _valid_remote_verdict(verdict: Any) -> bool:
+    return (
+        isinstance(verdict, dict)
+        and all(key in verdict and isinstance(verdict[key], kind) for key, kind in REMOTE_VERDICT_FIELDS.items())
+        and all(isinstance(verdict[key], kind) for key, kind in REMOTE_VERDICT_OPTIONAL_FIELDS.items() if key in verdict)
+    )
+
+
+def _valid_remote_result(result: Any, path: str) -> bool:
+    """원격 결과가 aggregate/index가 읽는 shape인지 — list/dict 원소와 verdict key/type까지 본다.
+    통과하지 못한 line은 폐기되어 해당 파일은 fetch 경로로 다시 분석된다 (run 전체를 중단하지 않음)."""
+    if result is None:
+        return True
+    if not isinstance(result, dict) or set(result) != set(REMOTE_RESULT_FIELDS):
+        return False
+    for key, kind in REMOTE_RESULT_FIELDS.items():
+        if not isinstance(result[key], kind):
+            return False
+    return (
+        result["path"] == path
+        and all(isinstance(v, str) for v in result["intensity_verdicts"])
+        and all(isinstance(v, str) for v in result["parse_failures"])
+        and all(type(n) is int for n in result["round_summary_stability"].values())
+        and all(_valid_remote_verdict(v) for v in result["verdicts"])
+    )
+
+
+def analyze_remote_exec(
+    host: str, files: list[str], warnings: list[str], triage: bool = False
+) -> tuple[list[tuple[str, dict | None, list[str]]], list[str]]:
+    """--remote-exec: 분석기를 `ssh host python3 -`로 보내 로그 옆에서 실행하고 결과 line만 수신.
+
+    jsonl 본문 대신 세션당 결과 JSON 1줄만 wire를 건넌다. 원격 stdout line은 비신뢰 입력으로
+    취급해 (1) 요청한 path, (2) REMOTE_RESULT_FIELDS shape를 통과한 line만 수용한다.
+    반환: (path별 (path, 결과, warnings) list, 원격이 보고하지 않은 path list) — 후자는 caller가
+    fetch 경로 (--transport)로 재시도한다 (원격 python3 부재, timeout, 중도 종료 등).
+    """
+    _validate_host(host)
+    # 검증 실패 path는 원격에 보내지 않는다 — 미보고로 남겨 fetch 경로의 ValueError warning을 따른다.
+    allowed = [p for p in files if _allowed_remote_path(host, p)]
+    started = time.perf_counter()
+    try:
+        proc = subprocess.Popen(
+            ["ssh", host, "python3", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+    except FileNotFoundError:
+        warnings.append(f"host {host}: ssh binary not found — partial result")
+        return [], list(files)
+
+    timed_out: list[bool] = []
+
+    def _kill() -> None:
+        timed_out.append(True)
+        proc.kill()
+
+    timer = threading.Timer(SSH_REMOTE_EXEC_TIMEOUT_SECONDS, _kill)
+    timer.start()
+    pending = set(allowed)
+    host_results: list[tuple[str, dict | None, list[str]]] = []
+    done = False
+    rejected = 0
+    received = 0
+    try:
+        try:
+            proc.stdin.write(_remote_exec_program(host, allowed, triage))
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        for line in proc.stdout:
+            received += len(line)
+            try:
+                record = json.loads(line)
+            except ValueError:
+                rejected += 1
+                continue
+            kind = record.get("type") if isinstance(record, dict) else None
+            if kind == "done":
+                done = True
+                continue
+            path = record.get("path") if kind else None
+            if not isinstance(path, str) or path not in pending:
+                rejected += 1
+                continue
+            if kind == "warning" and record.get("reason") in REMOTE_WARNING_REASONS:
+                pending.discard(path)
+                reason = REMOTE_WARNING_REASONS[record["reason"]]
+                host_results.append((path, None, [f"host {host}: {reason} for {path} — partial result"]))
+            elif kind == "session" and _valid_remote_result(record.get("result"), path):
+                pending.discard(path)
+                result = record["result"]
+                if result is not None:
+                    result = _restore_session_types(result)
+                host_results.append((path, result, []))
+            else:
+                rejected += 1
+        rc = proc.wait()
+    finally:
+        timer.cancel()
+        profile_fetch(host, "remote-exec", started, received)
+
+    if rejected:
+        warnings.append(f"host {host}: remote-exec 응답 {rejected}줄 폐기 (형식/path 검증 실패)")
+    if timed_out or rc != 0 or not done or pending:
+        cause = "timeout" if timed_out else f"rc={rc}"
+        warnings.append(
+            f"host {host}: remote-exec 비정상 종료 ({cause}) — 미보고 {len(pending)}개 파일은 fetch 경로로 재시도"
+        )
+    reported = {triple[0] for triple in host_results}
+    return host_results, [p for p in files if p not in reported]
 
-    1. 제어문자/shell metacharacter/공백 부재.
-    2. `.jsonl` 확장자.
-    3. `posixpath.normpath`로 traversal(`../`) 정규화.
-    4. `posixpath.isabs`로 relative path 폐기 (find stdout 비신뢰).
-    5. `posixpath.commonpath([base_norm, path_norm]) == base_norm` boundary 비교 —
-       sibling-prefix(`/Users/green/.claude/projects-evil/...`)는 commonpath가
-       base_norm와 다르므로 거부. absolute/relative mix는 ValueError → 폐기.
-    6. `path_norm != base_norm`로 base 자체 통과를 차단 (`.jsonl` 확장자 검사가
-       이미 거부하지만 방어적 명시).
+
+class HostRun:
+    """host 1개의 수집 → cache 조회 → 분석 파이프라인 상태.
+
+    run_host가 host별 worker thread에서 채우고, main thread가 모든 host 종료 후 host 순서로 merge한다.
+    files가 None이면 (live 모드) worker가 직접 수집한다. warnings는 수집 단계 (collect_warnings)와
+    분석 단계 (warnings)를 분리해 host 순차 처리와 같은 순서로 merge된다.
+
+    fold 모드 (run_hosts accumulator)에서는 세션 dict를 보관하지 않고 FoldBuffer (folded)에 접는다.
+    local은 key가 files index라 앞에서부터 연속으로 도착한 구간을 바로 접고, remote는 host 종료 후
+    path 순으로 접는다 (sort_at_finish).
     """
-    if not isinstance(path, str) or not path:
-        return False
-    # 제어문자 / shell metacharacter / space 거부
-    if any(c in path for c in " \n\r\t;|&$`(){}[]<>*?\"'\\"):
-        return False
-    if not path.endswith(".jsonl"):
-        return False
+
+    def __init__(self, host: str, is_remote: bool, files: list[str] | None = None):
+        self.host = host
+        self.is_remote = is_remote
+        self.files = files
+        self.metadata: dict[str, tuple[int, int]] = {}
+        self.listing_complete = False
+        self.duplicates: list[str] = []  # dedup 단계가 뺀 path (다른 사본이 분석됨)
+        # --corpus snapshot manifest — path → {"sha256", "size", "mtime_ns"}, host 대신 blob store를 읽는다
+        self.blobs: dict[str, dict] | None = None
+        self.blob_store: BlobStore | None = None
+        self.collect_warnings: list[str] = []
+        self.warnings: list[str] = []
+        # (정렬 key, 결과, 파일별 warnings) — local은 files index, remote는 path가 key
+        self.results: list[tuple[Any, dict | None, list[str]]] = []
+        # fold 모드 상태
+        self.folded = FoldBuffer(sort_at_finish=is_remote)
+        self.file_warnings: list[tuple[Any, list[str]]] = []
+
+    def collect(self) -> None:
+        """files가 None이면 목록 수집. 원격은 find 1회로 (size, mtime)까지 모으고, find가 warning
+        없이 끝난 host만 mirror prune 대상으로 표시한다 (부분 목록으로 사본을 지우지 않음)."""
+        if self.files is not None:
+            return
+        with profile_stage(self.host, "collect"):
+            if self.is_remote:
+                self.files = collect_remote_files(self.host, self.collect_warnings, self.metadata)
+                self.listing_complete = not self.collect_warnings
+            else:
+                self.files = collect_local_files(self.host)
+
+    def fold(self, key: Any, result: dict | None, file_warnings: list[str]) -> None:
+        """결과 1건을 접는다 (fold 모드). 세션 dict는 여기서 버려진다."""
+        if file_warnings:
+            self.file_warnings.append((key, file_warnings))
+        self.folded.add(key, result)
+
+
+def run_host(
+    run: HostRun,
+    cache: SessionCache | None,
+    out,
+    *,
+    jobs: int = 1,
+    transport: str = "tar",
+    remote_exec: bool = False,
+    mirror_root: str | None = None,
+    triage: bool = False,
+) -> None:
+    """host worker thread 본체. 결과는 (run, item)으로 out queue에 넣고 끝나면 (run, None)을 넣는다.
+
+    item은 (정렬 key, path, 결과, 파일별 warnings, cache_entry)이며 cache_entry가 있으면
+    ((size, mtime_ns, encoded)) main thread가 SessionCache에 기록한다 — 기록은 main thread 1곳,
+    조회만 worker에서 lock으로 수행한다. out은 bounded queue라 main thread가 밀리면 worker가 대기한다.
+    """
+
+    def emit(key: Any, path: str, result: dict | None, file_warnings: list[str], cache_entry=None) -> None:
+        out.put((run, (key, path, result, file_warnings, cache_entry)))
+
     try:
-        path_norm = posixpath.normpath(path)
-    except Exception:
-        return False
-    if not posixpath.isabs(path_norm):
-        return False
-    paths = HOST_PATH_MAP.get(host, {})
-    bases = (paths.get("claude", ""), paths.get("codex", ""))
-    for base in bases:
-        if not base:
+        if run.blob_store is not None:
+            _run_blob_host(run, cache, emit, jobs, triage)
+        elif run.is_remote:
+            _run_remote_host(run, cache, emit, jobs, transport, remote_exec, mirror_root, triage)
+        else:
+            _run_local_host(run, cache, emit, jobs, triage)
+    except Exception as e:
+        run.warnings.append(f"host {run.host}: pipeline exception: {type(e).__name__}: {e}")
+    finally:
+        out.put((run, None))
+
+
+def _run_local_host(run: HostRun, cache: SessionCache | None, emit, jobs: int, triage: bool) -> None:
+    # local: 기본 직렬, --jobs N이면 cache miss 파일만 process pool 분배 (CPU-bound:
+    # json.loads + payload walk + regex pass). 결과는 files index 순으로 merge된다.
+    run.collect()
+    triage_stats: dict = {}
+    started = time.perf_counter()
+    with profile_stage(run.host, "cache_triage"):
+        results, pending = split_local_cache(run.host, run.files, cache, triage, triage_stats)
+        for i, result in enumerate(results):
+            if result is not None:
+                emit(i, run.files[i], result, [])
+    resumes = None if cache is None else {path: cache.get_resume(run.host, path) for _, path, _ in pending}
+    with profile_stage(run.host, "parse"):
+        for i, path, st, result, encoded in iter_local_analyses(pending, jobs, resumes):
+            emit(i, path, result, [], None if st is None else (st.st_size, st.st_mtime_ns, encoded))
+    if triage:
+        report_triage(run.host, len(run.files), triage_stats, time.perf_counter() - started)
+
+
+def _run_blob_host(run: HostRun, cache: SessionCache | None, emit, jobs: int, triage: bool) -> None:
+    # snapshot blob: host 접근 (ssh, 로컬 파일) 없이 store 사본을 분석한다. 정렬 key는 live 실행과
+    # 같게 (local은 files index, remote는 path) 두어 aggregate fold 순서가 같다. triage 비후보는
+    # 로컬 경로와 같이 cache에 넣지 않는다.
+    pending = []
+    with profile_stage(run.host, "cache_triage"):
+        for i, path in enumerate(run.files):
+            key = path if run.is_remote else i
+            entry = run.blobs.get(path)
+            if entry is None:
+                emit(key, path, None, [f"host {run.host}: snapshot blob 항목 없음 — {path} (snapshot 재실행 필요)"])
+                continue
+            if run.is_remote and not entry["size"]:
+                emit(key, path, None, [])  # 원격 빈 파일은 live fetch 경로와 같이 결과 없음
+                continue
+            meta = run.metadata.get(path)
+            cached = None if cache is None or meta is None else cache.get(run.host, path, *meta)
+            if cached is not None:
+                emit(key, path, cached, [])
+            else:
+                pending.append((key, path, entry["sha256"]))
+    with profile_stage(run.host, "blob_parse"):
+        for key, path, result, file_warnings, encoded, parsed in iter_blob_analyses(
+            run.blob_store.root, pending, jobs, triage
+        ):
+            meta = run.metadata.get(path)
+            file_warnings = [f"host {run.host}: {w}" for w in file_warnings]
+            emit(key, path, result, file_warnings, (*meta, encoded) if meta is not None and parsed else None)
+
+
+def report_triage(host: str, total: int, triage_stats: dict, elapsed: float) -> None:
+    """triage 효과 stderr 보고 — 측정 결과와 무관한 진단이라 warnings에는 넣지 않는다."""
+    skipped = triage_stats.get("skipped", 0)
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(
+        f"triage {host}: {skipped}/{total} files skipped by marker scan, {rate:.0f} files/s",
+        file=sys.stderr,
+    )
+
+
+def _run_remote_host(
+    run: HostRun,
+    cache: SessionCache | None,
+    emit,
+    jobs: int,
+    transport: str,
+    remote_exec: bool,
+    mirror_root: str | None,
+    triage: bool,
+) -> None:
+    host = run.host
+    # find 1회로 (size, mtime)까지 수집 — 원격 cache 조회와 mirror 동기화 기준
+    run.collect()
+
+    # 빈 remote files list (예: corpus 모드에서 해당 host 미분류 파일)는 ControlMaster
+    # preflight 비용 (~30s timeout)을 회피해 즉시 종료한다.
+    files = run.files
+    if not files:
+        return
+
+    # 원격 find metadata (size, mtime)로 cache 조회 — hit 파일은 전송/원격 실행 없이 재사용.
+    # corpus 모드는 metadata가 없어 cache 없이 전체 fetch한다.
+    metadata = run.metadata
+    if cache is not None and metadata:
+        uncached = []
+        with profile_stage(host, "cache_triage"):
+            for path in files:
+                cached = cache.get(host, path, *metadata[path])
+                if cached is None:
+                    uncached.append(path)
+                else:
+                    emit(path, path, cached, [])
+        files = uncached
+
+    def emit_fetched(path: str, result: dict | None, file_warnings: list[str]) -> None:
+        meta = metadata.get(path)
+        emit(path, path, result, file_warnings, None if meta is None else (*meta, None))
+
+    mirror = open_remote_mirror(mirror_root) if metadata else None
+    try:
+        if mirror is not None and run.listing_complete:
+            mirror.prune(host, metadata)  # find 목록 전체 — dedup/sample로 뺀 파일의 사본은 남긴다
+
+        # --remote-exec: 분석기를 원격에서 실행하고 결과만 수신. 미보고 파일만 아래 fetch 경로로.
+        if remote_exec and files:
+            with profile_stage(host, "remote_exec"):
+                fetched, files = analyze_remote_exec(host, files, run.warnings, triage)
+                for triple in fetched:
+                    emit_fetched(*triple)
+
+        # remote: ControlMaster preflight + worker pool.
+        # ControlMaster 비활성이면 K=1 강등이 5526 파일 직렬 fetch ≈ 37분으로 5분 timeout
+        # 안에 끝나기 어려우므로 fail-fast로 host 전체 fetch를 skip하고 명시적 warning을
+        # 누적한다. 사용자가 ControlMaster 활성화 (mac nrs 등) 누락을 즉시 인지할 수 있다.
+        if not files:
+            return
+        with profile_stage(host, "preflight"):
+            active = check_controlmaster_active(host, run.warnings)
+        if not active:
+            run.warnings.append(
+                f"host {host}: ControlMaster 비활성으로 fetch skip — 활성화 후 재실행 필요"
+                f" (직렬 fallback은 5분 budget 안에 완료 불가능). minipc는 nrs, mac은 사용자 수동 nrs."
+            )
+        elif mirror is not None:
+            # mirror: 새 파일/늘어난 tail만 전송 후 로컬 사본 분석 (--jobs 적용)
+            with profile_stage(host, "mirror_fetch_parse"):
+                for triple in analyze_mirrored_sessions(
+                    host, files, metadata, mirror, run.warnings, transport, jobs, triage, cache
+                ):
+                    emit_fetched(*triple)
+        else:
+            # batch/파일이 끝나는 대로 queue로 넘겨 main thread 처리와 fetch를 겹친다
+            with profile_stage(host, "fetch_parse"):
+                for triple in iter_remote_sessions(host, files, run.warnings, transport):
+                    emit_fetched(*triple)
+    finally:
+        if mirror is not None:
+            mirror.close()
+
+
+def collect_host_runs(runs: list[HostRun]) -> None:
+    """run_hosts 전에 목록이 필요한 단계 (dedup, sample)용 — 모든 host 목록을 동시에 수집한다."""
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(len(runs), 1)) as pool:
+        list(pool.map(HostRun.collect, runs))
+
+
+def dedupe_host_runs(runs: list[HostRun], cache: SessionCache | None) -> dict:
+    """run_hosts 전 dedup 단계 — 모든 host 목록을 (동시에) 수집한 뒤 중복 세션을 run.files에서 뺀다.
+
+    같은 host 목록의 반복 path (--corpus manifest 중복 기재)는 digest 없이 뺀다. 빠진 파일은
+    run.duplicates에 남는다 (mirror prune은 find 목록 기준이라 사본이 지워지지 않는다). warnings는
+    host별 수집 warnings에 붙는다.
+    """
+    collect_host_runs(runs)
+    listings = []
+    repeated = 0
+    blob_digests: dict[tuple[str, str], str] = {}
+    for run in runs:
+        unique = list(dict.fromkeys(run.files))
+        repeated += len(run.files) - len(unique)
+        run.files = unique
+        if run.blobs is not None:
+            # snapshot manifest — 기록된 digest로 판정 (stat/hash/ssh 없음)
+            stats = {p: (e["size"], e.get("mtime_ns")) for p, e in run.blobs.items()}
+            blob_digests.update({(run.host, p): e["sha256"] for p, e in run.blobs.items()})
+        elif run.is_remote:
+            stats = run.metadata or stat_remote_files(run.host, run.files, run.collect_warnings)
+        else:
+            stats = {}
+            for path in run.files:
+                st = _stat_or_none(path)
+                if st is not None:
+                    stats[path] = (st.st_size, st.st_mtime_ns)
+        listings.append((run.host, run.is_remote, {p: stats[p] for p in run.files if p in stats}))
+    drop, summary = find_duplicate_sessions(
+        listings, cache, {run.host: run.collect_warnings for run in runs}, blob_digests
+    )
+    for run in runs:
+        skipped = drop.get(run.host)
+        if skipped:
+            run.duplicates = [p for p in run.files if p in skipped]
+            run.files = [p for p in run.files if p not in skipped]
+    summary["sessions"] += repeated
+    summary["repeated_paths"] = repeated
+    return summary
+
+
+def run_hosts(
+    runs: list[HostRun],
+    cache: SessionCache | None,
+    accumulator: AggregateAccumulator | None = None,
+    sinks: Iterable = (),
+    **options,
+) -> tuple[list[dict], list[str]]:
+    """모든 host 파이프라인을 동시에 실행하고 (sessions, warnings)를 deterministic 순서로 반환.
+
+    host마다 worker thread 1개 (로컬 파싱, 원격 preflight/fetch가 동시에 진행)이며, 결과는
+    HOST_RESULT_QUEUE_SIZE bounded queue로 main thread에 모인다. main thread는 cache 기록 후
+    host bucket에 쌓고, 모든 worker 종료 후 host 순서 → (수집 warnings 전체, host별 분석 warnings,
+    local은 files 순서 / remote는 path 순서의 결과와 파일별 warnings)로 merge한다.
+
+    accumulator가 주어지면 세션 dict를 모으지 않고 도착하는 대로 host별로 접어 (HostRun.fold)
+    host 순서로 accumulator에 merge한다 — 반환 sessions는 빈 list이고, accumulator.build 결과는
+    같은 sessions로 build_aggregate한 것과 같다. sinks (VerdictIndex, SampleEstimator)는 세션 결과를
+    접기 전에 sink.add(host, 정렬 key, 결과)로 받는다.
+    """
+    out: queue.Queue = queue.Queue(maxsize=HOST_RESULT_QUEUE_SIZE)
+    threads = [
+        threading.Thread(target=run_host, args=(run, cache, out), kwargs=options, daemon=True)
+        for run in runs
+    ]
+    for t in threads:
+        t.start()
+    active = len(threads)
+    while active:
+        run, item = out.get()
+        if item is None:
+            active -= 1
             continue
-        base_norm = posixpath.normpath(base)
+        key, path, result, file_warnings, cache_entry = item
+        detached = take_session_resume(cache, run.host, path, result)
+        if (take_session_profile(run.host, path, result) or detached) and cache_entry is not None:
+            cache_entry = (*cache_entry[:2], None)  # encoded에 profile/resume이 섞여 있으므로 재인코딩
+        if cache is not None and cache_entry is not None and result is not None:
+            size, mtime_ns, encoded = cache_entry
+            cache.put(run.host, path, size, mtime_ns, result, encoded=encoded)
+        if result is not None:
+            for sink in sinks:
+                sink.add(run.host, key, result)
+        if accumulator is not None:
+            run.fold(key, result, file_warnings)
+        else:
+            run.results.append((key, result, file_warnings))
+    for t in threads:
+        t.join()
+
+    sessions: list[dict] = []
+    warnings: list[str] = []
+    for run in runs:
+        warnings.extend(run.collect_warnings)
+    for run in runs:
+        warnings.extend(run.warnings)
+        if accumulator is not None:
+            accumulator.merge(run.folded.finish())
+            run.file_warnings.sort(key=lambda pair: pair[0])
+            for _, file_warnings in run.file_warnings:
+                warnings.extend(file_warnings)
+            continue
+        run.results.sort(key=lambda triple: triple[0])
+        for _, result, file_warnings in run.results:
+            if result is not None:
+                sessions.append(result)
+            warnings.extend(file_warnings)
+    return sessions, warnings
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Watch daemon (watch)
+# ─────────────────────────────────────────────────────────────────────────────
+
+WATCH_QUERIES = ("markdown", "json", "status")
+
+
+class WatchState:
+    """watch daemon의 host별 세션 상태 + 미리 렌더링한 markdown/JSON.
+
+    sessions[host]는 path → (size, mtime_ns, 1건짜리 AggregateAccumulator | None — 결과 없는 원격 빈
+    파일)이며 세션 dict는 보관하지 않는다. poll은 목록/(size, mtime)을 직전 poll과 비교해 새로 생기거나 바뀐 파일만 run_hosts로
+    분석하고 (cache hit / 이어 파싱 적용), 사라진 파일은 뺀다. 결과가 None (read/fetch 실패)인
+    파일은 기록하지 않아 다음 poll에서 재시도된다. 바뀐 것이 있으면 host 순서 → local은 수집 순서,
+    remote는 path 순서로 다시 merge해 렌더링하므로, 같은 파일 집합이면 aggregate가 일회성 실행과
+    같고 query는 저장된 문자열을 돌려주기만 한다. warnings는 host별 마지막 poll 것만 보인다.
+
+    dedup=True면 poll마다 목록 (이번에 polling하지 않은 host는 추적 중인 세션)으로
+    find_duplicate_sessions를 돌려 중복 사본은 분석/추적하지 않는다.
+    """
+
+    def __init__(
+        self, hosts: list[str], cur_host: str, cache: SessionCache | None, dedup: bool = False, **options
+    ):
+        self.hosts = hosts
+        self.cur_host = cur_host
+        self.cache = cache
+        self.dedup = dedup
+        self.dedup_stats: dict | None = None
+        self.options = options
+        self.sessions: dict[str, dict[str, tuple[int, int, AggregateAccumulator | None]]] = {h: {} for h in hosts}
+        self.order: dict[str, list[str]] = {h: [] for h in hosts}
+        self.collect_warnings: dict[str, list[str]] = {h: [] for h in hosts}
+        self.warnings: dict[str, list[str]] = {h: [] for h in hosts}
+        self.polls = 0
+        self.last_poll_seconds = 0.0
+        self.updated_at: str | None = None
+        self.rendered: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def poll(self, remote: bool = True) -> int:
+        """1회 poll 후 추가/변경/삭제된 세션 수를 반환. remote=False면 원격 host는 직전 상태 유지."""
+        started = time.perf_counter()
+        runs = []
+        listed: dict[str, tuple[list[str], dict[str, tuple[int, int]], bool]] = {}
+        for host in self.hosts:
+            is_remote = host != self.cur_host
+            if is_remote and not remote:
+                continue
+            collect_warnings: list[str] = []
+            metadata: dict[str, tuple[int, int]] = {}
+            if is_remote:
+                files = collect_remote_files(host, collect_warnings, metadata)
+            else:
+                files = collect_local_files(host)
+                for path in files:
+                    st = _stat_or_none(path)
+                    if st is not None:
+                        metadata[path] = (st.st_size, st.st_mtime_ns)
+            listed[host] = (files, metadata, not collect_warnings)
+            self.collect_warnings[host] = collect_warnings
+
+        updated = 0
+        if self.dedup:
+            updated += self._drop_duplicates(listed)
+
+        for host, (files, metadata, _) in listed.items():
+            known = self.sessions[host]
+            changed = [p for p in files if p in metadata and known.get(p, (None, None))[:2] != metadata[p]]
+            if changed:
+                run = HostRun(host, host != self.cur_host, changed)
+                run.metadata = metadata
+                runs.append(run)
+        if runs:
+            run_hosts(runs, self.cache, **self.options)
+            if self.cache is not None:
+                self.cache.flush()
+
+        analyzed = {run.host: run for run in runs}
+        for host, (files, metadata, complete) in listed.items():
+            entries = self.sessions[host]
+            run = analyzed.get(host)
+            self.warnings[host] = [] if run is None else list(run.warnings)
+            if run is not None:
+                for key, result, file_warnings in run.results:
+                    path = key if run.is_remote else run.files[key]
+                    self.warnings[host].extend(file_warnings)
+                    if result is None and metadata[path][0]:
+                        updated += entries.pop(path, None) is not None
+                        continue
+                    # 원격 빈 파일은 결과가 없는 것이 정상이므로 aggregate 기여 없이 기록해 재fetch를 막는다
+                    partial = None
+                    if result is not None:
+                        partial = AggregateAccumulator()
+                        partial.add(result)
+                    entries[path] = (*metadata[path], partial)
+                    updated += 1
+            # 원격 find가 실패한 poll은 목록이 부분적이라 사라진 파일로 보지 않는다
+            if complete or host == self.cur_host:
+                present = set(files)
+                removed = [p for p in entries if p not in present]
+                for path in removed:
+                    del entries[path]
+                updated += len(removed)
+                if removed and host != self.cur_host:
+                    mirror = open_remote_mirror(self.options.get("mirror_root"))
+                    if mirror is not None:
+                        mirror.prune(host, metadata)  # dedup으로 뺀 사본은 남긴다
+                        mirror.close()
+            self.order[host] = files if host == self.cur_host else sorted(entries)
+
+        self.polls += 1
+        self.last_poll_seconds = time.perf_counter() - started
+        if updated or not self.rendered:
+            self.render()
+        return updated
+
+    def _drop_duplicates(self, listed: dict) -> int:
+        """listed (이번 poll 목록)에서 중복 사본을 빼고, polling하지 않은 host의 추적 세션 중 중복이 된
+        것은 지운다. 지운 추적 세션 수를 반환."""
+        listings = []
+        for host in self.hosts:
+            if host in listed:
+                stats = listed[host][1]
+            else:
+                stats = {path: entry[:2] for path, entry in self.sessions[host].items()}
+            listings.append((host, host != self.cur_host, stats))
+        drop, self.dedup_stats = find_duplicate_sessions(listings, self.cache, self.collect_warnings)
+        removed = 0
+        for host, paths in drop.items():
+            if host in listed:
+                files, metadata, complete = listed[host]
+                listed[host] = ([p for p in files if p not in paths], metadata, complete)
+                continue
+            entries = self.sessions[host]
+            for path in paths:
+                removed += entries.pop(path, None) is not None
+            self.order[host] = [p for p in self.order[host] if p not in paths]
+        return removed
+
+    def render(self) -> None:
+        acc = AggregateAccumulator()
+        for host in self.hosts:
+            entries = self.sessions[host]
+            for path in self.order[host]:
+                entry = entries.get(path)
+                if entry is not None and entry[2] is not None:
+                    acc.merge(entry[2])
+        warnings = [w for host in self.hosts for w in self.collect_warnings[host]]
+        for host in self.hosts:
+            warnings.extend(self.warnings[host])
+        agg = acc.build(self.hosts, "live", warnings)
+        if self.dedup_stats is not None:
+            agg["dedup"] = self.dedup_stats
+        rendered = {"markdown": render_markdown(agg), "json": render_json(agg)}
+        with self._lock:
+            self.rendered = rendered
+            self.updated_at = agg["captured_at"]
+
+    def answer(self, query: str) -> str:
+        """socket query 응답. 첫 poll이 끝나기 전이나 모르는 query는 `ERROR:` 줄."""
+        with self._lock:
+            rendered = self.rendered
+            updated_at = self.updated_at
+        if query not in WATCH_QUERIES:
+            return f"ERROR: unknown query {query!r}. valid: {list(WATCH_QUERIES)}\n"
+        if query == "status":
+            status = {
+                "hosts": self.hosts,
+                "sessions": {h: len(self.sessions[h]) for h in self.hosts},
+                "polls": self.polls,
+                "last_poll_seconds": round(self.last_poll_seconds, 3),
+                "updated_at": updated_at,
+            }
+            return json.dumps(status, ensure_ascii=False) + "\n"
+        if not rendered:
+            return "ERROR: first poll in progress\n"
+        return rendered[query]
+
+
+class _WatchRequestHandler(socketserver.StreamRequestHandler):
+    """1 connection = query 1줄 (`markdown` / `json` / `status`) → 응답 후 close."""
+
+    def handle(self) -> None:
+        self.connection.settimeout(WATCH_QUERY_TIMEOUT_SECONDS)
         try:
-            if posixpath.commonpath([base_norm, path_norm]) == base_norm and path_norm != base_norm:
-                return True
-        except ValueError:
-            # absolute/relative mix 등 — 폐기
+            query = self.rfile.readline(64).decode("ascii", "replace").strip()
+            self.wfile.write(self.server.state.answer(query).encode())
+        except OSError:
+            pass
+
+
+class _WatchServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def open_watch_socket(state: WatchState, socket_path: str) -> _WatchServer:
+    """socket_path에 query server를 bind (owner 전용 0600). 응답하는 daemon이 이미 있으면 OSError,
+    이전 daemon이 남긴 stale socket 파일은 지우고 다시 bind한다. socket이 아닌 파일 (오타난 --socket,
+    symlink 포함)은 지우지 않고 OSError."""
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        mode = None
+    if mode is not None:
+        if not stat.S_ISSOCK(mode):
+            raise OSError(f"{socket_path} exists and is not a socket — refusing to replace it")
+        try:
+            query_watch(socket_path, "status")
+        except OSError:
+            os.unlink(socket_path)
+        else:
+            raise OSError(f"watch daemon already running on {socket_path}")
+    parent = os.path.dirname(socket_path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    old_umask = os.umask(0o177)
+    try:
+        server = _WatchServer(socket_path, _WatchRequestHandler)
+    finally:
+        os.umask(old_umask)
+    server.state = state
+    return server
+
+
+def query_watch(socket_path: str, query: str) -> str:
+    """실행 중인 watch daemon에 query 1건을 보내고 응답 전체를 반환 (연결 실패는 OSError)."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(WATCH_QUERY_TIMEOUT_SECONDS)
+        sock.connect(socket_path)
+        sock.sendall(query.encode() + b"\n")
+        chunks = []
+        while True:
+            chunk = sock.recv(1 << 16)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return b"".join(chunks).decode()
+
+
+def watch_loop(state: WatchState, interval: float, remote_interval: float, stop: threading.Event) -> None:
+    """stop이 set될 때까지 interval마다 poll (원격 host는 remote_interval마다). poll 예외는 경고 후 계속."""
+    next_remote = time.monotonic() + remote_interval
+    while not stop.wait(interval):
+        remote = time.monotonic() >= next_remote
+        if remote:
+            next_remote = time.monotonic() + remote_interval
+        try:
+            updated = state.poll(remote)
+        except Exception as e:
+            print(f"WARNING: watch poll failed: {type(e).__name__}: {e}", file=sys.stderr)
             continue
-    return False
+        if updated:
+            print(
+                f"watch: {updated} sessions updated in {state.last_poll_seconds:.2f}s",
+                file=sys.stderr,
+            )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+
+def parse_hosts(s: str) -> list[str]:
+    hosts = [h.strip() for h in s.split(",") if h.strip()]
+    for h in hosts:
+        if h not in VALID_HOSTS:
+            raise argparse.ArgumentTypeError(
+                f"invalid host: {h!r}. valid: {sorted(VALID_HOSTS)}"
+            )
+    return hosts
+
+
+def parse_jobs(s: str) -> int:
+    """--jobs 파싱. 0은 os.cpu_count()로 치환, 음수는 거부."""
+    try:
+        n = int(s)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid --jobs: {s!r}")
+    if n < 0:
+        raise argparse.ArgumentTypeError(f"--jobs must be >= 0: {n}")
+    return n or (os.cpu_count() or 1)
+
+
+def parse_json_arg(s: str) -> str:
+    """--json out=<path> 형식 파싱."""
+    if s.startswith("out="):
+        return s[4:]
+    return s
+
+
+def parse_sample_size(s: str) -> int:
+    """--sample 파싱. 1 이상 세션 수."""
+    try:
+        n = int(s)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid --sample: {s!r}")
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"--sample must be >= 1: {n}")
+    return n
+
+
+def parse_fraction(s: str) -> float:
+    """--sample-frac 파싱. (0, 1] 비율."""
+    try:
+        p = float(s)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid fraction: {s!r}")
+    if not 0 < p <= 1:
+        raise argparse.ArgumentTypeError(f"fraction must be in (0, 1]: {s}")
+    return p
+
+
+def parse_seconds(s: str) -> float:
+    """--interval 계열 파싱. 양수 초만 허용."""
+    try:
+        seconds = float(s)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid seconds: {s!r}")
+    if not seconds > 0:
+        raise argparse.ArgumentTypeError(f"seconds must be > 0: {s}")
+    return seconds
+
+
+def add_run_arguments(parser: argparse.ArgumentParser) -> None:
+    """일회성 실행과 watch daemon이 공유하는 host/cache/분석 option."""
+    parser.add_argument(
+        "--hosts",
+        type=parse_hosts,
+        default=["mac", "minipc"],
+        help="comma-separated host list (default: mac,minipc). whitelist: mac, minipc",
+    )
+    parser.add_argument(
+        "--cache",
+        type=str,
+        default=CACHE_DEFAULT_PATH,
+        help=f"session result cache SQLite path (default: {CACHE_DEFAULT_PATH})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="disable the session result cache (full reparse)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=parse_jobs,
+        default=1,
+        help="local analysis worker processes (default: 1 = serial, 0 = CPU count)",
+    )
+    parser.add_argument(
+        "--transport",
+        choices=("tar", "cat"),
+        default="tar",
+        help="remote jsonl fetch: tar = one ssh tar stream per batch (default), cat = one ssh cat per file",
+    )
+    parser.add_argument(
+        "--remote-exec",
+        action="store_true",
+        help="run the analyzer on each remote host (ssh host python3 -) and receive only session results",
+    )
+    parser.add_argument(
+        "--mirror",
+        type=str,
+        default=MIRROR_DEFAULT_PATH,
+        help=f"local mirror of remote jsonl; repeat runs fetch only new files and appended tails (default: {MIRROR_DEFAULT_PATH})",
+    )
+    parser.add_argument(
+        "--no-triage",
+        action="store_true",
+        help="fully parse every session (default: byte-level marker scan skips sessions that cannot carry a marker)",
+    )
+    parser.add_argument(
+        "--no-mirror",
+        action="store_true",
+        help="disable the remote mirror (fetch remote jsonl in full every run)",
+    )
+    parser.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="analyze every listed copy (default: sessions with identical content on several hosts/paths are analyzed and counted once)",
+    )
+
+
+def run_options(args: argparse.Namespace) -> dict:
+    """add_run_arguments 결과 → run_hosts keyword option."""
+    return {
+        "jobs": args.jobs,
+        "transport": args.transport,
+        "remote_exec": args.remote_exec,
+        "mirror_root": None if args.no_mirror else args.mirror,
+        "triage": not args.no_triage,
+    }
+
+
+def watch_main(argv: list[str]) -> int:
+    """`analyze.py watch` — 세션 디렉터리를 polling하며 aggregate를 갱신하고 Unix socket으로 응답.
+
+    `--ask markdown|json|status`는 daemon 대신 client로 동작해 실행 중인 daemon의 응답을 출력한다.
+    """
+    parser = argparse.ArgumentParser(
+        prog="analyze.py watch",
+        description="DA 세션 watch daemon — 변경 세션만 재분석하고 markdown/JSON을 Unix socket으로 제공",
+    )
+    add_run_arguments(parser)
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=WATCH_SOCKET_DEFAULT_PATH,
+        help=f"query socket path (default: {WATCH_SOCKET_DEFAULT_PATH})",
+    )
+    parser.add_argument(
+        "--interval",
+        type=parse_seconds,
+        default=WATCH_POLL_SECONDS,
+        help=f"local mtime polling interval in seconds (default: {WATCH_POLL_SECONDS:g})",
+    )
+    parser.add_argument(
+        "--remote-interval",
+        type=parse_seconds,
+        default=WATCH_REMOTE_POLL_SECONDS,
+        help=f"remote host polling interval in seconds, one ssh find per poll (default: {WATCH_REMOTE_POLL_SECONDS:g})",
+    )
+    parser.add_argument(
+        "--ask",
+        choices=WATCH_QUERIES,
+        default=None,
+        help="query a running daemon and print its answer instead of starting one",
+    )
+    args = parser.parse_args(argv)
+
+    if args.ask:
+        try:
+            answer = query_watch(args.socket, args.ask)
+        except OSError as e:
+            print(f"ERROR: watch daemon query failed ({args.socket}): {e}", file=sys.stderr)
+            return 1
+        if answer.startswith("ERROR:"):
+            print(answer, end="", file=sys.stderr)
+            return 1
+        sys.stdout.write(answer)
+        return 0
+
+    # --no-cache여도 daemon 수명 동안의 이어 파싱 상태는 메모리 cache에 둔다
+    cache = None if args.no_cache else open_session_cache(args.cache)
+    if cache is None:
+        cache = SessionCache(":memory:")
+    state = WatchState(args.hosts, current_host(), cache, not args.no_dedup, **run_options(args))
+    try:
+        server = open_watch_socket(state, args.socket)
+    except OSError as e:
+        print(f"ERROR: watch socket bind failed ({args.socket}): {e}", file=sys.stderr)
+        cache.close()
+        return 1
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        state.poll(remote=True)
+        print(
+            f"watch: {sum(len(e) for e in state.sessions.values())} sessions in {state.last_poll_seconds:.2f}s,"
+            f" serving {args.socket}",
+            file=sys.stderr,
+        )
+        watch_loop(state, args.interval, args.remote_interval, stop)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        with contextlib.suppress(OSError):
+            os.unlink(args.socket)
+        cache.close()
+    return 0
+
+
+def parse_choices(choices: Iterable[str], s: str) -> list[str]:
+    """comma list 값 검증 (query filter). 대소문자 무관, 정의된 표기로 정규화."""
+    canonical = {c.upper(): c for c in choices}
+    values = []
+    for item in (part.strip() for part in s.split(",")):
+        if not item:
+            continue
+        if item.upper() not in canonical:
+            raise argparse.ArgumentTypeError(f"invalid value: {item!r}. valid: {sorted(canonical.values())}")
+        values.append(canonical[item.upper()])
+    return values
+
+
+def query_main(argv: list[str]) -> int:
+    """`analyze.py query` — --index SQLite에서 filter에 맞는 M-1..M-5를 다시 계산 (jsonl 미접근).
+
+    `--list`는 aggregate 대신 매칭 verdict 행을 markdown 표로 출력한다.
+    """
+    parser = argparse.ArgumentParser(
+        prog="analyze.py query",
+        description="DA verdict index query — jsonl 재파싱 없이 filter별 M-1..M-5 재계산",
+    )
+    parser.add_argument("--index", type=str, required=True, help="SQLite file written by `analyze.py --index`")
+    parser.add_argument("--hosts", type=parse_hosts, default=None, help="comma-separated host filter")
+    parser.add_argument("--path", type=str, default=None, help="session path substring filter")
+    parser.add_argument(
+        "--since",
+        type=parse_time_bound,
+        default=None,
+        help="keep verdicts (and sessions active) at or after this time: ISO 8601 (UTC if no offset) or <N>h|d|w ago",
+    )
+    parser.add_argument(
+        "--until",
+        type=parse_time_bound,
+        default=None,
+        help="keep verdicts (and sessions active) before this time, same format as --since",
+    )
+    parser.add_argument(
+        "--verdict",
+        type=functools.partial(parse_choices, VERDICT_CATEGORIES),
+        default=None,
+        help=f"comma list of {', '.join(VERDICT_CATEGORIES)}",
+    )
+    parser.add_argument(
+        "--bundle",
+        type=functools.partial(parse_choices, sorted(set(BUNDLE_MAP.values()))),
+        default=None,
+        help="comma list of reviewer bundles (Correctness, Design, Regression, Maintainability)",
+    )
+    parser.add_argument(
+        "--severity",
+        type=functools.partial(parse_choices, SEVERITY_RANK),
+        default=None,
+        help="comma list of CRITICAL, HIGH, MEDIUM, LOW",
+    )
+    parser.add_argument(
+        "--source",
+        type=functools.partial(parse_choices, ("verdict_json", "md_header", "json_unmarked", "kv")),
+        default=None,
+        help="comma list of verdict source tiers",
+    )
+    parser.add_argument("--list", action="store_true", help="print the matching verdict rows instead of the metrics")
+    parser.add_argument(
+        "--json",
+        type=parse_json_arg,
+        default=None,
+        help="also write the query aggregate (or --list rows) as JSON to this path",
+    )
+    args = parser.parse_args(argv)
+    filters = {
+        name: getattr(args, name)
+        for name in ("hosts", "path", "since", "until", *INDEX_VERDICT_FILTERS)
+    }
 
+    try:
+        if args.list:
+            conn = open_index_readonly(args.index)
+            try:
+                rows = query_index_verdicts(conn, filters)
+            finally:
+                conn.close()
+            print(render_verdict_rows(rows))
+            payload = json.dumps(rows, indent=2, ensure_ascii=False)
+        else:
+            agg = query_index(args.index, filters)
+            print(render_markdown(agg))
+            payload = render_json(agg)
+    except (ValueError, sqlite3.Error) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
 
-def _validate_remote_path(host: str, path: str) -> None:
-    if not _allowed_remote_path(host, path):
-        raise ValueError(f"disallowed remote path for host {host}: {path!r}")
+    if args.json:
+        try:
+            with open(args.json, "w") as fp:
+                fp.write(payload)
+            print(f"\n---\nJSON: {args.json}", file=sys.stderr)
+        except OSError as e:
+            print(f"WARNING: JSON write failed: {e}", file=sys.stderr)
+    return 0
 
 
-def collect_remote_files(host: str, warnings: list[str]) -> list[str]:
-    """원격 호스트에서 jsonl 파일 path glob (subprocess.run 고정 argv).
+def parse_tolerance(s: str) -> tuple[str, float]:
+    """--tolerance 파싱. `<값>` (전체 기본) 또는 `<group>=<값>` (group: counts, M-1..M-5, derived)."""
+    group, sep, value = s.rpartition("=")
+    if not sep:
+        group = "default"
+    elif group not in GATE_METRIC_GROUPS:
+        raise argparse.ArgumentTypeError(f"unknown metric group: {group!r}. valid: {', '.join(GATE_METRIC_GROUPS)}")
+    try:
+        tolerance = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"--tolerance must be a number: {value!r}")
+    if tolerance < 0:
+        raise argparse.ArgumentTypeError(f"--tolerance must be >= 0: {tolerance}")
+    return group, tolerance
 
-    SSH 명령 인자에는 host-neutral relative tilde 표현 (`~/.claude/projects`,
-    `~/.codex/sessions`)을 사용해 host별 absolute home prefix hardcoded를 피한다.
-    원격 shell이 `~`를 해당 user의 home directory로 expansion한다.
 
-    원격 find stdout의 path 라인은 비신뢰 입력으로 간주하여, `_allowed_remote_path`가
-    통과한 line만 수집한다 — 제어문자/shell metacharacter/relative path/sibling-prefix
-    포함 line은 silently 폐기한다. 검증은 absolute `HOST_PATH_MAP` prefix와의
-    boundary 비교로 수행한다.
-    """
-    _validate_host(host)
-    all_files: list[str] = []
-    for base in ("~/.claude/projects", "~/.codex/sessions"):
-        try:
-            # SSH는 argv를 single string으로 합쳐 원격 shell에 전달하므로
-            # `*.jsonl`을 single-quote로 감싸 원격 glob expansion을 차단한다.
-            proc = subprocess.run(
-                ["ssh", host, "find", base, "-type", "f", "-name", "'*.jsonl'"],
-                capture_output=True,
-                text=True,
-                timeout=SSH_FIND_TIMEOUT_SECONDS,
-            )
-            if proc.returncode != 0:
-                warnings.append(
-                    f"host {host}: ssh find failed (rc={proc.returncode}) for {base}"
-                )
-                continue
-            for line in proc.stdout.splitlines():
-                if "/subagents/" in line:
-                    continue
-                if not _allowed_remote_path(host, line):
-                    continue
-                all_files.append(line)
-        except subprocess.TimeoutExpired:
-            warnings.append(f"host {host}: ssh find timeout for {base} — partial result")
-        except FileNotFoundError:
-            warnings.append(f"host {host}: ssh binary not found — partial result")
-    return all_files
+def gate_main(argv: list[str]) -> int:
+    """`analyze.py gate` — pinned corpus를 바뀐 파일만 재분석해 baseline aggregate와 허용치로 비교.
 
+    exit code: 0 통과 (또는 --update 기록) / 1 허용치 초과 / 2 manifest·baseline 읽기 실패 또는
+    결과 없는 pinned 파일 (fetch 실패 등 — 부분 corpus로는 판정하지 않는다).
+    """
+    parser = argparse.ArgumentParser(
+        prog="analyze.py gate",
+        description="DA 회귀 게이트 — content가 바뀐 pinned 파일만 재분석하고 baseline과 metric별 허용치로 비교",
+    )
+    add_run_arguments(parser)
+    parser.add_argument("--corpus", type=str, required=True, help="pinned manifest.json path")
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=None,
+        help="baseline aggregate JSON (default: <manifest dir>/<snapshot_id>.baseline.json;"
+        " if missing, the manifest captured_metric_summary)",
+    )
+    parser.add_argument(
+        "--store",
+        type=str,
+        default=None,
+        help="per-file content digest + result store (default: <manifest dir>/<snapshot_id>.gate.json)",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=parse_tolerance,
+        action="append",
+        default=[],
+        help=f"allowed drift: <N> for every metric or <group>=<N> (groups: {', '.join(GATE_METRIC_GROUPS)});"
+        f" percentage points for rates, relative %% for counts (default: {GATE_DEFAULT_TOLERANCE:g}), repeatable",
+    )
+    parser.add_argument(
+        "--blob-store",
+        type=str,
+        default=None,
+        help=f"snapshot blob store (default: manifest blob_store, else {BLOB_STORE_DEFAULT_PATH})",
+    )
+    parser.add_argument("--update", action="store_true", help="record the current aggregate as the baseline instead of comparing")
+    parser.add_argument(
+        "--json",
+        type=parse_json_arg,
+        default=None,
+        help="also write the aggregate with a `gate` section to this path",
+    )
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
 
-def fetch_remote_file(host: str, path: str, warnings: list[str]) -> str | None:
-    """원격 jsonl 내용 가져오기. SSH 실패는 warnings 누적 + None 반환 (partial result)."""
-    _validate_host(host)
-    _validate_remote_path(host, path)
     try:
-        proc = subprocess.run(
-            ["ssh", host, "cat", path],
-            capture_output=True,
-            text=True,
-            timeout=SSH_CAT_TIMEOUT_SECONDS,
-        )
-    except subprocess.TimeoutExpired:
-        warnings.append(f"host {host}: ssh cat timeout for {path} — partial result")
-        return None
-    except FileNotFoundError:
-        warnings.append(f"host {host}: ssh binary not found — partial result")
-        return None
-    if proc.returncode != 0:
-        warnings.append(
-            f"host {host}: ssh cat failed (rc={proc.returncode}) for {path} — partial result"
-        )
-        return None
-    return proc.stdout
+        with open(args.corpus, "r") as fp:
+            manifest = json.load(fp)
+    except Exception as e:
+        print(f"ERROR: corpus manifest read failed: {e}", file=sys.stderr)
+        return 2
+    snapshot_id = manifest.get("snapshot_id", "pinned")
+    default_baseline, default_store = gate_paths(args.corpus, snapshot_id)
+    baseline_path = args.baseline or default_baseline
+    store_path = args.store or default_store
+    tolerances = {"default": GATE_DEFAULT_TOLERANCE, **dict(args.tolerance)}
 
+    warnings: list[str] = []
+    files_by_host = classify_corpus_files(manifest.get("files", []), args.hosts, warnings)
+    cur_host = current_host()
+    runs = [HostRun(host, host != cur_host, files) for host, files in files_by_host.items()]
+    attach_snapshot_blobs(runs, manifest, open_blob_store(manifest, args.corpus, args.blob_store))
+    cache = None if args.no_cache else open_session_cache(args.cache)
 
-def check_controlmaster_active(host: str, warnings: list[str]) -> bool:
-    """ControlMaster master socket이 활성인지 확인. 비활성이면 master 생성을 1회 시도 후 재확인.
+    # 1. content digest (snapshot manifest는 기록값) — 원격은 stat + sha256sum만 (jsonl 본문 전송 없음)
+    digest_warnings: dict[str, list[str]] = {run.host: [] for run in runs}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(len(runs), 1)) as pool:
+        host_digests = dict(zip(
+            [run.host for run in runs],
+            pool.map(lambda run: gate_file_digests(run, cache, digest_warnings[run.host]), runs),
+        ))
+    for run in runs:
+        warnings.extend(digest_warnings[run.host])
 
-    `ssh -O check <host>`는 master 부재 시 실패한다. 따라서 실패 시 일반 `ssh <host> true`로
-    master 생성 시도 후 다시 `-O check`로 확인하는 2단계 sequence로 구성한다.
+    # 2. dedup — 일회성 --corpus 실행과 같은 규칙 (반복 path, content가 같은 사본은 1개만)
+    dropped = None
+    if not args.no_dedup:
+        listed = sum(len(run.files) for run in runs)
+        for run in runs:
+            run.files = list(dict.fromkeys(run.files))
+        drop = select_duplicates(
+            {(host, p): d for host, digests in host_digests.items() for p, (size, d) in digests.items() if size},
+            {run.host: i for i, run in enumerate(runs)},
+            {run.host for run in runs if run.is_remote},
+        )
+        for run in runs:
+            run.files = [p for p in run.files if p not in drop.get(run.host, ())]
+        dropped = listed - sum(len(run.files) for run in runs)
 
-    반환값이 False이면 caller가 해당 host fetch를 skip한다 (fail-fast).
-    """
-    _validate_host(host)
+    # 3. store의 digest가 같은 파일은 저장된 결과 재사용, 나머지만 재분석
+    store = load_gate_store(store_path, snapshot_id)
+    entries: dict[tuple[str, str], dict] = {}
+    results: dict[tuple[str, str], dict | None] = {}
+    changed_runs = []
+    for run in runs:
+        todo = []
+        for path in dict.fromkeys(run.files):
+            digest = host_digests[run.host].get(path)
+            entry = store.get((run.host, path))
+            if digest is not None and entry is not None and entry.get("sha256") == digest[1]:
+                entries[(run.host, path)] = entry
+                results[(run.host, path)] = None if entry["result"] is None else decode_session(entry["result"])
+            else:
+                todo.append(path)
+        if todo:
+            changed = HostRun(run.host, run.is_remote, todo)
+            changed.metadata = run.metadata
+            changed.blobs, changed.blob_store = run.blobs, run.blob_store
+            changed_runs.append(changed)
+    reused = len(results)
+    collector = _ResultCollector()
+    if changed_runs:
+        _, host_warnings = run_hosts(changed_runs, cache, AggregateAccumulator(), [collector], **run_options(args))
+        warnings.extend(host_warnings)
+    if cache is not None:
+        cache.close()
+    results_changed = 0
+    missing = []
+    for run in changed_runs:
+        for path in run.files:
+            result = collector.results.get((run.host, path))
+            digest = host_digests[run.host].get(path)
+            if result is None and (digest is None or digest[0] > 0):
+                missing.append(path)  # 빈 파일이 아닌데 결과 없음 — fetch/읽기 실패
+                continue
+            results[(run.host, path)] = result
+            if digest is None:
+                continue
+            encoded = None if result is None else encode_session(result)
+            result_digest = hashlib.sha256((encoded or "").encode()).hexdigest()[:16]
+            previous = store.get((run.host, path))
+            if previous is not None and previous.get("result_digest") != result_digest:
+                results_changed += 1
+            entries[(run.host, path)] = {"sha256": digest[1], "result_digest": result_digest, "result": encoded}
     try:
-        proc = subprocess.run(
-            ["ssh", "-O", "check", host],
-            capture_output=True,
-            text=True,
-            timeout=SSH_CONTROLMASTER_CHECK_TIMEOUT_SECONDS,
+        save_gate_store(store_path, snapshot_id, entries)
+    except OSError as e:
+        print(f"WARNING: gate store write failed ({store_path}): {e}", file=sys.stderr)
+    if missing:
+        for path in missing:
+            print(f"ERROR: gate: pinned file has no result: {path}", file=sys.stderr)
+        for w in warnings:
+            print(f"WARNING: {w}", file=sys.stderr)
+        return 2
+
+    # 4. aggregate — --corpus 실행의 fold 순서 (로컬 manifest 순, 원격 path 순)
+    accumulator = AggregateAccumulator()
+    for run in runs:
+        for path in sorted(run.files) if run.is_remote else run.files:
+            accumulator.add(results.get((run.host, path)))
+    agg = accumulator.build(args.hosts, snapshot_id, warnings)
+    current = gate_values(agg)
+
+    if args.update:
+        try:
+            tmp = baseline_path + ".tmp"
+            with open(tmp, "w") as fp:
+                fp.write(render_json(agg))
+            os.replace(tmp, baseline_path)
+        except OSError as e:
+            print(f"ERROR: baseline write failed ({baseline_path}): {e}", file=sys.stderr)
+            return 2
+        print(
+            f"gate {snapshot_id}: baseline recorded ({baseline_path}) — reused {reused},"
+            f" reanalyzed {len(results) - reused} ({time.perf_counter() - started:.1f}s)",
+            file=sys.stderr,
         )
-        if proc.returncode == 0:
-            return True
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        pass
-    # master 부재로 추정 — `ssh true`로 master 생성 시도
+        return 0
+
+    keys = None
     try:
-        gen = subprocess.run(
-            ["ssh", host, "true"],
-            capture_output=True,
-            text=True,
-            timeout=SSH_CONTROLMASTER_CHECK_TIMEOUT_SECONDS,
-        )
-        if gen.returncode != 0:
-            warnings.append(
-                f"host {host}: ssh true (ControlMaster 생성 시도) 실패 (rc={gen.returncode}) — fetch skip"
+        with open(baseline_path, "r") as fp:
+            baseline = gate_values(json.load(fp))
+        baseline_label = baseline_path
+    except FileNotFoundError:
+        summary = manifest.get("captured_metric_summary") or {}
+        baseline = {GATE_SUMMARY_KEYS[k]: (float(v), "pp") for k, v in summary.items() if k in GATE_SUMMARY_KEYS}
+        if not baseline:
+            print(
+                f"ERROR: baseline not found: {baseline_path} — `gate --update`로 기록하거나"
+                " manifest captured_metric_summary 필요",
+                file=sys.stderr,
             )
-            return False
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        warnings.append(
-            f"host {host}: ssh true 시간 초과 또는 binary 부재 — fetch skip"
-        )
-        return False
-    # 재확인
-    try:
-        re_check = subprocess.run(
-            ["ssh", "-O", "check", host],
-            capture_output=True,
-            text=True,
-            timeout=SSH_CONTROLMASTER_CHECK_TIMEOUT_SECONDS,
-        )
-        if re_check.returncode == 0:
-            return True
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        pass
-    warnings.append(
-        f"host {host}: ControlMaster 재확인 실패 — fetch skip"
+            return 2
+        keys = list(baseline)
+        baseline_label = "manifest captured_metric_summary"
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"ERROR: baseline read failed ({baseline_path}): {e}", file=sys.stderr)
+        return 2
+
+    checks = compare_gate(baseline, current, tolerances, keys)
+    failed = sum(1 for c in checks if not c["ok"])
+    gate = {
+        "snapshot_id": snapshot_id,
+        "baseline": baseline_label,
+        "files": sum(len(files) for files in files_by_host.values()),
+        "reused": reused,
+        "reanalyzed": len(results) - reused,
+        "results_changed": results_changed,
+        "tolerances": tolerances,
+        "status": "fail" if failed else "pass",
+        "checks": checks,
+    }
+    if dropped is not None:
+        gate["dedup"] = dropped
+    markdown = _render_gate(gate)
+    if agg["warnings"]:
+        markdown += "\n\n---\n⚠ Warnings:\n" + "\n".join(f"- {w}" for w in agg["warnings"])
+    print(markdown)
+    print(
+        f"gate {snapshot_id}: {'FAIL' if failed else 'PASS'} — {failed}/{len(checks)} checks over tolerance,"
+        f" reused {reused}, reanalyzed {gate['reanalyzed']} ({time.perf_counter() - started:.1f}s)",
+        file=sys.stderr,
     )
-    return False
+    if args.json:
+        agg["gate"] = gate
+        try:
+            with open(args.json, "w") as fp:
+                fp.write(render_json(agg))
+            print(f"\n---\nJSON: {args.json}", file=sys.stderr)
+        except OSError as e:
+            print(f"WARNING: JSON write failed: {e}", file=sys.stderr)
+    return 1 if failed else 0
 
 
-def analyze_remote_session(host: str, path: str, warnings: list[str]) -> dict | None:
-    """원격 jsonl을 fetch하여 임시 파일에 쓰고 analyze_session 호출."""
-    content = fetch_remote_file(host, path, warnings)
-    if content is None or not content:
-        return None
-    import tempfile
-    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as tf:
-        tf.write(content)
-        tmp_path = tf.name
+def snapshot_main(argv: list[str]) -> int:
+    """`analyze.py snapshot` — manifest의 pinned 파일을 blob store에 고정하고 content digest를 기록.
+
+    이미 blob이 있는 항목은 건너뛰고 (--refresh면 현재 content로 다시 고정), 나머지만 읽거나 받는다.
+    한 파일이라도 고정하지 못하면 manifest를 바꾸지 않고 exit 1 — 이미 기록한 blob은 store에
+    남으므로 재실행은 실패분만 전송한다.
+    """
+    parser = argparse.ArgumentParser(
+        prog="analyze.py snapshot",
+        description="pinned corpus snapshot — manifest files를 content-addressed gzip blob store에 고정하고 digest를 manifest에 기록",
+    )
+    parser.add_argument("--corpus", type=str, required=True, help="pinned manifest.json path")
+    parser.add_argument(
+        "--hosts",
+        type=parse_hosts,
+        default=["mac", "minipc"],
+        help="comma-separated host list (default: mac,minipc). whitelist: mac, minipc",
+    )
+    parser.add_argument(
+        "--blob-store",
+        type=str,
+        default=None,
+        help=f"blob store directory (default: manifest blob_store, else {BLOB_STORE_DEFAULT_PATH})",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="write the updated manifest here instead of rewriting --corpus in place",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="re-capture files that already have a blob (default: keep the pinned content)",
+    )
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+
     try:
-        return analyze_session(tmp_path)
-    finally:
-        try:
-            os.unlink(tmp_path)
-        except OSError:
-            pass
+        with open(args.corpus, "r") as fp:
+            manifest = json.load(fp)
+    except Exception as e:
+        print(f"ERROR: corpus manifest read failed: {e}", file=sys.stderr)
+        return 1
+    snapshot_id = manifest.get("snapshot_id", "pinned")
+    store = open_blob_store(manifest, args.corpus, args.blob_store)
+    previous = manifest.get("blobs") if isinstance(manifest.get("blobs"), dict) else {}
+    warnings: list[str] = []
+    files_by_host = classify_corpus_files(manifest.get("files", []), args.hosts, warnings)
+    cur_host = current_host()
 
+    # 이미 고정된 항목 — blob이 store에 있으면 그대로 둔다
+    blobs: dict[str, dict] = dict(previous)
+    todo: dict[str, list[str]] = {}
+    kept = 0
+    for host, files in files_by_host.items():
+        files = list(dict.fromkeys(files))
+        if args.refresh:
+            todo[host] = files
+        else:
+            todo[host] = [
+                p for p in files if not (isinstance(previous.get(p), dict) and store.has(previous[p]["sha256"]))
+            ]
+        kept += len(files) - len(todo[host])
 
-# ─────────────────────────────────────────────────────────────────────────────
-# CLI
-# ─────────────────────────────────────────────────────────────────────────────
+    host_warnings: dict[str, list[str]] = {host: [] for host in todo}
 
-def parse_hosts(s: str) -> list[str]:
-    hosts = [h.strip() for h in s.split(",") if h.strip()]
-    for h in hosts:
-        if h not in VALID_HOSTS:
-            raise argparse.ArgumentTypeError(
-                f"invalid host: {h!r}. valid: {sorted(VALID_HOSTS)}"
-            )
-    return hosts
+    def _capture(host: str) -> dict[str, dict]:
+        if host != cur_host:
+            return snapshot_remote_files(host, todo[host], store, host_warnings[host])
+        return snapshot_local_files(host, todo[host], store, host_warnings[host])
 
+    # 로컬을 먼저 고정해 원격 사본 중 같은 content는 sha256sum만으로 건너뛴다 (전송 없음)
+    captured = {host: _capture(host) for host in todo if host == cur_host}
+    remote = [host for host in todo if host != cur_host]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(len(remote), 1)) as pool:
+        captured.update(zip(remote, pool.map(_capture, remote)))
+    for host in todo:
+        warnings.extend(host_warnings[host])
 
-def parse_json_arg(s: str) -> str:
-    """--json out=<path> 형식 파싱."""
-    if s.startswith("out="):
-        return s[4:]
-    return s
+    failed = []
+    for host, files in todo.items():
+        for path in files:
+            entry = captured[host].get(path)
+            if entry is None:
+                failed.append(path)
+                continue
+            pinned = previous.get(path)
+            if not args.refresh and isinstance(pinned, dict) and pinned.get("sha256") != entry["sha256"]:
+                # blob이 사라진 고정 항목 — 현재 content가 다르면 원래 snapshot을 복구할 수 없다
+                warnings.append(f"snapshot blob 유실 + content 변경 — {path} (--refresh로 다시 고정)")
+                failed.append(path)
+                continue
+            blobs[path] = entry
+    for w in warnings:
+        print(f"WARNING: {w}", file=sys.stderr)
+    if failed:
+        for path in failed:
+            print(f"ERROR: snapshot: not captured: {path}", file=sys.stderr)
+        print(f"ERROR: snapshot {snapshot_id}: {len(failed)} files not captured — manifest unchanged", file=sys.stderr)
+        return 1
+
+    manifest["blob_store"] = store.root
+    manifest["blobs"] = blobs
+    manifest["blobs_captured_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    output = args.output or args.corpus
+    try:
+        tmp = output + ".tmp"
+        with open(tmp, "w") as fp:
+            json.dump(manifest, fp, indent=2, ensure_ascii=False)
+            fp.write("\n")
+        os.replace(tmp, output)
+    except OSError as e:
+        print(f"ERROR: manifest write failed ({output}): {e}", file=sys.stderr)
+        return 1
+    captured_count = sum(len(files) for files in todo.values())
+    print(
+        f"snapshot {snapshot_id}: {captured_count} captured, {kept} already pinned;"
+        f" {store.stored} new blobs ({store.raw_bytes / 1e6:.1f} MB → {store.blob_bytes / 1e6:.1f} MB gzip),"
+        f" {captured_count - store.stored} deduplicated ({time.perf_counter() - started:.1f}s) → {output}",
+        file=sys.stderr,
+    )
+    return 0
 
 
-def main() -> int:
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["watch"]:
+        return watch_main(argv[1:])
+    if argv[:1] == ["query"]:
+        return query_main(argv[1:])
+    if argv[:1] == ["gate"]:
+        return gate_main(argv[1:])
+    if argv[:1] == ["snapshot"]:
+        return snapshot_main(argv[1:])
     parser = argparse.ArgumentParser(
         prog="analyze.py",
         description="DA 세션 정량 분석 — analyzing-da-sessions Skill SSOT",
+        epilog="subcommands: watch (incremental daemon + Unix socket query, `analyze.py watch --help`),"
+        " query (filtered metrics from an --index file, `analyze.py query --help`),"
+        " gate (pinned corpus regression gate against a stored baseline, `analyze.py gate --help`),"
+        " snapshot (pin manifest files into a content-addressed blob store, `analyze.py snapshot --help`)",
     )
+    add_run_arguments(parser)
     parser.add_argument(
-        "--hosts",
-        type=parse_hosts,
-        default=["mac", "minipc"],
-        help="comma-separated host list (default: mac,minipc). whitelist: mac, minipc",
+        "--corpus",
+        type=str,
+        default=None,
+        help="pinned manifest.json path for ±5% regression gate (default: live home log);"
+        " a manifest with `blobs` (analyze.py snapshot) is read from the blob store without ssh",
     )
     parser.add_argument(
-        "--corpus",
+        "--blob-store",
         type=str,
         default=None,
-        help="pinned manifest.json path for ±5% regression gate (default: live home log)",
+        help=f"snapshot blob store for --corpus (default: manifest blob_store, else {BLOB_STORE_DEFAULT_PATH})",
     )
     parser.add_argument(
         "--json",
@@ -967,7 +6251,44 @@ def main() -> int:
         default=None,
         help="JSON sidecar output path (default: /tmp/analyze-da-sessions-<ISO>.json)",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="record per-stage/per-host wall and CPU time, ssh fetch latency and the slowest sessions into the JSON sidecar `profile` section",
+    )
+    parser.add_argument(
+        "--index",
+        type=str,
+        default=None,
+        help="also write every session and extracted verdict to this SQLite file for `analyze.py query`",
+    )
+    sampling = parser.add_mutually_exclusive_group()
+    sampling.add_argument(
+        "--sample",
+        type=parse_sample_size,
+        default=None,
+        help="analyze only N sessions, stratified by host and source (claude/codex), and report M-1..M-3 estimates with bootstrap intervals",
+    )
+    sampling.add_argument(
+        "--sample-frac",
+        type=parse_fraction,
+        default=None,
+        help="like --sample with a fraction of the listed sessions (0 < p <= 1)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="sampling and bootstrap seed; the same listing and seed give the same sample and intervals (default: 0)",
+    )
+    parser.add_argument(
+        "--bucket",
+        choices=BUCKET_UNITS,
+        default=None,
+        help="also compute every metric per UTC day/week/month of session start (record timestamp, mtime fallback) in the same scan",
+    )
+    args = parser.parse_args(argv)
+    profile = enable_profile() if args.profile else None
 
     warnings: list[str] = []
     cur_host = current_host()
@@ -981,103 +6302,127 @@ def main() -> int:
         except Exception as e:
             print(f"ERROR: corpus manifest read failed: {e}", file=sys.stderr)
             return 1
-        all_files = manifest.get("files", [])
-        # host 분류는 HOST_PATH_MAP base prefix 순회 — 호스트 추가 시 한 곳만 수정.
-        # 미매칭 path는 silent host 배정 대신 warning만 누적한다 (예전 단순 /Users/-mac
-        # /home/-minipc fallback은 HOST_PATH_MAP 경계를 우회하는 별도 규칙이라 제거 —
-        # 새 host 지원은 HOST_PATH_MAP에 명시 추가가 정답).
-        # live mode와 동일하게 (a) /subagents/ 하위는 wrapper output이라 제외하고
-        # (b) --hosts whitelist 밖 host로 분류된 path는 분석에서 제외한다.
-        files_by_host: dict[str, list[str]] = defaultdict(list)
-        for f in all_files:
-            if "/subagents/" in f:
-                continue
-            matched_host = None
-            for host_alias, host_paths in HOST_PATH_MAP.items():
-                for base in (host_paths.get("claude", ""), host_paths.get("codex", "")):
-                    if base and f.startswith(base + os.sep):
-                        matched_host = host_alias
-                        break
-                if matched_host is not None:
-                    break
-            if matched_host is None:
-                warnings.append(f"corpus host unclassified (HOST_PATH_MAP 미일치): {f}")
-            elif matched_host in args.hosts:
-                files_by_host[matched_host].append(f)
+        files_by_host = classify_corpus_files(manifest.get("files", []), args.hosts, warnings)
         corpus_label = manifest.get("snapshot_id", "pinned")
     else:
-        files_by_host = defaultdict(list)
-        for host in args.hosts:
-            if host == cur_host:
-                files_by_host[host] = collect_local_files(host)
-            else:
-                files_by_host[host] = collect_remote_files(host, warnings)
+        files_by_host = None
         corpus_label = "live"
 
-    # 분석 — host 순차 처리, remote host는 ControlMaster preflight 후 worker pool dispatch.
-    # 각 worker는 local warnings list로 분리 수집한 뒤 main thread에서 path 순으로 merge
-    # 한다 (warning ordering deterministic 보장).
-    sessions: list[dict] = []
-
-    for host, files in files_by_host.items():
-        is_remote = host != cur_host
-        if not is_remote:
-            # local: 직렬 처리 (파일 read는 빠름, 동시성 이득 미미)
-            for path in files:
-                result = analyze_session(path)
-                if result is not None:
-                    sessions.append(result)
-            continue
-
-        # 빈 remote files list (예: corpus 모드에서 해당 host 미분류 파일)는 ControlMaster
-        # preflight 비용 (~30s timeout)을 회피해 즉시 다음 host로 진행한다.
-        if not files:
-            continue
+    # 분석 — host별 worker thread가 동시에 수집/cache 조회/fetch/파싱하고 bounded queue로
+    # main thread에 결과를 넘긴다. merge는 host 순서 + path 순이라 warning ordering은 deterministic.
+    if files_by_host is None:
+        runs = [HostRun(host, host != cur_host) for host in args.hosts]
+    else:
+        runs = [HostRun(host, host != cur_host, files) for host, files in files_by_host.items()]
+        # snapshot manifest면 host 대신 blob store를 읽는다 — ssh 없이 고정된 입력
+        blob_store = open_blob_store(manifest, args.corpus, args.blob_store)
+        pinned = attach_snapshot_blobs(runs, manifest, blob_store)
+        if pinned:
+            print(f"corpus: {pinned} pinned files from snapshot blob store ({blob_store.root})", file=sys.stderr)
+    cache = None if args.no_cache else open_session_cache(args.cache)
+    # 동기화/복사로 여러 host·path에 있는 같은 세션은 1개만 fetch/파싱/집계한다
+    dedup = None
+    if not args.no_dedup:
+        with profile_stage("all", "dedup"):
+            dedup = dedupe_host_runs(runs, cache)
+    # --sample: 층화 표본 세션만 분석하고 SampleEstimator가 추정 구간을 계산한다
+    sample = None
+    if args.sample is not None or args.sample_frac is not None:
+        with profile_stage("all", "sample"):
+            sample = sample_host_runs(runs, args.sample, args.sample_frac, args.seed)
+    index = open_verdict_index(args.index, [run.host for run in runs])
+    # --bucket: 같은 scan에서 세션 시작 시각 구간별로도 접는다
+    trend = TrendBuckets(runs, args.bucket) if args.bucket else None
+    # 세션 결과는 도착하는 대로 accumulator에 접혀 버려진다 — 메모리는 corpus 크기와 무관
+    accumulator = AggregateAccumulator()
+    try:
+        with profile_stage("all", "hosts"):
+            _, host_warnings = run_hosts(
+                runs,
+                cache,
+                accumulator,
+                [sink for sink in (index, sample, trend) if sink is not None],
+                **run_options(args),
+            )
+    except BaseException:
+        if index is not None:
+            index.abort()
+        raise
+    warnings.extend(host_warnings)
 
-        # remote: ControlMaster preflight + worker pool.
-        # ControlMaster 비활성이면 K=1 강등이 5526 파일 직렬 fetch ≈ 37분으로 5분 timeout
-        # 안에 끝나기 어려우므로 fail-fast로 host 전체 fetch를 skip하고 명시적 warning을
-        # 누적한다. 사용자가 ControlMaster 활성화 (mac nrs 등) 누락을 즉시 인지할 수 있다.
-        cm_active = check_controlmaster_active(host, warnings)
-        if not cm_active:
-            warnings.append(
-                f"host {host}: ControlMaster 비활성으로 fetch skip — 활성화 후 재실행 필요"
-                f" (직렬 fallback은 5분 budget 안에 완료 불가능). minipc는 nrs, mac은 사용자 수동 nrs."
+    if index is not None:
+        try:
+            index.commit(args.hosts, corpus_label)
+            print(
+                f"verdict index: {index.sessions} sessions, {index.verdicts} verdicts ({index.db_path})",
+                file=sys.stderr,
             )
-            continue
+        except (OSError, sqlite3.Error) as e:
+            index.abort()
+            print(f"WARNING: verdict index write failed ({index.db_path}): {e}", file=sys.stderr)
 
-        # remote_warnings는 worker별로 분리 수집 후 main thread에서 path 순으로 merge.
-        # CPython GIL이 list.append를 atomic하게 보장하지만 worker 간 순서가 비결정적이므로
-        # 별도 list로 받아 deterministic ordering을 강제한다.
-        def _fetch_one(p: str) -> tuple[str, dict | None, list[str]]:
-            local_warnings: list[str] = []
-            res = analyze_remote_session(host, p, local_warnings)
-            return (p, res, local_warnings)
-
-        host_results: list[tuple[str, dict | None, list[str]]] = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=SSH_FETCH_WORKERS) as executor:
-            futures = {executor.submit(_fetch_one, p): p for p in files}
-            for fut in concurrent.futures.as_completed(futures):
-                try:
-                    host_results.append(fut.result())
-                except Exception as e:
-                    p = futures[fut]
-                    host_results.append((p, None, [
-                        f"host {host}: worker exception for {p}: {type(e).__name__}: {e}"
-                    ]))
-
-        # path 기준 정렬 후 sessions append + warnings merge (deterministic ordering).
-        host_results.sort(key=lambda triple: triple[0])
-        for _, result, local_warnings in host_results:
-            if result is not None:
-                sessions.append(result)
-            warnings.extend(local_warnings)
+    if cache is not None:
+        print(
+            f"session cache: hit {cache.hits}, miss {cache.misses}, resumed {cache.resumed} ({cache.db_path})",
+            file=sys.stderr,
+        )
+        cache.close()
 
     # aggregate
-    agg = build_aggregate(sessions, args.hosts, corpus_label, warnings)
+    with profile_stage("all", "aggregate"):
+        agg = accumulator.build(args.hosts, corpus_label, warnings)
+    if dedup is not None:
+        agg["dedup"] = dedup
+        print(
+            f"dedup: {dedup['sessions']} duplicate sessions skipped"
+            f" ({dedup['candidates']} size-matched candidates, {dedup['hashed']} hashed)",
+            file=sys.stderr,
+        )
+    if sample is not None:
+        with profile_stage("all", "sample_estimate"):
+            agg["sample"] = sample.build()
+        print(
+            f"sample: {agg['sample']['sampled']}/{agg['sample']['population']} sessions"
+            f" from {len(agg['sample']['strata'])} strata (seed {args.seed})",
+            file=sys.stderr,
+        )
+    if trend is not None:
+        with profile_stage("all", "trend"):
+            agg["trend"] = trend.build(args.hosts, corpus_label)
+        sources = agg["trend"]["time_source"]
+        print(
+            f"trend: {len(agg['trend']['series'])} {args.bucket} buckets (record timestamp {sources['timestamp']},"
+            f" mtime {sources['mtime']}, unknown {sources[BUCKET_UNKNOWN]})",
+            file=sys.stderr,
+        )
 
     # 출력: markdown stdout
-    print(render_markdown(agg))
+    with profile_stage("all", "render_markdown"):
+        markdown = render_markdown(agg)
+    print(markdown)
+
+    # ssh fetch 동시성/재시도 — 진단이라 JSON sidecar에만 붙인다 (원격 fetch가 없었으면 생략)
+    transport = transport_stats()
+    if transport:
+        agg["transport"] = transport
+        for host, stats in transport.items():
+            concurrency = stats["concurrency"]
+            print(
+                f"ssh fetch {host}: concurrency {concurrency['initial']}→{concurrency['final']}"
+                f" (min {concurrency['min']}, max {concurrency['max']}), {stats['requests']} requests,"
+                f" {stats['retries']} retries, {stats['gave_up']} gave up",
+                file=sys.stderr,
+            )
+
+    # --profile: 측정값이 아닌 진단이라 markdown에는 넣지 않고 JSON sidecar에만 붙인다
+    if profile is not None:
+        agg["profile"] = profile.build()
+        disable_profile()
+        print(
+            f"profile: {agg['profile']['wall_seconds']:.2f}s wall,"
+            f" {agg['profile']['sessions']['count']} sessions timed (JSON sidecar `profile`)",
+            file=sys.stderr,
+        )
 
     # 출력: JSON sidecar
     if args.json:
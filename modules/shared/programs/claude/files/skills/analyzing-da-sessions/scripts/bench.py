@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""analyze.py 처리량 benchmark — 합성 DA 세션 corpus 생성 + 단계별 측정 + baseline 회귀 게이트.
+
+Internal boundary:
+  - corpus generator   — generate_corpus, generate_session (Claude Code / Codex jsonl)
+  - stage runner       — run_stages (collect / parse / severity / aggregate / render)
+  - baseline gate      — compare_baseline, load_baseline, save_baseline
+
+단계 정의 (analyze.py 함수 경계와 1:1):
+  collect    collect_local_files (glob)
+  parse      SessionParser.feed_line (JSON decode + payload walk + anchor/tier/regex)
+  severity   SessionParser.finish (finding_id 색인 + severity 라벨링)
+  aggregate  build_aggregate
+  render     render_markdown + render_json
+
+CLI:
+  --sessions N / --codex-ratio R / --session-kb K / --nesting D / --marker-density R /
+  --intensity-density R / --image-density R / --tiers a,b,.. / --findings N / --rounds N / --seed S
+                           합성 corpus spec (기본값은 DEFAULT_SPEC).
+  --corpus-dir <path>      생성 corpus를 남길 디렉터리 (default: 임시 디렉터리, 종료 시 삭제).
+  --repeat N               단계 전체 반복 횟수 — 단계별 최고 처리량 채택 (default: 3).
+  --json out=<path>        결과 JSON 경로.
+  --baseline <path>        baseline JSON (default: ~/.cache/analyzing-da-sessions/bench-baseline.json).
+  --save-baseline          이번 결과를 baseline으로 저장 (비교 없음).
+  --threshold R            files/sec가 baseline 대비 R 비율 넘게 떨어지면 exit 1 (default: 0.25).
+
+Exit code: 0 통과 / 1 회귀 / 2 baseline spec 불일치 또는 읽기 실패.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import analyze  # noqa: E402
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 1. constants
+# ─────────────────────────────────────────────────────────────────────────────
+
+TIERS = ("verdict_json", "md_header", "json_unmarked", "kv", "nl_summary")
+STAGES = ("collect", "parse", "severity", "aggregate", "render")
+DEFAULT_SPEC = {
+    "sessions": 200,
+    "codex_ratio": 0.3,
+    "session_kb": 64,
+    "nesting": 2,
+    "marker_density": 0.2,
+    "intensity_density": 0.1,
+    "image_density": 0.0,
+    "tiers": list(TIERS),
+    "findings": 6,
+    "rounds": 2,
+    "seed": 0,
+}
+BASELINE_DEFAULT_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "analyzing-da-sessions",
+    "bench-baseline.json",
+)
+REGRESSION_THRESHOLD = 0.25  # files/sec 하락 허용 비율 (best-of-repeat 기준)
+GATE_MIN_SECONDS = 0.05  # baseline 시간이 이보다 짧은 단계는 timer/scheduler 잡음이 커서 처리량 게이트 제외
+
+FILLER_WORDS = (
+    "refactor", "module", "test", "config", "nix", "flake", "home-manager", "derivation",
+    "함수", "변경", "확인", "구현", "파일", "설정", "리뷰", "수정",
+)
+IMAGE_KB = 96  # --image-density record 1개의 base64 image 크기 (screenshot tool result 수준)
+BUNDLES = ("Correctness", "Design", "Regression", "Maintainability")
+SEVERITIES = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 2. corpus generator
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def _wrap(text: str, depth: int) -> object:
+    """payload nesting — text를 depth 단계의 dict/list로 감싼다 (extract_text_payloads walk 부하)."""
+    node: object = text
+    for level in range(depth):
+        node = [{"type": "block", "level": level, "data": node}]
+    return node
+
+
+def _record(kind: str, text: str, rng: random.Random, nesting: int, seq: int) -> dict:
+    """Claude Code 또는 Codex jsonl record 1개."""
+    ts = f"2026-01-01T00:{seq // 60 % 60:02d}:{seq % 60:02d}.000Z"
+    if kind == "codex":
+        return {
+            "timestamp": ts,
+            "type": "response_item",
+            "payload": {
+                "type": "message",
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": _wrap(text, nesting)}],
+            },
+        }
+    return {
+        "parentUuid": f"{rng.getrandbits(64):016x}",
+        "type": "assistant",
+        "uuid": f"{rng.getrandbits(64):016x}",
+        "timestamp": ts,
+        "message": {"role": "assistant", "content": [{"type": "text", "text": _wrap(text, nesting)}]},
+    }
+
+
+def _image_record(kind: str, rng: random.Random, seq: int) -> dict:
+    """base64 image를 담은 tool result record — payload walk가 건너뛰어야 하는 bulky field 부하."""
+    ts = f"2026-01-01T00:{seq // 60 % 60:02d}:{seq % 60:02d}.000Z"
+    data = base64.b64encode(rng.randbytes(IMAGE_KB * 768)).decode()
+    if kind == "codex":
+        return {
+            "timestamp": ts,
+            "type": "response_item",
+            "payload": {
+                "type": "message",
+                "role": "user",
+                "content": [{"type": "input_image", "image_url": f"data:image/png;base64,{data}"}],
+            },
+        }
+    tool_use_id = f"toolu_{rng.getrandbits(64):016x}"
+    return {
+        "parentUuid": f"{rng.getrandbits(64):016x}",
+        "type": "user",
+        "uuid": f"{rng.getrandbits(64):016x}",
+        "timestamp": ts,
+        "message": {"role": "user", "content": [{
+            "type": "tool_result",
+            "tool_use_id": tool_use_id,
+            "content": [{"type": "image", "source": {"type": "base64", "media_type": "image/png", "data": data}}],
+        }]},
+        "toolUseResult": {"type": "image", "file": {"base64": data, "type": "image/png"}},
+    }
+
+
+def _filler(rng: random.Random) -> str:
+    """verdict/marker regex에 걸리지 않는 잡음 text — markdown header, 코드 블록, `건` 포함."""
+    words = " ".join(rng.choice(FILLER_WORDS) for _ in range(rng.randint(20, 120)))
+    shape = rng.randrange(4)
+    if shape == 0:
+        return f"### 작업 메모\n{words}"
+    if shape == 1:
+        return f"```nix\n{{ {words} }}\n```"
+    if shape == 2:
+        return f"{words} — 변경 {rng.randint(1, 9)}건 반영"
+    return words
+
+
+def _verdict_payloads(tier: str, findings: list[tuple[str, str, str]], round_no: int) -> list[str]:
+    """tier 형식의 verdict payload 목록. findings: (finding_id, verdict, severity)."""
+    if tier == "verdict_json":
+        out = []
+        for fid, verdict, sev in findings:
+            body = json.dumps({"finding_id": fid, "verdict": verdict, "confidence": "HIGH",
+                               "stability_status": "stable"})
+            out.append(f"<!-- verdict-json:start -->\n```json\n{body}\n```\n<!-- verdict-json:end -->")
+            out.append(f"{fid} 근거 정리\n**심각도**: {sev}")
+        return out
+    if tier == "md_header":
+        return [f"### {fid} — {verdict}\n**심각도**: {sev}" for fid, verdict, sev in findings]
+    if tier == "json_unmarked":
+        items = [{"finding_id": fid, "verdict": verdict} for fid, verdict, _ in findings]
+        return [f"라운드 {round_no} 결과\n```json\n{json.dumps(items)}\n```"]
+    if tier == "kv":
+        lines = ["## Arbiter 검증 결과", ""]
+        for i, (_, verdict, _) in enumerate(findings, 1):
+            lines += [f"### finding-{i}", f"- **판정**: {verdict}", ""]
+        return ["\n".join(lines)]
+    confirmed = sum(1 for _, v, _ in findings if v == "CONFIRMED_ISSUE")
+    return [f"Arbiter 검증 결과 요약: CONFIRMED {confirmed}건, NOT_AN_ISSUE {len(findings) - confirmed}건"]
+
+
+def generate_session(path: str, spec: dict, rng: random.Random, kind: str, flags: dict) -> dict:
+    """세션 jsonl 1개 생성. flags: arbiter (bool), intensity (bool), tier (str | None).
+
+    반환: 이 세션이 aggregate에 기여해야 하는 기대값 (bytes, m1_n, m2_n).
+    """
+    payloads: list[str] = []
+    m1_n = m2_n = 0
+    if flags["intensity"]:
+        payloads.append(f"intensity 결과: /tmp/da-{rng.getrandbits(32):08x}-intensity-{rng.getrandbits(24):06x}")
+        payloads.append(f"검토 강도: {rng.choice(analyze.INTENSITY_VERDICTS)}")
+        m1_n = 1
+    if flags["arbiter"]:
+        payloads.append(f"결과는 /tmp/da-{rng.getrandbits(32):08x}-arbiter-{rng.getrandbits(24):06x} 에 저장됨.")
+        tier = flags["tier"]
+        for round_no in range(1, spec["rounds"] + 1):
+            findings = [
+                (f"{BUNDLES[i % len(BUNDLES)]}-{i + 1}",
+                 rng.choice(analyze.VERDICT_CATEGORIES),
+                 rng.choice(SEVERITIES))
+                for i in range(spec["findings"])
+            ]
+            payloads.extend(_verdict_payloads(tier, findings, round_no))
+            if tier != "nl_summary":
+                m2_n += len(findings)
+        stable = rng.randint(0, spec["findings"])
+        payloads.append(
+            f"selective: trigger {spec['findings']}건 → stable {stable}건, "
+            f"split {spec['findings'] - stable}건, fragmented 0건"
+        )
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    target = spec["session_kb"] * 1024
+    # 측정 대상 payload는 filler 사이에 고르게 흩어 놓는다 — k번째 payload는 target의 k/(n+1) 지점
+    share = target / (len(payloads) + 1)
+    written = seq = placed = 0
+    with open(path, "w", encoding="utf-8") as fp:
+        while written < target or payloads:
+            if payloads and written >= share * (placed + 1):
+                text = payloads.pop(0)
+                placed += 1
+            elif spec["image_density"] and rng.random() < spec["image_density"]:
+                text = None
+            else:
+                text = _filler(rng)
+            record = _image_record(kind, rng, seq) if text is None else _record(kind, text, rng, spec["nesting"], seq)
+            line = json.dumps(record, ensure_ascii=False) + "\n"
+            fp.write(line)
+            written += len(line.encode("utf-8"))
+            seq += 1
+    return {"bytes": written, "m1_n": m1_n, "m2_n": m2_n}
+
+
+def generate_corpus(root: str, spec: dict) -> dict:
+    """root 아래 HOST_PATH_MAP과 같은 구조로 Claude Code / Codex 세션 생성.
+
+    반환: {"claude": base, "codex": base, "files": n, "bytes": n, "expected": {...}} — expected는
+    생성 시점에 알고 있는 aggregate 기대값 (분모 / M-1 n / M-2 n)이라 generator 자체의 회귀 검증에 쓴다.
+    """
+    rng = random.Random(spec["seed"])
+    claude = os.path.join(root, ".claude", "projects")
+    codex = os.path.join(root, ".codex", "sessions")
+    expected = {"total": 0, "arbiter_marker_sessions": 0, "intensity_marker_sessions": 0, "m1_n": 0, "m2_n": 0}
+    total_bytes = 0
+    tiers = spec["tiers"]
+    for i in range(spec["sessions"]):
+        kind = "codex" if rng.random() < spec["codex_ratio"] else "claude"
+        sid = f"{rng.getrandbits(128):032x}"
+        if kind == "codex":
+            path = os.path.join(codex, "2026", "01", f"{i % 28 + 1:02d}", f"rollout-2026-01-01T00-00-00-{sid}.jsonl")
+        else:
+            path = os.path.join(claude, f"-bench-p{i % 8}", f"{sid}.jsonl")
+        arbiter = rng.random() < spec["marker_density"]
+        flags = {
+            "arbiter": arbiter,
+            "intensity": rng.random() < spec["intensity_density"],
+            "tier": tiers[expected["arbiter_marker_sessions"] % len(tiers)] if arbiter and tiers else None,
+        }
+        if arbiter and not tiers:
+            flags["arbiter"] = False
+        facts = generate_session(path, spec, rng, kind, flags)
+        total_bytes += facts["bytes"]
+        expected["total"] += 1
+        expected["arbiter_marker_sessions"] += flags["arbiter"]
+        expected["intensity_marker_sessions"] += flags["intensity"]
+        expected["m1_n"] += facts["m1_n"]
+        expected["m2_n"] += facts["m2_n"]
+    return {"claude": claude, "codex": codex, "files": spec["sessions"], "bytes": total_bytes, "expected": expected}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 3. stage runner
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def _reset_peak_rss() -> bool:
+    """Linux는 /proc/self/clear_refs에 5를 써서 VmHWM을 현재 RSS로 되돌린다 (단계별 peak).
+
+    미지원 (macOS 등)이면 False — peak는 process 누적값이 된다.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as fp:
+            fp.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_bytes() -> int:
+    try:
+        with open("/proc/self/status") as fp:
+            for line in fp:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _parse_file(path: str) -> analyze.SessionParser:
+    # analyze_session의 path 입력 경로와 같은 open 방식 (errors="replace")
+    parser = analyze.SessionParser(path)
+    with open(path, "r", errors="replace") as fp:
+        for line in fp:
+            parser.feed_line(line)
+    return parser
+
+
+def run_stages(corpus: dict, repeat: int = 3) -> dict:
+    """단계별 처리량 측정. 반복마다 모든 단계를 다시 실행하고 단계별 최소 시간을 채택한다."""
+    host = analyze.current_host()
+    saved = analyze.HOST_PATH_MAP[host]
+    analyze.HOST_PATH_MAP[host] = {"claude": corpus["claude"], "codex": corpus["codex"]}
+    best: dict[str, float] = {}
+    peaks: dict[str, int] = {}
+    stage_scope = True
+    try:
+        for _ in range(max(1, repeat)):
+            timings: dict[str, float] = {}
+
+            def measure(stage: str, fn):
+                nonlocal stage_scope
+                stage_scope = _reset_peak_rss() and stage_scope
+                started = time.perf_counter()
+                value = fn()
+                timings[stage] = time.perf_counter() - started
+                peaks[stage] = max(peaks.get(stage, 0), _peak_rss_bytes())
+                return value
+
+            files = measure("collect", lambda: sorted(analyze.collect_local_files(host)))
+            parsers = measure("parse", lambda: [_parse_file(p) for p in files])
+            sessions = measure("severity", lambda: [p.finish() for p in parsers])
+            agg = measure("aggregate", lambda: analyze.build_aggregate(sessions, [host], "bench", []))
+            measure("render", lambda: (analyze.render_markdown(agg), analyze.render_json(agg)))
+            for stage, seconds in timings.items():
+                best[stage] = min(best.get(stage, seconds), seconds)
+    finally:
+        analyze.HOST_PATH_MAP[host] = saved
+
+    mb = corpus["bytes"] / (1024 * 1024)
+    stages = {}
+    for stage in STAGES:
+        seconds = max(best[stage], 1e-9)
+        stages[stage] = {
+            "seconds": round(best[stage], 6),
+            "files_per_sec": round(len(files) / seconds, 1),
+            "mb_per_sec": round(mb / seconds, 2),
+            "peak_rss_mb": round(peaks[stage] / (1024 * 1024), 1),
+        }
+    return {
+        "files": len(files),
+        "mb": round(mb, 2),
+        "rss_scope": "stage" if stage_scope else "process",
+        "session_counts": agg["session_counts"],
+        "stages": stages,
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 4. baseline gate
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def load_baseline(path: str) -> dict | None:
+    try:
+        with open(path, "r") as fp:
+            return json.load(fp)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path: str, report: dict) -> None:
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    with open(path, "w") as fp:
+        fp.write(json.dumps(report, ensure_ascii=False, indent=2) + "\n")
+
+
+def compare_baseline(report: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD) -> list[str]:
+    """baseline 대비 회귀 목록. files/sec가 threshold 넘게 떨어진 단계와, 둘 다 단계별 RSS를
+    측정했을 때 peak RSS가 threshold 넘게 늘어난 단계를 보고한다.
+
+    baseline 시간이 GATE_MIN_SECONDS 미만인 단계는 처리량 비교에서 뺀다 (RSS 비교는 유지).
+    """
+    regressions = []
+    same_scope = report.get("rss_scope") == baseline.get("rss_scope") == "stage"
+    for stage in STAGES:
+        cur = report["stages"][stage]
+        base = baseline["stages"].get(stage)
+        if not base:
+            continue
+        floor = base["files_per_sec"] * (1 - threshold)
+        if base["seconds"] >= GATE_MIN_SECONDS and cur["files_per_sec"] < floor:
+            regressions.append(
+                f"{stage}: {cur['files_per_sec']} files/s < baseline {base['files_per_sec']} × {1 - threshold:.2f}"
+            )
+        if same_scope and cur["peak_rss_mb"] > base["peak_rss_mb"] * (1 + threshold):
+            regressions.append(
+                f"{stage}: peak RSS {cur['peak_rss_mb']} MB > baseline {base['peak_rss_mb']} MB × {1 + threshold:.2f}"
+            )
+    return regressions
+
+
+def render_report(report: dict) -> str:
+    out = [
+        f"# analyze.py benchmark — {report['files']} files, {report['mb']} MB (RSS scope: {report['rss_scope']})",
+        "",
+        "| 단계 | 시간 (s) | files/sec | MB/sec | peak RSS (MB) |",
+        "|------|----------|-----------|--------|---------------|",
+    ]
+    for stage in STAGES:
+        s = report["stages"][stage]
+        out.append(f"| {stage} | {s['seconds']} | {s['files_per_sec']} | {s['mb_per_sec']} | {s['peak_rss_mb']} |")
+    return "\n".join(out)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 5. CLI
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def parse_tiers(s: str) -> list[str]:
+    tiers = [t.strip() for t in s.split(",") if t.strip()]
+    for t in tiers:
+        if t not in TIERS:
+            raise argparse.ArgumentTypeError(f"invalid tier: {t!r}. valid: {list(TIERS)}")
+    return tiers
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="bench.py", description="analyze.py 단계별 처리량 benchmark")
+    for key in ("sessions", "session_kb", "nesting", "findings", "rounds", "seed"):
+        parser.add_argument(f"--{key.replace('_', '-')}", type=int, default=DEFAULT_SPEC[key])
+    for key in ("codex_ratio", "marker_density", "intensity_density", "image_density"):
+        parser.add_argument(f"--{key.replace('_', '-')}", type=float, default=DEFAULT_SPEC[key])
+    parser.add_argument("--tiers", type=parse_tiers, default=list(TIERS),
+                        help=f"comma-separated verdict tiers for arbiter sessions (default: {','.join(TIERS)})")
+    parser.add_argument("--corpus-dir", type=str, default=None,
+                        help="keep the generated corpus here (default: temporary directory)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage; best is reported (default: 3)")
+    parser.add_argument("--json", type=analyze.parse_json_arg, default=None, help="result JSON path")
+    parser.add_argument("--baseline", type=str, default=BASELINE_DEFAULT_PATH,
+                        help=f"baseline JSON path (default: {BASELINE_DEFAULT_PATH})")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help=f"allowed files/sec drop ratio before failing (default: {REGRESSION_THRESHOLD})")
+    args = parser.parse_args()
+
+    spec = {key: getattr(args, key) for key in DEFAULT_SPEC}
+    root = args.corpus_dir or tempfile.mkdtemp(prefix="analyze-bench-")
+    try:
+        corpus = generate_corpus(root, spec)
+        report = run_stages(corpus, args.repeat)
+    finally:
+        if not args.corpus_dir:
+            shutil.rmtree(root, ignore_errors=True)
+    report = {
+        "spec": spec,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        **report,
+    }
+    print(render_report(report))
+    if args.json:
+        with open(args.json, "w") as fp:
+            fp.write(json.dumps(report, ensure_ascii=False, indent=2) + "\n")
+
+    if args.save_baseline:
+        save_baseline(args.baseline, report)
+        print(f"\nbaseline saved: {args.baseline}", file=sys.stderr)
+        return 0
+    try:
+        baseline = load_baseline(args.baseline)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: baseline read failed ({args.baseline}): {e}", file=sys.stderr)
+        return 2
+    if baseline is None:
+        print(f"\nbaseline 없음 ({args.baseline}) — --save-baseline으로 기록", file=sys.stderr)
+        return 0
+    # 이후 추가된 spec key는 기본값으로 기록된 baseline과 같은 corpus다
+    if dict(DEFAULT_SPEC, **baseline.get("spec", {})) != spec:
+        print("ERROR: baseline spec 불일치 — 같은 corpus spec으로 비교하거나 --save-baseline으로 갱신", file=sys.stderr)
+        return 2
+    regressions = compare_baseline(report, baseline, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION: {line}", file=sys.stderr)
+    if not regressions:
+        print(f"\nbaseline 대비 회귀 없음 (threshold {args.threshold:.0%})", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
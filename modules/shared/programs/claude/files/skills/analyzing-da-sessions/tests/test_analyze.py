@@ -1,4 +1,6 @@
 """algorithm fixture 5종 회귀 검증 — analyzing-da-sessions 정식화 (plan D-3)."""
+import os
+
 import pytest
 
 from conftest import load_fixture_pair
@@ -151,36 +153,1596 @@ def test_allowed_remote_path_boundary_check(analyze_module):
     ) is False
 
 
-def test_analyze_remote_session_partial_fetch_result(analyze_module, monkeypatch):
-    """`analyze_remote_session()`이 SSH cat 실패 시 None + warning, 성공 시 분석 dict를
+def test_analyze_remote_session_partial_fetch_result(analyze_module, tmp_path, monkeypatch):
+    """`analyze_remote_session_async()`이 SSH cat 실패 시 None + warning, 성공 시 분석 dict를
     반환하는 partial result 단위 계약을 검증한다.
 
-    `fetch_remote_file`을 monkeypatch하여 일부 path는 None (실패), 일부는 더미 jsonl
-    내용을 반환하도록 한 뒤 `analyze_remote_session()`을 직접 호출한다.
+    fake `ssh`가 일부 path는 실패 (rc 1), 일부는 더미 jsonl 내용을 내보내도록 한 뒤
+    `analyze_remote_session_async()`를 직접 호출한다.
 
-    참고: 본 테스트는 `analyze_remote_session()`의 단위 계약만 검증하며, `main()`의
-    `concurrent.futures.ThreadPoolExecutor` worker pool dispatch 경로는 통과하지
-    않는다. dispatch 경로 자체는 V-1 live 측정과 코드 review로 검증한다.
+    참고: 본 테스트는 파일 1개의 단위 계약만 검증하며, `iter_remote_sessions_async()`의 동시
+    dispatch 경로는 통과하지 않는다 (test_async_cat_transport_* 참조).
     """
-    warnings: list[str] = []
+    import asyncio
+
     fail_path = "/Users/green/.claude/projects/fail.jsonl"
     ok_path = "/Users/green/.claude/projects/ok.jsonl"
-
-    def fake_fetch(host, path, w):
-        if path == fail_path:
-            w.append(f"host {host}: ssh cat failed for {path}")
-            return None
-        # 정상 dummy jsonl 내용 (verdict 분포에 영향 없는 빈 line)
-        return '{"type": "user", "uuid": "x", "timestamp": "2026-05-10"}\n'
-
-    monkeypatch.setattr(analyze_module, "fetch_remote_file", fake_fetch)
+    # 정상 dummy jsonl 내용 (verdict 분포에 영향 없는 빈 line)
+    _install_fake_ssh(tmp_path, monkeypatch, (
+        f'[ "$2" = {fail_path} ] && exit 1\n'
+        "echo '{\"type\": \"user\", \"uuid\": \"x\", \"timestamp\": \"2026-05-10\"}'\n"
+    ))
+    limiter = analyze_module.FetchLimiter("mac")
 
     # 두 path 각각 호출
-    fail_result = analyze_module.analyze_remote_session("mac", fail_path, warnings)
-    ok_result = analyze_module.analyze_remote_session("mac", ok_path, warnings)
+    fail_result, fail_warnings = asyncio.run(analyze_module.analyze_remote_session_async("mac", fail_path, limiter))
+    ok_result, ok_warnings = asyncio.run(analyze_module.analyze_remote_session_async("mac", ok_path, limiter))
 
     assert fail_result is None, "failed fetch should return None"
     assert ok_result is not None, "successful fetch should return analysis dict"
-    assert any("ssh cat failed" in w for w in warnings), (
-        "failed fetch should accumulate a warning"
+    assert ok_result["first_timestamp"] == "2026-05-10"
+    assert fail_warnings == [f"host mac: ssh cat failed (rc=1) for {fail_path} — partial result"]
+    assert ok_warnings == []
+
+
+def _write_session(path, texts):
+    """texts 각각을 assistant message text payload로 가진 jsonl 세션 파일을 생성한다."""
+    import json as _json
+    with open(path, "w") as fp:
+        for t in texts:
+            fp.write(_json.dumps({"type": "assistant", "message": {"content": [{"type": "text", "text": t}]}}) + "\n")
+
+
+def _run_local(analyze_module, host, files, cache, **options):
+    """실제 실행 경로 (run_hosts → _run_local_host)로 로컬 files를 분석해 files 순서의 결과 list를
+    반환한다 (결과 없는 세션은 빠진다)."""
+    sessions, _ = analyze_module.run_hosts([analyze_module.HostRun(host, False, list(files))], cache, **options)
+    return sessions
+
+
+def test_session_cache_hit_and_invalidation(analyze_module, tmp_path, monkeypatch):
+    """cache는 (size, mtime, algorithm_version) 일치 시에만 hit이며, hit 결과는 재파싱 결과와 같다.
+
+    파일 append (size/mtime 변경)와 regex 상수 변경 (algorithm_version 변경)은 모두 miss로
+    재파싱되어야 한다.
+    """
+    session = tmp_path / "s.jsonl"
+    _write_session(session, [
+        "결과는 /tmp/da-c4a35fc4-arbiter-AbCdEf 에 저장됨.",
+        "selective: trigger 2건 → stable 1건, split 1건, fragmented 0건",
+    ])
+    db = str(tmp_path / "cache.sqlite3")
+
+    cache = analyze_module.SessionCache(db)
+    first = _run_local(analyze_module, "mac", [str(session)], cache)
+    assert (cache.hits, cache.misses) == (0, 1)
+    cache.close()
+
+    # 재실행: 파싱이 호출되면 실패하도록 막고 cache hit만으로 동일 결과 회수
+    def _no_parse(*args, **kwargs):
+        raise AssertionError("cache hit expected — session must not be parsed")
+
+    cache = analyze_module.SessionCache(db)
+    with monkeypatch.context() as m:
+        m.setattr(analyze_module, "analyze_session", _no_parse)
+        m.setattr(analyze_module, "analyze_session_file", _no_parse)
+        second = _run_local(analyze_module, "mac", [str(session)], cache)
+    assert second == first == [analyze_module.analyze_session(str(session))]
+    assert isinstance(second[0]["round_summary_stability"], analyze_module.Counter)
+    assert cache.hits == 1
+
+    # append → size/mtime 변경 → miss
+    with open(session, "a") as fp:
+        fp.write('{"type": "user"}\n')
+    _run_local(analyze_module, "mac", [str(session)], cache)
+    assert cache.misses == 1
+    cache.close()
+
+    # regex 상수 변경 → algorithm_version 변경 → miss
+    before = analyze_module.algorithm_version()
+    monkeypatch.setattr(
+        analyze_module, "SEV_LINE", analyze_module.re.compile(r"\*\*severity\*\*\s*:\s*(HIGH)")
+    )
+    assert analyze_module.algorithm_version() != before
+    cache = analyze_module.SessionCache(db)
+    _run_local(analyze_module, "mac", [str(session)], cache)
+    assert (cache.hits, cache.misses) == (0, 1)
+    cache.close()
+
+
+def test_algorithm_version_stable_across_processes(analyze_module):
+    """algorithm_version은 process마다 달라지는 hash seed (set/frozenset repr 순서)와 무관해야 한다 —
+    달라지면 실행마다 session cache 전체가 miss가 된다. set 값 상수도 원소를 정렬해 섞는다."""
+    import subprocess
+    import sys
+    script = os.path.dirname(analyze_module.__file__)
+    code = (
+        f"import sys; sys.path.insert(0, {script!r}); import analyze; print(analyze.algorithm_version());"
+        " analyze.PAYLOAD_EXCLUDE_PATHS = frozenset(analyze.PAYLOAD_EXCLUDE_PATHS);"
+        " analyze.BUNDLE_MAP = {k: {v} for k, v in analyze.BUNDLE_MAP.items()};"
+        " print(analyze.algorithm_version(), repr(analyze.PAYLOAD_EXCLUDE_PATHS))"
+    )
+    outputs = [
+        subprocess.run(
+            [sys.executable, "-c", code],
+            env={**os.environ, "PYTHONHASHSEED": str(seed)},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split("\n", 2)
+        for seed in range(4)
+    ]
+    assert {out[0] for out in outputs} == {analyze_module.algorithm_version()}
+    assert len({out[1].split(" ", 1)[0] for out in outputs}) == 1
+    assert len({out[1].split(" ", 1)[1] for out in outputs}) > 1  # 보정 없는 repr은 seed마다 다르다
+    assert analyze_module._constant_repr(set()) == "set()"
+
+
+def test_append_resume_matches_full_parse(analyze_module, tmp_path):
+    """늘어난 세션은 저장된 parser 상태에서 append된 줄만 파싱하고 결과는 전체 재파싱과 같다.
+
+    쓰는 중인 미완결 마지막 줄은 offset에 포함하지 않고, 파일이 줄거나 앞부분이 바뀌면
+    처음부터 다시 파싱해야 한다.
+    """
+    import json as _json
+
+    session = tmp_path / "s.jsonl"
+    _write_session(session, [
+        "결과는 /tmp/da-c4a35fc4-arbiter-AbCdEf 에 저장됨.",
+        "### Correctness-1 — CONFIRMED_ISSUE\n**심각도**: HIGH",
+    ])
+    files = [str(session)]
+    cache = analyze_module.SessionCache(str(tmp_path / "cache.sqlite3"))
+    first = _run_local(analyze_module, "mac", files, cache)
+    assert first == [analyze_module.analyze_session(str(session))]
+    assert cache.resumed == 0
+
+    # 완결 줄 + 쓰는 중인 줄 append → 이어 파싱 (resume offset은 미완결 줄 앞에서 멈춘다)
+    complete = _json.dumps({"type": "assistant", "message": {"content": [
+        {"type": "text", "text": "### Design-1 — NOT_AN_ISSUE\n**심각도**: LOW"}]}})
+    with open(session, "a") as fp:
+        fp.write(complete + "\n" + complete[:20])
+    cache.misses = 0
+    second = _run_local(analyze_module, "mac", files, cache)
+    assert second == [analyze_module.analyze_session(str(session))]
+    assert (cache.misses, cache.resumed) == (1, 1)
+    resume = cache.get_resume("mac", str(session))
+    assert resume["offset"] == session.stat().st_size - 20
+
+    # 미완결 줄 완성 → 다시 이어 파싱
+    with open(session, "a") as fp:
+        fp.write(complete[20:] + "\n")
+    assert _run_local(analyze_module, "mac", files, cache) == [
+        analyze_module.analyze_session(str(session))
+    ]
+    assert cache.resumed == 2
+
+    # 앞부분 rewrite (같은 크기 이상) → prefix hash 불일치 → 전체 재파싱
+    data = session.read_bytes()
+    session.write_bytes(data.replace(b"AbCdEf", b"ZzZzZz") + complete.encode() + b"\n")
+    result = analyze_module.analyze_session_file(str(session), cache.get_resume("mac", str(session)))
+    assert result.pop("resume")["resumed_from"] == 0
+    assert result == analyze_module.analyze_session(str(session))
+
+    # 파일이 줄어듦 → 전체 재파싱
+    _run_local(analyze_module, "mac", files, cache)
+    session.write_bytes(data[: len(data) // 2])
+    result = analyze_module.analyze_session_file(str(session), cache.get_resume("mac", str(session)))
+    assert result.pop("resume")["resumed_from"] == 0
+    assert result == analyze_module.analyze_session(str(session))
+    cache.close()
+
+
+def test_local_jobs_matches_serial(analyze_module, tmp_path):
+    """--jobs 경로 (process pool + encode/decode 왕복)의 결과가 직렬 경로와 순서/내용 모두 같다."""
+    files = []
+    for i in range(5):
+        p = tmp_path / f"s{i}.jsonl"
+        _write_session(p, [
+            f"/tmp/da-abc{i}-arbiter-Xy{i} 결과",
+            "### Correctness-1 — CONFIRMED_ISSUE\n**심각도**: HIGH",
+            "selective: trigger 1건 → stable 1건, split 0건, fragmented 0건",
+        ])
+        files.append(str(p))
+    files.append(str(tmp_path / "missing.jsonl"))
+
+    serial = _run_local(analyze_module, "mac", files, None, jobs=1)
+    parallel = _run_local(analyze_module, "mac", files, None, jobs=2)
+    assert parallel == serial
+    assert parallel == [analyze_module.analyze_session(p) for p in files[:-1]]  # missing은 결과 없음
+
+    def render(sessions):
+        agg = analyze_module.build_aggregate(sessions, ["mac"], "live", [])
+        agg["captured_at"] = "fixed"
+        return analyze_module.render_json(agg)
+
+    assert render(parallel) == render(serial)
+
+
+def test_anchor_dispatch_matches_full_tier_pipeline(fixtures_dir, analyze_module):
+    """anchor dispatch (scan_anchors → extract_tiered_verdicts)가 anchor 없이 모든 tier를 순서대로
+    실행한 4-tier fallback과 같은 verdict/NL 결과와 intensity 결과를 내는지 검증한다.
+    """
+    all_anchors = {
+        "/tmp/da-", "verdict-json:start", "```json", "###", "판정", "Arbiter", "건", "검토", "intensity",
+    }
+    payloads = [load_fixture_pair(fixtures_dir, name)[0] for name in FIXTURE_NAMES]
+    payloads += [
+        "REVIEW INTENSITY: lite",
+        "revıew ıntensıty: FULL",  # re.I가 dotless i를 i와 동일시하는 경우
+        "**검토 강도**: SKIP",
+        "plain text without any anchor",
+        "CONFIRMED_ISSUE 3건",
+    ]
+    for text in payloads:
+        anchors = analyze_module.scan_anchors(text)
+        naive_failures: list = []
+        dispatched_failures: list = []
+        assert analyze_module.extract_tiered_verdicts(text, all_anchors, naive_failures) == (
+            analyze_module.extract_tiered_verdicts(text, anchors, dispatched_failures)
+        )
+        assert naive_failures == dispatched_failures
+        intensity = analyze_module.extract_intensity_verdicts(text)
+        if intensity:
+            assert "intensity" in anchors or not anchors.isdisjoint({"검토", "판정"})
+
+
+def test_severity_index_matches_per_finding_rescan(analyze_module, monkeypatch):
+    """build_severity_index + lookup_severity가 기존 per-finding 알고리즘
+    (`re.finditer(re.escape(finding_id), blob)` + window별 SEV_LINE.search)과 같은 라벨을 낸다.
+
+    접두/내포/경계 걸침/self-overlap id와 window 경계에 걸친 severity 라벨을 만들기 위해
+    작은 alphabet의 random blob과 짧은 window를 사용한다.
+    """
+    import random
+    import re
+
+    monkeypatch.setattr(analyze_module, "SEVERITY_LOOKBEHIND_CHARS", 6)
+    monkeypatch.setattr(analyze_module, "SEVERITY_LOOKAHEAD_CHARS", 25)
+
+    def naive(blob, finding_id):
+        for m in re.finditer(re.escape(finding_id), blob):
+            start = max(0, m.start() - analyze_module.SEVERITY_LOOKBEHIND_CHARS)
+            end = min(len(blob), m.end() + analyze_module.SEVERITY_LOOKAHEAD_CHARS)
+            sm = analyze_module.SEV_LINE.search(blob[start:end])
+            if sm:
+                return sm.group(1).upper()
+        return None
+
+    rng = random.Random(671)
+    pieces = ["a", "b", "ab", "aba", "-1", "-12", " ", "\n", "**심각도**: HIGH", "**심각도**：**low**",
+              "**심각도** : Medium**", "**심각도**:"]
+    ids = ["a", "ab", "aba", "ba", "b-1", "b-12", "-1", "bab", "zz"]
+    for _ in range(300):
+        blob = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 40)))
+        wanted = rng.sample(ids, rng.randint(1, len(ids)))
+        index = analyze_module.build_severity_index(blob, wanted)
+        for fid in wanted:
+            assert analyze_module.lookup_severity(index, fid) == naive(blob, fid), (blob, fid)
+            assert analyze_module.find_severity_for_finding(blob, fid) == naive(blob, fid), (blob, fid)
+
+
+def test_session_parser_streaming_matches_joined_blob(analyze_module, monkeypatch):
+    """SessionParser가 payload를 흘려보내며 계산한 severity 색인/selective 카운트가 payload 전체를
+    "\\n"으로 이어 붙인 blob 기준 결과 (build_severity_index, resolve_stability_...)와 같다.
+
+    payload 경계에 걸친 severity core·selective 라인과 snippet 경계를 만들기 위해 짧은 window와
+    작은 FINDING_ID_MAX_CHARS를 사용한다.
+    """
+    import random
+
+    monkeypatch.setattr(analyze_module, "SEVERITY_LOOKBEHIND_CHARS", 6)
+    monkeypatch.setattr(analyze_module, "SEVERITY_LOOKAHEAD_CHARS", 25)
+    monkeypatch.setattr(analyze_module, "FINDING_ID_MAX_CHARS", 4)
+
+    rng = random.Random(5)
+    fragments = [
+        "selective : trigger 2건 x stable 1건 split 3건 · fragmented 0건",
+        "SELECTIVE: trigger 1건 stable 1건 split 0건 fragmented 4건",
+        "selective : trigger 2건 stable",
+        "**심각도** : HIGH",
+        "**심각도** ： **low**",
+        "**심각도** :",
+        "a", "ab", "b-1", "-1", "x" * 30, "·",
+    ]
+    ids = ["a", "ab", "ba", "b-1", "-1", "zz"]
+    for _ in range(400):
+        # 공백 일부를 payload 경계로 바꾼다 — join 결과는 그 자리에 "\n"이 들어간 text
+        text = " ".join(rng.choice(fragments) for _ in range(rng.randint(0, 10)))
+        payloads, last = [], 0
+        for i, ch in enumerate(text):
+            if ch == " " and rng.random() < 0.3:
+                payloads.append(text[last:i])
+                last = i + 1
+        payloads.append(text[last:])
+        blob = "\n".join(payloads)
+        parser = analyze_module.SessionParser("mem")
+        for text in payloads:
+            parser.feed_payload(text)
+        assert parser.stability == analyze_module.resolve_stability_status_from_round_summary(blob), payloads
+        wanted = rng.sample(ids, rng.randint(1, len(ids)))
+        streamed = parser.severity_index(wanted)
+        joined = analyze_module.build_severity_index(blob, wanted)
+        assert streamed["length"] == len(blob)
+        assert streamed["sev_starts"] == joined["sev_starts"], payloads
+        for fid in wanted:
+            assert analyze_module.lookup_severity(streamed, fid) == (
+                analyze_module.lookup_severity(joined, fid)
+            ), (payloads, fid)
+
+
+def _install_fake_ssh(tmp_path, monkeypatch, script):
+    """PATH 앞에 fake `ssh` shim을 둔다. shim은 `ssh <host> <command...>`의 host를 버리고 script 실행."""
+    import os
+    import stat
+
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    shim = bin_dir / "ssh"
+    shim.write_text("#!/bin/sh\nshift\n" + script)
+    shim.chmod(shim.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+
+def _remote_fixture_files(tmp_path, analyze_module, monkeypatch):
+    claude = tmp_path / "home" / ".claude" / "projects" / "p"
+    codex = tmp_path / "home" / ".codex" / "sessions"
+    claude.mkdir(parents=True)
+    codex.mkdir(parents=True)
+    monkeypatch.setitem(analyze_module.HOST_PATH_MAP, "mac", {
+        "claude": str(tmp_path / "home" / ".claude" / "projects"),
+        "codex": str(codex),
+    })
+    files = []
+    for i in range(3):
+        p = claude / f"s{i}.jsonl"
+        _write_session(p, [
+            f"/tmp/da-abc{i}-arbiter-Xy{i} 결과",
+            '<!-- verdict-json:start -->\n```json\n{"finding_id": "Correctness-%d", "verdict": "CONFIRMED_ISSUE"}\n```\n'
+            '<!-- verdict-json:end -->' % i,
+            f"### Correctness-{i} — CONFIRMED_ISSUE\n**심각도**: HIGH",
+            f"selective: trigger 1건 → stable {i}건, split 1건, fragmented 0건",
+        ])
+        files.append(str(p))
+    empty = codex / "rollout-empty.jsonl"
+    empty.write_text("")
+    files.append(str(empty))
+    return files
+
+
+def test_remote_exec_matches_fetch_path(analyze_module, tmp_path, monkeypatch):
+    """--remote-exec로 원격 실행한 세션 결과가 ssh cat fetch + local 분석 결과와 같다 (fake ssh shim)."""
+    files = _remote_fixture_files(tmp_path, analyze_module, monkeypatch)
+    _install_fake_ssh(tmp_path, monkeypatch, 'exec sh -c "$*"\n')
+
+    warnings: list = []
+    results, missing = analyze_module.analyze_remote_exec("mac", files, warnings)
+    assert warnings == [] and missing == []
+
+    def without_path(triples):
+        # fetch 경로 결과의 "path"는 local 임시 파일 — aggregate는 사용하지 않으므로 비교에서 제외
+        return sorted((p, r and {k: v for k, v in r.items() if k != "path"}, w) for p, r, w in triples)
+
+    fetched = analyze_module.analyze_remote_sessions("mac", files, [], transport="cat")
+    assert without_path(results) == without_path(fetched)
+    by_path = {p: r for p, r, _ in results}
+    assert by_path[files[0]]["path"] == files[0]
+    assert by_path[files[-1]] is None  # 빈 파일
+    assert by_path[files[0]]["verdicts"][0]["severity"] == "HIGH"
+    assert by_path[files[2]]["round_summary_stability"] == analyze_module.Counter(
+        {"stable": 2, "split": 1, "fragmented": 0}
     )
+
+
+def test_remote_exec_rejects_untrusted_lines_and_falls_back(analyze_module, tmp_path, monkeypatch):
+    """요청 밖 path, 깨진 JSON, shape 불일치 line은 폐기되고, done 없이 비정상 종료하면 미보고
+    파일 전체를 ssh cat fetch 대상으로 돌려준다."""
+    files = _remote_fixture_files(tmp_path, analyze_module, monkeypatch)
+    bogus = "\n".join([
+        '{"type":"session","path":"/etc/passwd.jsonl","result":null}',
+        "not json",
+        '{"type":"session","path":"%s","result":{"path":"%s"}}' % (files[0], files[0]),
+        '{"type":"warning","path":"%s","reason":"<script>"}' % files[1],
+    ])
+    _install_fake_ssh(tmp_path, monkeypatch, f"cat >/dev/null\ncat <<'EOF'\n{bogus}\nEOF\nexit 3\n")
+
+    warnings: list = []
+    results, missing = analyze_module.analyze_remote_exec("mac", files, warnings)
+    assert results == []
+    assert missing == files
+    assert warnings == [
+        "host mac: remote-exec 응답 4줄 폐기 (형식/path 검증 실패)",
+        "host mac: remote-exec 비정상 종료 (rc=3) — 미보고 4개 파일은 fetch 경로로 재시도",
+    ]
+
+
+def test_remote_exec_rejects_malformed_verdicts(analyze_module, tmp_path, monkeypatch):
+    """top-level shape가 맞아도 verdict key/type, intensity verdict, selective 합계 값이 어긋난 결과는
+    폐기되어 fetch 경로로 넘어간다 — AggregateAccumulator.add가 KeyError로 실행을 중단하지 않는다."""
+    import copy
+    import io
+    import json as _json
+
+    files = _remote_fixture_files(tmp_path, analyze_module, monkeypatch)
+    out = io.StringIO()
+    analyze_module.emit_remote_sessions("mac", files[:1], out)
+    line = out.getvalue().splitlines()[0]
+    good = _json.loads(line)["result"]
+    assert good["verdicts"] and analyze_module._valid_remote_result(good, files[0])
+
+    def verdict(**changes):
+        return lambda r: r["verdicts"][0].update(changes)
+
+    for mutate in [
+        lambda r: r.update(verdicts=[{}]),
+        lambda r: r["verdicts"][0].pop("source"),
+        lambda r: r["verdicts"][0].pop("source_confidence"),
+        verdict(verdict=None),
+        verdict(finding_id=7),
+        verdict(bundle=["Correctness"]),
+        verdict(severity={"HIGH": 1}),
+        verdict(timestamp=0),
+        lambda r: r.update(intensity_verdicts=[1]),
+        lambda r: r.update(parse_failures=[{}]),
+        lambda r: r.update(round_summary_stability={"stable": "1"}),
+        lambda r: r.update(round_summary_stability={"stable": True}),
+    ]:
+        bad = copy.deepcopy(good)
+        mutate(bad)
+        assert not analyze_module._valid_remote_result(bad, files[0])
+
+    bogus = line.replace(_json.dumps(good["verdicts"], separators=(",", ":")), "[{}]")
+    assert bogus != line
+    _install_fake_ssh(tmp_path, monkeypatch, f"cat >/dev/null\ncat <<'EOF'\n{bogus}\n{{\"type\":\"done\"}}\nEOF\n")
+    warnings: list = []
+    results, missing = analyze_module.analyze_remote_exec("mac", files[:1], warnings)
+    assert (results, missing) == ([], files[:1])
+    assert warnings[0] == "host mac: remote-exec 응답 1줄 폐기 (형식/path 검증 실패)"
+
+
+def test_tar_transport_matches_cat_transport(analyze_module, tmp_path, monkeypatch):
+    """`ssh tar` batch stream 결과가 파일당 `ssh cat` 결과와 같다. stream에 없는 파일 (원격 부재)은
+    cat 경로로 재시도되어 cat transport와 같은 warning을 남긴다."""
+    files = _remote_fixture_files(tmp_path, analyze_module, monkeypatch)
+    files.append(files[0].replace("s0.jsonl", "gone.jsonl"))
+    _install_fake_ssh(tmp_path, monkeypatch, 'exec sh -c "$*"\n')
+    monkeypatch.setattr(analyze_module, "TAR_FETCH_BATCH_FILES", 2)
+
+    tar_warnings: list = []
+    cat_warnings: list = []
+    via_tar = analyze_module.analyze_remote_sessions("mac", files, tar_warnings, transport="tar")
+    via_cat = analyze_module.analyze_remote_sessions("mac", files, cat_warnings, transport="cat")
+    assert tar_warnings == cat_warnings == []
+
+    def normalized(triples):
+        return sorted((p, r and {k: v for k, v in r.items() if k != "path"}, w) for p, r, w in triples)
+
+    assert normalized(via_tar) == normalized(via_cat)
+    by_path = {p: (r, w) for p, r, w in via_tar}
+    assert by_path[files[-1]][0] is None
+    assert by_path[files[-1]][1][0].startswith("host mac: ssh cat failed")
+    assert by_path[files[0]][0]["path"] == files[0]
+
+
+def test_tar_transport_rejects_unrequested_members(analyze_module, tmp_path, monkeypatch):
+    """tar stream의 요청 밖 member와 비정규 파일 member는 폐기하고, 해당 요청 path는 cat으로 재시도한다."""
+    import io
+    import tarfile
+
+    files = _remote_fixture_files(tmp_path, analyze_module, monkeypatch)
+    evil = tmp_path / "evil.tar"
+    with tarfile.open(evil, "w") as archive:
+        archive.add(files[0], arcname=files[0].lstrip("/"))
+        info = tarfile.TarInfo("etc/passwd.jsonl")
+        info.size = 3
+        archive.addfile(info, io.BytesIO(b"{}\n"))
+        link = tarfile.TarInfo(files[1].lstrip("/"))
+        link.type = tarfile.SYMTYPE
+        link.linkname = "/etc/passwd"
+        archive.addfile(link)
+    _install_fake_ssh(tmp_path, monkeypatch, f'case "$1" in tar) cat {evil};; *) exec sh -c "$*";; esac\n')
+
+    warnings: list = []
+    results = analyze_module.analyze_remote_sessions("mac", files, warnings, transport="tar")
+    assert warnings == ["host mac: tar stream member 2개 폐기 (요청 밖 path/비정규 파일)"]
+    by_path = {p: r for p, r, _ in results}
+    assert sorted(by_path) == sorted(files)
+    assert by_path[files[0]] == analyze_module.analyze_session(files[0])
+    assert by_path[files[1]]["verdicts"] == analyze_module.analyze_session(files[1])["verdicts"]
+
+
+def test_analyze_session_accepts_line_iterables_and_binary_streams(analyze_module, tmp_path):
+    """path / str line iterable / bytes line iterable / binary stream 입력이 같은 결과를 낸다."""
+    import io
+
+    session = tmp_path / "s.jsonl"
+    _write_session(session, [
+        "/tmp/da-abc1-arbiter-Xy1 결과 — 한글 payload",
+        '<!-- verdict-json:start -->\n```json\n{"finding_id": "Design-1", "verdict": "CONFIRMED_ISSUE"}\n```\n'
+        "<!-- verdict-json:end -->\n### Design-1 — CONFIRMED_ISSUE\n**심각도**: LOW",
+        "selective: trigger 1건 → stable 1건, split 0건, fragmented 0건",
+    ])
+    raw = session.read_bytes().replace(b"\n", b"\r\n")
+    session.write_bytes(raw)
+    expected = analyze_module.analyze_session(str(session))
+    assert expected["verdicts"][0]["severity"] == "LOW"
+
+    label = str(session)
+    assert analyze_module.analyze_session(io.BytesIO(raw), label) == expected
+    assert analyze_module.analyze_session(raw.splitlines(keepends=True), label) == expected
+    assert analyze_module.analyze_session(raw.decode().split("\r\n"), label) == expected
+
+
+def test_remote_cat_streams_pipe_without_temp_file(analyze_module, tmp_path, monkeypatch):
+    """원격 내용은 ssh pipe에서 바로 분석되고 임시 파일을 만들지 않는다. ssh 실패 시 부분 결과를
+    버리고 warning, 빈 파일은 warning 없이 None."""
+    import tempfile
+
+    files = _remote_fixture_files(tmp_path, analyze_module, monkeypatch)
+    _install_fake_ssh(tmp_path, monkeypatch, 'exec sh -c "$*"\n')
+
+    def _no_temp(*args, **kwargs):
+        raise AssertionError("remote content must not be spooled to a temp file")
+
+    monkeypatch.setattr(tempfile, "NamedTemporaryFile", _no_temp)
+    gone = files[0].replace("s0.jsonl", "gone.jsonl")
+    warnings: list = []
+    triples = analyze_module.analyze_remote_sessions("mac", [files[0], files[-1], gone], warnings, transport="cat")
+    assert sorted(triples) == sorted([
+        (files[0], analyze_module.analyze_session(files[0]), []),
+        (files[-1], None, []),  # 빈 파일
+        (gone, None, [f"host mac: ssh cat failed (rc=1) for {gone} — partial result"]),
+    ])
+    assert warnings == []
+
+
+def test_parse_find_stat_line(analyze_module):
+    """GNU `-printf '%s %T@ %p'`와 BSD `stat -f '%z %m %N'` 형식 모두 float 오차 없이 ns로 변환한다."""
+    parse = analyze_module._parse_find_stat_line
+    assert parse("12 1729000000.1234567890 /a/b.jsonl") == ("/a/b.jsonl", 12, 1729000000123456789)
+    assert parse("0 1729000000 /a/b.jsonl") == ("/a/b.jsonl", 0, 1729000000 * 10**9)
+    assert parse("/a/b.jsonl") is None
+    assert parse("12 17290x0000 /a/b.jsonl") is None
+
+
+def test_remote_mirror_transfers_only_new_and_appended_bytes(analyze_module, tmp_path, monkeypatch):
+    """mirror 첫 동기화는 전체 fetch, 변경 없는 재실행은 전송 0, append된 파일은 tail만 받는다.
+    rewrite/축소된 파일은 전체 재fetch하고, 분석 결과는 매번 ssh cat fetch 경로와 같다."""
+    import os
+
+    files = _remote_fixture_files(tmp_path, analyze_module, monkeypatch)
+    log = tmp_path / "ssh.log"
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setattr(analyze_module, "MIRROR_TAIL_OVERLAP_BYTES", 16)
+    _install_fake_ssh(tmp_path, monkeypatch, f'echo "$1" >> {log}\nexec sh -c "$*"\n')
+
+    def collect():
+        metadata: dict = {}
+        warnings: list = []
+        assert sorted(analyze_module.collect_remote_files("mac", warnings, metadata)) == sorted(files)
+        assert warnings == []
+        return metadata
+
+    metadata = collect()
+    st = os.stat(files[0])
+    assert metadata[files[0]] == (st.st_size, st.st_mtime_ns)
+
+    mirror = analyze_module.RemoteMirror(str(tmp_path / "mirror"))
+    warnings: list = []
+
+    def check_matches_fetch(results):
+        assert sorted(results) == sorted(analyze_module.analyze_remote_sessions("mac", files, [], transport="cat"))
+
+    check_matches_fetch(analyze_module.analyze_mirrored_sessions("mac", files, metadata, mirror, warnings))
+    log.write_text("")
+    synced, stats = mirror.sync("mac", files, metadata, warnings)
+    assert synced == files
+    assert stats == {"unchanged": 4, "tail": 0, "full": 0, "failed": 0, "bytes": 0}
+    assert log.read_text() == ""
+
+    appended = '{"message": {"content": "selective: trigger 1건 → stable 3건, split 0건, fragmented 0건"}}\n'
+    with open(files[0], "a", encoding="utf-8") as fp:
+        fp.write(appended)
+    _write_session(files[1], ["shrunk"])
+    _write_session(files[2], ["rewritten " * 40])
+    for path in files[:3]:
+        os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10**9))
+    metadata = collect()
+    log.write_text("")
+    synced, stats = mirror.sync("mac", files, metadata, warnings)
+    assert (stats["unchanged"], stats["tail"], stats["full"], stats["failed"]) == (1, 1, 2, 0)
+    assert "tail" in log.read_text().split()
+    for path in files:
+        with open(mirror.local_path("mac", path), "rb") as fp:
+            assert fp.read() == open(path, "rb").read()
+    check_matches_fetch(analyze_module.analyze_mirrored_sessions("mac", files, metadata, mirror, warnings))
+    assert warnings == []
+
+    os.remove(files[1])
+    assert mirror.prune("mac", [p for p in files if p != files[1]]) == 1
+    assert not os.path.exists(mirror.local_path("mac", files[1]))
+
+
+def test_run_hosts_matches_sequential_host_processing(analyze_module, tmp_path, monkeypatch):
+    """host 동시 실행 (bounded queue 1칸) 결과/warning 순서가 host 순차 처리와 같고, cache 기록은
+    main thread에서 수행되어 재실행 시 전부 hit이다."""
+    remote = _remote_fixture_files(tmp_path, analyze_module, monkeypatch)
+    remote.append(remote[0].replace("s0.jsonl", "gone.jsonl"))
+    local = [str(tmp_path / "home" / ".claude" / "projects" / "p" / f"s{i}.jsonl") for i in (2, 0, 1)]
+    # `ssh -O check <host>`는 shim이 첫 인자를 버려 $1 == check
+    _install_fake_ssh(tmp_path, monkeypatch, 'case "$1" in check) exit 0;; esac\nexec sh -c "$*"\n')
+    monkeypatch.setattr(analyze_module, "HOST_RESULT_QUEUE_SIZE", 1)
+
+    expected_warnings: list = []
+    expected = [r for r in map(analyze_module.analyze_session, local) if r is not None]
+    triples = sorted(analyze_module.analyze_remote_sessions("mac", remote, expected_warnings, transport="cat"))
+    for _, result, file_warnings in triples:
+        if result is not None:
+            expected.append(result)
+        expected_warnings.extend(file_warnings)
+
+    cache = analyze_module.SessionCache(str(tmp_path / "cache.sqlite3"))
+    for _ in range(2):
+        runs = [
+            analyze_module.HostRun("minipc", False, local),
+            analyze_module.HostRun("mac", True, remote),
+        ]
+        sessions, warnings = analyze_module.run_hosts(runs, cache, transport="cat")
+        assert sessions == expected
+        assert warnings == expected_warnings
+        assert warnings[0].startswith("host mac: ssh cat failed")
+    # remote는 corpus 형태 (find metadata 없음)라 cache 대상이 아니다
+    assert (cache.hits, cache.misses) == (3, 3)
+    cache.close()
+
+
+def _aggregate_without_timestamp(agg):
+    agg = dict(agg)
+    agg.pop("captured_at")
+    return agg
+
+
+def test_aggregate_accumulator_merge_matches_single_pass(analyze_module, tmp_path):
+    """구간별 부분 누적을 순서대로 merge한 결과 (결합 방식 무관)가 세션 list 1회 build와 같다."""
+    sessions = []
+    for i, (verdict, sev) in enumerate([("CONFIRMED_ISSUE", "HIGH"), ("NOT_AN_ISSUE", "LOW"),
+                                        ("CONFIRMED_ISSUE", "CRITICAL"), ("NEEDS_MORE_INFO", "MEDIUM")]):
+        p = tmp_path / f"s{i}.jsonl"
+        _write_session(p, [
+            f"/tmp/da-abc{i}-arbiter-Xy{i} /tmp/da-abc{i}-intensity-Zz{i}",
+            "검토 강도: FULL" if i % 2 else "Review Intensity: LITE",
+            f"### Design-{i} — {verdict}\n**심각도**: {sev}",
+            f"### Design-{i} — CONFIRMED_ISSUE\n**심각도**: HIGH",
+            f"selective: trigger 2건 → stable {i}건, split 1건, fragmented 0건",
+        ])
+        sessions.append(analyze_module.analyze_session(str(p)))
+    sessions.insert(1, None)
+    sessions.insert(3, analyze_module.triaged_session("plain.jsonl", (None, None)))
+
+    expected = analyze_module.build_aggregate(sessions, ["mac"], "live", [])
+    for cut in range(len(sessions) + 1):
+        head, tail = analyze_module.AggregateAccumulator(), analyze_module.AggregateAccumulator()
+        for s in sessions[:cut]:
+            head.add(s)
+        for s in sessions[cut:]:
+            tail.add(s)
+        head.merge(tail)
+        assert _aggregate_without_timestamp(head.build(["mac"], "live", [])) == \
+            _aggregate_without_timestamp(expected)
+
+    # 세션 1건짜리 누적기를 오른쪽부터 묶어도 같은 결과 (결합법칙)
+    right = analyze_module.AggregateAccumulator()
+    for s in reversed(sessions):
+        single = analyze_module.AggregateAccumulator()
+        single.add(s)
+        single.merge(right)
+        right = single
+    assert _aggregate_without_timestamp(right.build(["mac"], "live", [])) == \
+        _aggregate_without_timestamp(expected)
+
+
+def test_run_hosts_fold_matches_collected_sessions(analyze_module, tmp_path, monkeypatch):
+    """accumulator 모드 run_hosts는 세션 list를 모은 뒤 build_aggregate한 결과/warnings와 같다."""
+    remote = _remote_fixture_files(tmp_path, analyze_module, monkeypatch)
+    remote.append(remote[0].replace("s0.jsonl", "gone.jsonl"))
+    local = [str(tmp_path / "home" / ".claude" / "projects" / "p" / f"s{i}.jsonl") for i in (2, 0, 1)]
+    _install_fake_ssh(tmp_path, monkeypatch, 'case "$1" in check) exit 0;; esac\nexec sh -c "$*"\n')
+    monkeypatch.setattr(analyze_module, "HOST_RESULT_QUEUE_SIZE", 1)
+
+    def runs():
+        return [analyze_module.HostRun("minipc", False, local), analyze_module.HostRun("mac", True, remote)]
+
+    sessions, expected_warnings = analyze_module.run_hosts(runs(), None, transport="cat")
+    expected = analyze_module.build_aggregate(sessions, ["minipc", "mac"], "live", list(expected_warnings))
+
+    acc = analyze_module.AggregateAccumulator()
+    folded, warnings = analyze_module.run_hosts(runs(), None, acc, transport="cat")
+    assert folded == []
+    assert warnings == expected_warnings
+    agg = acc.build(["minipc", "mac"], "live", warnings)
+    assert _aggregate_without_timestamp(agg) == _aggregate_without_timestamp(expected)
+    assert agg["session_counts"]["arbiter_marker_sessions"] > 0
+
+
+def test_profile_records_sessions_without_changing_results_or_cache(analyze_module, tmp_path, monkeypatch):
+    """--profile은 세션별 단계 시간을 profile section으로만 모으고, 세션 결과와 cache 내용은
+    profile 없는 실행과 같다."""
+    local = []
+    for i in range(3):
+        p = tmp_path / f"s{i}.jsonl"
+        _write_session(p, [
+            f"/tmp/da-abc{i}-arbiter-Xy{i} 결과",
+            "### Correctness-1 — CONFIRMED_ISSUE\n**심각도**: HIGH",
+        ])
+        local.append(str(p))
+    expected = [analyze_module.analyze_session(p) for p in local]
+
+    cache = analyze_module.SessionCache(str(tmp_path / "cache.sqlite3"))
+    profile = analyze_module.enable_profile()
+    try:
+        with analyze_module.profile_stage("all", "hosts"):
+            sessions, _ = analyze_module.run_hosts([analyze_module.HostRun("minipc", False, local)], cache)
+    finally:
+        analyze_module.disable_profile()
+    assert sessions == expected
+    rows = [r for (r,) in cache.conn.execute("SELECT result FROM session_results")]
+    assert len(rows) == 3 and all('"profile"' not in r for r in rows)
+    cache.close()
+
+    built = profile.build(top=2)
+    assert {(s["host"], s["stage"]) for s in built["stages"]} >= {("minipc", "parse"), ("all", "hosts")}
+    assert built["sessions"]["count"] == 3
+    assert len(built["sessions"]["slowest"]) == 2
+    slowest = built["sessions"]["slowest"][0]
+    assert slowest["path"] in local and slowest["lines"] == 2
+    assert {"json_decode", "anchor_scan", "tier_strict", "severity_lookup"} <= set(slowest["phases"])
+    assert analyze_module.analyze_session(local[0]) == expected[0]  # 비활성화 후 profile key 없음
+
+
+def test_profile_fetch_latency_percentiles(analyze_module):
+    profile = analyze_module.RunProfile()
+    for i in range(1, 101):
+        profile.add_fetch("mac", "cat", i / 100, 10)
+    fetch = profile.build()["fetch"]["mac"]["cat"]
+    assert fetch["count"] == 100 and fetch["bytes"] == 1000
+    assert fetch["latency_seconds"] == {"p50": 0.5, "p90": 0.9, "p99": 0.99, "max": 1.0}
+
+
+def test_triage_skips_only_sessions_without_marker_bytes(analyze_module, tmp_path, capsys):
+    """marker / escape된 marker / verdict-json 후보만 전체 파싱하고, 나머지는 total에만 세어
+    aggregate가 --no-triage와 같다."""
+    import json as _json
+
+    marker = tmp_path / "marker.jsonl"
+    _write_session(marker, ["결과는 /tmp/da-c4a35fc4-arbiter-AbCdEf 에 저장됨."])
+    escaped = tmp_path / "escaped.jsonl"
+    escaped.write_text(_json.dumps({"t": "/tmp/da-c4a35fc4-intensity-AbCdEf"}).replace("/", "\\/") + "\n")
+    broken = tmp_path / "broken.jsonl"
+    _write_session(broken, ['<!-- verdict-json:start -->\n```json\n{not json\n```\n<!-- verdict-json:end -->'])
+    plain = tmp_path / "plain.jsonl"
+    _write_session(plain, ["### Correctness-1 — CONFIRMED_ISSUE", "검토 강도: FULL"])
+    empty = tmp_path / "empty.jsonl"
+    empty.write_text("")
+    files = [str(p) for p in (marker, escaped, broken, plain, empty, tmp_path / "missing.jsonl")]
+
+    assert [analyze_module.triage_session_file(p) for p in files] == [True, True, True, False, False, True]
+
+    triaged = _run_local(analyze_module, "mac", files, None, triage=True)
+    assert capsys.readouterr().err.startswith("triage mac: 2/6 files skipped by marker scan")
+    full = _run_local(analyze_module, "mac", files, None)
+    assert len(triaged) == len(full) == 5  # missing은 결과 없음
+    assert triaged[:3] == full[:3]
+    assert triaged[3] == analyze_module.SessionParser(files[3]).finish()
+    assert full[3]["verdicts"]  # 전체 파싱은 marker 없는 세션의 verdict도 회수하지만 aggregate는 쓰지 않는다
+
+    def render(sessions):
+        agg = analyze_module.build_aggregate([s for s in sessions if s], ["mac"], "live", [])
+        agg["captured_at"] = "fixed"
+        return analyze_module.render_json(agg)
+
+    assert render(triaged) == render(full)
+    assert _json.loads(render(triaged))["session_counts"]["total"] == 5
+
+
+def test_bench_corpus_matches_generator_expectations(analyze_module, tmp_path):
+    """합성 corpus를 benchmark 단계로 돌린 분모/M-1/M-2 n이 generator 기대값과 일치하는지 검증."""
+    import bench  # type: ignore
+
+    spec = dict(bench.DEFAULT_SPEC, sessions=24, session_kb=4, marker_density=0.6, intensity_density=0.4)
+    corpus = bench.generate_corpus(str(tmp_path), spec)
+    expected = corpus["expected"]
+    assert expected["arbiter_marker_sessions"] > len(bench.TIERS)
+
+    report = bench.run_stages(corpus, repeat=1)
+    assert report["files"] == spec["sessions"]
+    assert report["session_counts"] == {
+        "total": expected["total"],
+        "arbiter_marker_sessions": expected["arbiter_marker_sessions"],
+        "intensity_marker_sessions": expected["intensity_marker_sessions"],
+    }
+    assert set(report["stages"]) == set(bench.STAGES)
+
+    host = analyze_module.current_host()
+    sessions = [analyze_module.analyze_session(p) for p in _bench_files(corpus)]
+    agg = analyze_module.build_aggregate(sessions, [host], "bench", [])
+    assert agg["metrics"]["M-1"]["n"] == expected["m1_n"]
+    assert agg["metrics"]["M-2"]["n"] == expected["m2_n"]
+
+
+def _bench_files(corpus):
+    out = []
+    for base in (corpus["claude"], corpus["codex"]):
+        for dirpath, _, names in os.walk(base):
+            out.extend(os.path.join(dirpath, n) for n in names if n.endswith(".jsonl"))
+    return sorted(out)
+
+
+def test_bench_baseline_gate_flags_regressions():
+    """files/sec 하락과 단계별 peak RSS 증가가 threshold를 넘을 때만 회귀로 보고되는지 검증."""
+    import bench  # type: ignore
+
+    def report(fps, rss, seconds=1.0, scope="stage"):
+        stage = {"seconds": seconds, "files_per_sec": fps, "mb_per_sec": 1.0, "peak_rss_mb": rss}
+        return {"rss_scope": scope, "stages": {s: dict(stage) for s in bench.STAGES}}
+
+    baseline = report(100.0, 50.0)
+    assert bench.compare_baseline(report(80.0, 60.0), baseline, 0.25) == []
+    slow = bench.compare_baseline(report(70.0, 50.0), baseline, 0.25)
+    assert len(slow) == len(bench.STAGES) and all("files/s" in line for line in slow)
+    fat = bench.compare_baseline(report(100.0, 70.0), baseline, 0.25)
+    assert len(fat) == len(bench.STAGES) and all("peak RSS" in line for line in fat)
+    # process 누적 RSS는 단계 비교 불가, 너무 짧은 단계는 처리량 잡음이 커서 게이트 제외
+    assert bench.compare_baseline(report(100.0, 70.0, scope="process"), baseline, 0.25) == []
+    assert bench.compare_baseline(report(10.0, 50.0), report(100.0, 50.0, seconds=0.001), 0.25) == []
+
+
+def test_watch_poll_tracks_changes_and_matches_one_shot(analyze_module, tmp_path, monkeypatch):
+    """watch poll은 새로 생기거나 바뀐 세션만 재분석 (append는 이어 파싱)하고 사라진 세션은 빼며,
+    렌더링 결과는 같은 파일 집합의 일회성 실행과 같다."""
+    import json as _json
+
+    remote = _remote_fixture_files(tmp_path, analyze_module, monkeypatch)
+    local_root = tmp_path / "local"
+    (local_root / "projects" / "p").mkdir(parents=True)
+    (local_root / "sessions").mkdir()
+    monkeypatch.setitem(analyze_module.HOST_PATH_MAP, "minipc", {
+        "claude": str(local_root / "projects"),
+        "codex": str(local_root / "sessions"),
+    })
+    local = [str(local_root / "projects" / "p" / f"l{i}.jsonl") for i in range(3)]
+    for path, src in zip(local, remote):
+        _write_session(path, [])
+        with open(path, "w") as fp, open(src) as s:
+            fp.write(s.read())
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))  # 원격 find `~/.claude/projects`
+    _install_fake_ssh(tmp_path, monkeypatch, 'case "$1" in check) exit 0;; esac\nexec sh -c "$*"\n')
+    options = {"transport": "cat", "mirror_root": str(tmp_path / "mirror"), "triage": True}
+
+    def one_shot():
+        acc = analyze_module.AggregateAccumulator()
+        runs = [analyze_module.HostRun("minipc", False), analyze_module.HostRun("mac", True)]
+        _, warnings = analyze_module.run_hosts(runs, None, acc, **options)
+        agg = acc.build(["minipc", "mac"], "live", warnings)
+        return _aggregate_without_timestamp(agg)
+
+    def served(state):
+        return _aggregate_without_timestamp(_json.loads(state.answer("json")))
+
+    cache = analyze_module.SessionCache(":memory:")
+    state = analyze_module.WatchState(["minipc", "mac"], "minipc", cache, **options)
+    assert state.answer("markdown").startswith("ERROR:")
+    assert state.poll() == 7  # local 3 + remote 4 (빈 rollout은 결과 없이 추적)
+    assert served(state) == one_shot()
+    assert state.answer("markdown") == state.rendered["markdown"]
+    assert state.poll() == 0 and cache.misses == 7
+
+    # local append + 새 파일 + 삭제 → 해당 세션만 재분석, 원격은 remote=False poll에서 건너뜀
+    with open(local[0], "a") as fp:
+        fp.write(_json.dumps({"type": "assistant", "message": {"content": [
+            {"type": "text", "text": "### Design-9 — NOT_AN_ISSUE\n**심각도**: LOW"}]}}) + "\n")
+    os.unlink(local[1])
+    _write_session(local_root / "projects" / "p" / "l9.jsonl", ["/tmp/da-abc9-intensity-Zz9 검토 강도: FULL"])
+    os.unlink(remote[2])
+    mirror = analyze_module.RemoteMirror(options["mirror_root"])
+    mirrored = mirror.local_path("mac", remote[2])
+    mirror.close()
+    assert os.path.exists(mirrored)
+    assert state.poll(remote=False) == 3
+    assert (cache.misses, cache.resumed) == (9, 1)
+    assert _json.loads(state.answer("status"))["sessions"] == {"minipc": 3, "mac": 4}
+
+    assert state.poll() == 1
+    assert not os.path.exists(mirrored)  # 원격에서 사라진 파일의 mirror 사본도 정리
+    assert served(state) == one_shot()
+    assert state.answer("nope").startswith("ERROR: unknown query")
+    cache.close()
+
+
+def test_watch_socket_serves_queries_and_guards_running_daemon(analyze_module, tmp_path):
+    """socket query는 미리 렌더링된 응답을 그대로 돌려주고, 응답하는 daemon이 있으면 bind를 거부하며
+    stale socket 파일은 지우고 다시 bind한다. socket이 아닌 파일은 지우지 않는다."""
+    import json as _json
+    import socket
+    import threading
+
+    state = analyze_module.WatchState(["minipc"], "minipc", None)
+    state.rendered = {"markdown": "# md\n", "json": "{}\n"}
+    sock_path = str(tmp_path / "w.sock")
+
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(sock_path)
+    stale.close()  # listen하지 않은 socket 파일 = 죽은 daemon의 흔적
+    server = analyze_module.open_watch_socket(state, sock_path)
+    assert os.stat(sock_path).st_mode & 0o777 == 0o600
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        assert analyze_module.query_watch(sock_path, "markdown") == "# md\n"
+        assert analyze_module.query_watch(sock_path, "json") == "{}\n"
+        assert _json.loads(analyze_module.query_watch(sock_path, "status"))["polls"] == 0
+        with pytest.raises(OSError, match="already running"):
+            analyze_module.open_watch_socket(state, sock_path)
+    finally:
+        server.shutdown()
+        server.server_close()
+    with pytest.raises(OSError):
+        analyze_module.query_watch(str(tmp_path / "missing.sock"), "status")
+
+    # socket이 아닌 경로 (일반 파일, 파일을 가리키는 symlink)는 지우지 않는다
+    regular = tmp_path / "notes.txt"
+    regular.write_text("keep")
+    link = tmp_path / "link.sock"
+    link.symlink_to(regular)
+    for path in (regular, link):
+        with pytest.raises(OSError, match="not a socket"):
+            analyze_module.open_watch_socket(state, str(path))
+    assert regular.read_text() == "keep" and link.is_symlink()
+
+
+def test_fetch_limiter_aimd(analyze_module, monkeypatch):
+    """성공 1 round마다 상한 +1, 첫 byte 지연 포화면 -1, transient 실패는 절반 — 같은 감소 이전에
+    시작된 fetch의 실패는 다시 줄이지 않고, 상한은 [MIN, MAX] 안에 머문다."""
+    monkeypatch.setattr(analyze_module, "SSH_FETCH_WORKERS_MAX", 6)
+    limiter = analyze_module.FetchLimiter("mac", initial=4)
+
+    def round_trip(latency, n=None):
+        for _ in range(n or limiter.limit):
+            limiter.release(limiter.acquire(), latency)
+
+    round_trip(0.01)
+    assert limiter.limit == 5
+    round_trip(0.01)
+    round_trip(0.01)
+    assert limiter.limit == 6  # MAX
+    round_trip(0.5)  # 지연 EWMA가 최저치의 2배 초과 → 감소
+    assert limiter.limit == 5
+
+    epochs = [limiter.acquire() for _ in range(4)]
+    for epoch in epochs:
+        limiter.release(epoch, 0.0, ok=False, transient=True)
+    assert limiter.limit == 2  # 동시 실패 4건이어도 절반 1회
+    limiter.release(limiter.acquire(), 0.0, ok=False, transient=True)
+    limiter.release(limiter.acquire(), 0.0, ok=False, transient=True)
+    assert limiter.limit == 1  # MIN
+    stats = limiter.build()
+    assert {k: stats["concurrency"][k] for k in ("initial", "final", "min", "max")} == {
+        "initial": 4, "final": 1, "min": 1, "max": 6,
+    }
+    assert (stats["transient_failures"], stats["retries"]) == (6, 0)
+
+
+def test_remote_fetch_retries_transient_ssh_failures(analyze_module, tmp_path, monkeypatch):
+    """ssh rc 255 (mux session 거부 등)는 backoff 후 재시도해 결과를 회수하고, 원격 명령 실패
+    (rc != 255)는 재시도 없이 warning — 재시도 수는 transport 통계에 남는다."""
+    files = _remote_fixture_files(tmp_path, analyze_module, monkeypatch)
+    gone = files[0].replace("s0.jsonl", "gone.jsonl")
+    flags = tmp_path / "flags"
+    flags.mkdir()
+    # 파일마다 첫 시도는 ssh 자체 실패 (exit 255)
+    _install_fake_ssh(tmp_path, monkeypatch, (
+        f'flag="{flags}/$(echo "$*" | cksum | cut -d" " -f1)"\n'
+        'if [ ! -e "$flag" ]; then touch "$flag"; exit 255; fi\n'
+        'exec sh -c "$*"\n'
+    ))
+    monkeypatch.setattr(analyze_module, "_fetch_limiters", {})
+    monkeypatch.setattr(analyze_module, "SSH_RETRY_BACKOFF_SECONDS", 0.0)
+
+    warnings: list = []
+    triples = sorted(analyze_module.analyze_remote_sessions("mac", files + [gone], warnings, transport="cat"))
+    expected = {p: analyze_module.analyze_session(p) for p in files[:-1]}
+    assert {p: r for p, r, _ in triples if r is not None} == expected
+    assert [w for _, _, ws in triples for w in ws] == [
+        f"host mac: ssh cat failed (rc=1) for {gone} — partial result"
+    ]
+    stats = analyze_module.transport_stats()["mac"]
+    assert (stats["retries"], stats["transient_failures"], stats["gave_up"]) == (5, 5, 0)
+    assert stats["requests"] == 10
+
+    # 계속 실패하면 SSH_FETCH_RETRIES회 재시도 후 마지막 시도의 warning만 남긴다
+    monkeypatch.setattr(analyze_module, "_fetch_limiters", {})
+    (tmp_path / "always").mkdir()
+    _install_fake_ssh(tmp_path / "always", monkeypatch, "exit 255\n")
+    assert analyze_module.analyze_remote_sessions("mac", [files[0]], [], transport="cat") == [
+        (files[0], None, [f"host mac: ssh cat failed (rc=255) for {files[0]} — partial result"])
+    ]
+    stats = analyze_module.transport_stats()["mac"]
+    retries = analyze_module.SSH_FETCH_RETRIES
+    assert (stats["requests"], stats["retries"], stats["gave_up"]) == (retries + 1, retries, 1)
+
+
+def test_async_cat_transport_idle_timeout_keeps_slow_streams(analyze_module, tmp_path, monkeypatch):
+    """cat transport는 event loop 1개에서 파일별 ssh stdout을 도착하는 대로 파싱한다. timeout은 read
+    무응답 기준이라 전체 시간이 길어도 조금씩 오는 stream은 끝까지 받고, 멈춘 stream만 끊어 재시도 후
+    warning을 남긴다 — 멈춘 파일이 있어도 나머지 파일은 기다리지 않고 끝난다."""
+    import time
+    files = _remote_fixture_files(tmp_path, analyze_module, monkeypatch)
+    slow, stalled = files[0], files[1]
+    _install_fake_ssh(tmp_path, monkeypatch, (
+        f'case "$2" in\n'
+        f'  {slow}) while IFS= read -r line; do printf "%s\\n" "$line"; sleep 0.3; done < "$2";;\n'
+        f'  {stalled}) exec sleep 30;;\n'
+        '  *) exec sh -c "$*";;\n'
+        'esac\n'
+    ))
+    monkeypatch.setattr(analyze_module, "_fetch_limiters", {})
+    monkeypatch.setattr(analyze_module, "SSH_READ_IDLE_TIMEOUT_SECONDS", 0.6)
+    monkeypatch.setattr(analyze_module, "SSH_RETRY_BACKOFF_SECONDS", 0.0)
+    monkeypatch.setattr(analyze_module, "SSH_FETCH_RETRIES", 1)
+
+    started = time.perf_counter()
+    triples = {p: (r, w) for p, r, w in analyze_module.analyze_remote_sessions("mac", files, [], transport="cat")}
+    assert time.perf_counter() - started < 10
+    # 4줄 × 0.3s > idle timeout이지만 read 간격은 짧으므로 끝까지 받는다
+    assert triples[slow] == (analyze_module.analyze_session(slow), [])
+    assert triples[files[2]] == (analyze_module.analyze_session(files[2]), [])
+    assert triples[files[3]] == (None, [])  # 빈 파일
+    assert triples[stalled] == (None, [
+        f"host mac: ssh cat idle timeout (0.6s 무응답) for {stalled} — partial result"
+    ])
+    stats = analyze_module.transport_stats()["mac"]
+    assert (stats["requests"], stats["retries"], stats["transient_failures"], stats["gave_up"]) == (5, 1, 2, 1)
+
+
+def test_async_cat_transport_backpressure_and_close(analyze_module, tmp_path, monkeypatch, capfd):
+    """caller가 결과를 꺼내지 않으면 worker + queue 크기 이상 ssh를 시작하지 않고, generator를 닫으면
+    새 fetch 없이 진행 중 ssh를 끊고 바로 돌아온다. 마지막 결과 직후 (done 전) 닫아도 조용히 끝난다."""
+    import time
+    files = _remote_fixture_files(tmp_path, analyze_module, monkeypatch)
+    for i in range(3, 40):
+        p = tmp_path / "home" / ".claude" / "projects" / "p" / f"s{i}.jsonl"
+        _write_session(p, [f"/tmp/da-abc{i}-arbiter-Xy{i}"])
+        files.append(str(p))
+    log, stall = tmp_path / "ssh.log", tmp_path / "stall"
+    _install_fake_ssh(tmp_path, monkeypatch, (
+        f'echo "$2" >> {log}\n'
+        f'if [ -e {stall} ] && [ "$2" != {files[0]} ]; then exec sleep 30; fi\n'
+        'exec sh -c "$*"\n'
+    ))
+    monkeypatch.setattr(analyze_module, "_fetch_limiters", {})
+    monkeypatch.setattr(analyze_module, "SSH_FETCH_WORKERS_MAX", 2)
+
+    def fetched():
+        return len(log.read_text().splitlines()) if log.exists() else 0
+
+    gen = analyze_module.iter_remote_sessions_async("mac", files)
+    assert next(gen)[0] in files
+    time.sleep(0.5)
+    assert fetched() <= 1 + 2 + 2  # 꺼낸 1건 + queue 2 + worker 2
+    gen.close()
+    count = fetched()
+    time.sleep(0.3)
+    assert fetched() == count < len(files)
+
+    stall.write_text("")
+    log.write_text("")
+    gen = analyze_module.iter_remote_sessions_async("mac", files)
+    assert next(gen)[0] == files[0]
+    started = time.perf_counter()
+    gen.close()  # 멈춘 ssh 1건을 kill하고 끝난다 (30s를 기다리지 않음)
+    assert time.perf_counter() - started < 5
+    assert fetched() <= 3  # files[0] + worker 2개의 멈춘 ssh
+    assert analyze_module.fetch_limiter("mac").active == 0
+
+    import threading
+    monkeypatch.setattr(threading, "excepthook", threading.__excepthook__)  # 실제 실행처럼 stderr에 출력
+    stall.unlink()
+    capfd.readouterr()
+    gen = analyze_module.iter_remote_sessions_async("mac", files[:2])
+    assert {next(gen)[0], next(gen)[0]} == set(files[:2])
+    gen.close()
+    assert capfd.readouterr().err == ""
+
+
+def test_verdict_index_query_matches_run_and_filters(analyze_module, tmp_path, capsys):
+    """--index 기록 후 filter 없는 query는 일회성 aggregate와 같고 (key 순서 포함), verdict/시각
+    filter는 매칭 verdict만으로 M-2..M-4를 다시 계산한다."""
+    import json as _json
+    files = []
+    for i, (stamp, verdict, sev) in enumerate([
+        ("2026-05-01T09:00:00Z", "CONFIRMED_ISSUE", "HIGH"),
+        ("2026-05-08T09:00:00+09:00", "NOT_AN_ISSUE", "LOW"),
+        ("2026-05-10T00:00:00.500Z", "CONFIRMED_ISSUE", "CRITICAL"),
+    ]):
+        p = tmp_path / f"s{i}.jsonl"
+        texts = [
+            f"/tmp/da-abc{i}-arbiter-Xy{i} /tmp/da-abc{i}-intensity-Zz{i}",
+            "검토 강도: FULL",
+            f"### Regression-{i} — {verdict}\n**심각도**: {sev}",
+            f"### Design-{i} — CONFIRMED_ISSUE\n**심각도**: HIGH",
+            f"selective: trigger 2건 → stable {i}건, split 1건, fragmented 0건",
+        ]
+        with open(p, "w") as fp:
+            for t in texts:
+                fp.write(_json.dumps({"type": "assistant", "timestamp": stamp,
+                                      "message": {"content": [{"type": "text", "text": t}]}}) + "\n")
+        files.append(str(p))
+    (tmp_path / "plain.jsonl").write_text('{"type": "user"}\n')
+    files.insert(1, str(tmp_path / "plain.jsonl"))
+
+    db = str(tmp_path / "verdicts.db")
+    acc = analyze_module.AggregateAccumulator()
+    index = analyze_module.VerdictIndex(db, ["minipc"])
+    analyze_module.run_hosts([analyze_module.HostRun("minipc", False, list(reversed(files)))], None, acc, [index])
+    index.commit(["minipc"], "live")
+    assert (index.sessions, index.verdicts) == (4, 6)
+    assert not os.path.exists(db + ".tmp")
+
+    expected = acc.build(["minipc"], "live", [])
+    agg = analyze_module.query_index(db, {})
+    assert agg.pop("query")["filters"] == {}
+    expected.pop("captured_at")
+    agg.pop("captured_at")
+    assert _json.dumps(agg) == _json.dumps(expected)
+
+    # 시각은 UTC로 정규화 — s1 (+09:00)은 2026-05-08T00:00Z, s2는 2026-05-10
+    filters = {"verdict": ["CONFIRMED_ISSUE"], "bundle": ["Regression"],
+               "since": analyze_module.parse_time_bound("2026-05-05")}
+    agg = analyze_module.query_index(db, filters)
+    assert agg["session_counts"]["total"] == 1
+    assert agg["metrics"]["M-3"]["by_bundle"]["Regression"] == {"total": 1, "confirmed": 1, "confirmed_rate": 1.0}
+    assert agg["metrics"]["M-3"]["by_bundle"]["Design"]["total"] == 0
+    assert agg["metrics"]["M-5"]["distribution"] == {"stable": 2, "split": 1}
+
+    assert analyze_module.main(["query", "--index", db, "--severity", "high,critical", "--list"]) == 0
+    listed = capsys.readouterr().out
+    assert "4 verdicts" in listed
+    assert "| minipc | " + files[-1] + " | Regression-2 | Regression | CONFIRMED_ISSUE | CRITICAL |" in listed
+    assert "2026-05-10T00:00:00.500+00:00" in listed
+    assert analyze_module.main(["query", "--index", str(tmp_path / "missing.db")]) == 1
+
+
+def test_verdict_index_time_filter_keeps_sessions_without_verdicts(analyze_module, tmp_path):
+    """--since/--until만으로는 verdict 없는 (intensity-only) 세션이 빠지지 않는다 — 시각 filter는 활동
+    구간으로 세션을, timestamp로 verdict 행만 좁힌다."""
+    import json as _json
+    files = []
+    for name, stamp, texts in [
+        ("arbiter", "2026-05-10T00:00:00Z", ["/tmp/da-abc0-arbiter-Xy0", "### Regression-0 — CONFIRMED_ISSUE"]),
+        ("intensity", "2026-05-09T00:00:00Z", ["/tmp/da-abc1-intensity-Zz1", "검토 강도: LITE"]),
+        ("old", "2026-04-01T00:00:00Z", ["/tmp/da-abc2-intensity-Zz2", "검토 강도: FULL"]),
+    ]:
+        p = tmp_path / f"{name}.jsonl"
+        with open(p, "w") as fp:
+            for t in texts:
+                fp.write(_json.dumps({"type": "assistant", "timestamp": stamp,
+                                      "message": {"content": [{"type": "text", "text": t}]}}) + "\n")
+        files.append(str(p))
+
+    db = str(tmp_path / "verdicts.db")
+    index = analyze_module.VerdictIndex(db, ["minipc"])
+    analyze_module.run_hosts([analyze_module.HostRun("minipc", False, files)], None,
+                             analyze_module.AggregateAccumulator(), [index])
+    index.commit(["minipc"], "live")
+
+    agg = analyze_module.query_index(db, {"since": analyze_module.parse_time_bound("2026-05-05")})
+    assert agg["session_counts"] == {"total": 2, "arbiter_marker_sessions": 1, "intensity_marker_sessions": 1}
+    assert agg["metrics"]["M-1"]["distribution"] == {"LITE": 1}
+    agg = analyze_module.query_index(db, {"since": analyze_module.parse_time_bound("2026-05-05"),
+                                          "verdict": ["CONFIRMED_ISSUE"]})
+    assert agg["session_counts"]["total"] == 1
+
+
+def test_dedup_skips_identical_copies_across_hosts(analyze_module, tmp_path, monkeypatch):
+    """content가 같은 원격 사본은 fetch/파싱 없이 빠지고 (로컬 사본 유지), 크기만 같은 파일과 빈 파일은
+    남는다. digest는 cache에 남아 재실행 시 다시 계산하지 않고, watch도 같은 집합을 추적한다."""
+    import json as _json
+
+    remote = _remote_fixture_files(tmp_path, analyze_module, monkeypatch)
+    local_root = tmp_path / "local"
+    (local_root / "projects" / "p").mkdir(parents=True)
+    (local_root / "sessions").mkdir()
+    monkeypatch.setitem(analyze_module.HOST_PATH_MAP, "minipc", {
+        "claude": str(local_root / "projects"),
+        "codex": str(local_root / "sessions"),
+    })
+    local = [str(local_root / "projects" / "p" / f"l{i}.jsonl") for i in range(3)]
+    for path, src in zip(local, remote):
+        with open(src) as s:
+            content = s.read()
+        if path == local[2]:
+            content = content.replace("Xy2", "Xz2")  # 같은 크기, 다른 content
+        with open(path, "w") as fp:
+            fp.write(content)
+    (local_root / "sessions" / "rollout-empty.jsonl").write_text("")
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    log = tmp_path / "ssh.log"
+    _install_fake_ssh(tmp_path, monkeypatch,
+                      f'echo "$*" >> {log}\ncase "$1" in check) exit 0;; esac\nexec sh -c "$*"\n')
+    options = {"transport": "cat", "mirror_root": None}
+
+    def runs():
+        return [analyze_module.HostRun("minipc", False), analyze_module.HostRun("mac", True)]
+
+    cache = analyze_module.SessionCache(str(tmp_path / "cache.sqlite3"))
+    deduped = runs()
+    summary = analyze_module.dedupe_host_runs(deduped, cache)
+    assert summary == {"sessions": 2, "by_host": {"minipc": 0, "mac": 2}, "candidates": 6, "hashed": 6,
+                       "repeated_paths": 0}
+    assert sorted(deduped[1].files) == remote[2:] and sorted(deduped[1].duplicates) == remote[:2]
+    log.write_text("")
+    acc = analyze_module.AggregateAccumulator()
+    analyze_module.run_hosts(deduped, cache, acc, **options)
+    fetched = log.read_text()
+    assert remote[2] in fetched and remote[0] not in fetched and remote[1] not in fetched
+    agg = acc.build(["minipc", "mac"], "live", [])
+    assert agg["session_counts"]["total"] == 5  # local 4 (빈 rollout 포함) + 원격 s2 (원격 빈 파일은 결과 없음)
+    assert agg["session_counts"]["arbiter_marker_sessions"] == 4
+
+    again = runs()
+    assert analyze_module.dedupe_host_runs(again, cache)["hashed"] == 0
+    assert [run.files for run in again] == [run.files for run in deduped]
+
+    # --corpus manifest의 반복 path는 digest 없이 뺀다
+    corpus = [analyze_module.HostRun("minipc", False, [local[0], local[1], local[0]])]
+    assert analyze_module.dedupe_host_runs(corpus, None)["repeated_paths"] == 1
+    assert corpus[0].files == local[:2]
+
+    state = analyze_module.WatchState(["minipc", "mac"], "minipc", cache, dedup=True, **options)
+    state.poll()
+    assert sorted(state.sessions["mac"]) == [remote[2], remote[3]]
+    served = _json.loads(state.answer("json"))
+    assert served["dedup"]["sessions"] == 2
+    assert _aggregate_without_timestamp(served)["metrics"] == agg["metrics"]
+    cache.close()
+
+
+def test_sample_stratified_deterministic_and_full_fraction_matches(analyze_module, tmp_path, monkeypatch):
+    """층 (host, source) 배분은 합이 target이고 비어 있지 않은 층마다 최소 1개이며, 같은 seed는 같은
+    표본을 고른다. --sample-frac 1의 점 추정은 전체 aggregate 비율과 같고 구간이 추정을 감싼다."""
+    assert analyze_module.allocate_sample([90, 0, 10], 5) == [4, 0, 1]
+    assert analyze_module.allocate_sample([3, 1, 0], 10) == [3, 1, 0]
+    assert sum(analyze_module.allocate_sample([7, 5, 3, 1], 9)) == 9
+
+    claude = tmp_path / "claude" / "p"
+    codex = tmp_path / "codex" / "2026"
+    claude.mkdir(parents=True)
+    codex.mkdir(parents=True)
+    monkeypatch.setitem(analyze_module.HOST_PATH_MAP, "minipc", {
+        "claude": str(tmp_path / "claude"), "codex": str(tmp_path / "codex"),
+    })
+    for i in range(8):
+        _write_session(claude / f"s{i}.jsonl", [
+            f"/tmp/da-abc{i}-arbiter-Xy{i} /tmp/da-abc{i}-intensity-Zz{i}",
+            "검토 강도: " + ("FULL" if i % 3 else "LITE"),
+            f"### Regression-{i} — " + ("CONFIRMED_ISSUE" if i % 2 else "NOT_AN_ISSUE") + "\n**심각도**: HIGH",
+        ])
+    for i in range(2):
+        _write_session(codex / f"rollout-{i}.jsonl", [
+            f"/tmp/da-cdx{i}-arbiter-Qq{i}",
+            f"### Design-{i} — CONFIRMED_ISSUE\n**심각도**: MEDIUM",
+        ])
+
+    def sampled(seed, **kw):
+        run = analyze_module.HostRun("minipc", False, analyze_module.collect_local_files("minipc"))
+        estimator = analyze_module.sample_host_runs([run], seed=seed, **kw)
+        return run, estimator
+
+    run, estimator = sampled(7, size=4)
+    assert len(run.files) == 4
+    assert [(s["source"], s["population"], s["sampled"]) for s in estimator.strata] == [("claude", 8, 3), ("codex", 2, 1)]
+    assert sampled(7, size=4)[0].files == run.files
+    assert {tuple(sampled(seed, size=4)[0].files) for seed in range(6)} != {tuple(run.files)}
+
+    run, estimator = sampled(3, frac=1.0)
+    acc = analyze_module.AggregateAccumulator()
+    analyze_module.run_hosts([run], None, acc, [estimator])
+    agg = acc.build(["minipc"], "live", [])
+    sample = estimator.build()
+    assert (sample["population"], sample["sampled"]) == (10, 10)
+    assert [s["analyzed"] for s in sample["strata"]] == [8, 2]
+    for metric in ("M-1", "M-2"):
+        for k, pct in agg["metrics"][metric]["percentages"].items():
+            est = sample["estimates"][metric][k]
+            assert est["estimate"] == pct
+            assert est["ci"][0] <= est["estimate"] <= est["ci"][1]
+    for bundle, row in agg["metrics"]["M-3"]["by_bundle"].items():
+        est = sample["estimates"]["M-3"][bundle]
+        assert est["estimate"] == (round(row["confirmed_rate"], 3) if row["total"] else None)
+    assert sample["estimates"]["M-3"]["Regression"]["estimate"] == 0.5
+    assert sample["estimates"]["M-3"]["Maintainability"] == {"estimate": None, "ci": None}
+    assert estimator.build() == sample
+
+
+def test_payload_walker_schema_paths_and_deep_nesting(analyze_module):
+    """record schema별 include subtree만 key 순서대로 수집하고, exclude field와 상한 초과 binary field는
+    건너뛴다. 명시 stack walk라 recursion 한도를 넘는 nesting도 처리한다."""
+    import sys
+    blob = "A" * (analyze_module.PAYLOAD_BINARY_MAX_CHARS + 1)
+    claude = {
+        "parentUuid": "p-1", "uuid": "u-1", "cwd": "/tmp/da-ab-arbiter-Cw1", "type": "user",
+        "message": {"id": "msg_1", "role": "user", "content": [
+            {"type": "tool_result", "tool_use_id": "toolu_1", "content": [
+                {"type": "text", "text": "first"},
+                {"type": "image", "source": {"type": "base64", "media_type": "image/png", "data": blob}},
+                {"type": "image", "source": {"type": "url", "data": "short"}},
+            ]},
+            {"type": "thinking", "thinking": "second", "signature": "sig"},
+        ]},
+        "toolUseResult": {"filePath": "/x", "originalFile": "/tmp/da-ab-arbiter-Of1", "newString": "third"},
+        "snapshot": {"trackedFileBackups": {"a": "backup"}},
+    }
+    out: list = []
+    analyze_module.extract_text_payloads(claude, out)
+    assert out == ["tool_result", "text", "first", "image", "base64", "image/png", "image", "url", "short",
+                   "thinking", "second", "/x", "third"]
+
+    codex = {"timestamp": "t", "type": "response_item", "payload": {
+        "type": "reasoning", "id": "rs_1", "encrypted_content": "enc",
+        "content": [{"type": "input_image", "image_url": "data:image/png;base64," + blob},
+                    {"type": "output_text", "text": "codex"}]}}
+    out = []
+    analyze_module.extract_text_payloads(codex, out)
+    assert out == ["reasoning", "input_image", "output_text", "codex"]
+
+    deep: object = "bottom"
+    for _ in range(sys.getrecursionlimit() * 2):
+        deep = [{"text": deep}]
+    out = []
+    analyze_module.extract_text_payloads({"type": "assistant", "message": {"content": deep}}, out)
+    assert out == ["bottom"]
+
+
+def test_skipped_payloads_keep_severity_window_distance(analyze_module, tmp_path):
+    """walk가 빼는 string (base64 image, id 등)도 가상 blob 위치는 차지하므로, 앞 finding의 severity
+    window가 image 너머 다음 finding의 라벨에 닿지 않는다 (전체 string walk와 같은 거리)."""
+    import json as _json
+    blob = "A" * (analyze_module.PAYLOAD_BINARY_MAX_CHARS + 1)
+    image = {"type": "user", "uuid": "u-1", "message": {"role": "user", "content": [
+        {"type": "tool_result", "tool_use_id": "toolu_1", "content": [
+            {"type": "image", "source": {"type": "base64", "media_type": "image/png", "data": blob}}]}]}}
+
+    def all_strings(value):
+        if isinstance(value, str):
+            return [value]
+        children = value.values() if isinstance(value, dict) else value if isinstance(value, list) else ()
+        return [s for child in children for s in all_strings(child)]
+
+    out: list = []
+    analyze_module.extract_text_payloads(image, out, gaps=True)
+    assert [x for x in out if isinstance(x, str)] == ["tool_result", "image", "base64", "image/png"]
+    assert sum(x if isinstance(x, int) else len(x) + 1 for x in out) == sum(len(x) + 1 for x in all_strings(image))
+
+    def run(with_image):
+        p = tmp_path / f"s{int(with_image)}.jsonl"
+        records = [
+            {"type": "assistant", "message": {"content": [{"type": "text", "text": t}]}}
+            for t in ["/tmp/da-abc1-arbiter-Xy1", "### Regression-1 — CONFIRMED_ISSUE",
+                      "### Design-2 — CONFIRMED_ISSUE\n**심각도**: HIGH"]
+        ]
+        if with_image:
+            records.insert(2, image)
+        p.write_text("".join(_json.dumps(r) + "\n" for r in records))
+        result = analyze_module.analyze_session(str(p))
+        return {v["finding_id"]: v.get("severity") for v in result["verdicts"]}
+
+    assert run(False) == {"Regression-1": "HIGH", "Design-2": "HIGH"}
+    assert run(True) == {"Regression-1": None, "Design-2": "HIGH"}
+
+def test_trend_buckets_split_sessions_by_start_time(analyze_module, tmp_path):
+    """--bucket은 첫 record timestamp (없으면 mtime)의 UTC 구간으로 세션을 나누고, 구간 합은 전체
+    aggregate와 같으며 한 구간뿐이면 metric까지 같다."""
+    import json as _json
+    files = []
+    for i, (stamp, verdict) in enumerate([
+        ("2026-05-03T23:30:00-01:00", "CONFIRMED_ISSUE"),  # UTC 05-04 (월) → 2026-W19
+        ("2026-05-10T09:00:00Z", "NOT_AN_ISSUE"),           # 일요일 → 2026-W19
+        ("2026-05-11T00:00:00Z", "CONFIRMED_ISSUE"),        # 2026-W20
+        (None, "NEEDS_MORE_INFO"),                          # mtime fallback
+    ]):
+        p = tmp_path / f"s{i}.jsonl"
+        with open(p, "w") as fp:
+            for t in [f"/tmp/da-abc{i}-arbiter-Xy{i} /tmp/da-abc{i}-intensity-Zz{i}", "검토 강도: FULL",
+                      f"### Regression-{i} — {verdict}\n**심각도**: HIGH"]:
+                record = {"type": "assistant", "message": {"content": [{"type": "text", "text": t}]}}
+                if stamp:
+                    record["timestamp"] = stamp
+                fp.write(_json.dumps(record) + "\n")
+        files.append(str(p))
+    mtime = 1_779_062_400  # 2026-05-18T00:00:00Z → 2026-W21
+    os.utime(files[3], (mtime, mtime))
+
+    assert analyze_module.bucket_of(analyze_module.datetime.datetime(2026, 1, 1, tzinfo=analyze_module.datetime.timezone.utc), "week") == ("2026-W01", "2025-12-29")
+
+    def run(unit):
+        host_run = analyze_module.HostRun("minipc", False, list(files))
+        trend = analyze_module.TrendBuckets([host_run], unit)
+        acc = analyze_module.AggregateAccumulator()
+        analyze_module.run_hosts([host_run], None, acc, [trend])
+        return acc.build(["minipc"], "live", []), trend.build(["minipc"], "live")
+
+    agg, trend = run("week")
+    assert trend["time_source"] == {"timestamp": 3, "mtime": 1, "unknown": 0}
+    assert [(b["bucket"], b["start"], b["session_counts"]["total"]) for b in trend["series"]] == [
+        ("2026-W19", "2026-05-04", 2), ("2026-W20", "2026-05-11", 1), ("2026-W21", "2026-05-18", 1)]
+    assert trend["series"][0]["metrics"]["M-2"]["distribution"] == {"CONFIRMED_ISSUE": 1, "NOT_AN_ISSUE": 1}
+    assert sum(b["metrics"]["M-2"]["n"] for b in trend["series"]) == agg["metrics"]["M-2"]["n"]
+
+    agg, trend = run("month")
+    assert [b["bucket"] for b in trend["series"]] == ["2026-05"]
+    assert trend["series"][0]["metrics"] == agg["metrics"]
+    assert trend["series"][0]["session_counts"] == agg["session_counts"]
+
+    agg["trend"] = trend
+    markdown = analyze_module.render_markdown(agg)
+    assert "## 추이 (month 단위, UTC)" in markdown
+    assert "| 2026-05 | 4 | 4 | 100.0% | 4 | 50.0% | 50.0% | - | - |" in markdown
+
+
+def test_triaged_sessions_keep_record_timestamps(analyze_module, tmp_path):
+    """triage 제외 (marker 없는) 세션도 양 끝 record timestamp를 읽어 --bucket은 mtime이 아닌 시작
+    시각으로 배정하고 --index sessions 행에 활동 구간이 남는다 — 전체 파싱 결과와 같은 값."""
+    import json as _json
+    import sqlite3
+    plain = tmp_path / "plain.jsonl"
+    with open(plain, "w") as fp:
+        fp.write(_json.dumps({"type": "summary", "summary": "timestamp 없는 첫 줄"}) + "\n")
+        for stamp in ("2026-05-04T10:00:00Z", "2026-05-05T10:00:00Z", "2026-05-06T10:00:00Z"):
+            fp.write(_json.dumps({"type": "user", "timestamp": stamp, "message": {"content": "hi"}}) + "\n")
+        fp.write('{"type": "assistant", "timestamp": 7}\n{not json "timestamp"')
+    marker = tmp_path / "marker.jsonl"
+    _write_session(marker, ["/tmp/da-abc0-arbiter-Xy0"])
+    mtime = 1_779_062_400  # 2026-05-18 → 2026-W21
+    for p in (plain, marker):
+        os.utime(p, (mtime, mtime))
+    files = [str(marker), str(plain)]
+
+    full = analyze_module.analyze_session(str(plain))
+    bounds = ("2026-05-04T10:00:00Z", "2026-05-06T10:00:00Z")
+    assert (full["first_timestamp"], full["last_timestamp"]) == bounds
+    assert analyze_module.file_time_bounds(str(plain)) == bounds
+    for size in (1, 7, 64, 1 << 20):
+        scan = analyze_module.RecordTimeBounds()
+        content = plain.read_bytes()
+        for i in range(0, len(content), size):
+            scan.feed(content[i:i + size])
+        assert scan.finish() == bounds
+    assert _run_local(analyze_module, "minipc", [str(plain)], None, triage=True) == [full]
+
+    db = str(tmp_path / "verdicts.db")
+    host_run = analyze_module.HostRun("minipc", False, files)
+    trend = analyze_module.TrendBuckets([host_run], "week")
+    index = analyze_module.VerdictIndex(db, ["minipc"])
+    analyze_module.run_hosts([host_run], None, analyze_module.AggregateAccumulator(), [trend, index], triage=True)
+    index.commit(["minipc"], "live")
+    agg = trend.build(["minipc"], "live")
+    assert agg["time_source"] == {"timestamp": 1, "mtime": 1, "unknown": 0}
+    assert [(b["bucket"], b["session_counts"]["total"]) for b in agg["series"]] == [("2026-W19", 1), ("2026-W21", 1)]
+    with sqlite3.connect(db) as conn:
+        row = conn.execute("SELECT first_timestamp, last_timestamp FROM sessions WHERE path = ?", (str(plain),)).fetchone()
+    assert row == ("2026-05-04T10:00:00.000+00:00", "2026-05-06T10:00:00.000+00:00")
+
+
+def test_gate_reuses_unchanged_files_and_fails_on_drift(analyze_module, tmp_path, monkeypatch, capsys):
+    """gate는 content digest가 store와 같은 파일은 재분석하지 않고, 바뀐 파일만 다시 분석해 baseline과
+    metric group별 허용치로 비교한다 (exit 0 통과 / 1 초과 / 2 baseline 없음)."""
+    import json as _json
+    claude = tmp_path / "claude" / "p"
+    claude.mkdir(parents=True)
+    monkeypatch.setitem(analyze_module.HOST_PATH_MAP, "minipc", {
+        "claude": str(tmp_path / "claude"), "codex": str(tmp_path / "codex"),
+    })
+    monkeypatch.setattr(analyze_module, "current_host", lambda: "minipc")
+    files = []
+    for i, verdict in enumerate(["CONFIRMED_ISSUE", "NOT_AN_ISSUE", "CONFIRMED_ISSUE", "CONFIRMED_ISSUE"]):
+        p = claude / f"s{i}.jsonl"
+        _write_session(p, [f"/tmp/da-abc{i}-arbiter-Xy{i}", f"### Regression-{i} — {verdict}\n**심각도**: HIGH"])
+        files.append(str(p))
+    manifest = tmp_path / "m.json"
+    manifest.write_text(_json.dumps({"snapshot_id": "snap", "files": files + [files[0]]}))
+    base = ["gate", "--corpus", str(manifest), "--hosts", "minipc", "--cache", str(tmp_path / "c.db")]
+
+    def gate(*extra):
+        out = tmp_path / "g.json"
+        code = analyze_module.main(base + ["--json", f"out={out}", *extra])
+        capsys.readouterr()
+        return code, _json.loads(out.read_text())["gate"] if out.exists() else None
+
+    assert analyze_module.main(base + ["--no-cache"]) == 2  # baseline도 captured_metric_summary도 없음
+    assert analyze_module.main(base + ["--update"]) == 0
+    assert (tmp_path / "snap.baseline.json").exists() and (tmp_path / "snap.gate.json").exists()
+    code, result = gate()
+    assert code == 0
+    assert (result["reused"], result["reanalyzed"], result["dedup"]) == (4, 0, 1)
+    assert result["status"] == "pass" and all(c["ok"] for c in result["checks"])
+
+    # s3 CONFIRMED → NOT_AN_ISSUE: M-2 CONFIRMED 75% → 50% (-25%p)
+    _write_session(claude / "s3.jsonl", ["/tmp/da-abc3-arbiter-Xy3", "### Regression-3 — NOT_AN_ISSUE\n**심각도**: HIGH"])
+    (tmp_path / "g.json").unlink()
+    code, result = gate("--tolerance", "30", "--tolerance", "M-3=30")
+    assert code == 0
+    assert (result["reused"], result["reanalyzed"], result["results_changed"]) == (3, 1, 1)
+    code, result = gate("--tolerance", "M-2=10")
+    assert code == 1 and result["reanalyzed"] == 0
+    failed = {(c["metric"], c["item"]): c["delta"] for c in result["checks"] if not c["ok"]}
+    assert failed == {("M-2", "CONFIRMED_ISSUE"): -25.0, ("M-2", "NOT_AN_ISSUE"): 25.0,
+                      ("M-3", "Regression.confirmed_rate"): -25.0}
+
+    checks = analyze_module.compare_gate({("counts", "total"): (0, "%")}, {("counts", "total"): (3, "%")},
+                                         {"default": 5.0})
+    assert checks[0]["delta"] is None and not checks[0]["ok"]
+
+
+def test_snapshot_pins_content_and_corpus_reads_blob_store(analyze_module, tmp_path, monkeypatch, capsys):
+    """snapshot은 pinned 파일을 content sha256 주소의 gzip blob으로 고정하고 (같은 content는 blob 1개),
+    --corpus는 이후 원본이 바뀌어도 blob에서 같은 aggregate를 만든다. 깨진 blob은 결과 없음 + warning."""
+    import gzip
+    import json as _json
+    claude = tmp_path / "claude" / "p"
+    claude.mkdir(parents=True)
+    monkeypatch.setitem(analyze_module.HOST_PATH_MAP, "minipc", {
+        "claude": str(tmp_path / "claude"), "codex": str(tmp_path / "codex"),
+    })
+    monkeypatch.setattr(analyze_module, "current_host", lambda: "minipc")
+    files = []
+    for i, verdict in enumerate(["CONFIRMED_ISSUE", "NOT_AN_ISSUE", "CONFIRMED_ISSUE"]):
+        p = claude / f"s{i}.jsonl"
+        _write_session(p, [f"/tmp/da-abc{i}-arbiter-Xy{i}", f"### Regression-{i} — {verdict}\n**심각도**: HIGH"])
+        files.append(str(p))
+    (claude / "copy.jsonl").write_bytes((claude / "s0.jsonl").read_bytes())
+    _write_session(claude / "plain.jsonl", ["marker 없는 세션"])
+    files += [str(claude / "copy.jsonl"), str(claude / "plain.jsonl")]
+    manifest = tmp_path / "m.json"
+    manifest.write_text(_json.dumps({"snapshot_id": "snap", "files": files}))
+    store = tmp_path / "blobs"
+    run = ["--corpus", str(manifest), "--hosts", "minipc", "--no-cache", "--no-dedup"]
+
+    def aggregate(*extra):
+        out = tmp_path / "a.json"
+        assert analyze_module.main(run + ["--json", f"out={out}", *extra]) == 0
+        capsys.readouterr()
+        data = _json.loads(out.read_text())
+        data.pop("captured_at")
+        return data
+
+    live = aggregate()
+    assert analyze_module.main(["snapshot", "--corpus", str(manifest), "--blob-store", str(store)]) == 0
+    pinned = _json.loads(manifest.read_text())
+    assert pinned["blob_store"] == str(store) and set(pinned["blobs"]) == set(files)
+    assert pinned["blobs"][files[0]]["sha256"] == pinned["blobs"][files[3]]["sha256"]
+    blobs = sorted(store.glob("*/*.jsonl.gz"))
+    assert len(blobs) == 4
+    assert gzip.decompress(blobs[0].read_bytes()) in {(claude / n).read_bytes() for n in ("s0.jsonl", "s1.jsonl", "s2.jsonl", "plain.jsonl")}
+
+    # 원본이 바뀌어도 snapshot 입력은 그대로 — triage / --jobs 경로도 같은 결과
+    _write_session(claude / "s1.jsonl", ["/tmp/da-abc1-arbiter-Xy1", "### Regression-1 — CONFIRMED_ISSUE\n**심각도**: HIGH"])
+    assert aggregate() == live
+    assert aggregate("--no-triage", "--jobs", "2") == live
+
+    # 같은 content의 다른 snapshot은 blob을 새로 쓰지 않는다
+    other = tmp_path / "o.json"
+    other.write_text(_json.dumps({"snapshot_id": "other", "files": [files[0], files[2]]}))
+    assert analyze_module.main(["snapshot", "--corpus", str(other), "--blob-store", str(store)]) == 0
+    assert sorted(store.glob("*/*.jsonl.gz")) == blobs
+
+    # 고정된 blob이 사라졌고 현재 content가 다르면 복구 불가 — manifest는 그대로, exit 1
+    s1_blob = store / pinned["blobs"][files[1]]["sha256"][:2] / (pinned["blobs"][files[1]]["sha256"] + ".jsonl.gz")
+    s1_blob.unlink()
+    assert analyze_module.main(["snapshot", "--corpus", str(manifest)]) == 1
+    assert _json.loads(manifest.read_text()) == pinned
+    capsys.readouterr()
+
+    # 깨진 blob (content가 digest와 다름)은 결과 없음 + warning
+    with gzip.open(s1_blob, "wb") as fp:
+        fp.write((claude / "s2.jsonl").read_bytes())
+    broken = aggregate()
+    assert broken["session_counts"]["total"] == live["session_counts"]["total"] - 1
+    assert any("digest 불일치" in w and files[1] in w for w in broken["warnings"])